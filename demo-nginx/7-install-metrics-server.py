@@ -7,6 +7,7 @@ pyinfra -y -vv --user root ${SERVER_NAME} 7-install-metrics-server.py
 from pyinfra.operations import python, server
 
 from common import log_callback
+from constants import BUNDLED_METRICS_SERVER_MANIFEST, METRICS_SERVER_MANIFEST_URL
 
 KUBECONFIG = "/root/.kube/config"
 
@@ -17,14 +18,13 @@ def main() -> None:
 
 
 def install_metrics_server() -> None:
-    COMPONENT_SOURCE = (
-        "https://github.com/kubernetes-sigs/metrics-server/"
-        "releases/latest/download/components.yaml"
-    )
+    # The manifest of the offline bundle, when installed, is the same file.
     server.shell(
         name="Install Metrics Server",
         commands=[
-            f"wget {COMPONENT_SOURCE}",
+            f"if [ -f {BUNDLED_METRICS_SERVER_MANIFEST} ]; "
+            f"then cp {BUNDLED_METRICS_SERVER_MANIFEST} components.yaml; "
+            f"else wget -O components.yaml {METRICS_SERVER_MANIFEST_URL}; fi",
             "sed -i '/- args:/a \        - --kubelet-insecure-tls' components.yaml",
             f"kubectl apply -f components.yaml --kubeconfig {KUBECONFIG}",
             f"kubectl get crds --kubeconfig {KUBECONFIG}",
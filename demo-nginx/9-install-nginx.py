@@ -9,6 +9,7 @@ import io
 from pyinfra.operations import files, python, server
 
 from common import log_callback
+from constants import BUNDLED_METRICS_SERVER_MANIFEST, METRICS_SERVER_MANIFEST_URL
 
 KUBECONFIG = "/root/.kube/config"
 
@@ -19,14 +20,13 @@ def main() -> None:
 
 
 def install_metrics_server() -> None:
-    COMPONENT_SOURCE = (
-        "https://github.com/kubernetes-sigs/metrics-server/"
-        "releases/latest/download/components.yaml"
-    )
+    # The manifest of the offline bundle, when installed, is the same file.
     server.shell(
         name="Install Metrics Server",
         commands=[
-            f"wget {COMPONENT_SOURCE}",
+            f"if [ -f {BUNDLED_METRICS_SERVER_MANIFEST} ]; "
+            f"then cp {BUNDLED_METRICS_SERVER_MANIFEST} components.yaml; "
+            f"else wget -O components.yaml {METRICS_SERVER_MANIFEST_URL}; fi",
             "sed -i '/- args:/a \        - --kubelet-insecure-tls' components.yaml",
             f"kubectl apply -f components.yaml --kubeconfig {KUBECONFIG}",
             f"kubectl get crds --kubeconfig {KUBECONFIG}",
@@ -5,3 +5,15 @@ HDAR_URL = (
 )
 SMO_URL = "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/smo.git"
 KARMADA_RELEASE_BRANCH = "release-1.14"
+
+# Where offline-bundle/install-bundle.py extracts the offline bundle.
+OFFLINE_BUNDLE_DIR = "/opt/nephele-bundle"
+# Keep in sync with offline-bundle/contents.py.
+METRICS_SERVER_VERSION = "v0.7.2"
+METRICS_SERVER_MANIFEST_URL = (
+    "https://github.com/kubernetes-sigs/metrics-server/releases/download/"
+    f"{METRICS_SERVER_VERSION}/components.yaml"
+)
+BUNDLED_METRICS_SERVER_MANIFEST = (
+    f"{OFFLINE_BUNDLE_DIR}/downloads/metrics-server-components.yaml"
+)
@@ -11,6 +11,7 @@ from pyinfra.facts.hardware import Ipv4Addrs
 from pyinfra.operations import python, server
 
 from common import log_callback
+from readiness import kubectl_wait, wait_for_http
 from constants import GITS
 
 TOP_DIR = f"{GITS}/h3ni-demos/"
@@ -186,27 +187,20 @@ def find_demo0() -> None:
             """
             export KUBECONFIG="/root/.kube/karmada-apiserver.config"
             kubectl config use-context member1
-
+            """
+            + kubectl_wait(
+                "demo0 pods", "pods --all", "condition=Ready", namespace="demo0"
+            )
+            + """
             pod_name=$(kubectl get pods -n demo0 -o jsonpath='{.items[0].metadata.name}')
-            kubectl wait --for=condition=Ready pod/$pod_name -n demo0 --timeout=120s
             kubectl port-forward -n demo0 $pod_name 8080:8080 &
-            sleep 2
-            counter=0
-            code=""
-            while [ $counter -lt 120 ]; do
-                code=$(curl -s -o /dev/null -w "%{http_code}" "http://localhost:8080")
-                if [ "$code" -eq 200 ]; then
-                    break
-                fi
-                counter=$((counter + 2))
-                sleep 2
-            done
-
+            """
+            + wait_for_http("demo0 through port-forward", "http://localhost:8080")
+            + """
             echo "curl -s http://localhost:8080"
             curl -s http://localhost:8080
             echo
-
-        """
+            """
         ],
         _get_pty=True,
         _shell_executable="/bin/bash",
@@ -0,0 +1 @@
+../kind/_common/artifacts.py
\ No newline at end of file
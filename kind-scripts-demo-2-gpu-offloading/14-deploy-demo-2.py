@@ -11,7 +11,9 @@ from pyinfra.facts.hardware import Ipv4Addrs
 from pyinfra.operations import files, python, server
 
 from common import log_callback
+from readiness import kubectl_wait, wait_for_http
 from constants import GITS
+from artifacts import package_and_push
 
 TOP_DIR = f"{GITS}/h3ni-demos/"
 SMO_URL = "http://127.0.0.1:8000"
@@ -103,42 +105,34 @@ def prepare_gpu_offloading() -> None:
     )
 
     server.shell(
-        name="Build and push images and artifacts",
+        name="Build and push images",
         commands=[
             f"""
-            cd {TOP_DIR}
-            . .venv/bin/activate
-
             cd {DEMO}
-            rm -fr dist
-            mkdir dist
-            rm -fr build
-            mkdir build
-
             docker build -t "127.0.0.1:5000/web-frontend-0.1.0" src/web-frontend
             docker build -t "127.0.0.1:5000/ml-inference-0.1.0" src/ml-inference
 
             docker push "127.0.0.1:5000/web-frontend-0.1.0"
             docker push "127.0.0.1:5000/ml-inference-0.1.0"
-
-            cp -a hdag build/
-            cp -a web-frontend build/
-            cp -a ml-inference build/
-
-            hdarctl package tar -d dist build/hdag
-            hdarctl package tar -d dist build/web-frontend
-            hdarctl package tar -d dist build/ml-inference
-
-            hdarctl push dist/gpu-offloading-graph-0.1.0.tar.gz http://127.0.0.1:5000/demo2
-            hdarctl push dist/web-frontend-0.1.0.tar.gz http://127.0.0.1:5000/demo2
-            hdarctl push dist/ml-inference-0.1.0.tar.gz http://127.0.0.1:5000/demo2
-
             """
         ],
         _get_pty=True,
         _shell_executable="/bin/bash",
     )
 
+    server.shell(
+        name="Package and push artifacts",
+        commands=[
+            package_and_push(
+                DEMO,
+                ["hdag", "web-frontend", "ml-inference"],
+                "http://127.0.0.1:5000/demo2",
+            )
+        ],
+        _get_pty=True,
+        _shell_executable="/bin/bash",
+    )
+
 
 def deploy_on_smo() -> None:
     cmd = make_deploy_command(PROJECT, GRAPH_NAME)
@@ -219,27 +213,20 @@ def find_demo2() -> None:
             """
             export KUBECONFIG="/root/.kube/karmada-apiserver.config"
             kubectl config use-context member1
-
+            """
+            + kubectl_wait(
+                "demo2 pods", "pods --all", "condition=Ready", namespace="demo2"
+            )
+            + """
             pod_name=$(kubectl get pods -n demo2 -o jsonpath='{.items[0].metadata.name}')
-            kubectl wait --for=condition=Ready pod/$pod_name -n demo2 --timeout=120s
             kubectl port-forward -n demo2 $pod_name 8080:8080 &
-            sleep 2
-            counter=0
-            code=""
-            while [ $counter -lt 120 ]; do
-                code=$(curl -s -o /dev/null -w "%{http_code}" "http://localhost:8080")
-                if [ "$code" -eq 200 ]; then
-                    break
-                fi
-                counter=$((counter + 2))
-                sleep 2
-            done
-
+            """
+            + wait_for_http("demo2 through port-forward", "http://localhost:8080")
+            + """
             echo "curl -s http://localhost:8080"
             curl -s http://localhost:8080
             echo
-
-        """
+            """
         ],
         _get_pty=True,
         _shell_executable="/bin/bash",
@@ -1,6 +1,8 @@
 from pyinfra import host, logger
 from pyinfra.facts.server import LsbRelease
 
+from profiler import install_profiler
+
 
 def check_server() -> None:
     logger.info("Starting Common Prerequisite Checks")
@@ -19,3 +21,7 @@ def log_callback(result):
         logger.info("stderr:")
         logger.info(result.stderr)
     logger.info("-" * 60)
+
+
+# No-op unless NEPHELE_PROFILE is set.
+install_profiler()
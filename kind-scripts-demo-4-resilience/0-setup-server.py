@@ -38,7 +38,7 @@ DOCKER_APT_PACKAGES = [
     "docker-ce",
     "docker-ce-cli",
     "containerd.io",
-    # "docker-buildx-plugin",
+    "docker-buildx-plugin",
     "docker-compose-plugin",
 ]
 
@@ -285,6 +285,7 @@ def start_docker_registry() -> None:
             (
                 f"docker run -d -p {REGISTRY_PORT}:5000 "
                 "--restart=always "
+                "-e REGISTRY_STORAGE_DELETE_ENABLED=true "
                 "--name registry registry:latest || true"
             )
         ],
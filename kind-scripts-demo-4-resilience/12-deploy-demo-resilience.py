@@ -11,7 +11,10 @@ from pyinfra.facts.hardware import Ipv4Addrs
 from pyinfra.operations import files, python, server
 
 from common import log_callback
+from readiness import kubectl_wait, wait_for_http
 from constants import GITS
+from imagebuild import image_builds
+from artifacts import package_and_push
 
 TOP_DIR = f"{GITS}/h3ni-demos/"
 SMO_URL = "http://127.0.0.1:8000"
@@ -102,32 +105,31 @@ def prepare_resilience() -> None:
     )
 
     result = server.shell(
-        name="Build and push images and artifacts",
+        name="Build and push images",
         commands=[
-            f"""
-            cd {TOP_DIR}
-            . .venv/bin/activate
-
-            cd {DEMO}
-            rm -fr dist
-            mkdir dist
-            rm -fr build
-            mkdir build
-
-            docker build -t "127.0.0.1:5000/critical-service-0.1.0" src/critical-service
-
-            docker push "127.0.0.1:5000/critical-service-0.1.0"
-
-            cp -a hdag build/
-            cp -a critical-service build/
-
-            hdarctl package tar -d dist build/hdag
-            hdarctl package tar -d dist build/critical-service
-
-            hdarctl push dist/resilience-critical-graph-0.1.0.tar.gz http://127.0.0.1:5000/demo4
-            hdarctl push dist/critical-service-0.1.0.tar.gz http://127.0.0.1:5000/demo4
+            image_builds(
+                [
+                    (
+                        "127.0.0.1:5000/critical-service-0.1.0",
+                        f"{DEMO}/src/critical-service",
+                    )
+                ]
+            )
+        ],
+        _shell_executable="/bin/bash",
+    )
+    python.call(
+        name="Show image builds",
+        function=log_callback,
+        result=result,
+    )
 
-            """
+    result = server.shell(
+        name="Package and push artifacts",
+        commands=[
+            package_and_push(
+                DEMO, ["hdag", "critical-service"], "http://127.0.0.1:5000/demo4"
+            )
         ],
         _get_pty=True,
         _shell_executable="/bin/bash",
@@ -218,27 +220,20 @@ def find_demo4() -> None:
             """
             export KUBECONFIG="/root/.kube/karmada-apiserver.config"
             kubectl config use-context member1
-
+            """
+            + kubectl_wait(
+                "demo4 pods", "pods --all", "condition=Ready", namespace="demo4"
+            )
+            + """
             pod_name=$(kubectl get pods -n demo4 -o jsonpath='{.items[0].metadata.name}')
-            kubectl wait --for=condition=Ready pod/$pod_name -n demo4 --timeout=120s
             kubectl port-forward -n demo4 $pod_name 8080:8080 &
-            sleep 2
-            counter=0
-            code=""
-            while [ $counter -lt 120 ]; do
-                code=$(curl -s -o /dev/null -w "%{http_code}" "http://localhost:8080")
-                if [ "$code" -eq 200 ]; then
-                    break
-                fi
-                counter=$((counter + 2))
-                sleep 2
-            done
-
+            """
+            + wait_for_http("demo4 through port-forward", "http://localhost:8080")
+            + """
             echo "curl -s http://localhost:8080"
             curl -s http://localhost:8080
             echo
-
-        """
+            """
         ],
         _get_pty=True,
         _shell_executable="/bin/bash",
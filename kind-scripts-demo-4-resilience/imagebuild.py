@@ -0,0 +1 @@
+../kind/_common/imagebuild.py
\ No newline at end of file
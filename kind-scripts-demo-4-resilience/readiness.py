@@ -0,0 +1 @@
+../kind/_common/readiness.py
\ No newline at end of file
@@ -16,6 +16,7 @@ from pyinfra.operations import python, server
 
 from common import log_callback
 from constants import GITS
+from artifacts import artifact_commands
 
 SMO_NEPHE = "smo"
 SMO_NEPHE_URL = (
@@ -118,12 +119,8 @@ def make_package_artifacts() -> None:
     result = server.shell(
         name="Make package artifacts",
         commands=[
-            f"""\
-                cd {REPO}
-                . .venv/bin/activate
-                cd {DEMO}
-                make package-artifacts
-            """,
+            f"cd {REPO}\n. .venv/bin/activate\n"
+            + artifact_commands(DEMO, "make -n package-artifacts"),
         ],
         _shell_executable="/bin/bash",
         _get_pty=True,
@@ -139,12 +136,8 @@ def make_push_artifacts() -> None:
     result = server.shell(
         name="Make push artifacts",
         commands=[
-            f"""\
-                cd {REPO}
-                . .venv/bin/activate
-                cd {DEMO}
-                make push-artifacts
-            """,
+            f"cd {REPO}\n. .venv/bin/activate\n"
+            + artifact_commands(DEMO, "make -n push-artifacts"),
         ],
         _shell_executable="/bin/bash",
         _get_pty=True,
@@ -5,3 +5,6 @@ HDAR_URL = (
 )
 SMO_URL = "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/smo.git"
 KARMADA_RELEASE_BRANCH = "release-1.14"
+
+# Fingerprints of the artifacts packaged by artifacts.py.
+BUILD_FINGERPRINT_DIR = "/root/.cache/nephele/builds"
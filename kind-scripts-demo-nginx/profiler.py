@@ -0,0 +1 @@
+../kind/_common/profiler.py
\ No newline at end of file
@@ -5,18 +5,39 @@ Minimal recipe to deploy
 Warning: connection as user root.
 
 pyinfra -y -vvv --user root ${SERVER_NAME} 0-setup-server.py
+
+With the 'offline_bundle' host data set (NEPHELE_OFFLINE=1, see inventory.py),
+packages, uv and git repositories are expected to come from the offline
+bundle (offline-bundle/install-bundle.py): nothing is fetched from the network.
+
+With the 'incremental' host data set (NEPHELE_INCREMENTAL=1, see inventory.py),
+an already provisioned host is not wiped: the Docker image store, the
+registry container and the registry mirrors (and their volumes) are kept, and
+so are the kind clusters, the kubeconfigs and Karmada state, and MicroK8s
+(4-install-kubectl-karmada.py recreates the clusters anyway). Only the other
+containers of previous runs are removed.
 """
 
 import io
+from textwrap import dedent
 
 from pyinfra import host
 from pyinfra.facts.files import File
 from pyinfra.facts.hardware import Ipv4Addrs
 from pyinfra.facts.server import LsbRelease, User
 from pyinfra.operations import apt, files, python, server, systemd
+from pyinfra.operations.util import any_changed
 
 from common import check_server, log_callback
-from constants import GITS, HDAR_URL, REGISTRY_PORT
+from gobuild import go_build
+from constants import (
+    GITS,
+    HDAR_URL,
+    KIND_NETWORK,
+    OFFLINE_INSTALLER,
+    REGISTRY_MIRRORS,
+    REGISTRY_PORT,
+)
 
 BASE_APT_PACKAGES = [
     "ca-certificates",
@@ -38,13 +59,17 @@ DOCKER_APT_PACKAGES = [
     "docker-ce",
     "docker-ce-cli",
     "containerd.io",
-    # "docker-buildx-plugin",
+    "docker-buildx-plugin",
     "docker-compose-plugin",
 ]
 
+# In incremental mode, apt metadata younger than this is not refreshed.
+APT_CACHE_TIME = 24 * 3600
+
 DOCKER_CONF = """\n
 {
   "insecure-registries": ["___ip___:5000", "127.0.0.1:5000"],
+  "registry-mirrors": ["___mirror___"],
   "exec-opts": ["native.cgroupdriver=systemd"],
   "log-driver": "json-file",
   "log-opts": {
@@ -66,12 +91,16 @@ def main() -> None:
     install_go()
     install_uv()
     install_docker()
+    load_offline_images()
     make_hdarctl()
     configure_containerd()
     start_docker_registry()
+    start_registry_mirrors()
 
 
 def delete_kind_clusters() -> None:
+    if host.data.get("incremental"):
+        return
     fact = host.get_fact(File, "/usr/local/bin/kind")
     if not fact:
         return
@@ -89,6 +118,9 @@ def kill_docker_containers() -> None:
     fact = host.get_fact(File, "/usr/bin/docker")
     if not fact:
         return
+    if host.data.get("incremental"):
+        reset_docker_containers()
+        return
     server.shell(
         name="Stop running and removes all containers",
         commands=[
@@ -101,7 +133,39 @@ def kill_docker_containers() -> None:
     )
 
 
+def reset_docker_containers() -> None:
+    """
+    Remove the containers of previous runs, but keep the images, the volumes,
+    the registry, its mirrors, the BuildKit builder (see imagebuild.py) and
+    the nodes of the kind clusters. Docker is only wiped if its daemon does
+    not work.
+    """
+    server.shell(
+        name="Remove containers of previous runs (keep images and registry)",
+        commands=[
+            dedent("""\
+            systemctl start docker || true
+            if docker info > /dev/null 2>&1; then
+                docker ps -a --format '{{.Names}} {{.Label "io.x-k8s.kind.cluster"}}' \\
+                    | awk '$2 == "" {print $1}' \\
+                    | grep -vxE 'registry|mirror-.*|buildx_buildkit_.*' \\
+                    | xargs -r docker rm -f
+                docker network prune -f
+                docker image prune -f
+            else
+                echo "Docker is not working, resetting it"
+                systemctl stop docker.service docker.socket || true
+                rm -fr /var/lib/docker
+            fi
+            """)
+        ],
+        _shell_executable="/bin/bash",
+    )
+
+
 def remove_mk8s() -> None:
+    if host.data.get("incremental"):
+        return
     server.shell(
         name="Remove .karmada and .kube configurations",
         commands=[
@@ -120,6 +184,11 @@ def remove_mk8s() -> None:
 
 
 def update_server() -> None:
+    if host.data.get("offline_bundle"):
+        return
+    if host.data.get("incremental"):
+        apt.update(name="Update apt cache if stale", cache_time=APT_CACHE_TIME)
+        return
     apt.update(name="Update apt cache")
     apt.upgrade(name="Upgrade system packages")
 
@@ -157,14 +226,17 @@ def configure_server_limits() -> None:
 # Go
 #
 def install_go() -> None:
-    apt.ppa(
-        name="Add the Go ppa",
-        src="ppa:longsleep/golang-backports",
-    )
+    offline = host.data.get("offline_bundle")
+    if not offline:
+        apt.ppa(
+            name="Add the Go ppa",
+            src="ppa:longsleep/golang-backports",
+        )
     apt.packages(
         name="Install Go packages",
         packages=["golang-go"],
-        update=True,
+        update=not offline,
+        cache_time=APT_CACHE_TIME if host.data.get("incremental") else None,
     )
 
 
@@ -191,25 +263,28 @@ def install_uv() -> None:
 # Docker
 #
 def install_docker() -> None:
-    apt.key(
-        name="Add the Docker apt gpg key",
-        src="https://download.docker.com/linux/ubuntu/gpg",
-    )
-
-    lsb_info = host.get_fact(LsbRelease)
-    distro = lsb_info["id"].lower()
-    code_name = lsb_info["codename"]
-
-    apt.repo(
-        name="Add Docker repo",
-        src=f"deb https://download.docker.com/linux/{distro} {code_name} stable",
-    )
+    offline = host.data.get("offline_bundle")
+    if not offline:
+        apt.key(
+            name="Add the Docker apt gpg key",
+            src="https://download.docker.com/linux/ubuntu/gpg",
+        )
+
+        lsb_info = host.get_fact(LsbRelease)
+        distro = lsb_info["id"].lower()
+        code_name = lsb_info["codename"]
+
+        apt.repo(
+            name="Add Docker repo",
+            src=f"deb https://download.docker.com/linux/{distro} {code_name} stable",
+        )
 
     packages = DOCKER_APT_PACKAGES
     apt.packages(
         name=f"Install packages {packages}",
         packages=packages,
-        update=True,
+        update=not offline,
+        cache_time=APT_CACHE_TIME if host.data.get("incremental") else None,
     )
 
     user = host.get_fact(User)
@@ -220,6 +295,17 @@ def install_docker() -> None:
     )
 
 
+def load_offline_images() -> None:
+    """Reload the bundle images, since Docker was reset above."""
+    if not host.data.get("offline_bundle"):
+        return
+    target = host.data.get("bundle_target", "kind")
+    server.shell(
+        name="Load container images from the offline bundle",
+        commands=[f"python3 {OFFLINE_INSTALLER} --images-only --target {target}"],
+    )
+
+
 def make_hdarctl():
     HDACTL = "/usr/bin/hdarctl"
     REPO = f"{GITS}/hdar"
@@ -229,30 +315,19 @@ def make_hdarctl():
         path=GITS,
     )
 
-    server.shell(
-        name="Clone/pull HDAR repository if needed",
-        commands=[
-            f"[ -d {REPO} ] || git clone {HDAR_URL} {REPO}",
-            f"cd {REPO} && git pull",
-        ],
-    )
+    if not host.data.get("offline_bundle"):
+        server.shell(
+            name="Clone/pull HDAR repository if needed",
+            commands=[
+                f"[ -d {REPO} ] || git clone {HDAR_URL} {REPO}",
+                f"cd {REPO} && git pull",
+            ],
+        )
 
-    workdir = f"{REPO}/components/hdar-ctl"
     server.shell(
-        name="Build HDAR if needed",
-        # commands=f"""cd {workdir} && [ -x {HDACTL} -a $({GIT_LAST}) -gt {LAST_KNOWN} ] && {{
-        #         CGO_ENABLED=0 go build -a -installsuffix cgo -o hdarctl .
-        #         f"{workdir}/hdarctl -h",
-        #         f"cp {workdir}/hdarctl {HDACTL}",
-        #     }} || true
-        #     """,
-        commands=f"""[ ! -x {HDACTL} ] && {{
-                cd {workdir}
-                CGO_ENABLED=0 go build -a -installsuffix cgo -o hdarctl .
-                ./hdarctl -h
-                cp hdarctl {HDACTL}
-            }} || true
-            """,
+        name="Build hdarctl if its sources changed",
+        commands=[go_build("hdarctl", f"{REPO}/components/hdar-ctl", ".", HDACTL)],
+        _shell_executable="/bin/bash",
     )
 
 
@@ -266,25 +341,39 @@ def start_docker_registry() -> None:
 
     ips = host.get_fact(Ipv4Addrs)
     eth0 = ips["eth0"][0]
-    config = DOCKER_CONF.replace("___ip___", eth0)
-    files.put(
+    docker_io_mirror = f"http://127.0.0.1:{REGISTRY_MIRRORS['docker.io'][1]}"
+    config = DOCKER_CONF.replace("___ip___", eth0).replace(
+        "___mirror___", docker_io_mirror
+    )
+    daemon_json = files.put(
         name="Put file /etc/docker/daemon.json",
         src=io.StringIO(config),
         dest="/etc/docker/daemon.json",
     )
 
-    systemd.service(
-        name="Restart docker daemon",
-        service="docker",
-        restarted=True,
-    )
+    if host.data.get("incremental"):
+        systemd.service(
+            name="Restart docker daemon if its configuration changed",
+            service="docker",
+            running=True,
+            restarted=True,
+            _if=daemon_json.did_change,
+        )
+    else:
+        systemd.service(
+            name="Restart docker daemon",
+            service="docker",
+            restarted=True,
+        )
 
     server.shell(
         name="Deploy docker registry",
         commands=[
             (
+                "docker start registry 2> /dev/null || "
                 f"docker run -d -p {REGISTRY_PORT}:5000 "
                 "--restart=always "
+                "-e REGISTRY_STORAGE_DELETE_ENABLED=true "
                 "--name registry registry:latest || true"
             )
         ],
@@ -301,16 +390,38 @@ def start_docker_registry() -> None:
     )
 
 
+def start_registry_mirrors() -> None:
+    """
+    Run a pull-through cache (a registry in proxy mode) for each upstream
+    registry of REGISTRY_MIRRORS, so that every layer is fetched from
+    upstream once per host: by the host containerd and Docker on 127.0.0.1,
+    and by the nodes of all the kind clusters on the kind network. The kind
+    network is created beforehand (kind uses it if it exists), and the caches
+    are kept in volumes across runs.
+    """
+    commands = [
+        f"docker network inspect {KIND_NETWORK} > /dev/null 2>&1 "
+        f"|| docker network create {KIND_NETWORK}"
+    ]
+    for upstream, port, container in REGISTRY_MIRRORS.values():
+        commands += [
+            f"docker start {container} 2> /dev/null "
+            f"|| docker run -d -p 127.0.0.1:{port}:5000 --restart=always "
+            f"--name {container} -v {container}:/var/lib/registry "
+            f"-e REGISTRY_PROXY_REMOTEURL={upstream} registry:latest",
+            f"docker network connect {KIND_NETWORK} {container} 2> /dev/null || true",
+        ]
+    server.shell(
+        name="Deploy the registry mirrors",
+        commands=commands,
+        _shell_executable="/bin/bash",
+    )
+
+
 def configure_containerd() -> None:
     CONF = "/etc/containerd/config.toml"
     CERTD = "/etc/containerd/certs.d"
     HOST5000 = "127.0.0.1:5000"
-    HOSTS_IO = f"{CERTD}/docker.io/hosts.toml"
-    HOSTS_IO_TOML = (
-        'server = "https://registry-1.docker.io"\n'
-        '[host."https://{docker.mirror.url}"]\n'
-        '  capabilities = ["pull", "resolve"]\n'
-    )
     HOSTS_5000 = f"{CERTD}/{HOST5000}/hosts.toml"
     HOSTS_5000_TOML = (
         'server = "https://registry-1.docker.io"\n'
@@ -319,7 +430,7 @@ def configure_containerd() -> None:
         "  skip_verify = true\n"
     )
 
-    files.block(
+    config_block = files.block(
         name=f"Configure {CONF}",
         path=CONF,
         content=(
@@ -331,28 +442,43 @@ def configure_containerd() -> None:
         name=f"Create {CERTD} directory",
         path=CERTD,
     )
-    files.directory(
-        name=f"Create {CERTD}/docker.io directory",
-        path=f"{CERTD}/docker.io",
-    )
     files.directory(
         name=f"Create {CERTD}/{HOST5000} directory",
         path=f"{CERTD}/{HOST5000}",
     )
-    files.put(
-        name=f"Put file {HOSTS_IO}",
-        src=io.StringIO(HOSTS_IO_TOML),
-        dest=HOSTS_IO,
-    )
-    files.put(
+    hosts_5000 = files.put(
         name=f"Put file {HOSTS_5000}",
         src=io.StringIO(HOSTS_5000_TOML),
         dest=HOSTS_5000,
     )
-    server.shell(
-        name="Restart containerd",
-        commands=["systemctl restart containerd"],
-    )
+    # Each upstream registry is pulled through its mirror on this host (see
+    # start_registry_mirrors()).
+    hosts_mirrors = []
+    for registry, (upstream, port, _container) in REGISTRY_MIRRORS.items():
+        hosts_mirrors.append(
+            files.put(
+                name=f"Put file {CERTD}/{registry}/hosts.toml",
+                src=io.StringIO(
+                    f'server = "{upstream}"\n'
+                    f'[host."http://127.0.0.1:{port}"]\n'
+                    '  capabilities = ["pull", "resolve"]\n'
+                    "  skip_verify = true\n"
+                ),
+                dest=f"{CERTD}/{registry}/hosts.toml",
+                create_remote_dir=True,
+            )
+        )
+    if host.data.get("incremental"):
+        server.shell(
+            name="Restart containerd if its configuration changed",
+            commands=["systemctl restart containerd"],
+            _if=any_changed(config_block, hosts_5000, *hosts_mirrors),
+        )
+    else:
+        server.shell(
+            name="Restart containerd",
+            commands=["systemctl restart containerd"],
+        )
 
 
 main()
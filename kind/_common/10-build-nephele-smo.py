@@ -0,0 +1,92 @@
+"""
+Minimal recipe to build smo nephele: clone (or update) the source, patch it
+for kind and build its virtualenv.
+
+The patch is fix/kind.patch, or the 'smo_patch' host data (NEPHELE_SMO_PATCH,
+see inventory.py), e.g. the patch of the kind-scripts-demo-* directories for
+the base testbed of testbed.py.
+
+This only needs the base packages of 0-setup-server.py (git, uv), not the
+clusters nor Prometheus, so that run-scenario.py can run it while the
+clusters come up. 10-install-nephele-smo.py then configures and starts it.
+
+Warning: connection as user root.
+
+pyinfra -y -v --user root ${SERVER_NAME} 10-build-nephele-smo.py
+"""
+
+from pyinfra import host
+from pyinfra.operations import files, server
+
+from constants import GITS
+
+SMO_NEPHE = "smo"
+SMO_NEPHE_URL = (
+    "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/smo.git"
+)
+BRANCH = "main"
+REPO = f"{GITS}/{SMO_NEPHE}"
+
+
+def main() -> None:
+    install_smo()
+
+
+def install_smo() -> None:
+    files.directory(
+        name=f"Create {GITS} directory",
+        path=GITS,
+    )
+
+    server.shell(
+        name=f"Clone/pull {SMO_NEPHE} source",
+        commands=[
+            f"[ -d {REPO} ] || git clone {SMO_NEPHE_URL} {REPO}",
+            f"""
+                cd {REPO}
+                git fetch
+                git clean -fxd
+                git checkout {BRANCH}
+                git reset --hard HEAD
+            """,
+        ],
+        _shell_executable="/bin/bash",
+        _get_pty=True,
+    )
+
+    files.put(
+        name="Put smo patch file",
+        src=host.data.get("smo_patch") or "fix/kind.patch",
+        dest="/root/gits/smo/kind.patch",
+        mode="644",
+    )
+
+    server.shell(
+        name="Apply patch to smo",
+        commands=[
+            f"[ -d {REPO} ] || git clone {SMO_NEPHE_URL} {REPO}",
+            f"""
+                cd {REPO}
+                git apply kind.patch
+            """,
+        ],
+        _shell_executable="/bin/bash",
+        _get_pty=True,
+    )
+
+    server.shell(
+        name="Build smo",
+        commands=[
+            f"""
+                cd {REPO}
+                uv venv --clear -p3.12
+                . .venv/bin/activate
+                uv sync
+            """
+        ],
+        _shell_executable="/bin/bash",
+        _get_pty=True,
+    )
+
+
+main()
@@ -1,7 +1,8 @@
 """
 Minimal recipe to install smo nephele
 
-assuming 0-setup-server.py has already been applied for base packages.
+assuming 0-setup-server.py has already been applied for base packages, and
+10-build-nephele-smo.py for the smo source and virtualenv.
 
 Warning: connection as user root.
 
@@ -14,11 +15,7 @@ from common import log_callback
 from constants import GITS
 
 SMO_NEPHE = "smo"
-SMO_NEPHE_URL = (
-    "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/smo.git"
-)
 SMO_CLI = "/usr/local/bin/smo-cli"
-BRANCH = "main"
 LOCAL_IP = "127.0.0.1"
 INTERNAL_IP = "host.docker.internal"
 REPO = f"{GITS}/{SMO_NEPHE}"
@@ -26,7 +23,6 @@ REPO = f"{GITS}/{SMO_NEPHE}"
 
 def main() -> None:
     remove_prior_smo_cli()
-    install_smo()
     # make_smo_tests()
     configure_smo_ip()
     start_smo()
@@ -41,63 +37,6 @@ def remove_prior_smo_cli() -> None:
     )
 
 
-def install_smo() -> None:
-    files.directory(
-        name=f"Create {GITS} directory",
-        path=GITS,
-    )
-
-    server.shell(
-        name=f"Clone/pull {SMO_NEPHE} source",
-        commands=[
-            f"[ -d {REPO} ] || git clone {SMO_NEPHE_URL} {REPO}",
-            f"""
-                cd {REPO}
-                git fetch
-                git clean -fxd
-                git checkout {BRANCH}
-                git reset --hard HEAD
-            """,
-        ],
-        _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
-
-    files.put(
-        name="Put smo patch file",
-        src="fix/kind.patch",
-        dest="/root/gits/smo/kind.patch",
-        mode="644",
-    )
-
-    server.shell(
-        name="Apply patch to smo",
-        commands=[
-            f"[ -d {REPO} ] || git clone {SMO_NEPHE_URL} {REPO}",
-            f"""
-                cd {REPO}
-                git apply kind.patch
-            """,
-        ],
-        _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
-
-    server.shell(
-        name="Build smo",
-        commands=[
-            f"""
-                cd {REPO}
-                uv venv --clear -p3.12
-                . .venv/bin/activate
-                uv sync
-            """
-        ],
-        _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
-
-
 def make_smo_tests() -> None:
     server.shell(
         name="make smo tests",
@@ -6,8 +6,11 @@ assuming 0-setup-server.py has already been applied for base packages.
 pyinfra -y -vv --user root ${SERVER_NAME} 2-install-kind-kubectl.py
 """
 
+from pyinfra import host
 from pyinfra.operations import apt, server, snap, systemd
 
+from constants import OFFLINE_BUNDLE_DIR
+
 
 APT_PACKAGES = ["snapd"]
 SNAP_PACKAGES = ["lxd"]
@@ -38,7 +41,7 @@ def install_apt_packages() -> None:
     apt.packages(
         name="Install base packages",
         packages=APT_PACKAGES,
-        update=True,
+        update=not host.data.get("offline_bundle"),
     )
 
 
@@ -70,6 +73,15 @@ def start_services() -> None:
 
 
 def install_kubectl():
+    if host.data.get("offline_bundle"):
+        server.shell(
+            name="Install kubectl from the offline bundle",
+            commands=[
+                f"install -o root -g root -m 0755 {OFFLINE_BUNDLE_DIR}/downloads/kubectl "
+                "/usr/local/bin/kubectl",
+            ],
+        )
+        return
     server.shell(
         name="Install kubectl",
         commands=[
@@ -89,6 +101,15 @@ def install_kind():
     Documentation: https://kind.sigs.k8s.io/docs/user/quick-start/
     """
     VERSION = "v0.29.0"
+    if host.data.get("offline_bundle"):
+        server.shell(
+            name="Install kind from the offline bundle",
+            commands=[
+                f"install -o root -g root -m 0755 {OFFLINE_BUNDLE_DIR}/downloads/kind "
+                "/usr/local/bin/kind",
+            ],
+        )
+        return
     server.shell(
         name="Install kind",
         commands=[
@@ -41,14 +41,20 @@ member3   v1.31.2   Pull   True    58m
 
 """
 
+import os
+
+from pyinfra import host
+from pyinfra.facts.server import Ipv4Addrs
 from pyinfra.operations import files, python, server
 
 from common import log_callback
-from constants import GITS
+from constants import GITS, REGISTRY_MIRRORS, REGISTRY_PORT
+from gobuild import go_build
 
 
-KARMADA_VERSION = "1.14.2"
 RELEASE = "release-1.14"
+KARMADA_VERSION_PACKAGE = "github.com/karmada-io/karmada/pkg/version"
+HERE = os.path.dirname(os.path.abspath(__file__))
 
 
 def main() -> None:
@@ -84,6 +90,13 @@ def git_clone_karmada() -> None:
     )
     SOURCE = "https://github.com/karmada-io/karmada.git"
     REPO = f"{GITS}/karmada"
+    if host.data.get("offline_bundle"):
+        # Restored by offline-bundle/install-bundle.py, nothing to pull.
+        server.shell(
+            name=f"Checkout {RELEASE}",
+            commands=[f"cd {REPO} && git checkout {RELEASE}"],
+        )
+        return
     server.shell(
         name=f"Clone/pull {SOURCE}",
         commands=[
@@ -97,33 +110,33 @@ def git_clone_karmada() -> None:
     )
 
 
+def install_karmada_cli() -> None:
+    """
+    Build karmadactl and kubectl-karmada from the RELEASE checkout (only
+    when it changed since the last build, see gobuild.py).
+    """
+    repo = f"{GITS}/karmada"
+    for name in ("karmadactl", "kubectl-karmada"):
+        server.shell(
+            name=f"Build {name} if its sources changed",
+            commands=[
+                go_build(
+                    name,
+                    repo,
+                    f"./cmd/{name}",
+                    f"/usr/local/bin/{name}",
+                    ldflags=f"-X {KARMADA_VERSION_PACKAGE}.gitVersion="
+                    "$(git describe --tags --dirty)",
+                )
+            ],
+            _shell_executable="/bin/bash",
+        )
+
+
 def install_karmada_clusters() -> None:
-    # INSTALLER_URL = (
-    #     "https://raw.githubusercontent.com/karmada-io/"
-    #     "karmada/master/hack/install-cli.sh"
-    # )
-    files.file(
-        name="Remove old kubectl-karmada CLI",
-        path="/usr/local/bin/kubectl-karmada",
-        present=False,
-    )
-    files.file(
-        name="Remove old karmadactl CLI",
-        path="/usr/local/bin/karmadactl",
-        present=False,
-    )
-    INSTALLER = f"{GITS}/karmada/hack/install-cli.sh"
-    server.shell(
-        name="Install Karmada CLI",
-        commands=[
-            f"""
-            export INSTALL_CLI_VERSION={KARMADA_VERSION}
-            /bin/bash {INSTALLER} kubectl-karmada
-            """
-        ],
-        _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
+    # Offline, the Karmada CLIs come prebuilt from offline-bundle/install-bundle.py.
+    if not host.data.get("offline_bundle"):
+        install_karmada_cli()
 
     result = server.shell(
         name="Get kubectl-karmada version",
@@ -135,10 +148,29 @@ def install_karmada_clusters() -> None:
         result=result,
     )
 
+    # Same clusters and kubeconfigs as hack/local-up-karmada.sh, but the
+    # independent steps (cluster creation, image builds and loads, joins) run
+    # concurrently, and the nodes pull through the registry mirrors of the
+    # host (see start_registry_mirrors() in 0-setup-server.py).
+    mirror_options = "".join(
+        f" --registry-mirror {registry}=http://{container}:5000"
+        for registry, (_upstream, _port, container) in REGISTRY_MIRRORS.items()
+    )
+    # The demos push their images to the local registry, under the address of
+    # the host (see start_docker_registry() in 0-setup-server.py), over HTTP.
+    eth0 = host.get_fact(Ipv4Addrs)["eth0"][0]
+    local_registry = f"{eth0}:{REGISTRY_PORT}"
+    mirror_options += f" --registry-mirror {local_registry}=http://{local_registry}"
+    files.put(
+        name="Put local-up-karmada.py",
+        src=os.path.join(HERE, "local-up-karmada.py"),
+        dest="/root/local-up-karmada.py",
+        mode="755",
+    )
     server.shell(
-        name="Execute hack/local-up-karmada.sh (long)",
+        name="Execute local-up-karmada.py (long)",
         commands=[
-            f"cd {GITS}/karmada && ./hack/local-up-karmada.sh",
+            f"/root/local-up-karmada.py --karmada-dir {GITS}/karmada" + mirror_options,
         ],
     )
 
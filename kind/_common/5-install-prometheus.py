@@ -21,6 +21,8 @@ import io
 from pyinfra.operations import files, python, server
 
 from common import log_callback
+from helmcache import apply_chart, delete_chart, fetch_chart
+from readiness import kubectl_wait
 
 
 # Note: Replace 127.0.0.1 with the actual IP address of your SMO service
@@ -92,12 +94,19 @@ grafana:
   service:
     type: NodePort
     nodePort: 30002
+# Installed from manifests rendered by `helm template` (see helmcache.py),
+# where the hooks generating the admission webhook certificates do not run.
+prometheusOperator:
+  admissionWebhooks:
+    enabled: false
+  tls:
+    enabled: false
 """
 
 
 def main() -> None:
     remove_prior_prometheus_cluster()
-    add_prometheus_repo()
+    fetch_prometheus_chart()
     put_prometheus_config_file()
     install_kube_prometheus_stack_v3()
     # install_crds_in_control_pane()
@@ -105,34 +114,22 @@ def main() -> None:
 
 def remove_prior_prometheus_cluster() -> None:
     server.shell(
-        name="Uninstall service prometheus monitoring",
+        name="Delete prior prometheus monitoring",
         commands=[
-            f"""
-            export KUBECONFIG="{KCONFIG}"
-            kubectl config use-context karmada-host
-
-            helm uninstall prometheus -n monitoring
-            """
+            f"""\
+export KUBECONFIG="{KCONFIG}"
+"""
+            + delete_chart("prometheus", "monitoring", CLUSTER_NAME)
         ],
         _ignore_errors=True,
         _shell_executable="/bin/bash",
     )
 
 
-def add_prometheus_repo() -> None:
-    REPO = "https://prometheus-community.github.io/helm-charts"
+def fetch_prometheus_chart() -> None:
     server.shell(
-        name="Add helm repo for prometheus",
-        commands=[
-            f"""
-            export KUBECONFIG="{KCONFIG}"
-            kubectl config use-context karmada-host
-
-            helm repo add prometheus-community {REPO}
-            helm repo update
-            """,
-        ],
-        _ignore_errors=True,
+        name="Get kube-prometheus-stack chart",
+        commands=[fetch_chart("kube-prometheus-stack")],
         _shell_executable="/bin/bash",
     )
 
@@ -153,19 +150,29 @@ def install_kube_prometheus_stack_v3():
     result = server.shell(
         name="Install kube prometheus stack",
         commands=[
-            f"""
-            export KUBECONFIG="{KCONFIG}"
-            kubectl config use-context karmada-host
-
-            helm install prometheus \
-            --create-namespace -n monitoring \
-            prometheus-community/kube-prometheus-stack \
-            --values /root/{PROM_VALUES_FILE} \
-            --atomic
-
-            kubectl -n monitoring get pods
-            kubectl -n monitoring get svc
-            """
+            f"""\
+set -e
+export KUBECONFIG="{KCONFIG}"
+"""
+            + apply_chart(
+                "prometheus",
+                "kube-prometheus-stack",
+                "monitoring",
+                f"/root/{PROM_VALUES_FILE}",
+                CLUSTER_NAME,
+            )
+            + kubectl_wait(
+                "Prometheus stack",
+                "deployment --all",
+                "condition=Available",
+                namespace="monitoring",
+                context=CLUSTER_NAME,
+                timeout=300,
+            )
+            + f"""\
+kubectl --context {CLUSTER_NAME} -n monitoring get pods
+kubectl --context {CLUSTER_NAME} -n monitoring get svc
+"""
         ],
         _shell_executable="/bin/bash",
     )
@@ -7,19 +7,22 @@ Minimal recipe to deploy prometheus on members clusters.
 pyinfra -y -vv --user root ${SERVER_NAME}  6-install-prometheus-members.py
 
 
-export KUBECONFIG=/root/.kube/karmada.config:/root/.kube/members.config:~/.kube/config
-kubectl config use-context member1
-kubectl get nodes
+Prometheus is installed on every member registered with Karmada, on all
+members at once, each install selecting its cluster with --context (the
+shared kubeconfig is never switched). The chart comes from the local chart
+cache and is applied from manifests rendered once per member and values (see
+helmcache.py). Per member, this is the equivalent of:
 
-kubectl create namespace monitoring
+export KUBECONFIG=/root/.kube/karmada-apiserver.config
 helm repo add prometheus-community https://prometheus-community.github.io/helm-charts
 helm repo update
 
 create prometheus-member1-values.yaml
 
-helm install prometheus-member1 prometheus-community/prometheus -n monitoring -f prometheus-member1-values.yaml
+helm install prometheus-member1 prometheus-community/prometheus -n monitoring \
+    --create-namespace -f prometheus-member1-values.yaml --kube-context member1
 
-kubectl get pods -n monitoring
+kubectl --context member1 get pods -n monitoring
 
  docker inspect -f '{{.NetworkSettings.Networks.kind.IPAddress}}' member1-control-plane
 172.20.0.2
@@ -31,6 +34,8 @@ from textwrap import dedent
 from pyinfra.operations import python, server
 
 from common import log_callback
+from helmcache import apply_chart, delete_chart, fetch_chart
+from readiness import WAIT_UNTIL_FUNCTION, kubectl_wait
 
 # CLUSTER_NAME = "karmada-host"  # or member1 ?
 # CENTRAL_PROMETHEUS_IP_AND_PORT = "127.0.0.1:30093"
@@ -38,263 +43,192 @@ from common import log_callback
 # for nephele, nedd first the source: <CLUSTER_NAME> ans <CENTRAL_PROMETHEUS_IP_AND_PORT>
 
 KCONFIG = "/root/.kube/karmada-apiserver.config"
-PROMETHEUS_REPO = "https://prometheus-community.github.io/helm-charts"
-
-
-def main() -> None:
-    install_prometheus_member(1)
-
-
-def member_context_cmd(mid: int) -> str:
-    return f"""
-            export KUBECONFIG="{KCONFIG}"
-            kubectl config use-context member{mid}
-            """
+NODEPORT = 30090
 
+# Sets $members to the clusters registered with Karmada.
+MEMBERS_CMD = f"""\
+export KUBECONFIG="{KCONFIG}"
+members=$(kubectl --context karmada-apiserver get clusters \
+    -o jsonpath='{{.items[*].metadata.name}}')
+"""
 
-def nodeport(mid: int) -> int:
-    return 30000 + mid
 
+def main() -> None:
+    show_members()
+    fetch_prometheus_chart()
+    build_member_values()
+    install_prometheus_members()
+    check_prometheus_members()
 
-def install_prometheus_member(mid: int):
-    member_ctx = member_context_cmd(1)
 
+def show_members() -> None:
     result = server.shell(
-        name=f"Check member{mid} nodes",
+        name="Check member nodes",
         commands=[
-            dedent(f"""\
-            {member_ctx}
-
-            kubectl get nodes
+            MEMBERS_CMD
+            + dedent("""\
+            for member in $members; do
+                echo "--- $member"
+                kubectl --context $member get nodes
+            done
             """)
         ],
         _shell_executable="/bin/bash",
-        _get_pty=True,
     )
     python.call(
-        name=f"Show member{mid} nodes",
+        name="Show member nodes",
         function=log_callback,
         result=result,
     )
 
-    server.shell(
-        name="Uninstall any prior prometheus monitoring",
-        commands=[
-            dedent(f"""\
-            {member_ctx}
-
-            helm uninstall prometheus-member{mid} -n monitoring
-            kubectl delete namespace monitoring
-            """),
-        ],
-        _ignore_errors=True,
-        _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
 
+def fetch_prometheus_chart() -> None:
+    # Once for all members, before the concurrent installs.
     server.shell(
-        name=f"Create namespace monitoring for member{mid}",
-        commands=[
-            dedent(f"""\
-            {member_ctx}
-
-            kubectl create namespace monitoring
-            """)
-        ],
+        name="Get prometheus chart",
+        commands=[fetch_chart("prometheus")],
         _shell_executable="/bin/bash",
-        _get_pty=True,
     )
 
-    server.shell(
-        name=f"Add helm repo for prometheus for member{mid}",
-        commands=[
-            dedent(f"""\
-            {member_ctx}
-
-            helm repo add prometheus-community {PROMETHEUS_REPO}
-            helm repo update
-            """)
-        ],
-        _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
 
+def build_member_values() -> None:
     server.shell(
-        name=f"Build Prometheus config for member{mid}",
+        name="Build Prometheus config for members",
         commands=[
-            dedent(f"""\
-            export KUBECONFIG="{KCONFIG}"
-            kubectl config use-context karmada-host
-
-            central_ip=$(kubectl get nodes -o jsonpath='{{.items[0].status.addresses[?(@.type=="InternalIP")].address}}')
+            MEMBERS_CMD
+            + dedent(f"""\
+            central_ip=$(kubectl --context karmada-host get nodes -o jsonpath='{{.items[0].status.addresses[?(@.type=="InternalIP")].address}}')
             #central_port=$(kubectl -n monitoring get svc prometheus-kube-prometheus-prometheus -o jsonpath='{{.spec.ports[0].nodePort}}')
             # always 30090
 
-            cat << EOF > /root/prometheus-member{mid}-values.yaml
-            # prometheus-member{mid}-values.yaml
+            for member in $members; do
+            cat << EOF > /root/prometheus-${{member}}-values.yaml
+            # prometheus-${{member}}-values.yaml
             prometheus:
               prometheusSpec:
                 externalLabels:
-                  source: member{mid}
+                  source: ${{member}}
                 scrapeInterval: 30s
                 remoteWrite:
                   - url: "http://${{central_ip}}:30090/api/v1/write"
               service:
                 nodePort: 30090
                 type: NodePort
+            server:
+              service:
+                type: NodePort
+                nodePort: {NODEPORT}
             EOF
+            done
             """)
         ],
         _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
-
-    server.shell(
-        name=f"Install Prometheus stack for member{mid}",
-        commands=[
-            dedent(f"""\
-            {member_ctx}
-
-            helm install prometheus-member{mid} \
-            --create-namespace -n monitoring \
-            prometheus-community/prometheus \
-            --values /root/prometheus-member{mid}-values.yaml
-            """)
-            # "helm install prometheus --create-namespace -n monitoring "
-            # "prometheus-community/kube-prometheus-stack "
-            # "--values /root/{PROM_VALUES_FILE}"
-        ],
-        _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
-
-    result = server.shell(
-        name=f"Fix member{mid} nodeport type",
-        commands=[
-            dedent(f"""\
-            {member_ctx}
-
-            kubectl get svc prometheus-member{mid}-server -n monitoring \
-            -o yaml > /root/prometheus-svc-{mid}-backup-before.yaml
-
-            kubectl patch svc prometheus-member{mid}-server -n monitoring \
-            --type='json' \
-            -p='[{{"op":"replace","path":"/spec/type","value":"NodePort"}},{{"op":"replace","path":"/spec/ports/0/nodePort","value":30090}}]'
-
-            kubectl get svc prometheus-member{mid}-server -n monitoring \
-            -o yaml > /root/prometheus-svc-{mid}-backup-after.yaml
-            """)
-        ],
     )
 
-    result = server.shell(
-        name=f"Check member{mid} NodePort type",
-        commands=[
-            dedent(f"""\
-            {member_ctx}
-
-            kubectl get svc prometheus-member{mid}-server -n monitoring
-            echo "pods:"
-            kubectl -n monitoring get pods
-            echo "services:"
-            kubectl -n monitoring get svc
-            """)
-        ],
-    )
-    python.call(
-        name=f"Show member{mid} NodePort type",
-        function=log_callback,
-        result=result,
-    )
 
-    result = server.shell(
-        name=f"Check member{mid} docker IP",
-        commands=[
-            dedent("""\
-                docker inspect -f '{{.NetworkSettings.Networks.kind.IPAddress}}' \
-                member1-control-plane
-            """)
-        ],
-    )
-    python.call(
-        name=f"Smoke test 1: show member{mid} docker IP",
-        function=log_callback,
-        result=result,
+def install_prometheus_members() -> None:
+    """
+    Installs Prometheus on all members concurrently, one background job per
+    member (logged to /root/prometheus-<member>.log and shown prefixed with
+    the member name), and fails if any of them failed.
+    """
+    install_member = (
+        dedent("""\
+        install_member() {
+            local member=$1
+        """)
+        + delete_chart("prometheus-$member", "monitoring", "$member")
+        + dedent("""\
+            kubectl --context $member delete namespace monitoring \
+                --ignore-not-found --wait
+            set -e
+        """)
+        + apply_chart(
+            "prometheus-$member",
+            "prometheus",
+            "monitoring",
+            "/root/prometheus-$member-values.yaml",
+            "$member",
+        )
+        + kubectl_wait(
+            "Prometheus server",
+            "deployment/prometheus-$member-server",
+            "condition=Available",
+            namespace="monitoring",
+            context="$member",
+        )
+        + "}\n"
     )
-
     result = server.shell(
-        name=f"Check member{mid} prometheus service",
+        name="Install Prometheus on all members (in parallel)",
         commands=[
-            dedent(f"""\
-                {member_ctx}
-
-                kubectl -n monitoring get svc prometheus-member1-server
+            MEMBERS_CMD
+            + install_member
+            + dedent("""\
+            declare -A pids
+            for member in $members; do
+                ( install_member $member ) > /root/prometheus-$member.log 2>&1 &
+                pids[$member]=$!
+            done
+
+            failed=""
+            for member in $members; do
+                wait ${pids[$member]} || failed="$failed $member"
+                sed "s/^/[$member] /" /root/prometheus-$member.log
+            done
+            if [ -n "$failed" ]; then
+                echo "FAILED:$failed"
+                exit 1
+            fi
             """)
         ],
         _shell_executable="/bin/bash",
-        _get_pty=True,
     )
     python.call(
-        name=f"smoke test 3: show member{mid} services",
+        name="Show Prometheus install on all members",
         function=log_callback,
         result=result,
     )
 
-    result = server.shell(
-        name=f"Check member{mid} access from outer cluster",
-        commands=[
-            dedent("""\
-                export KUBECONFIG="/root/.kube/karmada-apiserver.config"
-                kubectl config use-context karmada-host
-
-                member1_node_ip=$(kubectl -n monitoring get nodes -o \
-                jsonpath='{.items[0].status.addresses[?(@.type=="InternalIP")].address}')
-
-                url="http://${member1_node_ip}:30090"
-
-                max_try=30
-                interval=2
-                for ((i=1; i<=max_try; i++)); do
-                  echo "try ${url} (attempt $i)..."
-                  if curl -s ${url} > /dev/null; then
-                    break
-                  else
-                    sleep $interval
-                  fi
-                done
-                curl -sS ${url} 2>&1 | head -n5
-            """)
-        ],
-        _shell_executable="/bin/bash",
-        _get_pty=True,
-    )
-    python.call(
-        name=f"Smoke test 5: member{mid} access from outer cluster",
-        function=log_callback,
-        result=result,
-    )
 
+def check_prometheus_members() -> None:
+    """
+    Checks the Prometheus NodePort of every member from outside the clusters,
+    all members at once, and shows one table of the results.
+    """
     result = server.shell(
-        name=f"Check member{mid} access from inner cluster",
+        name="Check Prometheus NodePort of all members",
         commands=[
-            dedent("""\
-                export KUBECONFIG="/root/.kube/karmada-apiserver.config"
-                kubectl config use-context member1
-
-                sleep 20
-
-                kubectl -n monitoring run -i --tty --rm debug \
-                --image=busybox --restart=Never \
-                -- sh -c 'i=0; while [ $i -lt 10 ]; do \
-                wget -qO- http://prometheus-member1-server:80 2>/dev/null \
-                && break; i=$((i+1)); sleep 2; done | head -n10'
+            MEMBERS_CMD
+            + WAIT_UNTIL_FUNCTION
+            + dedent(f"""\
+            declare -A urls
+            for member in $members; do
+                ip=$(docker inspect -f \
+                    '{{{{.NetworkSettings.Networks.kind.IPAddress}}}}' \
+                    $member-control-plane)
+                urls[$member]="http://${{ip}}:{NODEPORT}"
+                wait_until 60 "$member Prometheus NodePort" \
+                    curl -sf -o /dev/null --max-time 5 "${{urls[$member]}}/-/ready" &
+            done
+            wait
+
+            failed=0
+            printf "%-12s %-28s %s\\n" MEMBER URL READY
+            for member in $members; do
+                url=${{urls[$member]}}
+                code=$(curl -s -o /dev/null -w '%{{http_code}}' --max-time 5 \
+                    "$url/-/ready")
+                printf "%-12s %-28s %s\\n" "$member" "$url" "$code"
+                [ "$code" = 200 ] || failed=1
+            done
+            exit $failed
             """)
         ],
         _shell_executable="/bin/bash",
-        _get_pty=True,
     )
     python.call(
-        name=f"Smoke test 6: show member{mid} access from inner cluster",
+        name="Show Prometheus NodePort of all members",
         function=log_callback,
         result=result,
     )
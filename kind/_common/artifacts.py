@@ -0,0 +1,173 @@
+"""
+Package and push HDAR artifacts (Helm charts and HDAGs) incrementally and
+concurrently.
+
+Each chart or HDAG directory is keyed by a fingerprint of its files: it is
+packaged again (`hdarctl package tar`) only when the fingerprint changed, and
+its archive is kept in the dist directory otherwise. Before a push, the
+manifest of the artifact (`<url>/<name>:<version>`, from the archive name) is
+fetched from the registry: when it already refers to the archive's digest,
+the push is skipped. Packages run concurrently, then pushes.
+
+The demos describe their artifacts in a Makefile target: artifact_commands()
+runs the commands that `make -n` prints, with the `hdarctl` ones made
+incremental and concurrent, and without the `rm -fr dist build` that would
+throw everything away. Invoke tasks are run as they are: `inv --dry` prints
+decorated commands (colours, `cd ... &&` prefixes) and skips the Python code
+of the task.
+
+    server.shell(
+        name="Package and push artifacts",
+        commands=[
+            package_and_push(DEMO, ["hdag", "service"], "http://127.0.0.1:5000/demo")
+        ],
+        _shell_executable="/bin/bash",
+    )
+"""
+
+import shlex
+
+from constants import BUILD_FINGERPRINT_DIR
+
+MANIFEST_TYPES = ", ".join(
+    [
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+
+ARTIFACT_FUNCTIONS = f"""\
+directory_fingerprint() {{
+    (cd "$1" && find . -type f ! -path './.git/*' -print0 \\
+        | sort -z | xargs -0 -r sha256sum) | sha256sum | cut -c1-16
+}}
+
+hdar_package() {{
+    # hdar_package SOURCE [DIST]: hdarctl package tar, unless SOURCE is unchanged.
+    local source dist=${{2:-.}} fingerprint recorded staging tarball
+    source=$(realpath "$1") || return 1
+    local stamp="{BUILD_FINGERPRINT_DIR}/artifact-${{source//\\//_}}.fingerprint"
+    fingerprint=$(directory_fingerprint "$source") || return 1
+    recorded=($(cat "$stamp" 2> /dev/null))
+    if [ "${{recorded[0]}}" = "$fingerprint" ] && [ -f "${{recorded[1]}}" ]; then
+        echo "$1 is up to date (${{recorded[1]##*/}})"
+        return 0
+    fi
+    staging=$(mktemp -d) || return 1
+    if ! hdarctl package tar -d "$staging" "$source"; then
+        rm -fr "$staging"
+        return 1
+    fi
+    mkdir -p "$dist" {BUILD_FINGERPRINT_DIR}
+    tarball="$(realpath "$dist")/$(ls "$staging")"
+    mv -f "$staging"/* "$tarball"
+    rm -fr "$staging"
+    echo "$fingerprint $tarball" > "$stamp"
+    echo "Packaged $1 (${{tarball##*/}})"
+}}
+
+hdar_pushed() {{
+    # hdar_pushed TARBALL URL: whether the registry has this very archive.
+    local file=${{1##*/}} address=${{2#*://}} digest
+    file=${{file%.tar.gz}}
+    local registry=${{address%%/*}} repository=${{address#*/}}
+    [ "$repository" = "$address" ] && repository=""
+    repository="${{repository:+${{repository%/}}/}}${{file%-*}}"
+    digest=$(sha256sum "$1" | cut -d' ' -f1) || return 1
+    curl -sf -H "Accept: {MANIFEST_TYPES}" \\
+        "http://$registry/v2/$repository/manifests/${{file##*-}}" \\
+        | grep -q "sha256:$digest"
+}}
+
+hdar_push() {{
+    # hdar_push [OPTION...] TARBALL URL: hdarctl push, unless already pushed.
+    local tarball=${{@: -2:1}} url=${{@: -1}}
+    if hdar_pushed "$tarball" "$url"; then
+        echo "${{tarball##*/}} is already in $url"
+        return 0
+    fi
+    hdarctl push "$@"
+}}
+
+wait_for_jobs() {{
+    # wait_for_jobs PID...: waits for all the jobs, fails if any failed.
+    local failed=0 pid
+    for pid in "$@"; do
+        wait "$pid" || failed=1
+    done
+    return $failed
+}}
+
+run_artifact_commands() {{
+    # Runs the commands read from stdin, in order, except that the hdarctl
+    # packages and then pushes run concurrently, and that dist and build are
+    # kept.
+    local line packages=() pushes=() failed=0
+    while IFS= read -r line; do
+        line="${{line#"${{line%%[![:space:]]*}}"}}"
+        if [[ $line =~ ^rm\\ -[rf]+(\\ +(dist|build)/?)+$ ]]; then
+            echo "Keeping the previous artifacts ($line)"
+        elif [[ $line =~ ^mkdir(\\ +-p)?((\\ +(dist|build)/?)+)$ ]]; then
+            mkdir -p ${{BASH_REMATCH[2]}}
+        elif [[ $line =~ ^hdarctl\\ package\\ tar\\ +-d\\ +([^ ]+)\\ +([^ ]+)$ ]]; then
+            hdar_package "${{BASH_REMATCH[2]}}" "${{BASH_REMATCH[1]}}" &
+            packages+=($!)
+        elif [[ $line =~ ^hdarctl\\ push\\  ]]; then
+            if (( ${{#packages[@]}} )); then
+                wait_for_jobs "${{packages[@]}}" || failed=1
+                packages=()
+            fi
+            eval "hdar_push ${{line#hdarctl push }}" &
+            pushes+=($!)
+        elif [ -n "$line" ]; then
+            wait_for_jobs "${{packages[@]}}" "${{pushes[@]}}" || failed=1
+            packages=() pushes=()
+            (eval "$line") || failed=1
+        fi
+    done
+    wait_for_jobs "${{packages[@]}}" "${{pushes[@]}}" || failed=1
+    return $failed
+}}
+"""
+
+
+def artifact_commands(directory: str, dry_run: str) -> str:
+    """
+    Returns a bash snippet running, in `directory`, the commands printed by
+    the `dry_run` command (e.g. "make -n push-artifacts"), with the hdarctl
+    packages and pushes incremental and concurrent.
+    """
+    return f"""\
+{ARTIFACT_FUNCTIONS}
+cd {directory} || exit 1
+commands=$({dry_run}) || exit 1
+run_artifact_commands <<< "$commands"
+"""
+
+
+def package_and_push(
+    directory: str, sources: list, url: str, dist: str = "dist"
+) -> str:
+    """
+    Returns a bash snippet packaging the chart and HDAG directories `sources`
+    (relative to `directory`) into `dist`, all at once and only if they
+    changed, then pushing the archives that the registry at `url` does not
+    have yet, all at once.
+    """
+    packages = "\n".join(
+        f"hdarctl package tar -d {shlex.quote(dist)} {shlex.quote(source)}"
+        for source in sources
+    )
+    pushes = "\n".join(
+        f'hdarctl push "$(cut -d" " -f2 {BUILD_FINGERPRINT_DIR}/artifact-'
+        f'$(realpath {shlex.quote(source)} | tr / _).fingerprint)" {url}'
+        for source in sources
+    )
+    return f"""\
+{ARTIFACT_FUNCTIONS}
+cd {directory} || exit 1
+run_artifact_commands << 'EOF'
+{packages}
+{pushes}
+EOF
+"""
@@ -1,7 +1,43 @@
 REGISTRY_PORT = 5000
+# Pull-through mirrors, see start_registry_mirrors() in 0-setup-server.py.
+# registry -> (upstream URL, port of the mirror on the host, container name).
+# The kind nodes reach each mirror at <container name>:5000 on KIND_NETWORK.
+REGISTRY_MIRRORS = {
+    "docker.io": ("https://registry-1.docker.io", 5001, "mirror-docker-io"),
+    "registry.k8s.io": ("https://registry.k8s.io", 5002, "mirror-registry-k8s-io"),
+    "quay.io": ("https://quay.io", 5003, "mirror-quay-io"),
+    "ghcr.io": ("https://ghcr.io", 5004, "mirror-ghcr-io"),
+}
+KIND_NETWORK = "kind"
 GITS = "/root/gits"
 HDAR_URL = (
     "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/nephele-hdar.git"
 )
 SMO_URL = "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/smo.git"
 KARMADA_RELEASE_BRANCH = "release-1.14"
+
+# Offline bundle, see offline-bundle/README.md.
+OFFLINE_BUNDLE_DIR = "/opt/nephele-bundle"
+OFFLINE_INSTALLER = "/root/nephele-bundle/install-bundle.py"
+
+# Go build caches, kept across runs and resets (see gobuild.py). These are the
+# Go defaults for root, where the offline bundle also restores its modules.
+GOCACHE = "/root/.cache/go-build"
+GOMODCACHE = "/root/go/pkg/mod"
+BUILD_FINGERPRINT_DIR = "/root/.cache/nephele/builds"
+
+# Helm charts, see helmcache.py. chart id -> (chart, repository URL, version).
+# Versions are pinned so that the chart archives, and the manifests rendered
+# from them, can be cached.
+PROMETHEUS_COMMUNITY_REPO = "https://prometheus-community.github.io/helm-charts"
+HELM_CHARTS = {
+    "prometheus": ("prometheus", PROMETHEUS_COMMUNITY_REPO, "25.27.0"),
+    "kube-prometheus-stack": (
+        "kube-prometheus-stack",
+        PROMETHEUS_COMMUNITY_REPO,
+        "65.1.1",
+    ),
+}
+CHART_CACHE_DIR = "/root/.cache/nephele/charts"
+MANIFEST_STORE_DIR = "/root/.cache/nephele/manifests"
+CHART_OCI_REPOSITORY = f"oci://127.0.0.1:{REGISTRY_PORT}/charts"
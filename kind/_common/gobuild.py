@@ -0,0 +1,44 @@
+"""
+Build Go tools from their git checkouts, only when their sources changed.
+
+Each build is keyed by a fingerprint of the source commit (plus uncommitted
+changes) and of the Go version, stored next to the build caches. When the
+installed binary matches the fingerprint, nothing is built; otherwise `go
+build` runs with persistent GOCACHE and GOMODCACHE directories, so only the
+packages that changed are recompiled.
+
+    server.shell(
+        name="Build hdarctl if its sources changed",
+        commands=[go_build("hdarctl", f"{REPO}/components/hdar-ctl", ".", HDACTL)],
+        _shell_executable="/bin/bash",
+    )
+"""
+
+from constants import BUILD_FINGERPRINT_DIR, GOCACHE, GOMODCACHE
+
+
+def go_build(
+    name: str, source_dir: str, package: str, dest: str, ldflags: str = ""
+) -> str:
+    """
+    Returns a bash snippet building `package` (relative to `source_dir`) into
+    `dest`, unless `dest` was already built from the same sources. `ldflags`
+    may use shell substitutions, e.g. "-X main.version=$(git describe)".
+    """
+    stamp = f"{BUILD_FINGERPRINT_DIR}/{name}.fingerprint"
+    return f"""\
+set -e
+cd {source_dir}
+fingerprint="$(git rev-parse HEAD) \
+$(git diff HEAD | sha256sum | cut -c1-12) $(go version)"
+if [ -x {dest} ] && [ "$(cat {stamp} 2> /dev/null)" = "$fingerprint" ]; then
+    echo "{name} is up to date ($fingerprint)"
+else
+    mkdir -p {BUILD_FINGERPRINT_DIR} {GOCACHE} {GOMODCACHE}
+    export GOCACHE={GOCACHE} GOMODCACHE={GOMODCACHE} CGO_ENABLED=0
+    go build -ldflags "{ldflags}" -o {dest}.new {package}
+    mv -f {dest}.new {dest}
+    echo "$fingerprint" > {stamp}
+    echo "Built {name} ($fingerprint)"
+fi
+"""
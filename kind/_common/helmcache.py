@@ -0,0 +1,116 @@
+"""
+Install Helm charts from a local chart cache and pre-rendered manifests.
+
+Charts are pinned in HELM_CHARTS. The archive of a chart is looked up, in
+order, in CHART_CACHE_DIR, in the offline bundle, in the local OCI registry
+(CHART_OCI_REPOSITORY), and only then downloaded from its Helm repository, in
+which case it is also pushed to the local OCI registry.
+
+Releases are not installed with `helm install`: the chart is rendered once
+with `helm template` for a given release, namespace and values file, and the
+manifests are stored in MANIFEST_STORE_DIR under a hash of all of these. They
+are then applied with `kubectl apply --server-side`, so a repeated install
+neither contacts a Helm repository nor renders templates again. Since there is
+no Helm release, delete_chart() deletes the stored manifests from the cluster.
+
+    server.shell(
+        name="Install Prometheus",
+        commands=[
+            fetch_chart("prometheus")
+            + apply_chart("prometheus", "prometheus", "monitoring",
+                          "/root/values.yaml", "member1")
+        ],
+        _shell_executable="/bin/bash",
+    )
+"""
+
+from constants import (
+    CHART_CACHE_DIR,
+    CHART_OCI_REPOSITORY,
+    HELM_CHARTS,
+    MANIFEST_STORE_DIR,
+    OFFLINE_BUNDLE_DIR,
+)
+
+FIELD_MANAGER = "nephele-deploy"
+
+
+def chart_archive(chart_id: str) -> str:
+    chart, _, version = HELM_CHARTS[chart_id]
+    return f"{CHART_CACHE_DIR}/{chart}-{version}.tgz"
+
+
+def fetch_chart(chart_id: str) -> str:
+    """Returns a bash snippet making sure the archive of a chart is cached."""
+    chart, repo_url, version = HELM_CHARTS[chart_id]
+    archive = chart_archive(chart_id)
+    offline_archive = f"{OFFLINE_BUNDLE_DIR}/charts/{chart}-{version}.tgz"
+    return f"""\
+mkdir -p {CHART_CACHE_DIR}
+if [ -f {archive} ]; then
+    echo "Chart {chart} {version} is cached"
+elif [ -f {offline_archive} ]; then
+    cp {offline_archive} {archive}
+elif helm pull {CHART_OCI_REPOSITORY}/{chart} --version {version} \
+        --plain-http -d {CHART_CACHE_DIR} 2> /dev/null; then
+    echo "Pulled chart {chart} {version} from the local registry"
+else
+    helm pull {chart} --repo {repo_url} --version {version} -d {CHART_CACHE_DIR}
+    helm push {archive} {CHART_OCI_REPOSITORY} --plain-http || true
+fi
+"""
+
+
+def apply_chart(
+    release: str, chart_id: str, namespace: str, values_file: str, context: str
+) -> str:
+    """
+    Returns a bash snippet installing (or updating) a release in the cluster of
+    `context`, from manifests rendered on the first install only. The cached
+    chart archive must exist (see fetch_chart). Arguments may use shell
+    variables, e.g. release="prometheus-$member".
+    """
+    chart, _, version = HELM_CHARTS[chart_id]
+    archive = chart_archive(chart_id)
+    apply = (
+        f"kubectl --context {context} apply --server-side --force-conflicts "
+        f"--field-manager={FIELD_MANAGER}"
+    )
+    return f"""\
+key=$( (echo {chart}-{version} {release} {namespace}; helm version --short; \
+cat {values_file}) | sha256sum | cut -c1-16)
+manifests={MANIFEST_STORE_DIR}/{release}-$key
+if [ -d $manifests ]; then
+    echo "Using the manifests of {release} rendered earlier ($key)"
+else
+    mkdir -p {MANIFEST_STORE_DIR}
+    staging=$(mktemp -d -p {MANIFEST_STORE_DIR})
+    helm show crds {archive} > $staging/crds.yaml
+    helm template {release} {archive} --namespace {namespace} \
+        --values {values_file} --skip-tests > $staging/manifest.yaml
+    mv -T $staging $manifests 2> /dev/null || rm -fr $staging
+fi
+if [ -s $manifests/crds.yaml ]; then
+    {apply} -f $manifests/crds.yaml
+    kubectl --context {context} wait --for=condition=Established \
+        -f $manifests/crds.yaml --timeout=60s
+fi
+kubectl --context {context} create namespace {namespace} 2> /dev/null || true
+{apply} --namespace {namespace} -f $manifests/manifest.yaml
+"""
+
+
+def delete_chart(release: str, namespace: str, context: str) -> str:
+    """
+    Returns a bash snippet deleting the resources of a release installed by
+    apply_chart() from the cluster of `context`, as rendered for any of the
+    values it was installed with. The CRDs are kept.
+    """
+    renderings = f"{MANIFEST_STORE_DIR}/{release}-{'?' * 16}"
+    return f"""\
+for manifests in {renderings}; do
+    [ -f $manifests/manifest.yaml ] || continue
+    kubectl --context {context} delete --namespace {namespace} \
+        --ignore-not-found --wait -f $manifests/manifest.yaml
+done
+"""
@@ -0,0 +1,161 @@
+"""
+Build container images with BuildKit, in parallel, only when their sources
+changed.
+
+The builds run on a `docker-container` buildx builder on the host network,
+which pushes the images straight to the local registry and keeps its layer
+cache there too (`<registry>/buildcache/<image>`, with `mode=max`), so the
+cache survives builder and Docker resets.
+
+Each image is keyed by a fingerprint of its build context, its Dockerfile and
+its build arguments. After a push, the fingerprint is stored with the digest
+of the pushed manifest; a later build is skipped when the fingerprint is the
+same and the registry still serves that digest for the tag.
+
+    server.shell(
+        name="Build and push the demo images",
+        commands=[
+            image_builds([("127.0.0.1:5000/app:0.1.0", f"{DEMO}/src/app")])
+        ],
+        _shell_executable="/bin/bash",
+    )
+"""
+
+import shlex
+
+from constants import BUILD_FINGERPRINT_DIR, REGISTRY_PORT
+
+BUILDER = "nephele"
+BUILDKITD_CONFIG = "/etc/buildkit/buildkitd.toml"
+REGISTRY = f"127.0.0.1:{REGISTRY_PORT}"
+CACHE_REPOSITORY = f"{REGISTRY}/buildcache"
+MANIFEST_TYPES = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+
+IMAGE_BUILD_FUNCTIONS = f"""\
+ensure_builder() {{
+    mkdir -p {BUILD_FINGERPRINT_DIR} $(dirname {BUILDKITD_CONFIG})
+    printf '[registry."{REGISTRY}"]\\n  http = true\\n  insecure = true\\n' \\
+        > {BUILDKITD_CONFIG}
+    docker buildx inspect {BUILDER} > /dev/null 2>&1 \\
+        || docker buildx create --name {BUILDER} --driver docker-container \\
+            --driver-opt network=host --buildkitd-config {BUILDKITD_CONFIG}
+    docker buildx inspect --bootstrap {BUILDER} > /dev/null
+}}
+
+registry_digest() {{
+    # registry_digest IMAGE: the digest the registry serves for IMAGE, if any.
+    local registry=${{1%%/*}} path=${{1#*/}} tag=latest
+    if [[ ${{path##*/}} == *:* ]]; then
+        tag=${{path##*:}}
+        path=${{path%:*}}
+    fi
+    curl -sfI -H "Accept: {MANIFEST_TYPES}" \\
+        "http://$registry/v2/$path/manifests/$tag" \\
+        | tr -d '\\r' | awk -F': ' 'tolower($1) == "docker-content-digest" {{print $2}}'
+}}
+
+image_build() {{
+    # image_build IMAGE CONTEXT [DOCKERFILE [BUILD OPTION...]]
+    local image=$1 context=$2 dockerfile=${{3:-$2/Dockerfile}}
+    shift $(( $# < 3 ? $# : 3 ))
+    local name=${{image##*/}}
+    name=${{name%%:*}}
+    local stamp="{BUILD_FINGERPRINT_DIR}/image-${{image//[\\/:]/_}}.fingerprint"
+    local fingerprint digest
+    fingerprint=$(
+        {{
+            (cd "$context" && find . -type f ! -path './.git/*' -print0 \\
+                | sort -z | xargs -0 -r sha256sum)
+            sha256sum < "$dockerfile"
+            echo "$*"
+        }} | sha256sum | cut -c1-16
+    ) || return 1
+    digest=$(registry_digest "$image")
+    if [ -n "$digest" ] \\
+        && [ "$(cat "$stamp" 2> /dev/null)" = "$fingerprint $digest" ]; then
+        echo "$image is up to date ($fingerprint)"
+        return 0
+    fi
+    docker buildx build --builder {BUILDER} --push --provenance=false \\
+        --tag "$image" --file "$dockerfile" \\
+        --label "io.nephele.fingerprint=$fingerprint" \\
+        --cache-from "type=registry,ref={CACHE_REPOSITORY}/$name" \\
+        --cache-to "type=registry,ref={CACHE_REPOSITORY}/$name,mode=max" \\
+        "$@" "$context" || return 1
+    echo "$fingerprint $(registry_digest "$image")" > "$stamp"
+    echo "Built and pushed $image ($fingerprint)"
+}}
+
+docker_build() {{
+    # docker_build [OPTION...] CONTEXT: image_build with `docker build` options.
+    local image="" dockerfile="" options=()
+    while (( $# > 1 )); do
+        case $1 in
+            -t|--tag) image=$2; shift 2 ;;
+            -f|--file) dockerfile=$2; shift 2 ;;
+            --build-arg|--target|--platform) options+=("$1" "$2"); shift 2 ;;
+            *) options+=("$1"); shift ;;
+        esac
+    done
+    image_build "$image" "$1" "${{dockerfile:-$1/Dockerfile}}" "${{options[@]}}"
+}}
+
+wait_for_builds() {{
+    # wait_for_builds PID...: waits for all the builds, fails if any failed.
+    local failed=0 pid
+    for pid in "$@"; do
+        wait "$pid" || failed=1
+    done
+    return $failed
+}}
+"""
+
+
+def image_builds(builds: list) -> str:
+    """
+    Returns a bash snippet building and pushing `builds`, a list of (image,
+    context) or (image, context, dockerfile) tuples, all at once. It fails if
+    any of the builds failed.
+    """
+    commands = [IMAGE_BUILD_FUNCTIONS, "ensure_builder || exit 1", "pids=()"]
+    for build in builds:
+        arguments = " ".join(shlex.quote(argument) for argument in build)
+        commands.append(f"image_build {arguments} &")
+        commands.append("pids+=($!)")
+    commands.append('wait_for_builds "${pids[@]}"')
+    return "\n".join(commands) + "\n"
+
+
+def make_image_builds(directory: str, target: str) -> str:
+    """
+    Returns a bash snippet building and pushing, all at once, the images the
+    `docker build` commands of a make target (in `directory`) would build: the
+    commands printed by `make -n` run through docker_build instead. It fails
+    if the target has no `docker build` command of its own (e.g. one behind
+    a `cd x &&`), rather than build nothing.
+    """
+    return f"""\
+{IMAGE_BUILD_FUNCTIONS}
+ensure_builder || exit 1
+cd {directory} || exit 1
+commands=$(make -n {target}) || exit 1
+builds=$(sed -nE 's/^\\s*docker build (.*)/\\1/p' <<< "$commands")
+if [ -z "$builds" ]; then
+    echo "No 'docker build' command in 'make -n {target}':" >&2
+    echo "$commands" >&2
+    exit 1
+fi
+pids=()
+while read -r options; do
+    eval "docker_build $options" &
+    pids+=($!)
+done <<< "$builds"
+wait_for_builds "${{pids[@]}}"
+"""
@@ -8,7 +8,23 @@ _hostname = os.getenv("SERVER_NAME", _default_hostname)
 
 __all__ = ["hosts"]
 
+# Set NEPHELE_OFFLINE=1 for a host prepared with the offline bundle.
+_offline_bundle = os.getenv("NEPHELE_OFFLINE", "") == "1"
+# Set NEPHELE_INCREMENTAL=1 to re-run on a provisioned host without wiping
+# Docker (see 0-setup-server.py).
+_incremental = os.getenv("NEPHELE_INCREMENTAL", "") == "1"
+# Set NEPHELE_SMO_PATCH to patch the SMO with another file than fix/kind.patch
+# (see 10-build-nephele-smo.py).
+_smo_patch = os.getenv("NEPHELE_SMO_PATCH", "fix/kind.patch")
+
 hosts = [
     # List of hosts in the inventory.
-    _hostname,
+    (
+        _hostname,
+        {
+            "offline_bundle": _offline_bundle,
+            "incremental": _incremental,
+            "smo_patch": _smo_patch,
+        },
+    ),
 ]
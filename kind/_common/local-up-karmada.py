@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+
+"""
+Brings up a local Karmada testbed on kind, like Karmada's
+`hack/local-up-karmada.sh`, but with every independent step run concurrently.
+
+Here's what this script does:
+
+1. **Creates the kind clusters concurrently**: `karmada-host`, `member1` and `member2` (Push mode) and `member3` (Pull mode) are all created at once, while the Karmada images are built from the checkout and the extra images are pulled.
+2. **Preloads images in parallel**: the control plane images into `karmada-host`, the agent into the Pull members and the shared image set (`--preload-image`) into every cluster, with one `kind load` per cluster, all clusters at the same time.
+3. **Installs the control plane while the members come up**: `hack/deploy-karmada.sh` runs as soon as the host cluster and the images are ready.
+4. **Joins each member as soon as it is ready**: `karmadactl join` for the Push members, `hack/deploy-karmada-agent.sh` for the Pull members, then the metrics-server, for all members concurrently.
+5. **Writes the same kubeconfigs as local-up-karmada.sh**: `~/.kube/karmada.config` (contexts `karmada-host` and `karmada-apiserver`) and `~/.kube/members.config` (one context per member).
+
+With `--registry-mirror REGISTRY=URL` (repeatable), the containerd of every
+node pulls the images of REGISTRY through the mirror at URL, e.g. a
+pull-through cache on the kind network (see start_registry_mirrors() in
+0-setup-server.py).
+
+    ./local-up-karmada.py --karmada-dir /root/gits/karmada \\
+        --registry-mirror docker.io=http://mirror-docker-io:5000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# --- ANSI Color Codes for Better Output ---
+class colors:
+    GREEN = "\033[92m"
+    RED = "\033[91m"
+    YELLOW = "\033[93m"
+    BLUE = "\033[94m"
+    GRAY = "\033[90m"
+    ENDC = "\033[0m"
+
+
+HOST_CLUSTER = "karmada-host"
+KARMADA_APISERVER_CONTEXT = "karmada-apiserver"
+PUSH_MEMBERS = ["member1", "member2"]
+PULL_MEMBERS = ["member3"]
+
+KUBE_DIR = os.path.expanduser("~/.kube")
+MAIN_KUBECONFIG = os.path.join(KUBE_DIR, "karmada.config")
+MEMBERS_KUBECONFIG = os.path.join(KUBE_DIR, "members.config")
+
+DEFAULT_KIND_CONFIG = "kind: Cluster\napiVersion: kind.x-k8s.io/v1alpha4\n"
+# Makes containerd read the hosts.toml files of the registries (the mirrors).
+CONTAINERD_CONFIG_PATCH = """\
+containerdConfigPatches:
+- |-
+  [plugins."io.containerd.grpc.v1.cri".registry]
+    config_path = "/etc/containerd/certs.d"
+"""
+
+# Same defaults as local-up-karmada.sh.
+DEFAULT_NODE_IMAGE = os.getenv("CLUSTER_VERSION", "kindest/node:v1.31.2")
+REGISTRY = os.getenv("REGISTRY", "docker.io/karmada")
+VERSION = os.getenv("VERSION", "latest")
+CONTROL_PLANE_IMAGES = [
+    "karmada-controller-manager",
+    "karmada-scheduler",
+    "karmada-descheduler",
+    "karmada-webhook",
+    "karmada-scheduler-estimator",
+    "karmada-aggregated-apiserver",
+    "karmada-search",
+    "karmada-metrics-adapter",
+]
+AGENT_IMAGE = "karmada-agent"
+
+_print_lock = threading.Lock()
+# (step, start, end) of every finished step, for the summary.
+_timings = []
+
+
+def print_color(color, message, label=None):
+    """Prints a message in a given color, prefixed with its step label."""
+    prefix = f"{colors.GRAY}[{label}]{colors.ENDC} " if label else ""
+    with _print_lock:
+        print(f"{prefix}{color}{message}{colors.ENDC}", flush=True)
+
+
+def run_command(command, label, env=None, cwd=None, capture_output=False):
+    """
+    Runs a command, relaying its output prefixed with `label`.
+    Raises CalledProcessError if it fails. Returns its output if captured.
+    """
+    print_color(colors.BLUE, f"--> Executing: {' '.join(command)}", label)
+    process_env = os.environ.copy()
+    process_env.update(env or {})
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env=process_env,
+        cwd=cwd,
+    )
+    output = []
+    for line in process.stdout:
+        if capture_output:
+            output.append(line)
+        else:
+            print_color("", line.rstrip(), label)
+    if process.wait() != 0:
+        if capture_output:
+            print_color("", "".join(output), label)
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return "".join(output)
+
+
+def step(label):
+    """Decorator timing a step and labelling its failures."""
+
+    def decorator(function):
+        def wrapper(*args, **kwargs):
+            name = label.format(*args)
+            start = time.monotonic()
+            try:
+                return function(*args, **kwargs)
+            except Exception:
+                print_color(colors.RED, "❌ Failed.", name)
+                raise
+            finally:
+                _timings.append((name, start, time.monotonic()))
+
+        return wrapper
+
+    return decorator
+
+
+def kubeconfig_of(cluster):
+    """The kubeconfig file of a cluster while it is being set up."""
+    if cluster == HOST_CLUSTER:
+        return MAIN_KUBECONFIG
+    return os.path.join(tempfile.gettempdir(), f"karmada-{cluster}.config")
+
+
+def karmada_image(name):
+    return f"{REGISTRY}/{name}:{VERSION}"
+
+
+#
+# Clusters
+#
+def kind_config_with_mirrors(cluster, config_file):
+    """
+    Returns a copy of the kind configuration of a cluster (or of the default
+    one) that enables the hosts.toml files of containerd.
+    """
+    config = DEFAULT_KIND_CONFIG
+    if config_file and os.path.exists(config_file):
+        with open(config_file) as f:
+            config = f.read().rstrip("\n") + "\n"
+    path = os.path.join(tempfile.gettempdir(), f"kind-{cluster}-mirrors.yaml")
+    with open(path, "w") as f:
+        f.write(config + CONTAINERD_CONFIG_PATCH)
+    return path
+
+
+def configure_mirrors(cluster, mirrors):
+    """Writes the hosts.toml of each mirrored registry into every node."""
+    nodes = run_command(
+        ["kind", "get", "nodes", "--name", cluster], cluster, capture_output=True
+    ).split()
+    for registry, url in mirrors.items():
+        directory = f"/etc/containerd/certs.d/{registry}"
+        with tempfile.NamedTemporaryFile("w", suffix=".toml") as hosts_toml:
+            hosts_toml.write(
+                f'[host."{url}"]\n'
+                '  capabilities = ["pull", "resolve"]\n'
+                "  skip_verify = true\n"
+            )
+            hosts_toml.flush()
+            for node in nodes:
+                run_command(["docker", "exec", node, "mkdir", "-p", directory], cluster)
+                run_command(
+                    ["docker", "cp", hosts_toml.name, f"{node}:{directory}/hosts.toml"],
+                    cluster,
+                )
+
+
+@step("create {0}")
+def create_cluster(cluster, node_image, config_file, mirrors=None):
+    """
+    Creates a kind cluster, with a kubeconfig whose context is named after the
+    cluster and that uses the node's address on the kind network (reachable
+    from the host and from the other clusters). With `mirrors` ({registry:
+    URL}), its nodes pull the images of these registries through the mirrors.
+    """
+    kubeconfig = kubeconfig_of(cluster)
+    existing = run_command(["kind", "get", "clusters"], cluster, capture_output=True)
+    if cluster in existing.split():
+        run_command(["kind", "delete", "cluster", "--name", cluster], cluster)
+    if os.path.exists(kubeconfig):
+        os.remove(kubeconfig)
+
+    command = ["kind", "create", "cluster", "--name", cluster]
+    command += ["--kubeconfig", kubeconfig, "--image", node_image, "--wait", "5m"]
+    if mirrors:
+        command += ["--config", kind_config_with_mirrors(cluster, config_file)]
+    elif config_file and os.path.exists(config_file):
+        command += ["--config", config_file]
+    run_command(command, cluster)
+    if mirrors:
+        configure_mirrors(cluster, mirrors)
+
+    node_ip = run_command(
+        [
+            "docker",
+            "inspect",
+            "--format",
+            "{{ .NetworkSettings.Networks.kind.IPAddress }}",
+            f"{cluster}-control-plane",
+        ],
+        cluster,
+        capture_output=True,
+    ).strip()
+    kubectl = ["kubectl", "--kubeconfig", kubeconfig, "config"]
+    run_command([*kubectl, "rename-context", f"kind-{cluster}", cluster], cluster)
+    server = f"--server=https://{node_ip}:6443"
+    run_command([*kubectl, "set-cluster", f"kind-{cluster}", server], cluster)
+    print_color(colors.GREEN, f"✅ Cluster '{cluster}' is up ({node_ip}).", cluster)
+
+
+@step("load images into {0}")
+def load_images(cluster, images):
+    """Loads local Docker images into all the nodes of a cluster at once."""
+    if images:
+        run_command(
+            ["kind", "load", "docker-image", *images, "--name", cluster], cluster
+        )
+
+
+#
+# Images
+#
+@step("build Karmada images")
+def build_karmada_images(karmada_dir):
+    run_command(
+        ["make", "images", "GOOS=linux", f"--directory={karmada_dir}"],
+        "images",
+        env={"REGISTRY": REGISTRY, "VERSION": VERSION},
+    )
+    return True
+
+
+@step("pull shared images")
+def pull_images(images):
+    for image in images:
+        run_command(["docker", "pull", image], "pull")
+    return images
+
+
+#
+# Karmada
+#
+@step("deploy control plane")
+def deploy_control_plane(karmada_dir, host_ready, images_ready):
+    host_ready.result()
+    # Images that were not built are pulled by the clusters themselves.
+    if images_ready.result():
+        load_images(
+            HOST_CLUSTER, [karmada_image(name) for name in CONTROL_PLANE_IMAGES]
+        )
+    run_command(
+        [f"{karmada_dir}/hack/deploy-karmada.sh", MAIN_KUBECONFIG, HOST_CLUSTER],
+        "control-plane",
+        env={"REGISTRY": REGISTRY, "VERSION": VERSION},
+        cwd=karmada_dir,
+    )
+    print_color(colors.GREEN, "✅ Karmada control plane is up.", "control-plane")
+
+
+@step("join {0}")
+def join_member(
+    member, karmada_dir, member_ready, control_plane_ready, images_ready, shared_ready
+):
+    """Joins a member in Push or Pull mode, then adds the metrics-server."""
+    member_ready.result()
+    images = list(shared_ready.result())
+    if images_ready.result() and member in PULL_MEMBERS:
+        images.append(karmada_image(AGENT_IMAGE))
+    # Preloading does not need the control plane: do it while it comes up.
+    load_images(member, images)
+
+    control_plane_ready.result()
+    kubeconfig = kubeconfig_of(member)
+    if member in PULL_MEMBERS:
+        run_command(
+            [
+                f"{karmada_dir}/hack/deploy-karmada-agent.sh",
+                MAIN_KUBECONFIG,
+                KARMADA_APISERVER_CONTEXT,
+                kubeconfig,
+                member,
+            ],
+            member,
+            env={"REGISTRY": REGISTRY, "VERSION": VERSION},
+            cwd=karmada_dir,
+        )
+    else:
+        run_command(
+            [
+                "karmadactl",
+                "join",
+                member,
+                f"--karmada-context={KARMADA_APISERVER_CONTEXT}",
+                f"--cluster-kubeconfig={kubeconfig}",
+                f"--cluster-context={member}",
+            ],
+            member,
+            env={"KUBECONFIG": MAIN_KUBECONFIG},
+        )
+    run_command(
+        [f"{karmada_dir}/hack/deploy-k8s-metrics-server.sh", kubeconfig, member],
+        member,
+        cwd=karmada_dir,
+    )
+    mode = "Pull" if member in PULL_MEMBERS else "Push"
+    print_color(colors.GREEN, f"✅ '{member}' joined in {mode} mode.", member)
+
+
+def write_members_kubeconfig(members):
+    """Merges the member kubeconfigs into MEMBERS_KUBECONFIG."""
+    merged = run_command(
+        ["kubectl", "config", "view", "--flatten"],
+        "kubeconfig",
+        env={"KUBECONFIG": ":".join(kubeconfig_of(member) for member in members)},
+        capture_output=True,
+    )
+    with open(MEMBERS_KUBECONFIG, "w") as f:
+        f.write(merged)
+    os.chmod(MEMBERS_KUBECONFIG, 0o600)
+    for member in members:
+        os.remove(kubeconfig_of(member))
+
+
+def print_summary(started):
+    print_color(colors.BLUE, "\n--- Steps (start → end, seconds since start) ---")
+    for name, start, end in sorted(_timings, key=lambda timing: timing[1]):
+        print(
+            f"  {name:<30} {start - started:7.1f} → {end - started:7.1f}"
+            f"  ({end - start:6.1f}s)"
+        )
+    print(f"  {'Total':<30} {time.monotonic() - started:27.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bring up Karmada and its member clusters on kind, concurrently."
+    )
+    parser.add_argument(
+        "--karmada-dir", required=True, help="Path of the Karmada git checkout."
+    )
+    parser.add_argument(
+        "--node-image",
+        default=DEFAULT_NODE_IMAGE,
+        help=f"kind node image (default: {DEFAULT_NODE_IMAGE}).",
+    )
+    parser.add_argument(
+        "--build-images",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Build the Karmada images from the checkout (default), "
+        f"or use the {REGISTRY}/*:{VERSION} images already in Docker.",
+    )
+    parser.add_argument(
+        "--preload-image",
+        action="append",
+        default=[],
+        metavar="IMAGE",
+        help="Image to pull once and preload into every cluster (repeatable).",
+    )
+    parser.add_argument(
+        "--registry-mirror",
+        action="append",
+        default=[],
+        metavar="REGISTRY=URL",
+        help="Pull the images of REGISTRY through the mirror at URL (repeatable).",
+    )
+    args = parser.parse_args()
+    mirrors = dict(mirror.split("=", 1) for mirror in args.registry_mirror)
+
+    karmada_dir = os.path.abspath(args.karmada_dir)
+    kind_configs = os.path.join(karmada_dir, "artifacts", "kindClusterConfig")
+    members = PUSH_MEMBERS + PULL_MEMBERS
+    os.makedirs(KUBE_DIR, exist_ok=True)
+    started = time.monotonic()
+
+    # Every step waits only for the steps it needs, so there must be a worker
+    # for each of them.
+    with ThreadPoolExecutor(max_workers=len(members) * 2 + 4) as pool:
+        if args.build_images:
+            images = pool.submit(build_karmada_images, karmada_dir)
+        else:
+            images = pool.submit(lambda: False)
+        shared_images = pool.submit(pull_images, args.preload_image)
+        host = pool.submit(create_cluster, HOST_CLUSTER, args.node_image, None, mirrors)
+        member_clusters = {
+            member: pool.submit(
+                create_cluster,
+                member,
+                args.node_image,
+                os.path.join(kind_configs, f"{member}.yaml"),
+                mirrors,
+            )
+            for member in members
+        }
+        control_plane = pool.submit(deploy_control_plane, karmada_dir, host, images)
+        joins = [
+            pool.submit(
+                join_member,
+                member,
+                karmada_dir,
+                member_clusters[member],
+                control_plane,
+                images,
+                shared_images,
+            )
+            for member in members
+        ]
+    # Leaving the pool waited for every step: report the first failure.
+    failures = [join.exception() for join in joins if join.exception()]
+    if failures:
+        print_summary(started)
+        print_color(colors.RED, f"FATAL: {failures[0]}")
+        sys.exit(1)
+
+    write_members_kubeconfig(members)
+    print_summary(started)
+    print_color(colors.GREEN, "\n✅ --- Local Karmada is ready! --- ✅")
+    print(f"  export KUBECONFIG={MAIN_KUBECONFIG}  (karmada-apiserver, karmada-host)")
+    print(f"  export KUBECONFIG={MEMBERS_KUBECONFIG}  ({', '.join(members)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Opt-in profiler for pyinfra runs.
+
+Set NEPHELE_PROFILE=/path/to/trace.json to time every operation of a pyinfra
+run, per host. The trace opens in chrome://tracing or https://ui.perfetto.dev,
+and the slowest operations, and the time spent in each deploy file, are logged
+at the end of the run.
+
+common.py calls install_profiler(), so every recipe is covered. This module is
+shared by all the recipe directories (they symlink it).
+"""
+
+import atexit
+import json
+import os
+import sys
+import time
+from functools import cache
+
+import pyinfra
+from pyinfra import logger, state
+from pyinfra.api.state import BaseStateCallback
+
+PROFILE_FILE = os.getenv("NEPHELE_PROFILE", "")
+PROFILE_TOP = int(os.getenv("NEPHELE_PROFILE_TOP", "15"))
+
+
+class OperationProfiler(BaseStateCallback):
+    """Records the duration of every operation, per host, for the whole run."""
+
+    def __init__(self) -> None:
+        self.started: dict[tuple[str, str], float] = {}
+        self.spans: list[dict] = []
+
+    def operation_host_start(self, state, host, op_hash):
+        self.started[(op_hash, host.name)] = time.time()
+
+    def operation_host_success(self, state, host, op_hash, retry_count=0):
+        self.record(state, host, op_hash, "success")
+
+    def operation_host_error(self, state, host, op_hash, retry_count=0, max_retries=0):
+        self.record(state, host, op_hash, "error")
+
+    def record(self, state, host, op_hash, status: str) -> None:
+        start = self.started.pop((op_hash, host.name), None)
+        if start is None:
+            return
+        meta = state.get_op_meta(op_hash)
+        self.spans.append(
+            {
+                "file": deploy_file(meta.op_order),
+                "name": ", ".join(sorted(meta.names)) or op_hash,
+                "host": host.name,
+                "status": status,
+                "start": start,
+                "end": time.time(),
+            }
+        )
+
+    def write_chrome_trace(self, path: str) -> None:
+        origin = min(span["start"] for span in self.spans)
+        hosts = sorted({span["host"] for span in self.spans})
+        events = [
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "pyinfra"}}
+        ]
+        for tid, host_name in enumerate(hosts):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {"name": host_name},
+                }
+            )
+        for span in self.spans:
+            events.append(
+                {
+                    "name": span["name"],
+                    "cat": span["file"],
+                    "ph": "X",
+                    "ts": int((span["start"] - origin) * 1e6),
+                    "dur": int((span["end"] - span["start"]) * 1e6),
+                    "pid": 1,
+                    "tid": hosts.index(span["host"]),
+                    "args": {"file": span["file"], "status": span["status"]},
+                }
+            )
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def log_summary(self, top: int = PROFILE_TOP) -> None:
+        durations: dict[tuple[str, str], float] = {}
+        per_file: dict[str, float] = {}
+        for span in self.spans:
+            duration = span["end"] - span["start"]
+            key = (span["file"], span["name"])
+            durations[key] = durations.get(key, 0.0) + duration
+            per_file[span["file"]] = per_file.get(span["file"], 0.0) + duration
+
+        logger.info("-" * 60)
+        logger.info(f"Slowest operations (trace: {PROFILE_FILE})")
+        slowest = sorted(durations.items(), key=lambda item: item[1], reverse=True)
+        for (file, name), duration in slowest[:top]:
+            logger.info(f"  {duration:8.1f}s  {file}: {name}")
+        logger.info("Time per deploy file")
+        for file, duration in sorted(per_file.items(), key=lambda item: -item[1]):
+            logger.info(f"  {duration:8.1f}s  {file}")
+        logger.info("-" * 60)
+
+    def export(self) -> None:
+        if not self.spans:
+            return
+        self.write_chrome_trace(PROFILE_FILE)
+        self.log_summary()
+
+
+@cache
+def deploy_files() -> tuple:
+    """
+    Returns the deploy files of the pyinfra command line, in order, parsed
+    with pyinfra's own command.
+    """
+    from pyinfra_cli.main import cli
+
+    context = cli.make_context("pyinfra", sys.argv[1:], resilient_parsing=True)
+    return tuple(context.params["operations"])
+
+
+def deploy_file(op_order: tuple) -> str:
+    """
+    Returns the deploy file that created an operation. On the command line,
+    pyinfra puts the index of that file first in the operation order.
+    """
+    if not pyinfra.is_cli:
+        return "api"
+    return deploy_files()[op_order[0]]
+
+
+def install_profiler() -> None:
+    """Registers the operation profiler once per pyinfra run, if enabled."""
+    if not PROFILE_FILE:
+        return
+    handlers = state.callback_handlers
+    if any(type(h).__name__ == "OperationProfiler" for h in handlers):
+        return
+    if pyinfra.is_cli:
+        # Parse the command line now, so that a pyinfra upgrade breaking it
+        # fails the run here rather than mislabelling the operations.
+        deploy_files()
+    profiler = OperationProfiler()
+    state.add_callback_handler(profiler)
+    atexit.register(profiler.export)
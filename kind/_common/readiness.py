@@ -0,0 +1,89 @@
+"""
+Shell snippets to wait for something to become ready, without fixed sleeps.
+
+The recipes run their checks remotely through `server.shell`, so the waits are
+bash: each helper returns a snippet that returns as soon as its condition
+holds, polling with a capped exponential backoff with random jitter, and
+prints how long the wait took (shown in the recipe logs by log_callback).
+Kubernetes conditions use `kubectl wait`, which watches the resource.
+
+    server.shell(
+        commands=[wait_for_http("Prometheus NodePort", url, timeout=60)],
+        _shell_executable="/bin/bash",
+    )
+"""
+
+import shlex
+
+DEFAULT_TIMEOUT = 120
+MAX_DELAY = 15
+
+WAIT_UNTIL_FUNCTION = f"""\
+wait_until() {{
+    # wait_until TIMEOUT DESCRIPTION COMMAND...
+    local timeout=$1 description=$2
+    shift 2
+    local start=$SECONDS ceiling=1 delay
+    echo "--> Waiting for $description (up to ${{timeout}}s)..."
+    while true; do
+        # The time left, for commands that take a timeout (see with_time_left).
+        wait_time_left=$(( timeout - (SECONDS - start) ))
+        if (( wait_time_left <= 0 )); then
+            echo "TIMEOUT: $description not ready after $((SECONDS - start))s"
+            return 1
+        fi
+        "$@" > /dev/null 2>&1 && break
+        delay=$(( RANDOM % ceiling + 1 ))
+        wait_time_left=$(( timeout - (SECONDS - start) ))
+        (( wait_time_left > 0 )) && sleep $(( delay < wait_time_left ? delay : wait_time_left ))
+        ceiling=$(( ceiling * 2 > {MAX_DELAY} ? {MAX_DELAY} : ceiling * 2 ))
+    done
+    echo "READY: $description after $((SECONDS - start))s"
+}}
+
+with_time_left() {{
+    # with_time_left COMMAND...: runs COMMAND --timeout=<time left>s, the time
+    # left to the wait_until running it.
+    "$@" --timeout="${{wait_time_left}}s"
+}}
+"""
+
+
+def wait_until(description: str, command: str, timeout: int = DEFAULT_TIMEOUT) -> str:
+    """
+    Waits until `command` succeeds. The command is inserted as is, so it can
+    use the variables of the surrounding script; wrap compound conditions in
+    `bash -c '...'`.
+    """
+    return (
+        f"{WAIT_UNTIL_FUNCTION}"
+        f"wait_until {timeout} {shlex.quote(description)} {command}\n"
+    )
+
+
+def wait_for_http(description: str, url: str, timeout: int = DEFAULT_TIMEOUT) -> str:
+    """Waits until a GET on `url` (which may use shell variables) succeeds."""
+    return wait_until(
+        description, f'curl -sf -o /dev/null --max-time 5 "{url}"', timeout
+    )
+
+
+def kubectl_wait(
+    description: str,
+    resource: str,
+    condition: str,
+    namespace: str = "",
+    context: str = "",
+    timeout: int = DEFAULT_TIMEOUT,
+) -> str:
+    """
+    Waits with `kubectl wait --for=<condition>` (e.g. "condition=Available"),
+    retrying with backoff while the resource does not exist yet. Each `kubectl
+    wait` only gets the time left, so the whole wait stays within `timeout`.
+    """
+    command = f"with_time_left kubectl wait {resource} --for={shlex.quote(condition)}"
+    if namespace:
+        command += f" -n {namespace}"
+    if context:
+        command += f" --context {context}"
+    return wait_until(description, command, timeout)
@@ -0,0 +1,115 @@
+"""
+Fast reset of the demos, between two demos run on the same base testbed (see
+testbed.py at the top of the repository).
+
+Instead of rebuilding the clusters, Karmada, Prometheus and the SMO, only what
+the demos add is removed:
+
+- the graphs of the demo projects, through the SMO API (the SMO then removes
+  their workloads from the clusters),
+- the demo namespaces, from Karmada and, for what Karmada did not clean up,
+  from every member.
+
+Warning: connection as user root.
+
+pyinfra -y -v --user root ${SERVER_NAME} reset-demos.py
+"""
+
+from textwrap import dedent
+
+from pyinfra.operations import python, server
+
+from common import log_callback
+from readiness import WAIT_UNTIL_FUNCTION
+
+KCONFIG = "/root/.kube/karmada-apiserver.config"
+SMO_URL = "http://127.0.0.1:8000"
+DEMO_PROJECTS = ["demo0", "demo2", "demo4"]
+# Graphs deployed by the demos, in case their project is not listed above.
+DEMO_GRAPHS = [
+    "hello-world-graph",
+    "image-detection-graph",
+    "gpu-offloading-graph",
+    "resilience-critical-graph",
+]
+DEMO_NAMESPACES = ["demo", "demo0", "demo2", "demo4"]
+
+
+def main() -> None:
+    delete_smo_graphs()
+    delete_demo_namespaces()
+
+
+def delete_smo_graphs() -> None:
+    result = server.shell(
+        name="Delete the graphs of the demos from the SMO",
+        commands=[
+            dedent(f"""\
+            graphs="{" ".join(DEMO_GRAPHS)}"
+            for project in {" ".join(DEMO_PROJECTS)}; do
+                graphs="$graphs $(curl -sf "{SMO_URL}/project/$project/graphs" \
+                    | python3 -c 'import json, sys
+            for graph in json.load(sys.stdin):
+                print(graph["name"])' 2> /dev/null)"
+            done
+
+            for graph in $(echo $graphs | tr " " "\\n" | sort -u); do
+                code=$(curl -s -o /dev/null -w '%{{http_code}}' \
+                    -X DELETE "{SMO_URL}/graphs/$graph")
+                echo "$graph: $code"
+            done
+            """)
+        ],
+        _shell_executable="/bin/bash",
+    )
+    python.call(
+        name="Show deleted graphs",
+        function=log_callback,
+        result=result,
+    )
+
+
+def delete_demo_namespaces() -> None:
+    """
+    Deletes the demo namespaces everywhere at once, then waits for all of them
+    to be gone, so that the next demo starts from empty namespaces.
+    """
+    namespaces = " ".join(DEMO_NAMESPACES)
+    result = server.shell(
+        name="Delete the demo namespaces from Karmada and the members",
+        commands=[
+            WAIT_UNTIL_FUNCTION
+            + dedent(f"""\
+            export KUBECONFIG="{KCONFIG}"
+            members=$(kubectl --context karmada-apiserver get clusters \
+                -o jsonpath='{{.items[*].metadata.name}}')
+
+            for context in karmada-apiserver $members; do
+                kubectl --context $context delete namespace {namespaces} \
+                    --ignore-not-found --wait=false
+            done
+
+            pids=""
+            for context in karmada-apiserver $members; do
+                wait_until 180 "demo namespaces gone from $context" \
+                    bash -c "! kubectl --context $context get namespace \
+                        {namespaces} -o name 2> /dev/null | grep -q ." &
+                pids="$pids $!"
+            done
+            failed=0
+            for pid in $pids; do
+                wait $pid || failed=1
+            done
+            exit $failed
+            """)
+        ],
+        _shell_executable="/bin/bash",
+    )
+    python.call(
+        name="Show deleted namespaces",
+        function=log_callback,
+        result=result,
+    )
+
+
+main()
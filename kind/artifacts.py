@@ -0,0 +1 @@
+_common/artifacts.py
\ No newline at end of file
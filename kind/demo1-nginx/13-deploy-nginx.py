@@ -10,6 +10,7 @@ from textwrap import dedent
 from pyinfra.operations import files, python, server
 
 from common import log_callback
+from readiness import wait_for_http
 
 MANIFEST_FILE = "nginx_manifest.yml"
 MANIFEST_YML = """\
@@ -272,9 +273,9 @@ def install_nginx_member(mid: int):
             kubectl config use-context member1
 
             kubectl -n demo port-forward svc/nginx-service 8080:80 &
-            sleep 5
-            curl http://localhost:8080 | head -5
             """)
+            + wait_for_http("nginx through port-forward", "http://localhost:8080")
+            + "curl http://localhost:8080 | head -5\n"
         ],
         _shell_executable="/bin/bash",
         _get_pty=True,
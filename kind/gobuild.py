@@ -0,0 +1 @@
+_common/gobuild.py
\ No newline at end of file
@@ -0,0 +1 @@
+_common/helmcache.py
\ No newline at end of file
@@ -0,0 +1 @@
+_common/imagebuild.py
\ No newline at end of file
@@ -0,0 +1 @@
+_common/profiler.py
\ No newline at end of file
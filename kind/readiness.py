@@ -0,0 +1 @@
+_common/readiness.py
\ No newline at end of file
@@ -7,12 +7,16 @@
 4. **Installs and configures LXD**: Installs LXD, sets up a network bridge, and ensures the LXD daemon is running.
 5. **Installs Docker**: Installs Docker if it is not already present.
 6. **Installs kubectl**: Installs the Kubernetes command-line tool if it is not already present.
-7. **Installs Karmada CLI tools**: Downloads and installs the Karmada CLI tools from a remote script.
+7. **Installs Karmada CLI tools**: Downloads and installs the Karmada CLI tools from a remote script, unless they are already installed.
+
+On a host where the offline bundle is installed (OFFLINE_BUNDLE_DIR, see
+offline-bundle/README.md), the packages come from the bundle's apt repository
+and nothing is downloaded.
 """
 
 import urllib.request
 import json
-import time
+import os
 import sys
 
 from common import (
@@ -22,7 +26,8 @@ from common import (
     print_color,
     colors,
 )
-from config import KARMADA_VERSION, LXD_BRIDGE_NAME
+from config import KARMADA_VERSION, LXD_BRIDGE_NAME, OFFLINE_BUNDLE_DIR
+from readiness import wait_until, wait_for_command, wait_or_exit, print_wait_summary
 
 
 def main():
@@ -33,8 +38,11 @@ def main():
     install_docker()
     install_kubectl()
     install_karmada_tools()
-    run_command(["snap", "install", "--classic", "helm"])
-    if step_6_verify_and_repair_network_setup():
+    if not command_exists("helm"):
+        run_command(["snap", "install", "--classic", "helm"])
+    network_ok = step_6_verify_and_repair_network_setup()
+    print_wait_summary()
+    if network_ok:
         print_color(
             colors.GREEN,
             "\n\n✅ --- Prerequisite and Network setup is complete and verified! --- ✅",
@@ -49,15 +57,20 @@ def main():
 
 def wait_for_lxd_daemon():
     """Waits for the LXD daemon to be ready by polling it."""
-    print("--> Waiting for LXD daemon to become responsive...")
-    for i in range(12):  # Wait up to 2 minutes
-        result = run_command(["lxc", "list"], check=False)
-        if result.returncode == 0:
-            print_color(colors.GREEN, "LXD daemon is ready.")
-            return
-        time.sleep(10)
-    print_color(colors.RED, "FATAL: Timed out waiting for LXD daemon.")
-    sys.exit(1)
+    wait_or_exit(
+        wait_for_command("LXD daemon", ["lxc", "list"], timeout=120),
+        "Timed out waiting for LXD daemon.",
+    )
+
+
+def apt_install(*packages):
+    """
+    Installs apt packages. The package lists are only updated when online:
+    install-bundle.py already registered (and indexed) the bundle repository.
+    """
+    if not os.path.isdir(OFFLINE_BUNDLE_DIR):
+        run_command(["apt-get", "update"])
+    run_command(["apt-get", "install", "-y", *packages])
 
 
 def install_utilities():
@@ -65,8 +78,7 @@ def install_utilities():
         print("Make is already installed. Skipping.")
         return
     print("Installing make...")
-    run_command(["apt-get", "update"])
-    run_command(["apt-get", "install", "-y", "make", "fish"])
+    apt_install("make", "fish")
 
 
 def install_microk8s():
@@ -101,17 +113,17 @@ def install_lxd_and_configure_network():
 
     print("Restarting LXD daemon to apply configuration...")
     run_command(["systemctl", "restart", "snap.lxd.daemon.service"])
-    time.sleep(10)
+    wait_for_lxd_daemon()
 
 
 def install_docker():
     print("\n--- 3. Setting up Docker ---")
-    if command_exists("docker"):
-        print("Docker is already installed. Skipping.")
+    buildx = ["docker", "buildx", "version"]
+    if command_exists("docker") and run_command(buildx, check=False).returncode == 0:
+        print("Docker and buildx are already installed. Skipping.")
         return
-    print("Installing Docker for Debian/Ubuntu...")
-    run_command(["apt-get", "update"])
-    run_command(["apt-get", "install", "-y", "docker.io"])
+    print("Installing Docker and buildx (used by image_build.py) for Debian/Ubuntu...")
+    apt_install("docker.io", "docker-buildx")
 
 
 def install_kubectl():
@@ -125,6 +137,16 @@ def install_kubectl():
 
 def install_karmada_tools():
     print(f"\n--- 5. Setting up Karmada CLI Tools (Version: {KARMADA_VERSION}) ---")
+    tools_to_install = {
+        "karmadactl": ["bash"],
+        "kubectl-karmada": ["bash", "-s", "kubectl-karmada"],
+    }
+    missing = [tool for tool in tools_to_install if not command_exists(tool)]
+    for tool in tools_to_install:
+        if tool not in missing:
+            print(f"{tool} is already installed. Skipping.")
+    if not missing:
+        return
     if not command_exists("curl"):
         print_color(colors.RED, "Error: 'curl' is required.")
         sys.exit(1)
@@ -136,23 +158,28 @@ def install_karmada_tools():
     except Exception as e:
         print_color(colors.RED, f"Failed to download installation script: {e}")
         sys.exit(1)
-    tools_to_install = {
-        "karmadactl": ["bash"],
-        "kubectl-karmada": ["bash", "-s", "kubectl-karmada"],
-    }
-    for tool, command in tools_to_install.items():
-        if command_exists(tool):
-            print(f"{tool} is already installed. Skipping.")
-        else:
-            print(f"--> Installing {tool} v{KARMADA_VERSION}...")
-            run_command(command, command_input=install_script_content, env=install_env)
+    for tool in missing:
+        print(f"--> Installing {tool} v{KARMADA_VERSION}...")
+        run_command(
+            tools_to_install[tool],
+            command_input=install_script_content,
+            env=install_env,
+        )
+
+
+def bridge_is_up():
+    """Checks whether the LXD bridge interface is administratively up."""
+    result = run_command(
+        ["ip", "-o", "link", "show", LXD_BRIDGE_NAME], check=False, capture_output=True
+    )
+    return result.returncode == 0 and "UP" in result.stdout.split(">")[0]
 
 
 def step_6_verify_and_repair_network_setup():
     print(f"\n--- 6. Verifying and Repairing Network Setup for '{LXD_BRIDGE_NAME}' ---")
     print(f"--> Forcibly bringing interface '{LXD_BRIDGE_NAME}' UP...")
     run_command(["ip", "link", "set", LXD_BRIDGE_NAME, "up"])
-    time.sleep(2)
+    wait_until(f"interface '{LXD_BRIDGE_NAME}' to come up", bridge_is_up, timeout=30)
     print(f"--> Checking and ensuring required firewall rules exist...")
     rules_to_check = {
         "FORWARD_IN": [
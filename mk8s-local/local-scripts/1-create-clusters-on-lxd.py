@@ -9,23 +9,59 @@
 5. **Sets up port forwarding**: Configures LXD to forward ports from the host to the container for API access.
 6. **Generates kubeconfig files**: Modifies the kubeconfig files to point to the correct API server addresses.
 7. **Performs health checks**: Ensures each cluster is accessible and ready by checking the API server connection.
+8. **Prints a timing summary**: Shows how long each member cluster took to provision.
+
+Steps 3 to 7 form the per-member pipeline. With `--jobs N`, up to N members are
+provisioned concurrently (output lines are prefixed with the member name), and
+the first member that fails stops the others.
+
+With `--golden-image`, step 3 is replaced by a copy-on-write clone of a golden
+container with the MicroK8s snap staged (see golden_image.py), which is built
+once and rebuilt only when KUBE_VERSION_TAG changes in config.py. Each clone
+then installs MicroK8s from the staged snap, so it gets its own cluster.
+
+With `--registry-mirror`, the members then pull their images through the
+pull-through mirrors of the host (see registry_mirror.py).
+
+Usage:
+    sudo ./1-create-clusters-on-lxd.py            # one member at a time
+    sudo ./1-create-clusters-on-lxd.py --jobs 3   # all three members at once
+    sudo ./1-create-clusters-on-lxd.py --golden-image --jobs 3
+    sudo ./1-create-clusters-on-lxd.py --golden-image --jobs 3 --registry-mirror
 """
 
+import argparse
+import functools
 import json
 import os
 import sys
-import time
 from pwd import getpwnam
 
 # Import shared configuration and helpers
-from common import run_command, check_root_privileges, print_color, colors
+from common import (
+    run_command,
+    check_root_privileges,
+    print_color,
+    colors,
+    run_in_parallel,
+    print_timing_summary,
+)
 from config import (
     MEMBER_CLUSTERS,
     LXD_PROFILE_NAME,
+    LXD_BASE_IMAGE,
     PORT_MAPPING,
     CONTAINER_API_PORT,
     CONFIG_FILES_DIR,
 )
+from readiness import wait_for_command, print_wait_summary
+from golden_image import (
+    ensure_golden_image,
+    clone_member_from_golden_image,
+    enable_microk8s_addons,
+    install_microk8s,
+)
+from registry_mirror import setup_registry_mirrors
 
 LXD_PROFILE_CONFIG = """
 config:
@@ -73,7 +109,7 @@ def provision_container(member_name):
             [
                 "lxc",
                 "launch",
-                "ubuntu:22.04",
+                LXD_BASE_IMAGE,
                 member_name,
                 "--profile",
                 "default",
@@ -90,27 +126,20 @@ def install_microk8s_in_container(member_name):
     print(f"Waiting for cloud-init to finish in {member_name}...")
     run_command(["lxc", "exec", member_name, "--", "cloud-init", "status", "--wait"])
 
-    print(f"Installing MicroK8s in {member_name}...")
-    install_cmd = 'if ! command -v microk8s &> /dev/null; then sudo snap install microk8s --classic; else echo "MicroK8s already installed."; fi'
-    run_command(["lxc", "exec", member_name, "--", "/bin/bash", "-c", install_cmd])
+    installed = run_command(
+        ["lxc", "exec", member_name, "--", "which", "microk8s"],
+        check=False,
+        capture_output=True,
+    )
+    if installed.returncode == 0:
+        print(f"MicroK8s already installed in {member_name}.")
+    else:
+        install_microk8s(member_name)
     run_command(
         ["lxc", "exec", member_name, "--", "sudo", "microk8s", "status", "--wait-ready"]
     )
 
-    print(f"Enabling addons in {member_name}...")
-    run_command(["lxc", "exec", member_name, "--", "sudo", "microk8s", "enable", "dns"])
-    run_command(
-        [
-            "lxc",
-            "exec",
-            member_name,
-            "--",
-            "sudo",
-            "microk8s",
-            "enable",
-            "hostpath-storage",
-        ]
-    )
+    enable_microk8s_addons(member_name)
 
 
 def setup_port_forward_and_kubeconfig(member_name):
@@ -162,23 +191,19 @@ def setup_port_forward_and_kubeconfig(member_name):
 def health_check_cluster(member_name, kubeconfig_path):
     """Performs a health check to ensure the cluster is accessible."""
     print(f"--> Health checking connection to {member_name} via port forward...")
-    for i in range(12):  # Try for 2 minutes
-        check_cmd = [
-            "kubectl",
-            "--kubeconfig",
-            kubeconfig_path,
-            "get",
-            "nodes",
-            "--insecure-skip-tls-verify",
-        ]
-        result = run_command(check_cmd, check=False)
-        if result.returncode == 0:
-            print_color(colors.GREEN, f"✅ Health check PASSED for {member_name}.")
-            return True
-        print_color(
-            colors.YELLOW, f"Health check attempt {i + 1}/12 failed. Retrying in 10s..."
-        )
-        time.sleep(10)
+    check_cmd = [
+        "kubectl",
+        "--kubeconfig",
+        kubeconfig_path,
+        "get",
+        "nodes",
+        "--insecure-skip-tls-verify",
+    ]
+    if wait_for_command(
+        f"{member_name} API server via port forward", check_cmd, timeout=120
+    ):
+        print_color(colors.GREEN, f"✅ Health check PASSED for {member_name}.")
+        return True
 
     print_color(
         colors.RED,
@@ -187,23 +212,76 @@ def health_check_cluster(member_name, kubeconfig_path):
     return False
 
 
+def provision_member(member_name, use_golden_image=False):
+    """Runs the full provisioning pipeline for one member cluster."""
+    if use_golden_image:
+        clone_member_from_golden_image(member_name)
+    else:
+        provision_container(member_name)
+        install_microk8s_in_container(member_name)
+    kubeconfig_path = setup_port_forward_and_kubeconfig(member_name)
+
+    if not health_check_cluster(member_name, kubeconfig_path):
+        return False
+
+    print_color(
+        colors.GREEN, f">>> Successfully processed and verified cluster: {member_name}."
+    )
+    return True
+
+
 def main():
     """Orchestrates the provisioning of all member clusters."""
+    parser = argparse.ArgumentParser(
+        description="Provisions the MicroK8s member clusters in LXD containers."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of member clusters to provision concurrently. Default: 1.",
+    )
+    parser.add_argument(
+        "--golden-image",
+        action="store_true",
+        help="Clone members from a golden container with MicroK8s staged.",
+    )
+    parser.add_argument(
+        "--registry-mirror",
+        action="store_true",
+        help="Make the members pull through the registry mirrors of the host.",
+    )
+    args = parser.parse_args()
+    if args.jobs < 1:
+        print_color(colors.RED, "FATAL: --jobs must be at least 1.")
+        sys.exit(1)
+
     check_root_privileges("1-create-clusters-on-lxd.py")
     setup_lxd_profile()
+    if args.golden_image:
+        ensure_golden_image()
 
-    print("\n--- Provisioning 3 MicroK8s clusters using LXD ---")
-    for member in MEMBER_CLUSTERS:
-        provision_container(member)
-        install_microk8s_in_container(member)
-        kubeconfig_path = setup_port_forward_and_kubeconfig(member)
+    print(
+        f"\n--- Provisioning {len(MEMBER_CLUSTERS)} MicroK8s clusters using LXD "
+        f"({args.jobs} at a time) ---"
+    )
+    pipeline = functools.partial(provision_member, use_golden_image=args.golden_image)
+    timings = run_in_parallel(pipeline, MEMBER_CLUSTERS, jobs=args.jobs)
+    print_timing_summary("Member provisioning times", timings)
+    print_wait_summary()
 
-        if not health_check_cluster(member, kubeconfig_path):
-            sys.exit(1)  # Exit if a cluster fails its health check
+    failed = [
+        member
+        for member in MEMBER_CLUSTERS
+        if member not in timings or not timings[member][0]
+    ]
+    if failed:
+        print_color(colors.RED, f"\nFATAL: Could not provision: {', '.join(failed)}.")
+        sys.exit(1)
 
-        print_color(
-            colors.GREEN, f">>> Successfully processed and verified cluster: {member}."
-        )
+    if args.registry_mirror and not setup_registry_mirrors(MEMBER_CLUSTERS):
+        print_color(colors.RED, "\nFATAL: Could not set up the registry mirrors.")
+        sys.exit(1)
 
     print_color(colors.GREEN, "\n--- All member clusters are ready! ---")
 
@@ -4,7 +4,7 @@
 
 1. **Runs pre-flight checks**: Ensures all required kubeconfigs for member clusters are present.
 2. **Prepares the host MicroK8s instance**: Enables necessary addons like DNS, storage, and registry.
-3. **Pushes required images to the local registry**: Pulls images from remote sources and pushes them to the local MicroK8s registry.
+3. **Mirrors required images to the local registry**: Copies images from remote sources to the local MicroK8s registry, concurrently, skipping images whose digests are unchanged since the last run.
 4. **Deploys Karmada control plane**: Initializes Karmada using the local registry images.
 5. **Waits for Karmada API to become available**: Ensures the Karmada control plane is fully operational.
 6. **Joins member clusters**: Registers each member cluster with the Karmada control plane, ensuring they are ready and healthy.
@@ -13,9 +13,31 @@
 import json
 import os
 import sys
-import time
-
-from common import run_command, check_root_privileges, print_color, colors
+from datetime import datetime, timezone
+
+from common import (
+    run_command,
+    check_root_privileges,
+    print_color,
+    colors,
+    run_in_parallel,
+    print_timing_summary,
+)
+from registry_client import manifest_digest
+from kube_client import karmada_client, KubeApiError
+from cluster_status import (
+    CLUSTER_API_VERSION,
+    get_cluster_statuses,
+    describe_cluster_status,
+    wait_for_clusters_ready,
+)
+from readiness import (
+    wait_until,
+    kubectl_wait,
+    wait_for_http,
+    wait_or_exit,
+    print_wait_summary,
+)
 from config import (
     MEMBER_CLUSTERS,
     KARMADA_VERSION,
@@ -26,6 +48,8 @@ from config import (
     KARMADA_IMAGES,
     K8S_IMAGES,
     CONFIG_FILES_DIR,
+    IMAGE_MIRROR_MANIFEST,
+    IMAGE_MIRROR_JOBS,
 )
 
 
@@ -33,11 +57,10 @@ def main():
     check_root_privileges("4-setup-karmada-on-mk8s.py")
     run_preflight_checks()
     step_1_prepare_host_cluster()
-    # Added because the registry can take a while to become available (seemingly)
-    time.sleep(10)
     step_2_push_images_to_local_registry()
     step_3_deploy_and_wait_for_karmada_control_plane()
     step_4_join_member_clusters()
+    print_wait_summary()
 
     print_color(
         colors.GREEN, "\n\n✅ --- Karmada setup on MicroK8s is complete! --- ✅"
@@ -68,41 +91,17 @@ def run_preflight_checks():
 
 
 def wait_for_registry():
-    print_color(
-        colors.YELLOW,
-        "\n--> Waiting for the local container registry to become available...",
-    )
-    max_wait_seconds = 180
-    start_time = time.time()
-    while time.time() - start_time < max_wait_seconds:
-        cmd = [
-            "microk8s",
-            "kubectl",
-            "get",
-            "deployment",
-            "registry",
-            "-n",
-            "container-registry",
-            "-o",
-            "json",
-        ]
-        result = run_command(cmd, check=False, capture_output=True)
-        if result.returncode == 0:
-            try:
-                deployment = json.loads(result.stdout)
-                if deployment.get("status", {}).get("availableReplicas", 0) >= 1:
-                    print_color(colors.GREEN, "✅ Local container registry is ready.")
-                    time.sleep(5)
-                    return
-            except (json.JSONDecodeError, KeyError):
-                pass
-        print("Registry not ready yet, waiting 15 seconds...")
-        time.sleep(15)
-    print_color(
-        colors.RED,
-        "FATAL: Timed out waiting for the local registry to become available.",
+    """Waits for the registry deployment, then for its HTTP API to answer."""
+    ready = kubectl_wait(
+        "local container registry deployment",
+        "deployment/registry",
+        "condition=Available",
+        namespace="container-registry",
+        kubectl=("microk8s", "kubectl"),
+    ) and wait_for_http(
+        "local container registry API", f"http://{HOST_REGISTRY}/v2/", timeout=60
     )
-    sys.exit(1)
+    wait_or_exit(ready, "Timed out waiting for the local registry to become available.")
 
 
 def step_1_prepare_host_cluster():
@@ -115,17 +114,108 @@ def step_1_prepare_host_cluster():
     print("Host MicroK8s is ready.")
 
 
+def load_mirror_manifest():
+    """Loads the record of previously mirrored images, keyed by target image."""
+    try:
+        with open(IMAGE_MIRROR_MANIFEST) as f:
+            return json.load(f).get("images", {})
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_mirror_manifest(images):
+    """Atomically writes the record of mirrored images."""
+    os.makedirs(os.path.dirname(IMAGE_MIRROR_MANIFEST), exist_ok=True)
+    tmp_path = f"{IMAGE_MIRROR_MANIFEST}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"registry": HOST_REGISTRY, "images": images}, f, indent=2)
+    os.replace(tmp_path, IMAGE_MIRROR_MANIFEST)
+
+
+def lookup_digest(image):
+    """Returns the manifest digest of an image, or None if it can't be found."""
+    try:
+        return manifest_digest(image)
+    except OSError as e:
+        print_color(colors.YELLOW, f"Could not look up digest of {image}: {e}")
+        return None
+
+
+def image_is_local(image):
+    """Checks whether the local Docker daemon already has an image."""
+    result = run_command(
+        ["docker", "image", "inspect", image], check=False, capture_output=True
+    )
+    return result.returncode == 0
+
+
+def mirror_image(source_image, target_image, previous_record):
+    """
+    Copies one image to the local registry unless the registry already holds
+    what we mirrored last time from the same source digest.
+    Returns the new manifest record for the target image.
+    """
+    source_digest = lookup_digest(source_image)
+    target_digest = lookup_digest(target_image)
+
+    if (
+        previous_record
+        and target_digest is not None
+        and target_digest == previous_record["target_digest"]
+    ):
+        if source_digest == previous_record["source_digest"]:
+            print_color(colors.GREEN, f"Unchanged, skipping: {target_image}")
+            return previous_record
+        if source_digest is None:
+            print_color(
+                colors.YELLOW,
+                f"Source unreachable, keeping mirrored copy: {target_image}",
+            )
+            return previous_record
+
+    if source_digest is None and image_is_local(source_image):
+        # Air-gapped host: the image was loaded from the offline bundle.
+        print_color(
+            colors.YELLOW, f"Source unreachable, using local image: {source_image}"
+        )
+    else:
+        run_command(["docker", "pull", source_image])
+    run_command(["docker", "tag", source_image, target_image])
+    run_command(["docker", "push", target_image])
+    return {
+        "source": source_image,
+        "source_digest": source_digest,
+        "target_digest": lookup_digest(target_image),
+        "mirrored_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
 def step_2_push_images_to_local_registry():
     print(
-        f"\n--- 2. Pushing all required images to the local registry ({HOST_REGISTRY}) ---"
+        f"\n--- 2. Mirroring all required images to the local registry ({HOST_REGISTRY}) ---"
     )
     all_images = {**KARMADA_IMAGES, **K8S_IMAGES}
-    for name, source_image in all_images.items():
-        target_image = f"{HOST_REGISTRY}/{name}:{source_image.split(':')[-1]}"
-        run_command(["docker", "pull", source_image])
-        run_command(["docker", "tag", source_image, target_image])
-        run_command(["docker", "push", target_image])
-    print("All required images pushed to the local registry.")
+    targets = {
+        name: f"{HOST_REGISTRY}/{name}:{source_image.split(':')[-1]}"
+        for name, source_image in all_images.items()
+    }
+    previous = load_mirror_manifest()
+    mirrored = dict(previous)
+
+    def mirror(name):
+        target_image = targets[name]
+        mirrored[target_image] = mirror_image(
+            all_images[name], target_image, previous.get(target_image)
+        )
+
+    timings = run_in_parallel(mirror, list(all_images), jobs=IMAGE_MIRROR_JOBS)
+    save_mirror_manifest(mirrored)
+    print_timing_summary("Image mirroring times", timings)
+
+    if not all(succeeded for succeeded, _ in timings.values()):
+        print_color(colors.RED, "FATAL: Could not mirror all required images.")
+        sys.exit(1)
+    print(f"All required images are in the local registry ({IMAGE_MIRROR_MANIFEST}).")
 
 
 def step_3_deploy_and_wait_for_karmada_control_plane():
@@ -154,28 +244,17 @@ def step_3_deploy_and_wait_for_karmada_control_plane():
     run_command(init_command)
     print("Karmada control plane initialization successful.")
 
-    print("\nWaiting for the Karmada control plane API to become fully available...")
-    max_wait_seconds = 180
-    start_time = time.time()
-    api_ready = False
-    while time.time() - start_time < max_wait_seconds:
-        check_api_cmd = ["kubectl", "api-resources", "--api-group=cluster.karmada.io"]
-        result = run_command(
-            check_api_cmd,
-            check=False,
-            env={"KUBECONFIG": KARMADA_KUBECONFIG},
-            capture_output=True,
-        )
-        if result.returncode == 0 and "clusters" in result.stdout:
-            print_color(colors.GREEN, "Karmada 'clusters' API is now available!")
-            api_ready = True
-            break
-        time.sleep(10)
-    if not api_ready:
-        print_color(
-            colors.RED, "FATAL: Timed out waiting for Karmada APIs to become available."
-        )
-        sys.exit(1)
+    def clusters_api_available():
+        try:
+            resources = karmada_client().api_resources(CLUSTER_API_VERSION)
+        except (KubeApiError, OSError):
+            return False
+        return "Cluster" in resources
+
+    wait_or_exit(
+        wait_until("Karmada 'clusters' API", clusters_api_available),
+        "Timed out waiting for Karmada APIs to become available.",
+    )
 
 
 def step_4_join_member_clusters():
@@ -185,9 +264,18 @@ def step_4_join_member_clusters():
     """
     print("\n--- 4. Joining member clusters to the control plane ---")
 
-    # First, join any clusters that are not already present and ready.
+    # First, join any clusters that are not already present and ready,
+    # from a single snapshot of all registered clusters.
+    statuses = get_cluster_statuses() or {}
     for member in MEMBER_CLUSTERS:
-        if not is_cluster_registered_and_ready(member):
+        status = describe_cluster_status(statuses, member)
+        if status == "Ready":
+            print_color(
+                colors.GREEN, f"Cluster '{member}' is already registered and Ready."
+            )
+            continue
+        print(f"Cluster '{member}' is {status}.")
+        if member not in statuses:
             join_cluster(member)
 
     wait_for_all_clusters_ready()
@@ -195,41 +283,6 @@ def step_4_join_member_clusters():
     print("All member clusters have been joined and verified.")
 
 
-def is_cluster_registered_and_ready(member_name):
-    """
-    Checks if a cluster is registered with Karmada and in a Ready state.
-    Returns True if ready, False otherwise.
-    """
-
-    print(f"--> Checking status of cluster '{member_name}'...")
-    check_cmd = ["karmadactl", "get", "cluster", member_name, "-o", "json"]
-    result = run_command(
-        check_cmd,
-        check=False,
-        env={"KUBECONFIG": KARMADA_KUBECONFIG},
-        capture_output=True,
-    )
-
-    if result.returncode != 0:
-        print(f"Cluster '{member_name}' is not registered.")
-        return False
-
-    try:
-        cluster_info = json.loads(result.stdout)
-        for condition in cluster_info.get("status", {}).get("conditions", []):
-            if condition.get("type") == "Ready" and condition.get("status") == "True":
-                print_color(
-                    colors.GREEN,
-                    f"Cluster '{member_name}' is already registered and Ready.",
-                )
-                return True
-    except (json.JSONDecodeError, KeyError):
-        pass  # If JSON is invalid, it's not ready
-
-    print_color(colors.YELLOW, f"Cluster '{member_name}' exists but is not yet Ready.")
-    return False
-
-
 def join_cluster(member_name):
     """
     Joins a single member cluster to the Karmada control plane using Push mode.
@@ -254,26 +307,8 @@ def wait_for_all_clusters_ready(timeout_seconds=60):
     Waits for all member clusters to report a Ready status.
     Exits with an error if the timeout is reached.
     """
-    print_color(
-        colors.YELLOW,
-        f"\n--> Waiting up to {timeout_seconds} seconds for all clusters to become Ready...",
-    )
-    start_time = time.time()
-    while time.time() - start_time < timeout_seconds:
-        ready_clusters = [
-            member
-            for member in MEMBER_CLUSTERS
-            if is_cluster_registered_and_ready(member)
-        ]
-
-        if len(ready_clusters) == len(MEMBER_CLUSTERS):
-            print_color(colors.GREEN, "\n✅ All member clusters are now Ready.")
-            return
-
-        print(
-            f"Waiting... ({len(ready_clusters)}/{len(MEMBER_CLUSTERS)} clusters ready). Retrying in 10 seconds."
-        )
-        time.sleep(10)
+    if wait_for_clusters_ready(MEMBER_CLUSTERS, timeout=timeout_seconds):
+        return
 
     print_color(
         colors.RED, "\nFATAL: Timed out waiting for all clusters to become Ready."
@@ -10,19 +10,18 @@
 6. **Cleans up test resources**: Deletes the test deployment and policies after verification.
 """
 
-import json
 import os
 import sys
-import tempfile
-import time
 
-from common import run_command, check_root_privileges, print_color, colors
+from common import check_root_privileges, print_color, colors
+from kube_client import karmada_client, host_client, member_client, KubeApiError
+from readiness import wait_for_object, print_wait_summary
+from cluster_status import get_cluster_statuses, describe_cluster_status
 from config import (
     MEMBER_CLUSTERS,
     KARMADA_NAMESPACE,
     KARMADA_KUBECONFIG,
     CONFIG_FILES_DIR,
-    HOST_KUBECONFIG,
 )
 
 # Define which clusters to test deployment on
@@ -58,23 +57,20 @@ def check_control_plane_health():
         colors.YELLOW, "\n--- Level 1: Checking Karmada Control Plane Health ---"
     )
 
-    env = {"KUBECONFIG": HOST_KUBECONFIG}
-
-    result = run_command(
-        ["kubectl", "get", "pods", "-n", KARMADA_NAMESPACE, "-o", "json"],
-        capture_output=True,
-        env=env,
-    )
+    try:
+        pods = host_client().list("v1", "Pod", namespace=KARMADA_NAMESPACE)
+    except (KubeApiError, OSError) as e:
+        print_color(colors.RED, f"❌ FAILED: Cannot list the control plane pods: {e}")
+        return False
 
     all_pods_ready = True
-    pods_data = json.loads(result.stdout)
-    if not pods_data.get("items"):
+    if not pods:
         print_color(
             colors.RED, f"❌ FAILED: No pods found in namespace '{KARMADA_NAMESPACE}'."
         )
         return False
 
-    for pod in pods_data["items"]:
+    for pod in pods:
         pod_name, pod_status = pod["metadata"]["name"], pod["status"]["phase"]
         if pod_status != "Running" or not all(
             cs["ready"] for cs in pod["status"].get("containerStatuses", [])
@@ -95,33 +91,19 @@ def check_control_plane_health():
 
 def check_member_cluster_status():
     print_color(colors.YELLOW, "\n--- Level 2: Checking Member Cluster Status ---")
-    env = {"KUBECONFIG": KARMADA_KUBECONFIG}
-    result = run_command(
-        ["kubectl", "get", "clusters", "-o", "json"], capture_output=True, env=env
-    )
+    statuses = get_cluster_statuses()
+    if statuses is None:
+        print_color(
+            colors.RED, "  - Could not list the clusters registered with Karmada."
+        )
+        return False
     all_clusters_ready = True
-    clusters_data = json.loads(result.stdout)
-    found_clusters = {
-        item["metadata"]["name"] for item in clusters_data.get("items", [])
-    }
     for member_name in MEMBER_CLUSTERS:
-        if member_name not in found_clusters:
-            print_color(colors.RED, f"  - Cluster '{member_name}' is not registered.")
-            all_clusters_ready = False
-            continue
-        cluster_item = next(
-            item
-            for item in clusters_data["items"]
-            if item["metadata"]["name"] == member_name
-        )
-        is_ready = any(
-            c.get("type") == "Ready" and c.get("status") == "True"
-            for c in cluster_item.get("status", {}).get("conditions", [])
-        )
-        if is_ready:
+        status = describe_cluster_status(statuses, member_name)
+        if status == "Ready":
             print_color(colors.GREEN, f"  - Cluster '{member_name}' is Ready.")
         else:
-            print_color(colors.RED, f"  - Cluster '{member_name}' is not Ready.")
+            print_color(colors.RED, f"  - Cluster '{member_name}' is {status}.")
             all_clusters_ready = False
     if all_clusters_ready:
         print_color(
@@ -134,81 +116,59 @@ def check_e2e_deployment():
     print_color(
         colors.YELLOW, "\n--- Level 3: Performing End-to-End Functionality Test ---"
     )
-    karmada_env = {"KUBECONFIG": KARMADA_KUBECONFIG}
-    deployment_yaml = """
-apiVersion: apps/v1
-kind: Deployment
-metadata:
-  name: karmada-test-nginx
-spec:
-  replicas: 2
-  selector:
-    matchLabels:
-      app: nginx
-  template:
-    metadata:
-      labels:
-        app: nginx
-    spec:
-      containers:
-      - name: nginx
-        image: nginx:1.21.6
-"""
-    policy_yaml = f"""
-apiVersion: policy.karmada.io/v1alpha1
-kind: PropagationPolicy
-metadata:
-  name: nginx-propagation
-spec:
-  resourceSelectors:
-    - apiVersion: apps/v1
-      kind: Deployment
-      name: karmada-test-nginx
-  placement:
-    clusterAffinity:
-      clusterNames: {MEMBER_CLUSTERS_TO_DEPLOY}
-"""
-    dep_filename, pol_filename = "", ""
+    karmada = karmada_client()
+    deployment = {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": "karmada-test-nginx", "namespace": "default"},
+        "spec": {
+            "replicas": 2,
+            "selector": {"matchLabels": {"app": "nginx"}},
+            "template": {
+                "metadata": {"labels": {"app": "nginx"}},
+                "spec": {"containers": [{"name": "nginx", "image": "nginx:1.21.6"}]},
+            },
+        },
+    }
+    policy = {
+        "apiVersion": "policy.karmada.io/v1alpha1",
+        "kind": "PropagationPolicy",
+        "metadata": {"name": "nginx-propagation", "namespace": "default"},
+        "spec": {
+            "resourceSelectors": [
+                {
+                    "apiVersion": "apps/v1",
+                    "kind": "Deployment",
+                    "name": "karmada-test-nginx",
+                }
+            ],
+            "placement": {
+                "clusterAffinity": {"clusterNames": MEMBER_CLUSTERS_TO_DEPLOY}
+            },
+        },
+    }
     try:
-        with (
-            tempfile.NamedTemporaryFile(
-                mode="w", delete=False, suffix=".yaml"
-            ) as dep_file,
-            tempfile.NamedTemporaryFile(
-                mode="w", delete=False, suffix=".yaml"
-            ) as pol_file,
-        ):
-            dep_file.write(deployment_yaml)
-            dep_filename = dep_file.name
-            pol_file.write(policy_yaml)
-            pol_filename = pol_file.name
-
         print("--> Deploying test Nginx application and policy...")
-        run_command(["kubectl", "apply", "-f", dep_filename], env=karmada_env)
-        run_command(["kubectl", "apply", "-f", pol_filename], env=karmada_env)
-        print("--> Waiting up to 90 seconds for resources to propagate...")
-        time.sleep(90)
+        karmada.apply(deployment)
+        karmada.apply(policy)
+        for member in MEMBER_CLUSTERS_TO_DEPLOY:
+            wait_for_object(
+                f"test deployment to propagate to '{member}'",
+                member_client(member),
+                "apps/v1",
+                "Deployment",
+                "karmada-test-nginx",
+                lambda d: d.get("status", {}).get("readyReplicas") == 2,
+                namespace="default",
+                timeout=90,
+            )
         overall_success = True
 
         for member in MEMBER_CLUSTERS_TO_DEPLOY:
             print(f"--> Verifying deployment on '{member}'...")
-            kubeconfig_path = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
-            pods = json.loads(
-                run_command(
-                    [
-                        "kubectl",
-                        "--kubeconfig",
-                        kubeconfig_path,
-                        "get",
-                        "pods",
-                        "-l",
-                        "app=nginx",
-                        "-o",
-                        "json",
-                    ],
-                    capture_output=True,
-                ).stdout
-            ).get("items", [])
+            pods = member_client(member).list(
+                "v1", "Pod", namespace="default", label_selector="app=nginx"
+            )
             running_pods = [p for p in pods if p["status"]["phase"] == "Running"]
             if len(running_pods) == 2:
                 print_color(
@@ -222,25 +182,9 @@ spec:
                 overall_success = False
 
         print(f"--> Verifying deployment is absent from '{MEMBER_CLUSTER_TO_AVOID}'...")
-        kubeconfig_path = os.path.join(
-            CONFIG_FILES_DIR, f"{MEMBER_CLUSTER_TO_AVOID}.config"
+        pods = member_client(MEMBER_CLUSTER_TO_AVOID).list(
+            "v1", "Pod", namespace="default", label_selector="app=nginx"
         )
-        pods = json.loads(
-            run_command(
-                [
-                    "kubectl",
-                    "--kubeconfig",
-                    kubeconfig_path,
-                    "get",
-                    "pods",
-                    "-l",
-                    "app=nginx",
-                    "-o",
-                    "json",
-                ],
-                capture_output=True,
-            ).stdout
-        ).get("items", [])
         if len(pods) == 0:
             print_color(
                 colors.GREEN,
@@ -256,16 +200,21 @@ spec:
         if overall_success:
             print_color(colors.GREEN, "\n✅ SUCCESS: End-to-end test passed.")
         return overall_success
+    except (KubeApiError, OSError) as e:
+        print_color(colors.RED, f"❌ FAILED: Kubernetes API error: {e}")
+        return False
     finally:
         print_color(colors.YELLOW, "\n--- Cleaning up test resources ---")
-        if dep_filename:
-            run_command(
-                ["kubectl", "delete", "-f", dep_filename], env=karmada_env, check=False
-            )
-        if pol_filename:
-            run_command(
-                ["kubectl", "delete", "-f", pol_filename], env=karmada_env, check=False
-            )
+        for resource in (deployment, policy):
+            try:
+                karmada.delete(
+                    resource["apiVersion"],
+                    resource["kind"],
+                    resource["metadata"]["name"],
+                    namespace="default",
+                )
+            except (KubeApiError, OSError) as e:
+                print_color(colors.YELLOW, f"  - Cleanup failed: {e}")
 
 
 def main():
@@ -282,6 +231,7 @@ def main():
             colors.RED, "\nSkipping Level 3 Test due to failures in preliminary checks."
         )
 
+    print_wait_summary()
     print("\n\n" + "=" * 20 + " FINAL SUMMARY " + "=" * 20)
     if all(results.values()):
         print_color(
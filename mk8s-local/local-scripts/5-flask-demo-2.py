@@ -4,18 +4,18 @@
 A simpler, more robust custom Flask demo.
 
 Here's what this script does:
-1. Builds a custom Flask application Docker image locally.
-2. Saves the image to a .tar file.
-3. Pushes the .tar file into each LXD container.
-4. Imports the image directly into each member cluster's image cache.
-5. Deploys the application, which now finds the image locally.
-6. Verifies the deployment and performs HTTP checks.
-7. Cleans up all resources, including the temporary .tar file and all cached images.
+1. Builds a custom Flask application Docker image locally, with BuildKit and
+   only if its sources changed (see image_build.py).
+2. Streams the image into each member cluster's image cache, to all members at
+   once and without a tarball on disk, skipping the members that already have
+   it (see image_fanout.py).
+3. Deploys the application, which now finds the image locally.
+4. Verifies the deployment and performs HTTP checks.
+5. Cleans up all resources, including all cached images.
 """
 
 import os
 import sys
-import time
 import json
 import tempfile
 import http.client
@@ -27,6 +27,9 @@ from config import (
     KARMADA_KUBECONFIG,
     CONFIG_FILES_DIR,
 )
+from readiness import wait_until, wait_for_command, wait_for_http, print_wait_summary
+from image_fanout import distribute_image
+from image_build import build_image
 
 # --- Configuration ---
 APP_HOST_PORT_MAPPING = {
@@ -50,11 +53,9 @@ def create_temp_file(content):
         return tmp_file.name
 
 
-def build_and_save_image_locally():
-    """Builds the Docker image and saves it to a temporary tar file."""
-    print_color(
-        colors.YELLOW, f"\n--- 1. Building and Saving Image: {CUSTOM_IMAGE_NAME} ---"
-    )
+def build_image_locally():
+    """Builds the Docker image, unless it is up to date."""
+    print_color(colors.YELLOW, f"\n--- 1. Building Image: {CUSTOM_IMAGE_NAME} ---")
     if not os.path.isdir(APP_BUILD_CONTEXT):
         print_color(
             colors.RED,
@@ -63,34 +64,18 @@ def build_and_save_image_locally():
         sys.exit(1)
 
     print(f"--> Building image with tag: {CUSTOM_IMAGE_NAME}")
-    run_command(["docker", "build", "-t", CUSTOM_IMAGE_NAME, APP_BUILD_CONTEXT])
-
-    temp_tar_file = tempfile.NamedTemporaryFile(delete=False, suffix=".tar")
-    temp_tar_path = temp_tar_file.name
-    temp_tar_file.close()
-
-    print(f"--> Saving image to tarball: {temp_tar_path}")
-    run_command(["docker", "save", "-o", temp_tar_path, CUSTOM_IMAGE_NAME])
-
-    print_color(colors.GREEN, "✅ Image built and saved successfully.")
-    return temp_tar_path
+    if not build_image(CUSTOM_IMAGE_NAME, APP_BUILD_CONTEXT):
+        print_color(colors.RED, "FATAL: The image could not be built.")
+        sys.exit(1)
+    print_color(colors.GREEN, "✅ Image built successfully.")
 
 
-def distribute_and_import_image(image_tar_path):
-    """Pushes the image tarball to each member cluster and imports it."""
+def distribute_and_import_image():
+    """Imports the image into the image cache of every member cluster."""
     print_color(colors.YELLOW, "\n--- 2. Distributing Image to Member Clusters ---")
-    remote_path = f"/root/{os.path.basename(image_tar_path)}"
-
-    for member in MEMBER_CLUSTERS:
-        print(f"--> Processing cluster: {member}")
-        print(f"    - Pushing '{image_tar_path}' to '{member}:{remote_path}'...")
-        run_command(["lxc", "file", "push", image_tar_path, f"{member}{remote_path}"])
-
-        print(f"    - Importing image from '{remote_path}' into the cluster's cache...")
-        run_command(
-            ["lxc", "exec", member, "--", "microk8s", "images", "import", remote_path]
-        )
-
+    if not distribute_image(CUSTOM_IMAGE_NAME, MEMBER_CLUSTERS):
+        print_color(colors.RED, "FATAL: The image could not be distributed.")
+        sys.exit(1)
     print_color(colors.GREEN, "✅ Image distributed to all member clusters.")
 
 
@@ -177,8 +162,8 @@ spec:
 def verify_pod_readiness():
     """Waits for and verifies that all pods are running in all member clusters."""
     print_color(colors.YELLOW, "\n--- 4. Verifying pod readiness ---")
-    print("--> Waiting up to 120 seconds for pods to be running...")
-    for i in range(12):
+
+    def count_ready_clusters():
         ready_count = 0
         for member in MEMBER_CLUSTERS:
             kubeconfig = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
@@ -201,13 +186,12 @@ def verify_pod_readiness():
                 ]
                 if len(running) == 1:
                     ready_count += 1
-        if ready_count == len(MEMBER_CLUSTERS):
-            print_color(colors.GREEN, "✅ SUCCESS: All pods are running.")
-            return True
-        print(
-            f"Pods not ready yet ({ready_count}/{len(MEMBER_CLUSTERS)}). Retrying in 10s..."
-        )
-        time.sleep(10)
+        print(f"Ready clusters: {ready_count}/{len(MEMBER_CLUSTERS)}")
+        return ready_count == len(MEMBER_CLUSTERS)
+
+    if wait_until("pods to be running on all members", count_ready_clusters, 120):
+        print_color(colors.GREEN, "✅ SUCCESS: All pods are running.")
+        return True
     print_color(colors.RED, "❌ FAILED: Timed out waiting for pods to become ready.")
     return False
 
@@ -228,12 +212,10 @@ def expose_services_and_get_nodeport():
         "-o",
         "json",
     ]
-    for _ in range(6):
-        result = run_command(cmd, capture_output=True, check=False)
-        if result.returncode == 0:
-            break
-        time.sleep(10)
-    else:
+    result = wait_for_command(
+        f"service {APP_NAME}-service on {MEMBER_CLUSTERS[0]}", cmd, timeout=60
+    )
+    if not result:
         print_color(colors.RED, "❌ FAILED: Could not find the service.")
         return None
     node_port = json.loads(result.stdout)["spec"]["ports"][0]["nodePort"]
@@ -263,7 +245,10 @@ def verify_http_access():
     """Verifies that each Nginx endpoint is accessible and returns HTTP 200."""
     print_color(colors.YELLOW, "\n--- 6. Verifying HTTP access to all instances ---")
     all_ok = True
-    time.sleep(5)
+    for member, host_port in APP_HOST_PORT_MAPPING.items():
+        wait_for_http(
+            f"proxy on {member}", f"http://127.0.0.1:{host_port}/", timeout=30
+        )
     for member, host_port in APP_HOST_PORT_MAPPING.items():
         print(f"--> Checking connection to {member} (http://127.0.0.1:{host_port})...")
         try:
@@ -289,7 +274,7 @@ def verify_http_access():
     return all_ok
 
 
-def cleanup_demo_resources(created_files, image_tar_path):
+def cleanup_demo_resources(created_files):
     """Cleans up all resources created by the demo script."""
     print_color(colors.YELLOW, "\n--- 7. Cleaning up all demo resources ---")
     karmada_env = {"KUBECONFIG": KARMADA_KUBECONFIG}
@@ -322,10 +307,6 @@ def cleanup_demo_resources(created_files, image_tar_path):
             ],
             check=False,
         )
-    # Remove local tar file
-    if image_tar_path and os.path.exists(image_tar_path):
-        print(f"--> Removing temporary image tarball: {image_tar_path}")
-        os.remove(image_tar_path)
     # Remove image from host Docker cache
     print(f"--> Removing image from local Docker cache: {CUSTOM_IMAGE_NAME}")
     run_command(["docker", "image", "rm", CUSTOM_IMAGE_NAME], check=False)
@@ -335,13 +316,12 @@ def cleanup_demo_resources(created_files, image_tar_path):
 def main():
     """Orchestrates the entire simplified custom demo workflow."""
     check_root_privileges("7-custom-flask-demo-simple.py")
-    image_tar_path = None
     created_files = []
     all_tests_passed = False
 
     try:
-        image_tar_path = build_and_save_image_locally()
-        distribute_and_import_image(image_tar_path)
+        build_image_locally()
+        distribute_and_import_image()
 
         karmada_env = {"KUBECONFIG": KARMADA_KUBECONFIG}
         created_files = deploy_resources(karmada_env)
@@ -352,6 +332,7 @@ def main():
             sys.exit(1)
         if not verify_http_access():
             sys.exit(1)
+        print_wait_summary()
 
         print_color(
             colors.GREEN,
@@ -364,7 +345,7 @@ def main():
             print_color(
                 colors.RED, "\nOne or more steps failed. Proceeding with cleanup..."
             )
-        # cleanup_demo_resources(created_files, image_tar_path)
+        # cleanup_demo_resources(created_files)
 
 
 if __name__ == "__main__":
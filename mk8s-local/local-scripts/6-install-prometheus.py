@@ -3,47 +3,54 @@
 """
 This script installs a Prometheus instance into each member cluster using Helm.
 
+The chart comes from the local chart cache and is installed from manifests
+rendered once per member and values (see helm_cache.py), so repeated installs
+do not depend on the Helm repository.
+
 It uses a robust method of exposing the service by creating an LXD proxy
 that connects directly to the Pod's internal IP and the correct container port (9090).
 """
 
 import os
 import sys
-import time
 import json
-import tempfile
 import http.client
+from textwrap import dedent
 
 # Import shared configuration and helpers
 from common import run_command, check_root_privileges, print_color, colors
 from config import MEMBER_CLUSTERS, HOST_KUBECONFIG, CONFIG_FILES_DIR
+from readiness import wait_until, wait_for_http, print_wait_summary
+from helm_cache import chart_archive, apply_chart, delete_chart
 
 # --- Configuration ---
-PROMETHEUS_HELM_REPO_URL = "https://prometheus-community.github.io/helm-charts"
-PROMETHEUS_HELM_REPO_NAME = "prometheus-community"
-HELM_CHART_NAME = f"{PROMETHEUS_HELM_REPO_NAME}/prometheus"
+HELM_CHART_ID = "prometheus"
 NAMESPACE = "monitoring"
+PROMETHEUS_VALUES = dedent("""\
+    alertmanager:
+      enabled: false
+    pushgateway:
+      enabled: false
+    server:
+      persistentVolume:
+        enabled: false
+    """)
 PROMETHEUS_HOST_PORTS = {"member1": 9091, "member2": 9092, "member3": 9093}
 # --- The correct default port for the Prometheus server ---
 PROMETHEUS_CONTAINER_PORT = 9090
 
 
-def create_temp_file(content):
-    with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".yaml") as f:
-        f.write(content)
-        return f.name
-
-
-def setup_helm_repository():
-    print_color(colors.YELLOW, "\n--- 1. Setting up Helm Repository ---")
-    run_command(
-        ["helm", "repo", "add", PROMETHEUS_HELM_REPO_NAME, PROMETHEUS_HELM_REPO_URL]
-    )
-    run_command(["helm", "repo", "update"])
-    print_color(colors.GREEN, "✅ Helm repository is ready.")
+def setup_helm_chart():
+    print_color(colors.YELLOW, "\n--- 1. Setting up the Prometheus Helm chart ---")
+    archive = chart_archive(HELM_CHART_ID)
+    if archive is None:
+        print_color(colors.RED, "❌ FAILED: Could not get the Prometheus chart.")
+        return False
+    print_color(colors.GREEN, f"✅ Helm chart is ready: {archive}")
+    return True
 
 
-def install_prometheus_on_members(temp_files_list):
+def install_prometheus_on_members():
     print_color(
         colors.YELLOW, f"\n--- 2. Installing Prometheus on all Member Clusters ---"
     )
@@ -51,51 +58,24 @@ def install_prometheus_on_members(temp_files_list):
         print_color(colors.BLUE, f"\n--> Processing cluster: {member}")
         member_kubeconfig = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
         helm_release_name = f"prometheus-{member}"
-        run_command(
-            [
-                "kubectl",
-                "--kubeconfig",
-                member_kubeconfig,
-                "create",
-                "namespace",
-                NAMESPACE,
-            ],
-            check=False,
-        )
-        values_yaml = f"""
-        alertmanager:
-          enabled: false
-        pushgateway:
-          enabled: false
-        server:
-          persistentVolume:
-            enabled: false
-        """
-        values_file_path = create_temp_file(values_yaml)
-        temp_files_list.append(values_file_path)
-        helm_install_cmd = [
-            "helm",
-            "upgrade",
-            "--install",
+        if not apply_chart(
             helm_release_name,
-            HELM_CHART_NAME,
-            "--kubeconfig",
-            member_kubeconfig,
-            "--namespace",
+            HELM_CHART_ID,
             NAMESPACE,
-            "-f",
-            values_file_path,
-        ]
-        run_command(helm_install_cmd)
+            PROMETHEUS_VALUES,
+            member_kubeconfig,
+        ):
+            return False
+    return True
 
 
 def verify_and_expose_installations():
     print_color(
         colors.YELLOW, "\n--- 3. Verifying and Exposing Prometheus Installations ---"
     )
-    print("--> Waiting up to 180 seconds for all Prometheus pods to become ready...")
     ready_pods_info = {}
-    for i in range(18):
+
+    def find_ready_pods():
         for member in MEMBER_CLUSTERS:
             if member in ready_pods_info:
                 continue
@@ -132,13 +112,10 @@ def verify_and_expose_installations():
                     print_color(
                         colors.GREEN, f"✅ Prometheus pod for {member} is Ready."
                     )
-        if len(ready_pods_info) == len(MEMBER_CLUSTERS):
-            break
-        print(
-            f"Waiting for pods... ({len(ready_pods_info)}/{len(MEMBER_CLUSTERS)} ready). Retrying in 10s..."
-        )
-        time.sleep(10)
-    else:
+        print(f"({len(ready_pods_info)}/{len(MEMBER_CLUSTERS)} ready)")
+        return len(ready_pods_info) == len(MEMBER_CLUSTERS)
+
+    if not wait_until("all Prometheus pods to become ready", find_ready_pods):
         print_color(colors.RED, "❌ FAILED: Timed out waiting for pods.")
         return False
 
@@ -173,7 +150,10 @@ def verify_and_expose_installations():
 
     print("\n--> Verifying HTTP access to each Prometheus instance...")
     all_accessible = True
-    time.sleep(5)
+    for member, host_port in PROMETHEUS_HOST_PORTS.items():
+        wait_for_http(
+            f"proxy on {member}", f"http://localhost:{host_port}/query", timeout=30
+        )
     for member, host_port in PROMETHEUS_HOST_PORTS.items():
         print(f"--> Checking connection to {member} (http://localhost:{host_port})...")
         try:
@@ -195,23 +175,18 @@ def verify_and_expose_installations():
     return all_accessible
 
 
-def cleanup(temp_files_list):
+def cleanup():
     print_color(colors.YELLOW, "\n--- Cleaning up Prometheus resources ---")
     for member in MEMBER_CLUSTERS:
         print(f"--> Cleaning up {member}...")
         member_kubeconfig = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
         helm_release_name = f"prometheus-{member}"
-        run_command(
-            [
-                "helm",
-                "uninstall",
-                helm_release_name,
-                "--kubeconfig",
-                member_kubeconfig,
-                "-n",
-                NAMESPACE,
-            ],
-            check=False,
+        delete_chart(
+            helm_release_name,
+            HELM_CHART_ID,
+            NAMESPACE,
+            PROMETHEUS_VALUES,
+            member_kubeconfig,
         )
         run_command(
             [
@@ -228,21 +203,18 @@ def cleanup(temp_files_list):
             ["lxc", "config", "device", "remove", member, f"proxy-prometheus-{member}"],
             check=False,
         )
-    for f in temp_files_list:
-        if os.path.exists(f):
-            os.remove(f)
     print_color(colors.GREEN, "✅ Prometheus cleanup complete.")
 
 
 def main():
     check_root_privileges("8-install-prometheus.py")
-    temp_files = []
     all_ok = False
     try:
-        setup_helm_repository()
-        install_prometheus_on_members(temp_files)
+        if not setup_helm_chart() or not install_prometheus_on_members():
+            sys.exit(1)
         if not verify_and_expose_installations():
             sys.exit(1)
+        print_wait_summary()
         print_color(
             colors.GREEN,
             "\n\n✅ --- Prometheus installed and verified successfully on all member clusters! --- ✅",
@@ -257,7 +229,7 @@ def main():
         pass
         # if not all_ok: print_color(colors.RED, "\nOne or more steps failed. Proceeding with cleanup...")
         # if all_ok: input("\nPress Enter to continue and clean up all Prometheus resources...")
-        # cleanup(temp_files)
+        # cleanup()
 
 
 if __name__ == "__main__":
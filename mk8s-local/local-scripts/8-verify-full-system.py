@@ -10,14 +10,15 @@ non-zero status code if any check fails.
 """
 
 import sys
-import os.path
 
 from common import run_command, print_color, colors
-from config import (
-    MEMBER_CLUSTERS,
-    KARMADA_KUBECONFIG,
-    CONFIG_FILES_DIR,
+from kube_client import karmada_client, member_client, KubeApiError
+from cluster_status import (
+    CLUSTER_API_VERSION,
+    get_cluster_statuses,
+    describe_cluster_status,
 )
+from config import MEMBER_CLUSTERS
 
 # --- Global State ---
 ALL_OK = True
@@ -70,6 +71,28 @@ def check(description, command, expected_output=None, expected_rc=0):
         return False
 
 
+def karmada_api_resources():
+    """Returns the Cluster API resources served by Karmada, or {} if unreachable."""
+    try:
+        return karmada_client().api_resources(CLUSTER_API_VERSION)
+    except (KubeApiError, OSError):
+        return {}
+
+
+def check_value(description, actual, expected):
+    """Reports a pass/fail message for a value that is already known."""
+    global ALL_OK
+    print_color(colors.GRAY, f"  > Checking: {description}")
+    if actual == expected:
+        print_color(colors.GREEN, "  [✅ PASSED]")
+        return True
+    print_color(colors.RED, "  [❌ FAILED]")
+    print_color(colors.RED, f"    - Expected: '{expected}'")
+    print_color(colors.RED, f"    -      Got: '{actual}'")
+    ALL_OK = False
+    return False
+
+
 def main():
     """Orchestrates the entire system verification process."""
     global ALL_OK
@@ -96,25 +119,18 @@ def main():
 
     # --- Layer 2: Karmada Control Plane ---
     print_color(colors.YELLOW, "\n--- Layer 2: Verifying Karmada Control Plane ---")
-    check(
+    check_value(
         "Karmada API server is responsive",
-        ["kubectl", "--kubeconfig", KARMADA_KUBECONFIG, "api-resources"],
+        "Cluster" in karmada_api_resources(),
+        expected=True,
     )
+    # One snapshot of all registered clusters answers for every member.
+    statuses = get_cluster_statuses() or {}
     for member in MEMBER_CLUSTERS:
-        cmd = [
-            "kubectl",
-            "--kubeconfig",
-            KARMADA_KUBECONFIG,
-            "get",
-            "cluster",
-            member,
-            "-o",
-            "jsonpath={.status.conditions[?(@.type=='Ready')].status}",
-        ]
-        check(
+        check_value(
             f"Member cluster '{member}' is registered and Ready",
-            cmd,
-            expected_output="True",
+            describe_cluster_status(statuses, member),
+            expected="Ready",
         )
 
     # --- Layer 3: Member Cluster APIs & Proxies ---
@@ -139,27 +155,20 @@ def main():
     # 4a: Custom Flask App Verification
     for member, host_port in FLASK_HOST_PORTS.items():
         print_color(colors.BLUE, f"\n--> Verifying Flask Demo on '{member}'")
-        member_kubeconfig = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
-
-        svc_cmd = [
-            "kubectl",
-            "--kubeconfig",
-            member_kubeconfig,
-            "get",
-            "svc",
-            "custom-flask-demo-simple-service",
-            "-o",
-            "jsonpath={.spec.ports[0].nodePort}",
-        ]
-        node_port_res = run_command(svc_cmd, check=False, capture_output=True)
-        if node_port_res.returncode != 0:
+        try:
+            service = member_client(member).get(
+                "v1", "Service", "custom-flask-demo-simple-service", namespace="default"
+            )
+        except (KubeApiError, OSError):
+            service = None
+        if service is None:
             print_color(
                 colors.RED,
                 f"  [❌ FAILED] - Could not find NodePort for Flask service on '{member}'.",
             )
             ALL_OK = False
             continue
-        node_port = node_port_res.stdout.strip()
+        node_port = service["spec"]["ports"][0].get("nodePort")
         print_color(
             colors.GREEN, f"  [INFO] Found Flask service with NodePort: {node_port}"
         )
@@ -188,31 +197,25 @@ def main():
     # 4b: Prometheus Verification
     for member, host_port in PROMETHEUS_HOST_PORTS.items():
         print_color(colors.BLUE, f"\n--> Verifying Prometheus Demo on '{member}'")
-        member_kubeconfig = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
         helm_release_name = f"prometheus-{member}"
 
-        pod_cmd = [
-            "kubectl",
-            "--kubeconfig",
-            member_kubeconfig,
-            "get",
-            "pods",
-            "-n",
-            "monitoring",
-            "-l",
-            f"app.kubernetes.io/name=prometheus,app.kubernetes.io/instance={helm_release_name}",
-            "-o",
-            "jsonpath={.items[0].status.podIP}",
-        ]
-        pod_ip_res = run_command(pod_cmd, check=False, capture_output=True)
-        if pod_ip_res.returncode != 0:
+        try:
+            pods = member_client(member).list(
+                "v1",
+                "Pod",
+                namespace="monitoring",
+                label_selector=f"app.kubernetes.io/name=prometheus,app.kubernetes.io/instance={helm_release_name}",
+            )
+        except (KubeApiError, OSError):
+            pods = []
+        if not pods:
             print_color(
                 colors.RED,
                 f"  [❌ FAILED] - Could not find running Prometheus pod on '{member}'.",
             )
             ALL_OK = False
             continue
-        pod_ip = pod_ip_res.stdout.strip()
+        pod_ip = pods[0]["status"].get("podIP")
         print_color(colors.GREEN, f"  [INFO] Found Prometheus pod with IP: {pod_ip}")
 
         proxy_cmd = [
@@ -8,8 +8,9 @@
 4. **Finds and deletes all Karmada CRDs**: Cleans up any remaining Custom Resource Definitions related to Karmada.
 5. **Destroys member clusters**: Stops and deletes all member clusters defined in the configuration.
 6. **Cleans up local kubeconfig files**: Removes any kubeconfig files related to member clusters.
-7. **Cleans up the LXD profile**: Deletes the LXD profile used for member clusters.
-8. **Disables the host MicroK8s registry**: Cleans up the local registry setup.
+7. **Deletes the golden image**: Removes the golden MicroK8s container (and its snapshot), which uses the LXD profile.
+8. **Cleans up the LXD profile**: Deletes the LXD profile used for member clusters.
+9. **Disables the host MicroK8s registry**: Cleans up the local registry setup.
 """
 
 import os
@@ -23,6 +24,7 @@ from config import (
     CONFIG_FILES_DIR,
     KARMADA_NAMESPACE,
     HOST_KUBECONFIG,
+    GOLDEN_CONTAINER_NAME,
 )
 
 
@@ -97,6 +99,10 @@ def main():
         except OSError as e:
             print_color(colors.RED, f"Error removing file {f}: {e}")
 
+    # The profile cannot be deleted while an instance still uses it.
+    print(f"\n--- Deleting golden image '{GOLDEN_CONTAINER_NAME}' ---")
+    run_command(["lxc", "delete", GOLDEN_CONTAINER_NAME, "--force"], check=False)
+
     print(f"\n--- Cleaning up LXD profile '{LXD_PROFILE_NAME}' ---")
     run_command(["lxc", "profile", "delete", LXD_PROFILE_NAME], check=False)
 
@@ -13,28 +13,45 @@ Here's what this script does:
 7.  Joins the new cluster to the existing Karmada control plane using 'karmadactl join'.
 8.  Waits and verifies that the new cluster becomes 'Ready' in the Karmada federation.
 
+With `--golden-image`, step 3 clones the golden container, which has the
+MicroK8s snap staged (see golden_image.py), instead of launching a container
+and downloading MicroK8s.
+
+With `--registry-mirror`, the new cluster pulls its images through the
+pull-through mirrors of the host (see registry_mirror.py).
+
 Usage:
-    sudo ./add-cluster.py <new-cluster-name>
+    sudo ./add-cluster.py <new-cluster-name> [--golden-image] [--registry-mirror]
     Example: sudo ./add-cluster.py member4
 """
 
+import argparse
 import sys
 import os
-import time
 import json
 
 # Import shared configuration and helpers
 from common import run_command, check_root_privileges, print_color, colors
 from config import (
     LXD_PROFILE_NAME,
+    LXD_BASE_IMAGE,
     CONTAINER_API_PORT,
     CONFIG_FILES_DIR,
     KARMADA_KUBECONFIG,
     PORT_MAPPING,
 )
+from readiness import wait_for_command, print_wait_summary
+from cluster_status import wait_for_clusters_ready
+from golden_image import (
+    ensure_golden_image,
+    clone_member_from_golden_image,
+    enable_microk8s_addons,
+    install_microk8s,
+)
+from registry_mirror import setup_registry_mirrors
 
 
-def provision_cluster(cluster_name):
+def provision_cluster(cluster_name, use_golden_image=False):
     """Provisions an LXD container and installs MicroK8s inside it."""
     print_color(colors.YELLOW, f"\n--- 1. Provisioning new cluster: {cluster_name} ---")
 
@@ -46,12 +63,20 @@ def provision_cluster(cluster_name):
         )
         sys.exit(1)
 
+    if use_golden_image:
+        ensure_golden_image()
+        clone_member_from_golden_image(cluster_name)
+        print_color(
+            colors.GREEN, f"✅ Cluster '{cluster_name}' provisioned successfully."
+        )
+        return
+
     print(f"--> Launching new LXD container for {cluster_name}...")
     run_command(
         [
             "lxc",
             "launch",
-            "ubuntu:22.04",
+            LXD_BASE_IMAGE,
             cluster_name,
             "--profile",
             "default",
@@ -63,9 +88,7 @@ def provision_cluster(cluster_name):
     print(f"--> Waiting for cloud-init to finish in {cluster_name}...")
     run_command(["lxc", "exec", cluster_name, "--", "cloud-init", "status", "--wait"])
 
-    print(f"--> Installing MicroK8s in {cluster_name}...")
-    install_cmd = "sudo snap install microk8s --classic"
-    run_command(["lxc", "exec", cluster_name, "--", "/bin/bash", "-c", install_cmd])
+    install_microk8s(cluster_name)
     run_command(
         [
             "lxc",
@@ -79,22 +102,7 @@ def provision_cluster(cluster_name):
         ]
     )
 
-    print(f"--> Enabling required addons (dns, hostpath-storage)...")
-    run_command(
-        ["lxc", "exec", cluster_name, "--", "sudo", "microk8s", "enable", "dns"]
-    )
-    run_command(
-        [
-            "lxc",
-            "exec",
-            cluster_name,
-            "--",
-            "sudo",
-            "microk8s",
-            "enable",
-            "hostpath-storage",
-        ]
-    )
+    enable_microk8s_addons(cluster_name)
 
     print_color(colors.GREEN, f"✅ Cluster '{cluster_name}' provisioned successfully.")
 
@@ -147,17 +155,10 @@ def health_check_cluster(cluster_name, kubeconfig_path):
     print_color(
         colors.YELLOW, f"\n--- 3. Health checking new cluster: {cluster_name} ---"
     )
-    for i in range(12):  # Try for 2 minutes
-        result = run_command(
-            ["kubectl", "--kubeconfig", kubeconfig_path, "get", "nodes"], check=False
-        )
-        if result.returncode == 0:
-            print_color(colors.GREEN, f"✅ Health check PASSED for {cluster_name}.")
-            return True
-        print_color(
-            colors.YELLOW, f"Health check attempt {i + 1}/12 failed. Retrying in 10s..."
-        )
-        time.sleep(10)
+    check_cmd = ["kubectl", "--kubeconfig", kubeconfig_path, "get", "nodes"]
+    if wait_for_command(f"{cluster_name} API server", check_cmd, timeout=120):
+        print_color(colors.GREEN, f"✅ Health check PASSED for {cluster_name}.")
+        return True
 
     print_color(colors.RED, f"❌ FATAL: Health check FAILED for {cluster_name}.")
     sys.exit(1)
@@ -188,28 +189,12 @@ def verify_karmada_join(cluster_name):
         colors.YELLOW, f"\n--- 5. Verifying '{cluster_name}' is Ready in Karmada ---"
     )
 
-    for i in range(18):  # Wait up to 3 minutes
-        check_cmd = [
-            "kubectl",
-            "--kubeconfig",
-            KARMADA_KUBECONFIG,
-            "get",
-            "cluster",
-            cluster_name,
-            "-o",
-            "jsonpath={.status.conditions[?(@.type=='Ready')].status}",
-        ]
-        result = run_command(check_cmd, check=False, capture_output=True)
-
-        if result.returncode == 0 and result.stdout.strip() == "True":
-            print_color(
-                colors.GREEN,
-                f"✅ Verification PASSED: Cluster '{cluster_name}' is now Ready in Karmada.",
-            )
-            return True
-
-        print(f"Cluster not ready yet. Retrying in 10s...")
-        time.sleep(10)
+    if wait_for_clusters_ready([cluster_name]):
+        print_color(
+            colors.GREEN,
+            f"✅ Verification PASSED: Cluster '{cluster_name}' is now Ready in Karmada.",
+        )
+        return True
 
     print_color(
         colors.RED,
@@ -223,18 +208,34 @@ def main():
     check_root_privileges("add-cluster.py")
 
     # --- Argument Parsing ---
-    if len(sys.argv) != 2:
-        print(f"Usage: {sys.argv[0]} <new-cluster-name>")
-        print("Example: sudo ./add-cluster.py member4")
-        sys.exit(1)
-    cluster_name = sys.argv[1]
+    parser = argparse.ArgumentParser(
+        description="Adds a new member cluster to the Karmada federation.",
+        epilog="Example: sudo ./add-cluster.py member4",
+    )
+    parser.add_argument("cluster_name", help="Name of the new member cluster.")
+    parser.add_argument(
+        "--golden-image",
+        action="store_true",
+        help="Clone the cluster from the golden container with MicroK8s staged.",
+    )
+    parser.add_argument(
+        "--registry-mirror",
+        action="store_true",
+        help="Make the cluster pull through the registry mirrors of the host.",
+    )
+    args = parser.parse_args()
+    cluster_name = args.cluster_name
 
     # --- Orchestration ---
-    provision_cluster(cluster_name)
+    provision_cluster(cluster_name, use_golden_image=args.golden_image)
+    if args.registry_mirror and not setup_registry_mirrors([cluster_name]):
+        print_color(colors.RED, "FATAL: Could not set up the registry mirrors.")
+        sys.exit(1)
     kubeconfig_path = setup_api_access(cluster_name)
     health_check_cluster(cluster_name, kubeconfig_path)
     join_to_karmada(cluster_name, kubeconfig_path)
     verify_karmada_join(cluster_name)
+    print_wait_summary()
 
     print_color(
         colors.GREEN, "\n\n========================================================"
@@ -3,12 +3,22 @@
 """
 A Chaos Monkey for the Karmada testbed.
 
-This script simulates infrastructure failures by periodically and randomly stopping
-and starting the LXD containers that host the member clusters. This is useful
-for testing the resilience and recovery behavior of the Karmada control plane
-and any deployed applications.
+This script simulates infrastructure failures by stopping and starting the LXD
+containers that host the member clusters, or by degrading their network, and
+measures how Karmada and the workloads react. This is useful for testing the
+resilience and recovery behavior of the Karmada control plane and any deployed
+applications.
 
-The script runs in an infinite loop. Press Ctrl+C to stop it gracefully.
+Here's what this script does:
+
+1. **Builds a schedule of faults**: from a seed, so that a run can be replayed exactly. Faults arrive on a fixed `--interval` (each member is faulted with `--down-probability`), or as a Poisson process with `--interval` as the mean time between faults. A fault lasts `--fault-duration`, faults on different members may overlap (up to `--max-concurrent`), and a member is left alone for `--cooldown` seconds after a fault.
+   The fault types (`--faults`) are `stop` (the container is stopped, then started again) and network faults, applied with `tc netem` to all the traffic of the member (see network_faults.py): `latency` (`--delay` and `--jitter`), `loss` (`--loss`), `bandwidth` (`--rate`) and `partition` (all packets dropped, which cuts the member off from the Karmada host and from the other members), and resource-pressure faults, which lower the LXD limits of the container and restore them afterwards (see resource_faults.py): `cpu` (`--cpu-limit`), `cpu-throttle` (`--cpu-allowance`) and `memory` (`--memory-limit`).
+2. **Watches Karmada**: a background thread polls the Ready condition of the clusters, the placements of the ResourceBindings and the availability of the Deployments (see chaos_measure.py).
+3. **Applies each fault and measures**: the detection latency (until Karmada marks the member NotReady), the rescheduling latency (until the workloads of the member are placed elsewhere and available) and the recovery time, or MTTR (from the end of the fault until the member is Ready and all workloads are available again). While the fault is applied, the member is also sampled every `--probe-interval` seconds: the latency of its API server, its pod evictions and, with `--app-url`, the response time of a demo app.
+4. **Records the results**: one JSON line per fault in `--output` (which `--replay` accepts as a schedule), and a histogram summary at the end.
+
+The script runs until `--duration` seconds have passed, or forever. Press Ctrl+C
+to stop it gracefully: the faults in progress are reverted first.
 
 Usage:
     # Run with default settings (10-minute interval, 10% down probability)
@@ -19,23 +29,251 @@ Usage:
 
     # Target only specific clusters
     sudo ./chaos-monkey.py --clusters member1 member3
+
+    # One hour of faults arriving every 2 minutes on average, up to 2 at once
+    sudo ./chaos-monkey.py --arrivals poisson --interval 120 --duration 3600 \\
+        --fault-duration 90 --max-concurrent 2 --seed 42
+
+    # Degraded links instead of stopped containers
+    sudo ./chaos-monkey.py --faults latency loss bandwidth --delay 300 --loss 20
+
+    # Slow members, with the response time of the flask demo of member1
+    sudo ./chaos-monkey.py --faults cpu-throttle memory --memory-limit 1GiB \
+        --app-url http://127.0.0.1:32101/
+
+    # Replay the faults of an earlier run
+    sudo ./chaos-monkey.py --replay chaos-20250101-120000.jsonl
 """
 
 import sys
 import time
+import json
 import random
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import shared configuration and helpers
 from common import run_command, check_root_privileges, print_color, colors
 from config import MEMBER_CLUSTERS
+from chaos_measure import KarmadaMonitor, FaultProbe, print_histogram_summary
+from network_faults import apply_netem, clear_netem
+from resource_faults import apply_limits, restore_limits
 
+# What an event of the schedule is made of, as recorded in the results.
+SCHEDULE_FIELDS = ["id", "at", "cluster", "fault", "params", "duration"]
+METRICS = ["detection_latency", "rescheduling_latency", "recovery_time"]
+# The metrics of the summary, and their units.
+SUMMARY_METRICS = {
+    "detection_latency": "seconds",
+    "rescheduling_latency": "seconds",
+    "recovery_time": "seconds",
+    "evictions": "pods",
+    "api_latency_p50_ms": "ms",
+    "app_response_p50_ms": "ms",
+}
 
-def main():
-    """Main execution function."""
-    check_root_privileges("chaos-monkey.py")
 
+# --- Faults: fault name -> (inject, revert), each returning True on success ---
+
+
+def stop_member(cluster, params):
+    return run_command(["lxc", "stop", cluster], check=False).returncode == 0
+
+
+def start_member(cluster, params):
+    return run_command(["lxc", "start", cluster], check=False).returncode == 0
+
+
+FAULTS = {
+    "stop": (stop_member, start_member),
+    "latency": (apply_netem, clear_netem),
+    "loss": (apply_netem, clear_netem),
+    "bandwidth": (apply_netem, clear_netem),
+    "partition": (apply_netem, clear_netem),
+    "cpu": (apply_limits, restore_limits),
+    "cpu-throttle": (apply_limits, restore_limits),
+    "memory": (apply_limits, restore_limits),
+}
+NETWORK_FAULTS = {"latency", "loss", "bandwidth", "partition"}
+
+
+def fault_params(fault, args):
+    """The parameters of a fault, recorded in its event so it can be replayed."""
+    if fault == "latency":
+        return {"delay_ms": args.delay, "jitter_ms": args.jitter}
+    if fault == "loss":
+        return {"loss_percent": args.loss}
+    if fault == "bandwidth":
+        return {"rate": args.rate}
+    if fault == "partition":
+        return {"loss_percent": 100}
+    if fault == "cpu":
+        return {"limits.cpu": args.cpu_limit}
+    if fault == "cpu-throttle":
+        return {"limits.cpu.allowance": args.cpu_allowance}
+    if fault == "memory":
+        return {"limits.memory": args.memory_limit}
+    return {}
+
+
+# --- Schedule ---
+
+
+def generate_schedule(args, rng):
+    """
+    Yields the events of the schedule, in order of their time `at` (in seconds
+    from the start of the run). Everything random comes from `rng`.
+    """
+    busy_until = {cluster: 0.0 for cluster in args.clusters}
+    fault_ends = []
+    at, tick, event_id = 0.0, 0, 0
+    while True:
+        if args.arrivals == "poisson":
+            at += rng.expovariate(1 / args.interval)
+            candidates = [rng.choice(args.clusters)]
+        else:
+            at = float(tick * args.interval)
+            tick += 1
+            candidates = [
+                cluster
+                for cluster in args.clusters
+                if rng.random() < args.down_probability
+            ]
+        if args.duration is not None and at >= args.duration:
+            return
+
+        # Only the faults still running count against --max-concurrent.
+        fault_ends = [end for end in fault_ends if end > at]
+        for cluster in candidates:
+            fault = rng.choice(args.faults)
+            if busy_until[cluster] > at or len(fault_ends) >= args.max_concurrent:
+                continue
+            event_id += 1
+            busy_until[cluster] = at + args.fault_duration + args.cooldown
+            fault_ends.append(at + args.fault_duration)
+            yield {
+                "id": event_id,
+                "at": round(at, 1),
+                "cluster": cluster,
+                "fault": fault,
+                "params": fault_params(fault, args),
+                "duration": args.fault_duration,
+            }
+
+
+def load_schedule(path):
+    """Reads the events of a results file (or of a schedule) to replay them."""
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    events = [{field: record[field] for field in SCHEDULE_FIELDS} for record in records]
+    return sorted(events, key=lambda event: event["at"])
+
+
+# --- Run ---
+
+
+class ChaosRun:
+    """The state shared by the faults of a run."""
+
+    def __init__(self, args, monitor, output):
+        self.args = args
+        self.monitor = monitor
+        self.output = output
+        self.records = []
+        self.active = {}  # event id -> event, for the faults not reverted yet
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+
+    def record(self, record):
+        with self.lock:
+            self.records.append(record)
+            self.output.write(json.dumps(record) + "\n")
+            self.output.flush()
+
+
+def now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def apply_chaos(run, event):
+    """Applies the fault of an event, reverts it on time, and measures."""
+    cluster, fault = event["cluster"], event["fault"]
+    inject, revert = FAULTS[fault]
+    monitor = run.monitor
+    before = monitor.latest()
+    affected = before.bindings_on(cluster) if before else set()
+    record = {**event, "seed": run.args.seed, "injected_at": now()}
+    if run.stopping.is_set():
+        return
+
+    print_color(colors.RED, f"[{now()}] #{event['id']} {fault} on '{cluster}'...")
+    probe = FaultProbe(cluster, run.args.app_url, run.args.probe_interval)
+    probe.start()
+    injected = time.monotonic()
+    run.active[event["id"]] = event
+    if not inject(cluster, event["params"]):
+        del run.active[event["id"]]
+        probe.stop()
+        run.record({**record, "error": f"could not apply '{fault}'"})
+        return
+
+    fault_end = injected + event["duration"]
+    record["detection_latency"] = monitor.wait_for(
+        lambda observation: not observation.is_ready(cluster),
+        injected,
+        event["duration"],
+        cancel=run.stopping,
+    )
+    record["rescheduling_latency"] = None
+    if affected:
+        record["rescheduling_latency"] = monitor.wait_for(
+            lambda observation: not observation.bindings_on(cluster) & affected
+            and not observation.unavailable,
+            injected,
+            max(0, fault_end - time.monotonic()),
+            cancel=run.stopping,
+        )
+    run.stopping.wait(max(0, fault_end - time.monotonic()))
+
+    print_color(colors.GREEN, f"[{now()}] #{event['id']} reverting {fault}...")
+    reverted = time.monotonic()
+    if not revert(cluster, event["params"]):
+        record["error"] = f"could not revert '{fault}'"
+    del run.active[event["id"]]
+    record.update(probe.stop())
+    record["recovery_time"] = monitor.wait_for(
+        lambda observation: observation.is_ready(cluster)
+        and not observation.unavailable,
+        reverted,
+        run.args.recovery_timeout,
+        cancel=run.stopping,
+    )
+    record["affected_bindings"] = len(affected)
+    run.record(record)
+    results = ", ".join(f"{metric}={record[metric]}" for metric in METRICS)
+    print_color(colors.BLUE, f"[{now()}] #{event['id']} {results}")
+
+
+def run_schedule(run, events):
+    """Starts the faults of the schedule on time; returns when they are done."""
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=run.args.max_concurrent) as pool:
+        for event in events:
+            if run.stopping.wait(max(0, started + event["at"] - time.monotonic())):
+                break
+            faulted = {e["cluster"] for e in list(run.active.values())}
+            if event["cluster"] in faulted:
+                print_color(
+                    colors.YELLOW,
+                    f"  - Skipping #{event['id']}: '{event['cluster']}' is faulted.",
+                )
+                continue
+            pool.submit(apply_chaos, run, event)
+
+
+def parse_args():
     # --- Argument Parsing for Configuration ---
     parser = argparse.ArgumentParser(
         description="A Chaos Monkey to simulate member cluster failures.",
@@ -59,6 +297,110 @@ def main():
         default=MEMBER_CLUSTERS,
         help=f"A list of member clusters to target. Default: {' '.join(MEMBER_CLUSTERS)}",
     )
+    parser.add_argument(
+        "--arrivals",
+        choices=["fixed", "poisson"],
+        default="fixed",
+        help="fixed: every --interval; poisson: --interval between faults on average.",
+    )
+    parser.add_argument(
+        "--faults",
+        nargs="+",
+        choices=sorted(FAULTS),
+        default=["stop"],
+        help="The fault types to pick from at random. Default: stop.",
+    )
+    parser.add_argument(
+        "--delay",
+        type=int,
+        default=200,
+        help="latency faults: delay in ms, in each direction. Default: 200.",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=int,
+        default=50,
+        help="latency faults: jitter in ms. Default: 50.",
+    )
+    parser.add_argument(
+        "--loss",
+        type=float,
+        default=10.0,
+        help="loss faults: percentage of packets lost. Default: 10.",
+    )
+    parser.add_argument(
+        "--rate",
+        default="1mbit",
+        help="bandwidth faults: rate, in tc units. Default: 1mbit.",
+    )
+    parser.add_argument(
+        "--cpu-limit",
+        default="1",
+        help="cpu faults: limits.cpu of the member. Default: 1.",
+    )
+    parser.add_argument(
+        "--cpu-allowance",
+        default="25ms/100ms",
+        help="cpu-throttle faults: limits.cpu.allowance. Default: 25ms/100ms.",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        default="2GiB",
+        help="memory faults: limits.memory of the member. Default: 2GiB.",
+    )
+    parser.add_argument(
+        "--app-url",
+        help="A demo app URL, whose response time is sampled during the faults.",
+    )
+    parser.add_argument(
+        "--probe-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between two samples of the faulted member. Default: 5.",
+    )
+    parser.add_argument(
+        "--fault-duration",
+        type=int,
+        help="How long a fault lasts, in seconds. Default: --interval.",
+    )
+    parser.add_argument(
+        "--cooldown",
+        type=int,
+        default=60,
+        help="Seconds without faults on a member after one. Default: 60.",
+    )
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        help="Maximum number of faults at the same time. Default: all clusters.",
+    )
+    parser.add_argument(
+        "--duration", type=int, help="Length of the run in seconds. Default: forever."
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Seed of the schedule. Default: a random one."
+    )
+    parser.add_argument(
+        "--replay",
+        help="Replay the faults of a results file instead of a new schedule.",
+    )
+    parser.add_argument(
+        "--recovery-timeout",
+        type=int,
+        default=600,
+        help="Maximum wait for the recovery after a fault, in seconds. Default: 600.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between two observations of Karmada. Default: 1.",
+    )
+    parser.add_argument(
+        "--output",
+        default=f"chaos-{datetime.now().strftime('%Y%m%d-%H%M%S')}.jsonl",
+        help="The JSON lines file of the results. Default: chaos-<date>.jsonl.",
+    )
     args = parser.parse_args()
 
     if not (0.0 <= args.down_probability <= 1.0):
@@ -66,65 +408,108 @@ def main():
             colors.RED, "FATAL: --down-probability must be between 0.0 and 1.0."
         )
         sys.exit(1)
+    if args.interval <= 0:
+        print_color(colors.RED, "FATAL: --interval must be positive.")
+        sys.exit(1)
+    if args.max_concurrent is not None and args.max_concurrent < 1:
+        print_color(colors.RED, "FATAL: --max-concurrent must be at least 1.")
+        sys.exit(1)
+    if (
+        args.replay is None
+        and args.arrivals == "fixed"
+        and args.down_probability == 0
+        and args.duration is None
+    ):
+        # The schedule would never yield a fault, nor end.
+        print_color(
+            colors.RED, "FATAL: --down-probability 0 needs a --duration to stop."
+        )
+        sys.exit(1)
+    if args.fault_duration is None:
+        args.fault_duration = args.interval
+    if args.max_concurrent is None:
+        args.max_concurrent = len(args.clusters)
+    if args.seed is None:
+        args.seed = random.randrange(2**32)
+    return args
+
+
+def main():
+    """Main execution function."""
+    check_root_privileges("chaos-monkey.py")
+    args = parse_args()
+
+    if args.replay:
+        events = load_schedule(args.replay)
+        clusters = sorted({event["cluster"] for event in events})
+        missing = [c for c in clusters if get_cluster_state(c) == "UNKNOWN"]
+        if missing:
+            print_color(
+                colors.RED, f"FATAL: LXD containers not found: {', '.join(missing)}."
+            )
+            sys.exit(1)
+    else:
+        missing = [c for c in args.clusters if get_cluster_state(c) == "UNKNOWN"]
+        for cluster in missing:
+            print_color(
+                colors.RED, f"  - Skipping '{cluster}': LXD container not found."
+            )
+        args.clusters = [c for c in args.clusters if c not in missing]
+        if not args.clusters:
+            print_color(colors.RED, "FATAL: No cluster to target.")
+            sys.exit(1)
+        events = generate_schedule(args, random.Random(args.seed))
 
     print_color(colors.BLUE, "========================================================")
     print_color(colors.BLUE, "🐒 Chaos Monkey is starting its mischief! 🐒")
     print_color(colors.BLUE, "========================================================")
-    print(f"Targeting clusters: {', '.join(args.clusters)}")
-    print(f"Run interval: {args.interval} seconds")
-    print(f"Down probability: {args.down_probability * 100}%")
+    if args.replay:
+        print(f"Replaying: {args.replay}")
+    else:
+        print(f"Targeting clusters: {', '.join(args.clusters)}")
+        print(f"Arrivals: {args.arrivals}, interval: {args.interval} seconds")
+        print(f"Down probability: {args.down_probability * 100}%")
+        print(f"Faults: {', '.join(args.faults)} for {args.fault_duration} seconds")
+        print(f"Seed: {args.seed} (use --seed {args.seed} to replay this schedule)")
+    print(f"Results: {args.output}")
     print_color(colors.YELLOW, "Press Ctrl+C to stop the monkey.")
 
-    try:
-        while True:
-            apply_chaos(args)
-            time.sleep(args.interval)
-
-    except KeyboardInterrupt:
-        print_color(
-            colors.GREEN,
-            "\n\n🐒 Chaos Monkey received Ctrl+C. Shutting down gracefully. 🐒",
-        )
-        sys.exit(0)
-    except Exception as e:
-        print_color(colors.RED, f"\nAn unexpected error occurred: {e}")
-        sys.exit(1)
-
+    if args.replay:
+        network_faults = {event["fault"] for event in events} & NETWORK_FAULTS
+        targets = clusters
+    else:
+        network_faults = set(args.faults) & NETWORK_FAULTS
+        targets = args.clusters
+    if network_faults:
+        # Left over by a run that could not revert its faults.
+        for cluster in targets:
+            clear_netem(cluster)
 
-def apply_chaos(args):
-    print_color(
-        colors.YELLOW,
-        f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] --- The monkey is waking up! ---",
-    )
-    for cluster in args.clusters:
-        current_state = get_cluster_state(cluster)
-        if current_state == "UNKNOWN":
+    monitor = KarmadaMonitor(args.poll_interval)
+    monitor.start()
+    with open(args.output, "a") as output:
+        run = ChaosRun(args, monitor, output)
+        worker = threading.Thread(target=run_schedule, args=(run, events))
+        worker.start()
+        try:
+            while worker.is_alive():
+                worker.join(timeout=1)
+        except KeyboardInterrupt:
             print_color(
-                colors.RED, f"  - Skipping '{cluster}': LXD container not found."
+                colors.GREEN,
+                "\n\n🐒 Chaos Monkey received Ctrl+C. Reverting the faults... 🐒",
             )
-            continue
+            run.stopping.set()
+            worker.join()
+    monitor.stop()
 
-        # Determine the desired state based on probability
-        roll = random.random()
-        if roll < args.down_probability:
-            desired_state = "STOPPED"
-        else:
-            desired_state = "RUNNING"
-
-        # Take action only if the state needs to change
-        if desired_state == "STOPPED" and current_state == "RUNNING":
-            print_color(colors.RED, f"  - Taking '{cluster}' OFFLINE...")
-            run_command(["lxc", "stop", cluster])
-        elif desired_state == "RUNNING" and current_state == "STOPPED":
-            print_color(colors.GREEN, f"  - Bringing '{cluster}' ONLINE...")
-            run_command(["lxc", "start", cluster])
-        else:
-            # State is already as desired, do nothing
-            print(f"  - Keeping '{cluster}' in its current state: {current_state}")
-    print_color(
-        colors.BLUE,
-        f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] --- The monkey is going to sleep for {args.interval} seconds... ---",
-    )
+    print_histogram_summary(run.records, SUMMARY_METRICS)
+    errors = [record for record in run.records if record.get("error")]
+    for record in errors:
+        print_color(
+            colors.RED, f"  #{record['id']} on {record['cluster']}: {record['error']}"
+        )
+    sys.exit(1 if errors else 0)
 
 
 def get_cluster_state(cluster_name):
@@ -0,0 +1,249 @@
+"""
+Measurements for chaos-monkey.py: what Karmada and the workloads do after a
+fault.
+
+A KarmadaMonitor polls the Karmada API in a background thread (one list of
+Clusters, ResourceBindings and Deployments per poll, on the pooled
+connection of kube_client) and keeps the recent observations. Each fault
+then waits, from its own thread, for the observations it is interested in:
+the member going NotReady, the workloads moving away from it, everything
+being back to normal.
+
+During each fault, a FaultProbe also samples the faulted member itself: the
+latency of its API server, its evicted pods, and the response time of a demo
+app.
+
+The results of the faults are summarized with print_histogram_summary().
+"""
+
+import collections
+import threading
+import time
+
+from common import print_color, colors
+from kube_client import karmada_client, member_client, KubeApiError
+from cluster_status import get_cluster_statuses
+from readiness import http_status
+
+BINDING_API_VERSION = "work.karmada.io/v1alpha2"
+SYSTEM_NAMESPACES = {
+    "kube-system",
+    "kube-public",
+    "karmada-system",
+    "karmada-cluster",
+}
+HISTORY_SIZE = 3600
+HISTOGRAM_BINS = 10
+HISTOGRAM_WIDTH = 40
+
+
+class Observation:
+    """The state of the federation at one poll."""
+
+    def __init__(self, at, clusters, placements, unavailable):
+        self.at = at  # time.monotonic()
+        self.clusters = clusters  # {cluster: Ready}
+        self.placements = placements  # {binding: set of clusters}
+        self.unavailable = unavailable  # Deployments not fully available
+
+    def is_ready(self, cluster):
+        return self.clusters.get(cluster, False)
+
+    def bindings_on(self, cluster):
+        return {key for key, clusters in self.placements.items() if cluster in clusters}
+
+
+def observe():
+    """Returns the current Observation, or None if Karmada is unreachable."""
+    statuses = get_cluster_statuses()
+    if statuses is None:
+        return None
+    client = karmada_client()
+    try:
+        bindings = client.list(BINDING_API_VERSION, "ResourceBinding")
+        deployments = client.list("apps/v1", "Deployment")
+    except (KubeApiError, OSError):
+        return None
+
+    placements = {
+        f"{b['metadata']['namespace']}/{b['metadata']['name']}": {
+            target["name"] for target in b.get("spec", {}).get("clusters", [])
+        }
+        for b in bindings
+    }
+    unavailable = [
+        f"{d['metadata']['namespace']}/{d['metadata']['name']}"
+        for d in deployments
+        if d["metadata"]["namespace"] not in SYSTEM_NAMESPACES
+        and d.get("status", {}).get("availableReplicas", 0)
+        < d.get("spec", {}).get("replicas", 1)
+    ]
+    clusters = {
+        name: status.get("Ready") == "True" for name, status in statuses.items()
+    }
+    return Observation(time.monotonic(), clusters, placements, unavailable)
+
+
+class KarmadaMonitor:
+    """Polls Karmada every `poll_interval` seconds, in a background thread."""
+
+    def __init__(self, poll_interval=1.0):
+        self.poll_interval = poll_interval
+        self._history = collections.deque(maxlen=HISTORY_SIZE)
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        if not self.wait_for(lambda observation: True, since=0, timeout=30):
+            print_color(colors.YELLOW, "    Karmada is not reachable (yet).")
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            observation = observe()
+            if observation is not None:
+                with self._condition:
+                    self._history.append(observation)
+                    self._condition.notify_all()
+            elapsed = time.monotonic() - started
+            self._stopped.wait(max(0, self.poll_interval - elapsed))
+
+    def latest(self):
+        with self._condition:
+            return self._history[-1] if self._history else None
+
+    def wait_for(self, predicate, since, timeout, cancel=None):
+        """
+        Waits until an observation made after `since` (a time.monotonic())
+        satisfies `predicate`. Returns the delay from `since` to that
+        observation, or None if there was none within `timeout` seconds (or
+        once the `cancel` event is set).
+        """
+        deadline = time.monotonic() + timeout
+        checked = 0.0
+        with self._condition:
+            while True:
+                for observation in self._history:
+                    if observation.at > max(since, checked):
+                        checked = observation.at
+                        if predicate(observation):
+                            return round(observation.at - since, 1)
+                remaining = deadline - time.monotonic()
+                cancelled = cancel is not None and cancel.is_set()
+                if remaining <= 0 or cancelled or self._stopped.is_set():
+                    return None
+                self._condition.wait(remaining)
+
+
+class FaultProbe:
+    """
+    Samples a member every `interval` seconds while a fault is applied, in a
+    background thread: the latency of a list of all its pods (which also
+    gives its evicted pods) and, with `app_url`, the response time of a GET on
+    a demo app.
+    """
+
+    def __init__(self, cluster, app_url=None, interval=5.0):
+        self.cluster = cluster
+        self.app_url = app_url
+        self.interval = interval
+        self.api_latencies, self.app_latencies = [], []
+        self.api_errors = self.app_errors = 0
+        self.evicted_before, self.evicted = None, set()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.evicted_before = self._evicted_pods()
+        self._thread.start()
+
+    def _evicted_pods(self):
+        """Returns the evicted pods of the member, or None if unreachable."""
+        started = time.monotonic()
+        try:
+            pods = member_client(self.cluster).list("v1", "Pod")
+        except (KubeApiError, OSError):
+            self.api_errors += 1
+            return None
+        self.api_latencies.append((time.monotonic() - started) * 1000)
+        return {
+            f"{pod['metadata']['namespace']}/{pod['metadata']['name']}"
+            for pod in pods
+            if pod.get("status", {}).get("reason") == "Evicted"
+        }
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            evicted = self._evicted_pods()
+            if evicted is not None:
+                self.evicted |= evicted
+            if self.app_url:
+                started = time.monotonic()
+                if http_status(self.app_url) == 200:
+                    self.app_latencies.append((time.monotonic() - started) * 1000)
+                else:
+                    self.app_errors += 1
+
+    def stop(self):
+        """Stops the sampling and returns the results, to add to the record."""
+        self._stopped.set()
+        self._thread.join()
+        evictions = None
+        if self.evicted_before is not None:
+            evictions = len(self.evicted - self.evicted_before)
+        results = {"evictions": evictions, "api_errors": self.api_errors}
+        for name, samples in [
+            ("api_latency", self.api_latencies),
+            ("app_response", self.app_latencies),
+        ]:
+            results[f"{name}_p50_ms"] = (
+                round(percentile(samples, 0.5)) if samples else None
+            )
+            results[f"{name}_max_ms"] = round(max(samples)) if samples else None
+        if self.app_url:
+            results["app_errors"] = self.app_errors
+        return results
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def print_histogram_summary(records, metrics):
+    """
+    Prints, for each metric of the records (the faults), its count,
+    percentiles and a text histogram. Faults where the metric was not
+    observed (e.g. a member never went NotReady) are counted apart.
+    `metrics` maps the metrics to their units.
+    """
+    print_color(colors.BLUE, f"\n--- Chaos summary ({len(records)} faults) ---")
+    for metric, unit in metrics.items():
+        values = [r[metric] for r in records if r.get(metric) is not None]
+        missing = len(records) - len(values)
+        print_color(colors.YELLOW, f"\n{metric} ({unit})")
+        if not values:
+            print(f"  not observed ({missing} faults)")
+            continue
+        print(
+            f"  n={len(values)}  not observed={missing}  min={min(values):.1f}  "
+            f"p50={percentile(values, 0.5):.1f}  p90={percentile(values, 0.9):.1f}  "
+            f"max={max(values):.1f}"
+        )
+        low, high = min(values), max(values)
+        width = (high - low) / HISTOGRAM_BINS or 1.0
+        counts = [0] * HISTOGRAM_BINS
+        for value in values:
+            counts[min(HISTOGRAM_BINS - 1, int((value - low) / width))] += 1
+        for index, count in enumerate(counts):
+            if high == low and index:
+                break
+            start = low + index * width
+            bar = "#" * round(HISTOGRAM_WIDTH * count / max(counts))
+            print(f"  {start:8.1f} - {start + width:8.1f} | {bar} {count}")
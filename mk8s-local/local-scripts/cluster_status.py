@@ -0,0 +1,81 @@
+"""
+The status of every member cluster registered with Karmada, from one list call.
+
+Instead of querying members one by one (one process and one API call per
+member), scripts take a snapshot of all Cluster objects with a single list
+request (on the pooled connection of kube_client) and answer every readiness
+question from it, so the cost of a poll does not grow with the number of
+members.
+"""
+
+from common import print_color, colors
+from kube_client import get_client, KubeApiError
+from readiness import wait_until, DEFAULT_TIMEOUT
+from config import KARMADA_KUBECONFIG
+
+CLUSTER_API_VERSION = "cluster.karmada.io/v1alpha1"
+
+
+def get_cluster_statuses(kubeconfig=KARMADA_KUBECONFIG):
+    """
+    Lists all clusters registered with Karmada in a single call.
+    Returns a dict {cluster_name: {condition_type: status}}, or None if the
+    Karmada API could not be queried.
+    """
+    try:
+        items = get_client(kubeconfig).list(CLUSTER_API_VERSION, "Cluster")
+    except (KubeApiError, OSError):
+        return None
+
+    return {
+        item["metadata"]["name"]: {
+            condition.get("type"): condition.get("status")
+            for condition in item.get("status", {}).get("conditions", [])
+        }
+        for item in items
+    }
+
+
+def is_cluster_ready(statuses, cluster_name):
+    """Tells whether a cluster is registered and Ready in a snapshot."""
+    return statuses.get(cluster_name, {}).get("Ready") == "True"
+
+
+def describe_cluster_status(statuses, cluster_name):
+    """Returns 'Ready', 'not Ready' or 'not registered' for a cluster."""
+    if cluster_name not in statuses:
+        return "not registered"
+    return "Ready" if is_cluster_ready(statuses, cluster_name) else "not Ready"
+
+
+def wait_for_clusters_ready(
+    cluster_names, timeout=DEFAULT_TIMEOUT, kubeconfig=KARMADA_KUBECONFIG
+):
+    """
+    Waits until all `cluster_names` are registered and Ready, taking one
+    snapshot per poll. Returns True if they all became Ready in time.
+    """
+    pending = list(cluster_names)
+
+    def all_ready():
+        statuses = get_cluster_statuses(kubeconfig)
+        if statuses is None:
+            return False
+        still_pending = [
+            name for name in cluster_names if not is_cluster_ready(statuses, name)
+        ]
+        if still_pending != pending:
+            pending[:] = still_pending
+            if still_pending:
+                print_color(
+                    colors.GRAY, f"    Not Ready yet: {', '.join(still_pending)}"
+                )
+        return not still_pending
+
+    return bool(
+        wait_until(
+            f"clusters {', '.join(cluster_names)} to be Ready in Karmada",
+            all_ready,
+            timeout=timeout,
+        )
+    )
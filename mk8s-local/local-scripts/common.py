@@ -1,7 +1,12 @@
+import atexit
+import json
 import os
 import sys
 import subprocess
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 # --- ANSI Color Codes for Better Output ---
@@ -14,6 +19,40 @@ class colors:
     ENDC = "\033[0m"
 
 
+# --- Per-thread state used when running work in parallel (see run_in_parallel) ---
+_thread_state = threading.local()
+_abort_parallel_run = threading.Event()
+
+
+class _PrefixedStdout:
+    """
+    A stand-in for sys.stdout that prefixes every line written by a worker
+    thread with that thread's label, so interleaved output stays readable.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        prefix = getattr(_thread_state, "prefix", None)
+        if prefix is None:
+            return self._stream.write(text)
+        *lines, rest = (getattr(_thread_state, "pending", "") + text).split("\n")
+        _thread_state.pending = rest
+        with self._lock:
+            for line in lines:
+                self._stream.write(f"{prefix}{line}\n")
+            self._stream.flush()
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
 def print_color(color, message):
     """Prints a message in a given color."""
     print(f"{color}{message}{colors.ENDC}")
@@ -26,17 +65,28 @@ def run_command(
     A comprehensive helper to run a shell command and handle errors.
     It correctly inherits and updates the process environment.
     """
+    if _abort_parallel_run.is_set() and getattr(_thread_state, "prefix", None):
+        # Another parallel worker failed: stop this one before its next command.
+        _thread_state.aborted = True
+        sys.exit(1)
+
     display_command = " ".join(command)
     if command_input:
         display_command += " <<< [INPUT]"
     print_color(colors.BLUE, f"--> Executing: {display_command}")
 
+    started = time.time()
+    result = None
     try:
         process_env = os.environ.copy()
         if env:
             # Update the copy with any specific variables for this command.
             process_env.update(env)
 
+        if getattr(_thread_state, "prefix", None) and not capture_output:
+            result = _run_streaming(command, command_input, check, process_env)
+            return result
+
         result = subprocess.run(
             command,
             input=command_input,
@@ -52,6 +102,7 @@ def run_command(
         )
         sys.exit(1)
     except subprocess.CalledProcessError as e:
+        result = e
         if capture_output and e.stderr:
             print_color(colors.RED, f"Stderr:\n{e.stderr}")
         if check:
@@ -60,6 +111,173 @@ def run_command(
             )
             sys.exit(1)
         return e
+    finally:
+        if TRACE_FILE:
+            _trace_command(command, started, result)
+
+
+def _run_streaming(command, command_input, check, process_env):
+    """
+    Runs a command from a parallel worker, relaying its combined output line by
+    line through print() so that it gets the worker's prefix.
+    """
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE if command_input else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env=process_env,
+    )
+    if command_input:
+        process.stdin.write(command_input)
+        process.stdin.close()
+    for line in process.stdout:
+        print(line, end="")
+    returncode = process.wait()
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    return subprocess.CompletedProcess(command, returncode)
+
+
+def run_in_parallel(function, items, jobs=1):
+    """
+    Runs `function(item)` for every item using a pool of `jobs` worker threads.
+
+    Each worker's output (including the output of the commands it runs) is
+    prefixed with `[item]`. A call fails if it raises or exits, or if it returns
+    False. The first failure stops all other workers before their next command.
+
+    Returns a dict mapping each item that was started to a tuple
+    (succeeded, elapsed_seconds), in the order of `items`. `succeeded` is None
+    for items that were stopped because another item failed.
+    """
+    results = {}
+    label_width = max(len(str(item)) for item in items)
+    _abort_parallel_run.clear()
+
+    def worker(item):
+        _thread_state.prefix = (
+            f"{colors.GRAY}[{str(item):<{label_width}}]{colors.ENDC} "
+        )
+        _thread_state.pending = ""
+        _thread_state.aborted = False
+        start = time.monotonic()
+        succeeded = False
+        try:
+            succeeded = function(item) is not False
+        finally:
+            if _thread_state.aborted:
+                succeeded = None
+            elif not succeeded:
+                _abort_parallel_run.set()
+            results[item] = (succeeded, time.monotonic() - start)
+            _thread_state.prefix = None
+
+    original_stdout = sys.stdout
+    sys.stdout = _PrefixedStdout(original_stdout)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+            futures = {executor.submit(worker, item): item for item in items}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except BaseException:
+                    # Already recorded as a failure by the worker itself.
+                    pass
+                if _abort_parallel_run.is_set():
+                    for pending in futures:
+                        pending.cancel()
+    finally:
+        sys.stdout = original_stdout
+        _abort_parallel_run.clear()
+
+    return {item: results[item] for item in items if item in results}
+
+
+# --- Command tracing (opt-in, see _trace_command) ---
+# Set NEPHELE_TRACE=/path/to/trace.jsonl to record every run_command() call.
+TRACE_FILE = os.environ.get("NEPHELE_TRACE")
+TRACE_TOP_COMMANDS = int(os.environ.get("NEPHELE_TRACE_TOP", "10"))
+_trace_records = []
+_trace_lock = threading.Lock()
+
+
+def _calling_function():
+    """Returns 'file.py:function' for the nearest caller outside this module."""
+    frame = sys._getframe(1)
+    while frame and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+def _output_bytes(output):
+    """Size of captured output; None when the output was not captured."""
+    if output is None:
+        return None
+    return len(output.encode() if isinstance(output, str) else output)
+
+
+def _trace_command(command, started, result):
+    """Appends a JSONL record for one run_command() call to TRACE_FILE."""
+    ended = time.time()
+    record = {
+        "argv": [str(arg) for arg in command],
+        "script": os.path.basename(sys.argv[0]),
+        "function": _calling_function(),
+        "start": started,
+        "end": ended,
+        "duration": round(ended - started, 3),
+        "exit_code": getattr(result, "returncode", None),
+        "stdout_bytes": _output_bytes(getattr(result, "stdout", None)),
+        "stderr_bytes": _output_bytes(getattr(result, "stderr", None)),
+    }
+    with _trace_lock:
+        if not _trace_records:
+            atexit.register(print_trace_report)
+        _trace_records.append(record)
+        with open(TRACE_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+def print_trace_report(top=TRACE_TOP_COMMANDS):
+    """Prints the slowest traced commands and the time spent per function."""
+    if not _trace_records:
+        return
+    print_color(colors.BLUE, f"\n--- Top {top} slowest commands ({TRACE_FILE}) ---")
+    slowest = sorted(_trace_records, key=lambda r: r["duration"], reverse=True)
+    for record in slowest[:top]:
+        command = " ".join(record["argv"])
+        if len(command) > 70:
+            command = command[:67] + "..."
+        print(f"  {record['duration']:8.1f}s  {command}")
+
+    by_function = {}
+    for record in _trace_records:
+        count, total = by_function.get(record["function"], (0, 0.0))
+        by_function[record["function"]] = (count + 1, total + record["duration"])
+    print_color(colors.BLUE, "\n--- Command time per function ---")
+    for function, (count, total) in sorted(
+        by_function.items(), key=lambda item: item[1][1], reverse=True
+    ):
+        print(f"  {function:<50} {count:5d} calls {total:8.1f}s")
+    total = sum(record["duration"] for record in _trace_records)
+    print(f"  {'Total':<50} {len(_trace_records):5d} calls {total:8.1f}s")
+
+
+def print_timing_summary(title, timings):
+    """Prints a table of (succeeded, elapsed_seconds) results keyed by name."""
+    print_color(colors.BLUE, f"\n--- {title} ---")
+    for name, (succeeded, elapsed) in timings.items():
+        if succeeded is None:
+            status, color = "ABORTED", colors.YELLOW
+        elif succeeded:
+            status, color = "OK", colors.GREEN
+        else:
+            status, color = "FAILED", colors.RED
+        print_color(color, f"  {name:<20} {status:<7} {elapsed:8.1f}s")
 
 
 def command_exists(command):
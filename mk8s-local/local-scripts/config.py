@@ -9,12 +9,70 @@ KUBE_VERSION_TAG = "v1.31.3"
 MEMBER_CLUSTERS = ["member1", "member2", "member3"]
 LXD_PROFILE_NAME = "microk8s"
 LXD_BRIDGE_NAME = "lxdbr0"
+# Set NEPHELE_LXD_IMAGE=nephele/ubuntu-22.04 to use the image imported from the
+# offline bundle.
+LXD_BASE_IMAGE = os.getenv("NEPHELE_LXD_IMAGE", "ubuntu:22.04")
+
+# --- MicroK8s inside member containers ---
+MICROK8S_CHANNEL = f"{KUBE_VERSION_TAG.lstrip('v').rsplit('.', 1)[0]}/stable"
+MICROK8S_ADDONS = ["dns", "hostpath-storage"]
+# Where install-bundle.py extracts the offline bundle. When it exists, the
+# scripts install from it instead of apt and upstream downloads.
+OFFLINE_BUNDLE_DIR = "/opt/nephele-bundle"
+# MicroK8s snap from the offline bundle; used for the members when present.
+OFFLINE_MICROK8S_SNAP_DIR = f"{OFFLINE_BUNDLE_DIR}/snaps/microk8s-1.31"
+
+# --- Golden image (see golden_image.py) ---
+GOLDEN_CONTAINER_NAME = "microk8s-golden"
+GOLDEN_SNAPSHOT_NAME = "ready"
+# Copy-on-write drivers are tried in order; "dir" is the (full copy) fallback.
+LXD_STORAGE_POOL = "microk8s-pool"
+LXD_STORAGE_DRIVERS = ["btrfs", "zfs", "dir"]
 
 # --- Host & Kubeconfig Paths ---
 HOST_KUBECONFIG = "/var/snap/microk8s/current/credentials/client.config"
 HOST_REGISTRY = "localhost:32000"
+# Digests of the images mirrored into HOST_REGISTRY by 2-setup-karmada.py
+IMAGE_MIRROR_MANIFEST = "/root/.cache/nephele/mirrored-images.json"
+IMAGE_MIRROR_JOBS = 4
 CONFIG_FILES_DIR = "/root"  # Directory where member configs will be saved
 
+# --- Pull-through registry mirrors (see registry_mirror.py) ---
+# registry -> (upstream URL, port of its mirror on the LXD_BRIDGE_NAME address).
+REGISTRY_MIRRORS = {
+    "docker.io": ("https://registry-1.docker.io", 5001),
+    "registry.k8s.io": ("https://registry.k8s.io", 5002),
+    "quay.io": ("https://quay.io", 5003),
+    "ghcr.io": ("https://ghcr.io", 5004),
+}
+REGISTRY_MIRROR_IMAGE = "registry:2"
+# Where MicroK8s' containerd looks for the hosts.toml of each registry.
+MEMBER_CERTS_DIR = "/var/snap/microk8s/current/args/certs.d"
+
+# --- Helm charts (see helm_cache.py) ---
+# chart id -> (chart, repository URL, version). Versions are pinned so that the
+# chart archives, and the manifests rendered from them, can be cached.
+HELM_CHARTS = {
+    "prometheus": (
+        "prometheus",
+        "https://prometheus-community.github.io/helm-charts",
+        "25.27.0",
+    ),
+}
+CHART_CACHE_DIR = "/root/.cache/nephele/charts"
+MANIFEST_STORE_DIR = "/root/.cache/nephele/manifests"
+OFFLINE_CHARTS_DIR = f"{OFFLINE_BUNDLE_DIR}/charts"
+CHART_OCI_REPOSITORY = f"oci://{HOST_REGISTRY}/charts"
+
+# --- Testbed snapshots (see testbed-snapshot.py) ---
+SNAPSHOT_DIR = "/root/.cache/nephele/snapshots"
+# Written by `karmadactl init`: the Karmada kubeconfig and certificates.
+KARMADA_CONFIG_DIR = "/etc/karmada"
+# `karmadactl init` runs the Karmada etcd on the host MicroK8s, with its data
+# in a hostPath volume (the default --etcd-storage-mode).
+KARMADA_ETCD_STATEFULSET = "etcd"
+KARMADA_ETCD_DATA_DIR = "/var/lib/karmada-etcd"
+
 
 # that points directly to the Karmada control plane.
 KARMADA_KUBECONFIG = "/etc/karmada/karmada-apiserver.config"
@@ -0,0 +1,292 @@
+"""
+Helpers for the "golden image" mode used by 1-create-clusters-on-lxd.py and
+add-cluster.py.
+
+Instead of launching every member container from the base image, waiting for
+cloud-init and downloading MicroK8s in each one, a single golden container
+(GOLDEN_CONTAINER_NAME) is prepared once: cloud-init is done and the MicroK8s
+snap is staged in GOLDEN_SNAP_DIR. It is then stopped and snapshotted, and new
+members are created with `lxc copy` from that snapshot, which is a
+near-instant copy-on-write clone on a btrfs or zfs storage pool.
+
+MicroK8s is deliberately not installed in the golden container: installing it
+initialises the cluster (CA, service-account keys, datastore and its
+kube-system namespace, whose UID Karmada uses as the cluster ID), and clones
+would share all of it. Each clone installs the staged snap, which needs no
+download, and so gets a cluster of its own.
+
+The golden container records a fingerprint of the base image and of the
+MicroK8s channel (derived from KUBE_VERSION_TAG), and is rebuilt automatically
+when either one changes.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+
+from common import run_command, print_color, colors
+from config import (
+    LXD_PROFILE_NAME,
+    LXD_BASE_IMAGE,
+    LXD_STORAGE_POOL,
+    LXD_STORAGE_DRIVERS,
+    MICROK8S_CHANNEL,
+    MICROK8S_ADDONS,
+    OFFLINE_BUNDLE_DIR,
+    OFFLINE_MICROK8S_SNAP_DIR,
+    GOLDEN_CONTAINER_NAME,
+    GOLDEN_SNAPSHOT_NAME,
+)
+
+FINGERPRINT_KEY = "user.microk8s-fingerprint"
+# Where the golden container keeps the MicroK8s snap and its assertion.
+GOLDEN_SNAP_DIR = "/var/cache/microk8s-snap"
+
+
+def golden_fingerprint():
+    """Returns a short hash of everything that goes into the golden image."""
+    recipe = json.dumps(
+        {
+            "base": LXD_BASE_IMAGE,
+            "channel": MICROK8S_CHANNEL,
+            "snap_dir": GOLDEN_SNAP_DIR,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(recipe.encode()).hexdigest()[:16]
+
+
+def container_exists(name):
+    """Checks whether an LXD instance with the given name exists."""
+    result = run_command(["lxc", "info", name], check=False, capture_output=True)
+    return result.returncode == 0
+
+
+def ensure_storage_pool():
+    """
+    Makes sure LXD_STORAGE_POOL exists, trying each driver of
+    LXD_STORAGE_DRIVERS in turn. Returns the driver of the pool.
+    """
+    result = run_command(
+        ["lxc", "storage", "list", "--format", "json"], capture_output=True
+    )
+    for pool in json.loads(result.stdout):
+        if pool["name"] == LXD_STORAGE_POOL:
+            print(
+                f"Storage pool '{LXD_STORAGE_POOL}' already exists ({pool['driver']})."
+            )
+            return pool["driver"]
+
+    for driver in LXD_STORAGE_DRIVERS:
+        print(f"Creating storage pool '{LXD_STORAGE_POOL}' with driver '{driver}'...")
+        result = run_command(
+            ["lxc", "storage", "create", LXD_STORAGE_POOL, driver],
+            check=False,
+            capture_output=True,
+        )
+        if result.returncode == 0:
+            if driver == "dir":
+                print_color(
+                    colors.YELLOW,
+                    "No copy-on-write driver available: clones will be full copies.",
+                )
+            return driver
+        print_color(colors.YELLOW, f"Driver '{driver}' is not usable here.")
+
+    print_color(
+        colors.RED, f"FATAL: Could not create storage pool '{LXD_STORAGE_POOL}'."
+    )
+    sys.exit(1)
+
+
+def lxc_exec(container_name, *command):
+    """Runs a command inside an LXD container."""
+    return run_command(["lxc", "exec", container_name, "--", *command])
+
+
+def import_offline_addon_images(container_name):
+    """
+    Imports the MicroK8s add-on images of the offline bundle (CNI, sandbox and
+    MICROK8S_ADDONS) into a container, so that they are not pulled.
+    """
+    manifest_path = os.path.join(OFFLINE_BUNDLE_DIR, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return
+    with open(manifest_path) as f:
+        images = json.load(f)["components"]["images"]
+    for image, entry in sorted(images.items()):
+        if "microk8s-addons" not in entry["groups"]:
+            continue
+        print(f"Importing {image} into {container_name}...")
+        path = os.path.join(OFFLINE_BUNDLE_DIR, "images", entry["file"])
+        remote_path = f"/tmp/{entry['file']}"
+        run_command(["lxc", "file", "push", path, f"{container_name}{remote_path}"])
+        lxc_exec(container_name, "microk8s", "ctr", "image", "import", remote_path)
+        lxc_exec(container_name, "rm", "-f", remote_path)
+
+
+def enable_microk8s_addons(container_name):
+    """Enables the MICROK8S_ADDONS inside a container."""
+    import_offline_addon_images(container_name)
+    print(f"Enabling addons in {container_name}: {', '.join(MICROK8S_ADDONS)}...")
+    for addon in MICROK8S_ADDONS:
+        lxc_exec(container_name, "sudo", "microk8s", "enable", addon)
+
+
+def stage_microk8s_snap(container_name, directory):
+    """
+    Puts the MicroK8s snap of MICROK8S_CHANNEL (or the one of the offline
+    bundle) and its assertion into a directory of a container.
+    """
+    lxc_exec(container_name, "mkdir", "-p", directory)
+    if os.path.isdir(OFFLINE_MICROK8S_SNAP_DIR):
+        print(f"Using the MicroK8s snap from {OFFLINE_MICROK8S_SNAP_DIR}.")
+        for pattern in ("*.assert", "*.snap"):
+            path = glob.glob(os.path.join(OFFLINE_MICROK8S_SNAP_DIR, pattern))[0]
+            run_command(["lxc", "file", "push", path, f"{container_name}{directory}/"])
+    else:
+        lxc_exec(
+            container_name,
+            "sh",
+            "-c",
+            f"snap wait system seed.loaded && cd {directory} "
+            f"&& snap download microk8s --channel={MICROK8S_CHANNEL}",
+        )
+
+
+def install_staged_microk8s(container_name, directory):
+    """Installs MicroK8s from the snap staged in a directory of a container."""
+    lxc_exec(
+        container_name,
+        "sh",
+        "-c",
+        f"snap wait system seed.loaded && snap ack {directory}/*.assert "
+        f"&& snap install {directory}/*.snap --classic",
+    )
+
+
+def install_microk8s(container_name):
+    """
+    Installs MicroK8s from MICROK8S_CHANNEL in a container (or from the offline
+    bundle), so that golden and non-golden members run the same Kubernetes.
+    """
+    print(f"Installing MicroK8s ({MICROK8S_CHANNEL}) in {container_name}...")
+    if os.path.isdir(OFFLINE_MICROK8S_SNAP_DIR):
+        stage_microk8s_snap(container_name, "/tmp/microk8s-snap")
+        install_staged_microk8s(container_name, "/tmp/microk8s-snap")
+    else:
+        lxc_exec(
+            container_name,
+            "sudo",
+            "snap",
+            "install",
+            "microk8s",
+            "--classic",
+            f"--channel={MICROK8S_CHANNEL}",
+        )
+
+
+def golden_image_is_current(fingerprint):
+    """Checks that the golden snapshot exists and matches the fingerprint."""
+    if not container_exists(GOLDEN_CONTAINER_NAME):
+        return False
+    result = run_command(
+        ["lxc", "config", "get", GOLDEN_CONTAINER_NAME, FINGERPRINT_KEY],
+        check=False,
+        capture_output=True,
+    )
+    if result.returncode != 0 or result.stdout.strip() != fingerprint:
+        return False
+    snapshot_url = (
+        f"/1.0/instances/{GOLDEN_CONTAINER_NAME}/snapshots/{GOLDEN_SNAPSHOT_NAME}"
+    )
+    result = run_command(
+        ["lxc", "query", snapshot_url], check=False, capture_output=True
+    )
+    return result.returncode == 0
+
+
+def build_golden_image(fingerprint):
+    """Builds the golden container from scratch and snapshots it."""
+    print_color(
+        colors.YELLOW,
+        f"\n>>> Building golden image '{GOLDEN_CONTAINER_NAME}' ({fingerprint})",
+    )
+    if container_exists(GOLDEN_CONTAINER_NAME):
+        print("Removing outdated golden container...")
+        run_command(["lxc", "delete", GOLDEN_CONTAINER_NAME, "--force"])
+
+    run_command(
+        [
+            "lxc",
+            "launch",
+            LXD_BASE_IMAGE,
+            GOLDEN_CONTAINER_NAME,
+            "--profile",
+            "default",
+            "--profile",
+            LXD_PROFILE_NAME,
+            "--storage",
+            LXD_STORAGE_POOL,
+        ]
+    )
+    lxc_exec(GOLDEN_CONTAINER_NAME, "cloud-init", "status", "--wait")
+
+    print(f"Staging MicroK8s ({MICROK8S_CHANNEL}) in {GOLDEN_SNAP_DIR}...")
+    stage_microk8s_snap(GOLDEN_CONTAINER_NAME, GOLDEN_SNAP_DIR)
+
+    # Clones must not share a machine-id; systemd regenerates an empty one at boot.
+    lxc_exec(GOLDEN_CONTAINER_NAME, "truncate", "-s", "0", "/etc/machine-id")
+    run_command(["lxc", "stop", GOLDEN_CONTAINER_NAME])
+    run_command(
+        ["lxc", "config", "set", GOLDEN_CONTAINER_NAME, FINGERPRINT_KEY, fingerprint]
+    )
+    run_command(["lxc", "snapshot", GOLDEN_CONTAINER_NAME, GOLDEN_SNAPSHOT_NAME])
+    print_color(colors.GREEN, f"✅ Golden image '{GOLDEN_CONTAINER_NAME}' is ready.")
+
+
+def ensure_golden_image():
+    """Builds the golden image, unless an up-to-date one already exists."""
+    print_color(colors.YELLOW, "\n--- Checking the MicroK8s golden image ---")
+    ensure_storage_pool()
+    fingerprint = golden_fingerprint()
+    if golden_image_is_current(fingerprint):
+        print(f"Golden image is up to date ({fingerprint}). Re-using.")
+        return
+    build_golden_image(fingerprint)
+
+
+def clone_member_from_golden_image(member_name):
+    """Creates (or re-uses) a member container as a clone of the golden image."""
+    print_color(colors.YELLOW, f"\n>>> Processing container: {member_name}")
+    if container_exists(member_name):
+        print(f"Container '{member_name}' already exists. Re-using.")
+        run_command(["lxc", "start", member_name], check=False, capture_output=True)
+    else:
+        print(f"Cloning {member_name} from the golden image...")
+        run_command(
+            [
+                "lxc",
+                "copy",
+                f"{GOLDEN_CONTAINER_NAME}/{GOLDEN_SNAPSHOT_NAME}",
+                member_name,
+                "--storage",
+                LXD_STORAGE_POOL,
+            ]
+        )
+        run_command(["lxc", "config", "unset", member_name, FINGERPRINT_KEY])
+        run_command(["lxc", "start", member_name])
+
+    # Skips the install when re-using a member that already has MicroK8s.
+    result = run_command(
+        ["lxc", "exec", member_name, "--", "which", "microk8s"],
+        check=False,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        print(f"Installing the staged MicroK8s snap in {member_name}...")
+        install_staged_microk8s(member_name, GOLDEN_SNAP_DIR)
+    lxc_exec(member_name, "sudo", "microk8s", "status", "--wait-ready")
+    enable_microk8s_addons(member_name)
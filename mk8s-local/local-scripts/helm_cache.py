@@ -0,0 +1,184 @@
+"""
+A local cache of Helm charts, and a store of the manifests rendered from them.
+
+Charts are pinned in HELM_CHARTS. The archive of a chart is looked up, in
+order, in CHART_CACHE_DIR, in the offline bundle, in the local OCI registry
+(CHART_OCI_REPOSITORY), and only then downloaded from its Helm repository, in
+which case it is also pushed to the local OCI registry.
+
+Charts are not installed with `helm install`: a chart is rendered once with
+`helm template` for a given release, namespace and values, and the manifests
+are stored in MANIFEST_STORE_DIR under a hash of all of these. Installs apply
+the stored manifests with `kubectl apply --server-side`, so a repeated install
+neither contacts a Helm repository nor renders templates again.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from common import run_command, print_color, colors
+from config import (
+    HELM_CHARTS,
+    CHART_CACHE_DIR,
+    MANIFEST_STORE_DIR,
+    OFFLINE_CHARTS_DIR,
+    CHART_OCI_REPOSITORY,
+)
+
+FIELD_MANAGER = "nephele-deploy"
+
+
+def chart_archive(chart_id):
+    """
+    Returns the path of the pinned archive of a chart, fetching it into the
+    cache if needed, or None if it could not be found anywhere.
+    """
+    chart, repo_url, version = HELM_CHARTS[chart_id]
+    file_name = f"{chart}-{version}.tgz"
+    path = os.path.join(CHART_CACHE_DIR, file_name)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+    offline_path = os.path.join(OFFLINE_CHARTS_DIR, file_name)
+    if os.path.exists(offline_path):
+        shutil.copy(offline_path, path)
+        return path
+
+    with tempfile.TemporaryDirectory(dir=CHART_CACHE_DIR) as download_dir:
+        pull = ["helm", "pull", "--version", version, "-d", download_dir]
+        result = run_command(
+            [*pull, f"{CHART_OCI_REPOSITORY}/{chart}", "--plain-http"],
+            check=False,
+            capture_output=True,
+        )
+        from_registry = result.returncode == 0
+        if not from_registry:
+            result = run_command([*pull, chart, "--repo", repo_url], check=False)
+            if result.returncode != 0:
+                return None
+        os.replace(os.path.join(download_dir, file_name), path)
+
+    if not from_registry:
+        # Best effort: the next hosts and runs get it from the local registry.
+        run_command(
+            ["helm", "push", path, CHART_OCI_REPOSITORY, "--plain-http"], check=False
+        )
+    return path
+
+
+def manifest_key(release, chart_id, namespace, values_yaml):
+    """Returns the hash of everything the rendered manifests depend on."""
+    helm_version = run_command(
+        ["helm", "version", "--short"], capture_output=True
+    ).stdout.strip()
+    inputs = json.dumps(
+        {
+            "chart": HELM_CHARTS[chart_id],
+            "release": release,
+            "namespace": namespace,
+            "values": values_yaml,
+            "helm": helm_version,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(inputs.encode()).hexdigest()[:16]
+
+
+def rendered_manifests(release, chart_id, namespace, values_yaml):
+    """
+    Returns the directory holding the CRDs (crds.yaml) and the other manifests
+    (manifest.yaml) of a release, rendering them on a cache miss. Returns None
+    if the chart is not available.
+    """
+    key = manifest_key(release, chart_id, namespace, values_yaml)
+    directory = os.path.join(MANIFEST_STORE_DIR, f"{release}-{key}")
+    if os.path.isdir(directory):
+        print(f"--> Using the manifests of {release} rendered earlier ({key}).")
+        return directory
+
+    archive = chart_archive(chart_id)
+    if archive is None:
+        return None
+    os.makedirs(MANIFEST_STORE_DIR, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=MANIFEST_STORE_DIR)
+    values_file = os.path.join(staging, "values.yaml")
+    with open(values_file, "w") as f:
+        f.write(values_yaml)
+    crds = run_command(["helm", "show", "crds", archive], capture_output=True)
+    manifest = run_command(
+        [
+            "helm",
+            "template",
+            release,
+            archive,
+            "--namespace",
+            namespace,
+            "--values",
+            values_file,
+            "--skip-tests",
+        ],
+        capture_output=True,
+    )
+    with open(os.path.join(staging, "crds.yaml"), "w") as f:
+        f.write(crds.stdout)
+    with open(os.path.join(staging, "manifest.yaml"), "w") as f:
+        f.write(manifest.stdout)
+    try:
+        os.rename(staging, directory)
+    except OSError:
+        # Rendered concurrently by another install: keep that one.
+        shutil.rmtree(staging)
+    return directory
+
+
+def apply_chart(release, chart_id, namespace, values_yaml, kubeconfig):
+    """
+    Installs (or updates) a release from its rendered manifests.
+    Returns False if the chart is not available.
+    """
+    directory = rendered_manifests(release, chart_id, namespace, values_yaml)
+    if directory is None:
+        print_color(colors.RED, f"❌ Chart '{chart_id}' is not available.")
+        return False
+
+    kubectl = ["kubectl", "--kubeconfig", kubeconfig]
+    apply = [*kubectl, "apply", "--server-side", "--force-conflicts"]
+    apply += [f"--field-manager={FIELD_MANAGER}"]
+    crds = os.path.join(directory, "crds.yaml")
+    if os.path.getsize(crds):
+        run_command([*apply, "-f", crds])
+        run_command(
+            [*kubectl, "wait", "--for=condition=Established", "-f", crds]
+            + ["--timeout=60s"]
+        )
+    run_command(
+        [*kubectl, "create", "namespace", namespace], check=False, capture_output=True
+    )
+    manifest = os.path.join(directory, "manifest.yaml")
+    run_command([*apply, "--namespace", namespace, "-f", manifest])
+    return True
+
+
+def delete_chart(release, chart_id, namespace, values_yaml, kubeconfig):
+    """Deletes the resources of a release applied by apply_chart()."""
+    key = manifest_key(release, chart_id, namespace, values_yaml)
+    manifest = os.path.join(MANIFEST_STORE_DIR, f"{release}-{key}", "manifest.yaml")
+    if os.path.exists(manifest):
+        run_command(
+            [
+                "kubectl",
+                "--kubeconfig",
+                kubeconfig,
+                "delete",
+                "--namespace",
+                namespace,
+                "--ignore-not-found",
+                "-f",
+                manifest,
+            ],
+            check=False,
+        )
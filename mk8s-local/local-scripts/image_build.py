@@ -0,0 +1,88 @@
+"""
+Builds the demo images with BuildKit, only when their sources changed.
+
+The builds run on a `docker-container` buildx builder on the host network,
+which keeps its layer cache in HOST_REGISTRY (`buildcache/<image>`, with
+`mode=max`) so that it survives builder and Docker resets, and loads the
+result into the local Docker (from where image_fanout.py streams it to the
+members).
+
+Each image is labelled with a fingerprint of its build context and
+Dockerfile: when the local image already has the fingerprint of the sources,
+nothing is built.
+"""
+
+import hashlib
+import os
+
+from common import run_command, print_color, colors
+from config import HOST_REGISTRY
+
+BUILDER = "nephele"
+BUILDKITD_CONFIG = "/etc/buildkit/buildkitd.toml"
+FINGERPRINT_LABEL = "io.nephele.fingerprint"
+IGNORED_DIRECTORIES = {".git", "__pycache__"}
+
+
+def ensure_builder():
+    """Creates the buildx builder, unless it exists. Returns True if it works."""
+    os.makedirs(os.path.dirname(BUILDKITD_CONFIG), exist_ok=True)
+    with open(BUILDKITD_CONFIG, "w") as f:
+        f.write(f'[registry."{HOST_REGISTRY}"]\n  http = true\n  insecure = true\n')
+    inspect = ["docker", "buildx", "inspect", BUILDER]
+    if run_command(inspect, check=False, capture_output=True).returncode != 0:
+        command = ["docker", "buildx", "create", "--name", BUILDER]
+        command += ["--driver", "docker-container", "--driver-opt", "network=host"]
+        command += ["--buildkitd-config", BUILDKITD_CONFIG]
+        run_command(command, check=False)
+    return run_command([*inspect, "--bootstrap"], check=False).returncode == 0
+
+
+def context_fingerprint(context, dockerfile):
+    """A hash of every file of the build context, and of the Dockerfile."""
+    digest = hashlib.sha256()
+    for root, directories, files in os.walk(context):
+        directories[:] = sorted(set(directories) - IGNORED_DIRECTORIES)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, context).encode() + b"\0")
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    with open(dockerfile, "rb") as f:
+        digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+def local_fingerprint(image):
+    """Returns the fingerprint label of a local image, or None."""
+    result = run_command(
+        ["docker", "image", "inspect", "-f"]
+        + [f'{{{{ index .Config.Labels "{FINGERPRINT_LABEL}" }}}}', image],
+        check=False,
+        capture_output=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def build_image(image, context, dockerfile=None):
+    """
+    Builds `image` from `context` into the local Docker, unless it is up to
+    date. Returns True if the image is there.
+    """
+    dockerfile = dockerfile or os.path.join(context, "Dockerfile")
+    fingerprint = context_fingerprint(context, dockerfile)
+    if local_fingerprint(image) == fingerprint:
+        print(f"--> {image} is up to date ({fingerprint}).")
+        return True
+    if not ensure_builder():
+        print_color(colors.RED, f"The buildx builder '{BUILDER}' does not work.")
+        return False
+
+    name = image.rsplit("/", 1)[-1].split(":")[0]
+    cache = f"{HOST_REGISTRY}/buildcache/{name}"
+    command = ["docker", "buildx", "build", "--builder", BUILDER, "--load"]
+    command += ["--tag", image, "--file", dockerfile]
+    command += ["--label", f"{FINGERPRINT_LABEL}={fingerprint}"]
+    command += ["--cache-from", f"type=registry,ref={cache}"]
+    command += ["--cache-to", f"type=registry,ref={cache},mode=max,ignore-error=true"]
+    return run_command([*command, context], check=False).returncode == 0
@@ -0,0 +1,154 @@
+"""
+Distributes a local Docker image to the containerd of the member clusters.
+
+A single `docker save` is streamed, through pipes, into `microk8s images
+import` in every member at once: the image is never written to the host disk,
+and is read from Docker once whatever the number of members.
+
+After an import, the image is labelled in the member's containerd with the
+Docker image ID, so the members that already have this exact image are
+skipped the next time.
+"""
+
+import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from common import run_command, print_color, colors
+
+IMAGE_ID_LABEL = "io.nephele.image-id"
+CHUNK_SIZE = 1024 * 1024
+
+
+def containerd_reference(image):
+    """The name containerd gives to an image imported with a Docker name."""
+    name = image if ":" in image.rsplit("/", 1)[-1] else f"{image}:latest"
+    domain = name.split("/", 1)[0]
+    if "/" not in name:
+        return f"docker.io/library/{name}"
+    if "." not in domain and ":" not in domain and domain != "localhost":
+        return f"docker.io/{name}"
+    return name
+
+
+def local_image_id(image):
+    """Returns the Docker image ID of a local image, or None."""
+    result = run_command(
+        ["docker", "image", "inspect", "-f", "{{.Id}}", image],
+        check=False,
+        capture_output=True,
+    )
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def member_image_id(member, image):
+    """Returns the image ID a member's containerd has for `image`, or None."""
+    reference = containerd_reference(image)
+    result = run_command(
+        ["lxc", "exec", member, "--", "microk8s", "ctr", "-n", "k8s.io"]
+        + ["images", "ls", f"name=={reference}"],
+        check=False,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+    match = re.search(rf"{re.escape(IMAGE_ID_LABEL)}=([^,\s]+)", result.stdout)
+    return match.group(1) if match else None
+
+
+def _relay_output(member, stream):
+    for line in stream:
+        print(f"{colors.GRAY}[{member}]{colors.ENDC} {line}", end="")
+
+
+def stream_image(image, members):
+    """
+    Streams `docker save` into `microk8s images import` on all `members` at
+    once. Returns the list of members where the import failed.
+    """
+    print(f"--> Streaming {image} to {', '.join(members)}...")
+    save = subprocess.Popen(["docker", "save", image], stdout=subprocess.PIPE)
+    imports, relays = {}, []
+    for member in members:
+        process = subprocess.Popen(
+            ["lxc", "exec", member, "--", "microk8s", "images", "import"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=False,
+        )
+        imports[member] = process
+        relay = threading.Thread(
+            target=_relay_output,
+            args=(member, (line.decode(errors="replace") for line in process.stdout)),
+        )
+        relay.start()
+        relays.append(relay)
+
+    # Each chunk goes to every member still importing: a slow member slows
+    # the stream down instead of buffering the image anywhere.
+    failed = set()
+    for chunk in iter(lambda: save.stdout.read(CHUNK_SIZE), b""):
+        for member, process in imports.items():
+            if member in failed:
+                continue
+            try:
+                process.stdin.write(chunk)
+            except BrokenPipeError:
+                failed.add(member)
+    for member, process in imports.items():
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            failed.add(member)
+
+    if save.wait() != 0:
+        failed = set(members)
+    for member, process in imports.items():
+        if process.wait() != 0:
+            failed.add(member)
+    for relay in relays:
+        relay.join()
+    return sorted(failed)
+
+
+def label_image(member, image, image_id):
+    run_command(
+        ["lxc", "exec", member, "--", "microk8s", "ctr", "-n", "k8s.io"]
+        + ["images", "label", containerd_reference(image)]
+        + [f"{IMAGE_ID_LABEL}={image_id}"],
+        check=False,
+        capture_output=True,
+    )
+
+
+def distribute_image(image, members):
+    """
+    Makes sure every member's containerd has the local Docker image `image`.
+    Returns True if all of them have it.
+    """
+    image_id = local_image_id(image)
+    if image_id is None:
+        print_color(colors.RED, f"Image '{image}' not found in the local Docker.")
+        return False
+
+    with ThreadPoolExecutor(max_workers=len(members)) as pool:
+        member_ids = dict(
+            zip(members, pool.map(lambda m: member_image_id(m, image), members))
+        )
+    up_to_date = [m for m in members if member_ids[m] == image_id]
+    missing = [m for m in members if m not in up_to_date]
+    if up_to_date:
+        print(f"--> Already up to date: {', '.join(up_to_date)}")
+    if not missing:
+        return True
+
+    failed = stream_image(image, missing)
+    for member in missing:
+        if member not in failed:
+            label_image(member, image, image_id)
+    if failed:
+        print_color(colors.RED, f"Import failed on: {', '.join(failed)}")
+        return False
+    return True
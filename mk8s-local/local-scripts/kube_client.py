@@ -0,0 +1,369 @@
+"""
+A small in-process client for the Kubernetes API (and the Karmada API).
+
+Running `kubectl` for every query means a new process that re-reads its
+kubeconfig, redoes the TLS handshake and re-runs API discovery. This client
+loads each kubeconfig once, keeps a pool of keep-alive HTTPS connections per
+cluster, and caches discovery, so repeated queries (verifications, waits)
+cost a single request each.
+
+    client = member_client("member1")
+    service = client.get("v1", "Service", "my-service", namespace="default")
+    for event_type, pod in client.watch("v1", "Pod", namespace="default"):
+        ...
+
+Kubeconfigs are read with `kubectl config view --raw --flatten -o json` (one
+process per cluster, the first time it is used), so that they are interpreted
+exactly as kubectl does.
+"""
+
+import base64
+import http.client
+import json
+import os
+import queue
+import ssl
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from common import run_command
+from config import KARMADA_KUBECONFIG, HOST_KUBECONFIG, CONFIG_FILES_DIR
+
+REQUEST_TIMEOUT = 30
+FIELD_MANAGER = "nephele-deploy"
+APPLY_PATCH_CONTENT_TYPE = "application/apply-patch+yaml"
+# Requests that can be sent again if the connection fails before the response.
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+
+
+class KubeApiError(Exception):
+    """An error status returned by the Kubernetes API server."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class KubeClient:
+    """
+    A client for the cluster of one kubeconfig (its current context, unless
+    `context` is given). Safe to share between threads.
+    """
+
+    def __init__(self, kubeconfig, context=None):
+        self.kubeconfig = kubeconfig
+        server, self._ssl_context, self._headers = _load_kubeconfig(kubeconfig, context)
+        url = urllib.parse.urlsplit(server)
+        self._host = url.hostname
+        self._port = url.port or 443
+        self._path_prefix = url.path.rstrip("/")
+        self._idle_connections = queue.LifoQueue()
+        self._discovery = {}
+        self._discovery_lock = threading.Lock()
+
+    # --- Connections ---
+
+    def _new_connection(self, timeout=REQUEST_TIMEOUT):
+        return http.client.HTTPSConnection(
+            self._host, self._port, context=self._ssl_context, timeout=timeout
+        )
+
+    def _url(self, path, params=None):
+        params = {key: value for key, value in (params or {}).items() if value}
+        query = f"?{urllib.parse.urlencode(params)}" if params else ""
+        return f"{self._path_prefix}{path}{query}"
+
+    def request(self, method, path, params=None, body=None, content_type=None):
+        """
+        Sends a request on a pooled connection and returns the decoded JSON
+        response. Raises KubeApiError for error statuses and OSError if the
+        API server cannot be reached or the connection fails.
+        """
+        headers = dict(self._headers, Accept="application/json")
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers["Content-Type"] = content_type or "application/json"
+
+        # An idle keep-alive connection may have been closed by the server:
+        # retry once on a fresh connection, if the request is idempotent (a
+        # server-side apply is). Others may have been applied already.
+        retry = method in IDEMPOTENT_METHODS or content_type == APPLY_PATCH_CONTENT_TYPE
+        for attempt in range(2 if retry else 1):
+            try:
+                connection = self._idle_connections.get_nowait()
+            except queue.Empty:
+                connection = self._new_connection()
+            try:
+                connection.request(
+                    method, self._url(path, params), body=payload, headers=headers
+                )
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, ConnectionError) as e:
+                connection.close()
+                error = e
+                continue
+            except OSError:
+                connection.close()
+                raise
+            self._idle_connections.put(connection)
+            break
+        else:
+            raise ConnectionError(f"{method} {path} failed: {error!r}") from error
+
+        if response.status >= 400:
+            raise KubeApiError(response.status, _error_message(data))
+        return json.loads(data) if data else {}
+
+    # --- Discovery ---
+
+    def api_resources(self, api_version):
+        """
+        Returns the resources served for an API version, as a dict
+        {kind: (plural_name, namespaced)}. Cached after the first success.
+        """
+        with self._discovery_lock:
+            if api_version not in self._discovery:
+                path = "/api/v1" if api_version == "v1" else f"/apis/{api_version}"
+                resources = self.request("GET", path).get("resources", [])
+                self._discovery[api_version] = {
+                    resource["kind"]: (resource["name"], resource["namespaced"])
+                    for resource in resources
+                    if "/" not in resource["name"]
+                }
+            return self._discovery[api_version]
+
+    def resource_path(self, api_version, kind, name=None, namespace=None):
+        """Returns the API path of a resource (or of a collection of them)."""
+        try:
+            plural, namespaced = self.api_resources(api_version)[kind]
+        except KeyError:
+            raise KubeApiError(404, f"{kind} is not served in {api_version}")
+        base = "/api/v1" if api_version == "v1" else f"/apis/{api_version}"
+        if namespaced and namespace:
+            base += f"/namespaces/{namespace}"
+        path = f"{base}/{plural}"
+        return f"{path}/{name}" if name else path
+
+    # --- Helpers ---
+
+    def get(self, api_version, kind, name, namespace=None):
+        """Returns a resource, or None if it does not exist."""
+        try:
+            return self.request(
+                "GET", self.resource_path(api_version, kind, name, namespace)
+            )
+        except KubeApiError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def list(self, api_version, kind, namespace=None, label_selector=None):
+        """Returns the items of a resource kind (in all namespaces by default)."""
+        return self.list_with_version(api_version, kind, namespace, label_selector)[0]
+
+    def list_with_version(
+        self,
+        api_version,
+        kind,
+        namespace=None,
+        label_selector=None,
+        field_selector=None,
+    ):
+        """Returns (items, resourceVersion); the version can start a watch."""
+        result = self.request(
+            "GET",
+            self.resource_path(api_version, kind, namespace=namespace),
+            params={"labelSelector": label_selector, "fieldSelector": field_selector},
+        )
+        return result.get("items", []), result["metadata"].get("resourceVersion")
+
+    def apply(self, manifest, field_manager=FIELD_MANAGER):
+        """Creates or updates a resource with server-side apply."""
+        metadata = manifest["metadata"]
+        path = self.resource_path(
+            manifest["apiVersion"],
+            manifest["kind"],
+            metadata["name"],
+            metadata.get("namespace", "default"),
+        )
+        return self.request(
+            "PATCH",
+            path,
+            params={"fieldManager": field_manager, "force": "true"},
+            body=manifest,
+            content_type=APPLY_PATCH_CONTENT_TYPE,
+        )
+
+    def delete(self, api_version, kind, name, namespace=None):
+        """Deletes a resource. Returns False if it did not exist."""
+        try:
+            self.request(
+                "DELETE", self.resource_path(api_version, kind, name, namespace)
+            )
+        except KubeApiError as e:
+            if e.status == 404:
+                return False
+            raise
+        return True
+
+    def watch(
+        self,
+        api_version,
+        kind,
+        namespace=None,
+        label_selector=None,
+        field_selector=None,
+        resource_version=None,
+        timeout=REQUEST_TIMEOUT,
+    ):
+        """
+        Yields (event_type, object) for the changes of a resource kind, for
+        up to `timeout` seconds. Uses its own connection, outside the pool.
+        """
+        path = self._url(
+            self.resource_path(api_version, kind, namespace=namespace),
+            params={
+                "watch": "1",
+                "labelSelector": label_selector,
+                "fieldSelector": field_selector,
+                "resourceVersion": resource_version,
+                "timeoutSeconds": str(max(1, int(timeout))),
+                "allowWatchBookmarks": "true",
+            },
+        )
+        connection = self._new_connection(timeout=timeout + REQUEST_TIMEOUT)
+        try:
+            connection.request("GET", path, headers=self._headers)
+            response = connection.getresponse()
+            if response.status >= 400:
+                raise KubeApiError(response.status, _error_message(response.read()))
+            while line := response.readline():
+                event = json.loads(line)
+                if event["type"] == "ERROR":
+                    status = event["object"]
+                    raise KubeApiError(status.get("code"), status.get("message"))
+                yield event["type"], event["object"]
+        except http.client.HTTPException as e:
+            raise ConnectionError(f"Watch of {kind} failed: {e!r}") from e
+        finally:
+            connection.close()
+
+    def wait_for(self, api_version, kind, name, predicate, namespace=None, timeout=60):
+        """
+        Watches a single resource until `predicate(object)` is true.
+        Returns the object, or None if `timeout` seconds pass first.
+        """
+        deadline = time.monotonic() + timeout
+        field_selector = f"metadata.name={name}"
+        while (remaining := deadline - time.monotonic()) > 0:
+            items, version = self.list_with_version(
+                api_version, kind, namespace, field_selector=field_selector
+            )
+            if items and predicate(items[0]):
+                return items[0]
+            try:
+                for event_type, obj in self.watch(
+                    api_version,
+                    kind,
+                    namespace,
+                    field_selector=field_selector,
+                    resource_version=version,
+                    timeout=remaining,
+                ):
+                    if event_type in ("ADDED", "MODIFIED") and predicate(obj):
+                        return obj
+            except KubeApiError as e:
+                # 410 Gone: the watched version expired, list again.
+                if e.status != 410:
+                    raise
+        return None
+
+
+def _error_message(data):
+    try:
+        return json.loads(data).get("message", "")
+    except (ValueError, AttributeError):
+        return data.decode(errors="replace")[:200]
+
+
+def _load_kubeconfig(kubeconfig, context=None):
+    """
+    Returns (server_url, ssl_context, headers) for a kubeconfig context.
+    Supports client certificates and bearer tokens.
+    """
+    command = ["kubectl", "config", "view", "--raw", "--flatten", "--minify"]
+    command += ["-o", "json", "--kubeconfig", kubeconfig]
+    if context:
+        command += ["--context", context]
+    result = run_command(command, check=False, capture_output=True)
+    if result.returncode != 0:
+        raise OSError(f"Cannot read kubeconfig '{kubeconfig}': {result.stderr}")
+    config = json.loads(result.stdout)
+    cluster = config["clusters"][0]["cluster"]
+    user = config["users"][0]["user"] if config.get("users") else {}
+
+    ssl_context = ssl.create_default_context()
+    if cluster.get("insecure-skip-tls-verify"):
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+    elif cluster.get("certificate-authority-data"):
+        ssl_context.load_verify_locations(
+            cadata=base64.b64decode(cluster["certificate-authority-data"]).decode()
+        )
+
+    if user.get("client-certificate-data"):
+        # ssl only loads client certificates from files.
+        with tempfile.TemporaryDirectory() as directory:
+            cert_file = os.path.join(directory, "client.crt")
+            key_file = os.path.join(directory, "client.key")
+            for path, key in [
+                (cert_file, "client-certificate-data"),
+                (key_file, "client-key-data"),
+            ]:
+                with open(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600), "wb") as f:
+                    f.write(base64.b64decode(user[key]))
+            ssl_context.load_cert_chain(cert_file, key_file)
+
+    headers = {"Connection": "keep-alive"}
+    if user.get("token"):
+        headers["Authorization"] = f"Bearer {user['token']}"
+    elif user.get("username"):
+        credentials = f"{user['username']}:{user.get('password', '')}"
+        headers["Authorization"] = (
+            f"Basic {base64.b64encode(credentials.encode()).decode()}"
+        )
+    return cluster["server"], ssl_context, headers
+
+
+# --- Shared clients, one per kubeconfig ---
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(kubeconfig):
+    """Returns the shared client of a kubeconfig, creating it on first use."""
+    with _clients_lock:
+        if kubeconfig not in _clients:
+            _clients[kubeconfig] = KubeClient(kubeconfig)
+        return _clients[kubeconfig]
+
+
+def karmada_client():
+    """The client of the Karmada API server."""
+    return get_client(KARMADA_KUBECONFIG)
+
+
+def host_client():
+    """The client of the host MicroK8s cluster (where Karmada runs)."""
+    return get_client(HOST_KUBECONFIG)
+
+
+def member_client(member_name):
+    """The client of a member cluster, from its kubeconfig in CONFIG_FILES_DIR."""
+    return get_client(os.path.join(CONFIG_FILES_DIR, f"{member_name}.config"))
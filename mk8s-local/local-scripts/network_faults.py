@@ -0,0 +1,110 @@
+"""
+Network faults for the member clusters, with `tc netem` (used by
+chaos-monkey.py).
+
+A member container is attached to LXD_BRIDGE_NAME through a veth pair, whose
+host-side end carries all of its traffic: with the Karmada host (API server
+proxies, karmada-agent, image pulls from the host registry) and with the
+other members. The faults are applied on that host-side end, in both
+directions: on its egress (traffic to the member) directly, and on its
+ingress (traffic from the member) through an IFB device the ingress traffic
+is redirected to, since netem only shapes egress traffic.
+
+Delays and losses apply in each direction, so a round trip gets twice the
+delay.
+"""
+
+import json
+
+from common import run_command
+from config import LXD_BRIDGE_NAME
+
+
+def member_veth(cluster):
+    """
+    Returns the host-side interface of the member's NIC on LXD_BRIDGE_NAME,
+    or None if the member is not running or not on that bridge.
+    """
+    result = run_command(
+        ["lxc", "query", f"/1.0/instances/{cluster}"], check=False, capture_output=True
+    )
+    if result.returncode != 0:
+        return None
+    devices = json.loads(result.stdout).get("expanded_devices", {})
+    nics = [
+        device.get("name", name)
+        for name, device in devices.items()
+        if device.get("type") == "nic"
+        and LXD_BRIDGE_NAME in (device.get("network"), device.get("parent"))
+    ]
+    if not nics:
+        return None
+
+    result = run_command(
+        ["lxc", "query", f"/1.0/instances/{cluster}/state"],
+        check=False,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+    network = json.loads(result.stdout).get("network") or {}
+    return network.get(nics[0], {}).get("host_name") or None
+
+
+def ifb_device(cluster):
+    # Interface names are limited to 15 characters.
+    return f"ifb-{cluster}"[:15]
+
+
+def netem_options(params):
+    """The netem options of a fault's parameters."""
+    options = []
+    if params.get("delay_ms"):
+        options += ["delay", f"{params['delay_ms']}ms"]
+        if params.get("jitter_ms"):
+            options += [f"{params['jitter_ms']}ms", "distribution", "normal"]
+    if params.get("loss_percent"):
+        options += ["loss", f"{params['loss_percent']}%"]
+    if params.get("rate"):
+        options += ["rate", params["rate"]]
+    return options
+
+
+def apply_netem(cluster, params):
+    """Applies netem with `params` to all the traffic of a member."""
+    veth = member_veth(cluster)
+    if veth is None:
+        return False
+    ifb = ifb_device(cluster)
+    options = netem_options(params)
+    commands = [
+        ["tc", "qdisc", "replace", "dev", veth, "root", "netem", *options],
+        ["ip", "link", "add", ifb, "type", "ifb"],
+        ["ip", "link", "set", ifb, "up"],
+        ["tc", "qdisc", "replace", "dev", ifb, "root", "netem", *options],
+        ["tc", "qdisc", "add", "dev", veth, "handle", "ffff:", "ingress"],
+        ["tc", "filter", "add", "dev", veth, "parent", "ffff:", "matchall"]
+        + ["action", "mirred", "egress", "redirect", "dev", ifb],
+    ]
+    for command in commands:
+        if run_command(command, check=False).returncode != 0:
+            clear_netem(cluster, params)
+            return False
+    return True
+
+
+def clear_netem(cluster, params=None):
+    """Removes the network faults of a member. Returns False if it is gone."""
+    veth = member_veth(cluster)
+    # Best effort: any of these may not exist (e.g. after a partial apply).
+    if veth is not None:
+        for parent in ("root", "ingress"):
+            run_command(
+                ["tc", "qdisc", "del", "dev", veth, parent],
+                check=False,
+                capture_output=True,
+            )
+    run_command(
+        ["ip", "link", "del", ifb_device(cluster)], check=False, capture_output=True
+    )
+    return veth is not None
@@ -0,0 +1,199 @@
+"""
+Shared helpers to wait for something to become ready, without fixed sleeps.
+
+Each wait returns as soon as its condition holds. Kubernetes conditions are
+checked with `kubectl wait`, which watches the resource and returns on the
+first matching event; everything else is polled with a capped exponential
+backoff with random jitter (up to 1s, 2s, 4s... capped at `max_delay`).
+
+Resources can also be watched in-process with wait_for_object().
+
+Every wait is timed and recorded, so scripts can show where their time went
+with print_wait_summary().
+"""
+
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from common import run_command, print_color, colors
+from kube_client import KubeApiError
+
+DEFAULT_TIMEOUT = 180
+INITIAL_DELAY = 1.0
+MAX_DELAY = 15.0
+
+# (description, succeeded, elapsed_seconds) for every wait, in order.
+_waits = []
+
+
+def backoff_delays(initial_delay=INITIAL_DELAY, max_delay=MAX_DELAY):
+    """Yields capped exponential backoff delays, with random jitter."""
+    ceiling = initial_delay
+    while True:
+        yield random.uniform(initial_delay / 2, ceiling)
+        ceiling = min(ceiling * 2, max_delay)
+
+
+def wait_until(
+    description,
+    probe,
+    timeout=DEFAULT_TIMEOUT,
+    initial_delay=INITIAL_DELAY,
+    max_delay=MAX_DELAY,
+):
+    """
+    Calls `probe()` until it returns a truthy value or `timeout` seconds pass.
+    Returns the value of the successful probe, or None on timeout.
+    """
+    print_color(colors.YELLOW, f"--> Waiting for {description} (up to {timeout}s)...")
+    start = time.monotonic()
+    deadline = start + timeout
+    delays = backoff_delays(initial_delay, max_delay)
+    while True:
+        result = probe()
+        elapsed = time.monotonic() - start
+        if result:
+            _record_wait(description, True, elapsed)
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(next(delays), remaining))
+
+    _record_wait(description, False, elapsed)
+    return None
+
+
+def _record_wait(description, succeeded, elapsed):
+    if succeeded:
+        print_color(colors.GREEN, f"✅ {description}: ready after {elapsed:.1f}s.")
+    else:
+        print_color(colors.RED, f"❌ {description}: not ready after {elapsed:.1f}s.")
+    _waits.append((description, succeeded, elapsed))
+
+
+def wait_for_command(description, command, timeout=DEFAULT_TIMEOUT, env=None):
+    """
+    Waits until `command` exits with status 0.
+    Returns its CompletedProcess (with the captured output), or None on timeout.
+    """
+
+    def probe():
+        result = run_command(command, check=False, env=env, capture_output=True)
+        return result if result.returncode == 0 else None
+
+    return wait_until(description, probe, timeout=timeout)
+
+
+def kubectl_wait(
+    description,
+    resources,
+    condition,
+    namespace=None,
+    kubeconfig=None,
+    context=None,
+    selector=None,
+    timeout=DEFAULT_TIMEOUT,
+    kubectl=("kubectl",),
+):
+    """
+    Waits with `kubectl wait --for=<condition>` (e.g. "condition=Available" or
+    "jsonpath={.status.phase}=Running") on one or more resources. Resources
+    that do not exist yet are retried with backoff until the deadline.
+    Returns True if the condition was met.
+    """
+    if isinstance(resources, str):
+        resources = [resources]
+    deadline = time.monotonic() + timeout
+    base_command = [*kubectl, "wait", *resources, f"--for={condition}"]
+    if namespace:
+        base_command += ["-n", namespace]
+    if context:
+        base_command += ["--context", context]
+    if selector:
+        base_command += ["-l", selector]
+    env = {"KUBECONFIG": kubeconfig} if kubeconfig else None
+
+    def probe():
+        remaining = max(1, int(deadline - time.monotonic()))
+        result = run_command(
+            [*base_command, f"--timeout={remaining}s"],
+            check=False,
+            env=env,
+            capture_output=True,
+        )
+        return result.returncode == 0
+
+    return bool(wait_until(description, probe, timeout=timeout))
+
+
+def wait_for_object(
+    description,
+    client,
+    api_version,
+    kind,
+    name,
+    predicate,
+    namespace=None,
+    timeout=DEFAULT_TIMEOUT,
+):
+    """
+    Waits until `predicate(object)` is true for a resource, by watching it
+    through a kube_client.KubeClient (no polling, no kubectl process).
+    Returns the object, or None on timeout or if the API is unreachable.
+    """
+    print_color(colors.YELLOW, f"--> Waiting for {description} (up to {timeout}s)...")
+    start = time.monotonic()
+    try:
+        obj = client.wait_for(
+            api_version, kind, name, predicate, namespace=namespace, timeout=timeout
+        )
+    except (KubeApiError, OSError) as e:
+        print_color(colors.RED, f"    API error: {e}")
+        obj = None
+    _record_wait(description, obj is not None, time.monotonic() - start)
+    return obj
+
+
+def http_status(url, request_timeout=5):
+    """Returns the HTTP status code of a GET on `url`, or None if unreachable."""
+    try:
+        with urllib.request.urlopen(url, timeout=request_timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (OSError, ValueError):
+        return None
+
+
+def wait_for_http(description, url, timeout=DEFAULT_TIMEOUT, expected_status=200):
+    """Waits until a GET on `url` answers with `expected_status`."""
+    return bool(
+        wait_until(
+            description,
+            lambda: http_status(url) == expected_status,
+            timeout=timeout,
+        )
+    )
+
+
+def wait_or_exit(ready, message):
+    """Exits with a FATAL message if a wait did not succeed."""
+    if not ready:
+        print_color(colors.RED, f"FATAL: {message}")
+        sys.exit(1)
+
+
+def print_wait_summary(title="Readiness waits"):
+    """Prints how long each wait of this run took."""
+    if not _waits:
+        return
+    print_color(colors.BLUE, f"\n--- {title} ---")
+    for description, succeeded, elapsed in _waits:
+        status, color = ("OK", colors.GREEN) if succeeded else ("TIMEOUT", colors.RED)
+        print_color(color, f"  {description:<50} {status:<7} {elapsed:8.1f}s")
+    total = sum(elapsed for _, _, elapsed in _waits)
+    print(f"  {'Total time spent waiting':<50} {'':<7} {total:8.1f}s")
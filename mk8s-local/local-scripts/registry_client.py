@@ -0,0 +1,95 @@
+"""
+A minimal, dependency-free client for the Docker Registry HTTP API v2.
+
+It only answers the question "what is the manifest digest behind this image
+reference?", without pulling anything. Anonymous bearer-token auth (as used by
+Docker Hub) is handled transparently, and registries on localhost are reached
+over plain HTTP, like the MicroK8s registry at HOST_REGISTRY.
+"""
+
+import json
+import re
+import urllib.error
+import urllib.parse
+import urllib.request
+
+DOCKER_HUB_REGISTRY = "registry-1.docker.io"
+MANIFEST_MEDIA_TYPES = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+REQUEST_TIMEOUT = 30
+
+
+def parse_image_reference(image):
+    """
+    Splits an image reference into (registry, repository, tag).
+    Example: 'docker.io/karmada/karmada-agent:v1.14.2'
+          -> ('registry-1.docker.io', 'karmada/karmada-agent', 'v1.14.2')
+    """
+    name, _, tag = image.rpartition(":")
+    if not name or "/" in tag:
+        name, tag = image, "latest"
+    first, _, rest = name.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        registry, repository = first, rest
+    else:
+        registry, repository = "docker.io", name
+    if registry == "docker.io":
+        registry = DOCKER_HUB_REGISTRY
+        if "/" not in repository:
+            repository = f"library/{repository}"
+    return registry, repository, tag
+
+
+def registry_base_url(registry):
+    """Returns the base URL of a registry, using HTTP for local ones."""
+    host = registry.split(":")[0]
+    scheme = "http" if host in ("localhost", "127.0.0.1") else "https"
+    return f"{scheme}://{registry}"
+
+
+def _fetch_bearer_token(challenge):
+    """Gets an anonymous token for a 'WWW-Authenticate: Bearer ...' challenge."""
+    params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+    realm = params.pop("realm", None)
+    if not realm:
+        return None
+    url = f"{realm}?{urllib.parse.urlencode(params)}"
+    with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT) as response:
+        payload = json.load(response)
+    return payload.get("token") or payload.get("access_token")
+
+
+def manifest_digest(image):
+    """
+    Returns the manifest digest ('sha256:...') of an image reference, or None
+    if the image does not exist in its registry.
+    Raises OSError (URLError) if the registry cannot be reached.
+    """
+    registry, repository, tag = parse_image_reference(image)
+    url = f"{registry_base_url(registry)}/v2/{repository}/manifests/{tag}"
+    headers = {"Accept": MANIFEST_MEDIA_TYPES}
+
+    for _ in range(2):
+        request = urllib.request.Request(url, headers=headers, method="HEAD")
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                return response.headers.get("Docker-Content-Digest")
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            challenge = e.headers.get("WWW-Authenticate", "")
+            if e.code != 401 or "Authorization" in headers:
+                raise
+            if not challenge.lower().startswith("bearer"):
+                raise
+            token = _fetch_bearer_token(challenge)
+            if not token:
+                raise
+            headers["Authorization"] = f"Bearer {token}"
+    return None
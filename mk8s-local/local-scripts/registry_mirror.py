@@ -0,0 +1,134 @@
+"""
+Pull-through registry mirrors for the member clusters.
+
+Each registry of REGISTRY_MIRRORS gets a `registry:2` container on the host,
+in proxy mode, listening on the address of LXD_BRIDGE_NAME (the host address
+the members see). The containerd of every member is then pointed at these
+mirrors with a `hosts.toml` per registry, in the `certs.d` directory MicroK8s
+already configures as containerd's `config_path` (so no restart is needed).
+
+A layer is then fetched from upstream once per host, whatever the number of
+members pulling it; the mirrors keep their storage in Docker volumes, across
+testbed rebuilds.
+
+HOST_REGISTRY (`localhost:32000`, the registry add-on of the host MicroK8s)
+gets a `hosts.toml` too: inside a member, it is redirected to the same port on
+the bridge address, so the images pushed to it on the host can be pulled by
+the members under the same name.
+"""
+
+from common import run_command, print_color, colors
+from config import (
+    LXD_BRIDGE_NAME,
+    HOST_REGISTRY,
+    REGISTRY_MIRRORS,
+    REGISTRY_MIRROR_IMAGE,
+    MEMBER_CERTS_DIR,
+)
+
+
+def bridge_address():
+    """Returns the IPv4 address of the host on LXD_BRIDGE_NAME, or None."""
+    result = run_command(
+        ["lxc", "network", "get", LXD_BRIDGE_NAME, "ipv4.address"],
+        check=False,
+        capture_output=True,
+    )
+    address = result.stdout.strip().split("/")[0]
+    if result.returncode != 0 or not address or address == "none":
+        return None
+    return address
+
+
+def mirror_container(registry):
+    return "mirror-" + registry.replace(".", "-")
+
+
+def published_address(name):
+    """Returns the host address a mirror container listens on, or None."""
+    result = run_command(
+        ["docker", "port", name, "5000/tcp"], check=False, capture_output=True
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return result.stdout.split()[0].rsplit(":", 1)[0]
+
+
+def ensure_mirrors(address):
+    """
+    Starts a mirror container for each registry, listening on `address`.
+    A container listening on another address (the bridge address changed) is
+    recreated, keeping its volume. Returns True if all of them are running.
+    """
+    succeeded = True
+    for registry, (upstream, port) in REGISTRY_MIRRORS.items():
+        name = mirror_container(registry)
+        run_command(["docker", "start", name], check=False, capture_output=True)
+        if published_address(name) == address:
+            continue
+        run_command(["docker", "rm", "-f", name], check=False, capture_output=True)
+        command = ["docker", "run", "-d", "--restart=always", "--name", name]
+        command += ["-p", f"{address}:{port}:5000", "-v", f"{name}:/var/lib/registry"]
+        command += ["-e", f"REGISTRY_PROXY_REMOTEURL={upstream}", REGISTRY_MIRROR_IMAGE]
+        if run_command(command, check=False).returncode != 0:
+            print_color(colors.RED, f"Could not start the mirror of {registry}.")
+            succeeded = False
+    return succeeded
+
+
+def hosts_toml(server, mirror):
+    return (
+        f'server = "{server}"\n'
+        f'[host."{mirror}"]\n'
+        '  capabilities = ["pull", "resolve"]\n'
+        "  skip_verify = true\n"
+    )
+
+
+def member_hosts_files(address):
+    """The hosts.toml files of the members: {registry: content}."""
+    files = {
+        registry: hosts_toml(upstream, f"http://{address}:{port}")
+        for registry, (upstream, port) in REGISTRY_MIRRORS.items()
+    }
+    registry_port = HOST_REGISTRY.rsplit(":", 1)[1]
+    files[HOST_REGISTRY] = hosts_toml(
+        f"http://{HOST_REGISTRY}", f"http://{address}:{registry_port}"
+    )
+    return files
+
+
+def configure_member(member, address):
+    """Points the containerd of a member at the mirrors on `address`."""
+    print(f"--> Configuring the registry mirrors in {member}...")
+    for registry, content in member_hosts_files(address).items():
+        directory = f"{MEMBER_CERTS_DIR}/{registry}"
+        result = run_command(
+            ["lxc", "exec", member, "--", "sh", "-c"]
+            + [f"mkdir -p {directory} && cat > {directory}/hosts.toml"],
+            check=False,
+            command_input=content,
+        )
+        if result.returncode != 0:
+            return False
+    return True
+
+
+def setup_registry_mirrors(members):
+    """
+    Starts the mirrors and configures them in `members`. Returns True if
+    every member uses them.
+    """
+    print_color(colors.YELLOW, "\n--- Setting up the pull-through registry mirrors ---")
+    address = bridge_address()
+    if address is None:
+        print_color(colors.RED, f"Bridge '{LXD_BRIDGE_NAME}' has no IPv4 address.")
+        return False
+    if not ensure_mirrors(address):
+        return False
+    failed = [member for member in members if not configure_member(member, address)]
+    if failed:
+        print_color(colors.RED, f"Could not configure: {', '.join(failed)}")
+        return False
+    print_color(colors.GREEN, f"✅ Members pull through the mirrors on {address}.")
+    return True
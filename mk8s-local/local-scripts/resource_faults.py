@@ -0,0 +1,61 @@
+"""
+Resource-pressure faults for the member clusters (used by chaos-monkey.py).
+
+Instead of disappearing, a member gets slow: the LXD limits of its container
+(`limits.cpu`, `limits.cpu.allowance`, `limits.memory`) are lowered, which
+LXD applies to the cgroup of the running container right away, and then
+restored to their original values (or unset, if they were not set).
+
+The parameters of a fault are the LXD configuration keys to set, e.g.
+{"limits.cpu.allowance": "25ms/100ms"}.
+"""
+
+import threading
+
+from common import run_command
+
+# cluster -> {key: original value}, for the faults not reverted yet.
+_original_limits = {}
+_lock = threading.Lock()
+
+
+def config_get(cluster, key):
+    result = run_command(
+        ["lxc", "config", "get", cluster, key], check=False, capture_output=True
+    )
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip()
+
+
+def apply_limits(cluster, params):
+    """Lowers the limits of a member, remembering their original values."""
+    original = {}
+    for key in params:
+        value = config_get(cluster, key)
+        if value is None:
+            return False
+        original[key] = value
+    with _lock:
+        _original_limits[cluster] = original
+
+    for key, value in params.items():
+        command = ["lxc", "config", "set", cluster, key, value]
+        if run_command(command, check=False).returncode != 0:
+            restore_limits(cluster, params)
+            return False
+    return True
+
+
+def restore_limits(cluster, params=None):
+    """Restores the limits changed by apply_limits()."""
+    with _lock:
+        original = _original_limits.pop(cluster, {})
+    succeeded = True
+    for key, value in original.items():
+        if value:
+            command = ["lxc", "config", "set", cluster, key, value]
+        else:
+            command = ["lxc", "config", "unset", cluster, key]
+        succeeded &= run_command(command, check=False).returncode == 0
+    return succeeded
@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+
+"""
+Snapshots the testbed in a known-good state, and restores it in seconds.
+
+Once 2-setup-karmada.py (and, say, 6-install-prometheus.py) succeeded, the
+testbed can be snapshotted, and restored between benchmark or chaos runs
+instead of going through 8-remove-karmada.py, 9-tidy-up.py and a full rebuild.
+
+A snapshot holds:
+
+- an LXD snapshot of every member registered with Karmada,
+- a copy of the data of the Karmada etcd, which runs on the host MicroK8s,
+- the Karmada kubeconfig and certificates, and the member kubeconfigs.
+
+Here's what `snapshot` does:
+
+1. **Checks the testbed**: all members must be Ready in Karmada.
+2. **Quiesces it**: stops the Karmada etcd and freezes the member containers, so that the snapshots of all of them are consistent with each other.
+3. **Takes the snapshots**: of all members at once, while the etcd data and the kubeconfigs are copied.
+4. **Resumes the testbed**: and records the snapshot in SNAPSHOT_DIR only once everything was taken.
+
+Here's what `restore` does:
+
+1. **Checks the snapshot**: every part must be there before anything is changed.
+2. **Stages the copies**: the etcd data and the kubeconfigs are copied next to the ones in use, so that nothing is half restored.
+3. **Stops the Karmada etcd**, takes a rollback snapshot of every member, restores all members at once, then renames the staged copies over the ones in use. If any of these steps fails, the members are restored from their rollback snapshots and the renamed files are put back: the testbed is left as it was.
+4. **Restarts the Karmada control plane**: so that its caches match the restored etcd, and waits for all members to be Ready.
+
+Usage:
+    sudo ./testbed-snapshot.py snapshot [NAME]   # NAME defaults to "baseline"
+    sudo ./testbed-snapshot.py restore [NAME]
+    sudo ./testbed-snapshot.py list
+    sudo ./testbed-snapshot.py delete NAME
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+# Import shared configuration and helpers
+from common import (
+    run_command,
+    check_root_privileges,
+    print_color,
+    colors,
+    run_in_parallel,
+    print_timing_summary,
+)
+from config import (
+    CONFIG_FILES_DIR,
+    HOST_KUBECONFIG,
+    KARMADA_CONFIG_DIR,
+    KARMADA_ETCD_DATA_DIR,
+    KARMADA_ETCD_STATEFULSET,
+    KARMADA_NAMESPACE,
+    SNAPSHOT_DIR,
+)
+from readiness import kubectl_wait, print_wait_summary
+from cluster_status import get_cluster_statuses, wait_for_clusters_ready
+
+DEFAULT_NAME = "baseline"
+MANIFEST = "snapshot.json"
+ETCD_COPY = "karmada-etcd"
+FILES_COPY = "files"
+
+HOST_KUBECTL = ["kubectl", "--kubeconfig", HOST_KUBECONFIG, "-n", KARMADA_NAMESPACE]
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, name)
+
+
+def load_manifest(name):
+    """Returns the manifest of a snapshot, or None if there is none."""
+    path = os.path.join(snapshot_path(name), MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def saved_files(members):
+    """The Karmada configuration directory and the member kubeconfigs."""
+    member_configs = [
+        os.path.join(CONFIG_FILES_DIR, f"{member}.config") for member in members
+    ]
+    return [KARMADA_CONFIG_DIR, *member_configs]
+
+
+def copy(source, target):
+    """Copies a file or directory, sharing its blocks on a copy-on-write fs."""
+    run_command(["cp", "-a", "--reflink=auto", source, target])
+
+
+def remove(path):
+    """Removes a file or directory, if it exists."""
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+def staged(target):
+    return f"{target}.restore"
+
+
+def stage_copies(copies):
+    """Copies each source next to its target, to be swapped in later."""
+    for source, target in copies.items():
+        remove(staged(target))
+        copy(source, staged(target))
+
+
+def swap_in(targets):
+    """
+    Renames the staged copy of each target over it. If a rename fails, the
+    targets swapped so far are put back before the error is raised, so that
+    either all of them or none of them are restored.
+    """
+    moved, swapped = [], []
+    try:
+        for target in targets:
+            previous = f"{target}.previous"
+            remove(previous)
+            if os.path.lexists(target):
+                os.rename(target, previous)
+                moved.append(target)
+            os.rename(staged(target), target)
+            swapped.append(target)
+    except OSError:
+        for target in reversed(swapped):
+            remove(target)
+        for target in reversed(moved):
+            os.rename(f"{target}.previous", target)
+        raise
+    for target in moved:
+        remove(f"{target}.previous")
+
+
+# --- Karmada etcd ---
+
+
+def stop_karmada_etcd():
+    run_command(
+        [*HOST_KUBECTL, "scale", f"statefulset/{KARMADA_ETCD_STATEFULSET}"]
+        + ["--replicas=0"]
+    )
+    return kubectl_wait(
+        "Karmada etcd to stop",
+        f"pod/{KARMADA_ETCD_STATEFULSET}-0",
+        "delete",
+        namespace=KARMADA_NAMESPACE,
+        kubeconfig=HOST_KUBECONFIG,
+        timeout=60,
+    )
+
+
+def start_karmada_etcd():
+    run_command(
+        [*HOST_KUBECTL, "scale", f"statefulset/{KARMADA_ETCD_STATEFULSET}"]
+        + ["--replicas=1"]
+    )
+    return kubectl_wait(
+        "Karmada etcd",
+        f"pod/{KARMADA_ETCD_STATEFULSET}-0",
+        "condition=Ready",
+        namespace=KARMADA_NAMESPACE,
+        kubeconfig=HOST_KUBECONFIG,
+        timeout=120,
+    )
+
+
+def restart_karmada_control_plane():
+    """
+    Restarts the Karmada components, whose caches and watches still refer to
+    the etcd revisions from before the restore, and waits for them.
+    """
+    result = run_command(
+        [*HOST_KUBECTL, "get", "deployments", "-o", "name"], capture_output=True
+    )
+    deployments = result.stdout.split()
+    run_command([*HOST_KUBECTL, "rollout", "restart", *deployments])
+
+    def wait_for_rollout(deployment):
+        result = run_command(
+            [*HOST_KUBECTL, "rollout", "status", deployment, "--timeout=180s"],
+            check=False,
+        )
+        return result.returncode == 0
+
+    timings = run_in_parallel(wait_for_rollout, deployments, jobs=len(deployments))
+    return all(succeeded for succeeded, _ in timings.values())
+
+
+# --- LXD members ---
+
+
+def lxd_snapshot_exists(member, lxd_snapshot):
+    result = run_command(
+        ["lxc", "query", f"/1.0/instances/{member}/snapshots/{lxd_snapshot}"],
+        check=False,
+        capture_output=True,
+    )
+    return result.returncode == 0
+
+
+def delete_lxd_snapshots(manifest):
+    for member in manifest["members"]:
+        run_command(
+            ["lxc", "delete", f"{member}/{manifest['lxd_snapshot']}"], check=False
+        )
+
+
+# --- Commands ---
+
+
+def take_snapshot(name):
+    print_color(colors.YELLOW, f"\n--- 1. Checking the testbed ('{name}') ---")
+    statuses = get_cluster_statuses()
+    if not statuses:
+        print_color(colors.RED, "FATAL: No members registered with Karmada.")
+        sys.exit(1)
+    members = sorted(statuses)
+    if not wait_for_clusters_ready(members, timeout=60):
+        print_color(colors.RED, "FATAL: The testbed is not in a good state.")
+        sys.exit(1)
+    for path in [KARMADA_ETCD_DATA_DIR, *saved_files(members)]:
+        if not os.path.exists(path):
+            print_color(colors.RED, f"FATAL: '{path}' not found.")
+            sys.exit(1)
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    lxd_snapshot = f"testbed-{name}-{stamp}"
+    staging = os.path.join(SNAPSHOT_DIR, f".{name}.{stamp}")
+    os.makedirs(os.path.join(staging, FILES_COPY))
+    files = {}
+    timings = {}
+
+    print_color(colors.YELLOW, "\n--- 2. Quiescing the testbed ---")
+    try:
+        if not stop_karmada_etcd():
+            shutil.rmtree(staging)
+            print_color(colors.RED, "FATAL: The Karmada etcd did not stop.")
+            sys.exit(1)
+        for member in members:
+            run_command(["lxc", "pause", member])
+
+        print_color(colors.YELLOW, "\n--- 3. Taking the snapshots ---")
+
+        def snapshot_part(part):
+            if part == ETCD_COPY:
+                copy(KARMADA_ETCD_DATA_DIR, os.path.join(staging, ETCD_COPY))
+                for index, path in enumerate(saved_files(members)):
+                    stored = f"{index}-{os.path.basename(path)}"
+                    copy(path, os.path.join(staging, FILES_COPY, stored))
+                    files[path] = stored
+                return True
+            run_command(["lxc", "snapshot", part, lxd_snapshot])
+            return True
+
+        timings = run_in_parallel(
+            snapshot_part, [ETCD_COPY, *members], jobs=len(members) + 1
+        )
+    finally:
+        print_color(colors.YELLOW, "\n--- 4. Resuming the testbed ---")
+        for member in members:
+            run_command(["lxc", "start", member], check=False)
+        etcd_started = start_karmada_etcd()
+
+    print_timing_summary("Snapshot times", timings)
+    if not all(succeeded for succeeded, _ in timings.values()):
+        for member in members:
+            run_command(["lxc", "delete", f"{member}/{lxd_snapshot}"], check=False)
+        shutil.rmtree(staging)
+        print_color(colors.RED, "FATAL: The snapshot failed; nothing was recorded.")
+        sys.exit(1)
+
+    manifest = {
+        "name": name,
+        "created": stamp,
+        "members": members,
+        "lxd_snapshot": lxd_snapshot,
+        "files": files,
+    }
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Replace the previous snapshot of the same name only now.
+    previous = load_manifest(name)
+    if previous:
+        delete_lxd_snapshots(previous)
+        shutil.rmtree(snapshot_path(name))
+    os.rename(staging, snapshot_path(name))
+
+    if not etcd_started or not wait_for_clusters_ready(members):
+        print_color(colors.RED, "FATAL: The testbed did not come back.")
+        sys.exit(1)
+    print_color(
+        colors.GREEN,
+        f"\n✅ --- Snapshot '{name}' of {', '.join(members)} taken. --- ✅",
+    )
+
+
+def restore_snapshot(name):
+    print_color(colors.YELLOW, f"\n--- 1. Checking snapshot '{name}' ---")
+    manifest = load_manifest(name)
+    if manifest is None:
+        print_color(colors.RED, f"FATAL: No snapshot named '{name}' (see 'list').")
+        sys.exit(1)
+    members = manifest["members"]
+    directory = snapshot_path(name)
+    missing = [
+        f"{member}/{manifest['lxd_snapshot']}"
+        for member in members
+        if not lxd_snapshot_exists(member, manifest["lxd_snapshot"])
+    ]
+    # Copy of the snapshot -> path it is restored to.
+    copies = {os.path.join(directory, ETCD_COPY): KARMADA_ETCD_DATA_DIR}
+    for path, stored in manifest["files"].items():
+        copies[os.path.join(directory, FILES_COPY, stored)] = path
+    missing += [source for source in copies if not os.path.exists(source)]
+    if missing:
+        print_color(
+            colors.RED, f"FATAL: Incomplete snapshot, missing: {', '.join(missing)}."
+        )
+        sys.exit(1)
+
+    print_color(colors.YELLOW, "\n--- 2. Staging the etcd data and the kubeconfigs ---")
+    targets = list(copies.values())
+    try:
+        stage_copies(copies)
+    except BaseException:
+        for target in targets:
+            remove(staged(target))
+        raise
+
+    print_color(colors.YELLOW, "\n--- 3. Restoring the members and Karmada ---")
+    rollback = f"testbed-rollback-{time.strftime('%Y%m%d-%H%M%S')}"
+    taken = []
+
+    def abort(message):
+        """Puts the members back as they were, then exits."""
+        failed = []
+        if taken:
+            print_color(colors.YELLOW, "Rolling the members back...")
+        for member in taken:
+            result = run_command(["lxc", "restore", member, rollback], check=False)
+            if result.returncode == 0:
+                run_command(["lxc", "delete", f"{member}/{rollback}"], check=False)
+            else:
+                failed.append(member)
+        for target in targets:
+            remove(staged(target))
+        start_karmada_etcd()
+        if failed:
+            print_color(
+                colors.RED,
+                f"FATAL: {message}, and rolling back {', '.join(failed)} failed too: "
+                f"restore them from their '{rollback}' snapshots.",
+            )
+        else:
+            print_color(colors.RED, f"FATAL: {message}; the testbed was rolled back.")
+        sys.exit(1)
+
+    if not stop_karmada_etcd():
+        abort("The Karmada etcd did not stop")
+    for member in members:
+        if run_command(["lxc", "snapshot", member, rollback], check=False).returncode:
+            abort(f"Could not take a rollback snapshot of '{member}'")
+        taken.append(member)
+
+    def restore_member(member):
+        run_command(["lxc", "restore", member, manifest["lxd_snapshot"]])
+        return True
+
+    timings = run_in_parallel(restore_member, members, jobs=len(members))
+    print_timing_summary("Restore times", timings)
+    if not all(succeeded for succeeded, _ in timings.values()):
+        abort("The restore of the members failed")
+    try:
+        swap_in(targets)
+    except OSError as error:
+        abort(f"Could not swap in the etcd data and the kubeconfigs ({error})")
+    for member in members:
+        run_command(["lxc", "delete", f"{member}/{rollback}"], check=False)
+
+    print_color(colors.YELLOW, "\n--- 4. Restarting the Karmada control plane ---")
+    if not start_karmada_etcd() or not restart_karmada_control_plane():
+        print_color(colors.RED, "FATAL: The Karmada control plane did not restart.")
+        sys.exit(1)
+    if not wait_for_clusters_ready(members):
+        print_color(colors.RED, "FATAL: Not all members are Ready after the restore.")
+        sys.exit(1)
+    print_color(
+        colors.GREEN,
+        f"\n✅ --- Testbed restored to '{name}' ({manifest['created']}). --- ✅",
+    )
+
+
+def list_snapshots():
+    names = []
+    if os.path.isdir(SNAPSHOT_DIR):
+        names = sorted(n for n in os.listdir(SNAPSHOT_DIR) if not n.startswith("."))
+    if not names:
+        print("No snapshots.")
+    for name in names:
+        manifest = load_manifest(name)
+        if manifest is None:
+            print(f"  {name:<20} (incomplete)")
+            continue
+        members = ", ".join(manifest["members"])
+        print(f"  {name:<20} {manifest['created']}  {members}")
+
+
+def delete_snapshot(name):
+    manifest = load_manifest(name)
+    if manifest is None:
+        print_color(colors.RED, f"FATAL: No snapshot named '{name}'.")
+        sys.exit(1)
+    delete_lxd_snapshots(manifest)
+    shutil.rmtree(snapshot_path(name))
+    print_color(colors.GREEN, f"✅ Snapshot '{name}' deleted.")
+
+
+def main():
+    check_root_privileges("testbed-snapshot.py")
+    parser = argparse.ArgumentParser(
+        description="Snapshot and restore the members, Karmada etcd and kubeconfigs."
+    )
+    parser.add_argument("command", choices=["snapshot", "restore", "list", "delete"])
+    parser.add_argument("name", nargs="?", default=DEFAULT_NAME)
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    if args.command == "snapshot":
+        take_snapshot(args.name)
+    elif args.command == "restore":
+        restore_snapshot(args.name)
+    elif args.command == "list":
+        list_snapshots()
+        return
+    else:
+        delete_snapshot(args.name)
+        return
+    print_wait_summary()
+    print(f"\nTotal: {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,30 @@ Minimal recipe to deploy
 Warning: connection as user root.
 
 pyinfra -y -vvv --user root ${SERVER_NAME} 0-setup-server.py
+
+With the 'offline_bundle' host data set (NEPHELE_OFFLINE=1, see inventory.py),
+packages, uv and git repositories are expected to come from the offline
+bundle (offline-bundle/install-bundle.py): nothing is fetched from the network.
+
+With the 'incremental' host data set (NEPHELE_INCREMENTAL=1, see inventory.py),
+an already provisioned host is not wiped: the Docker image store and the
+registry container (and its volume) are kept, and only what a previous run
+leaves behind (clusters, containers, Karmada state) is reset.
 """
 
 import io
+from textwrap import dedent
 
 from pyinfra import host
 from pyinfra.facts.files import File
 from pyinfra.facts.hardware import Ipv4Addrs
 from pyinfra.facts.server import LsbRelease, User
 from pyinfra.operations import apt, files, python, server, systemd
+from pyinfra.operations.util import any_changed
 
 from common import check_server, log_callback
-from constants import GITS, HDAR_URL, REGISTRY_PORT
+from gobuild import go_build
+from constants import GITS, HDAR_URL, OFFLINE_INSTALLER, REGISTRY_PORT
 
 BASE_APT_PACKAGES = [
     "ca-certificates",
@@ -42,6 +54,9 @@ DOCKER_APT_PACKAGES = [
     "docker-compose-plugin",
 ]
 
+# In incremental mode, apt metadata younger than this is not refreshed.
+APT_CACHE_TIME = 24 * 3600
+
 DOCKER_CONF = """\n
 {
   "insecure-registries": ["___ip___:5000", "127.0.0.1:5000"],
@@ -66,6 +81,7 @@ def main() -> None:
     install_go()
     install_uv()
     install_docker()
+    load_offline_images()
     make_hdarctl()
     configure_containerd()
     start_docker_registry()
@@ -79,6 +95,8 @@ def delete_kind_clusters() -> None:
         name="Stop running kind clusters",
         commands="kind get clusters | xargs -I {} kind delete cluster --name {} || true",
     )
+    if host.data.get("incremental"):
+        return
     server.shell(
         name="Remove kind",
         commands=["rm -f /root/go/bin/kind", "rm -f /usr/local/bin/kind"],
@@ -89,6 +107,9 @@ def kill_docker_containers() -> None:
     fact = host.get_fact(File, "/usr/bin/docker")
     if not fact:
         return
+    if host.data.get("incremental"):
+        reset_docker_containers()
+        return
     server.shell(
         name="Stop running and removes all containers",
         commands=[
@@ -101,6 +122,32 @@ def kill_docker_containers() -> None:
     )
 
 
+def reset_docker_containers() -> None:
+    """
+    Remove the containers of previous runs, but keep the images, the volumes
+    and the registry. Docker is only wiped if its daemon does not work.
+    """
+    server.shell(
+        name="Remove containers of previous runs (keep images and registry)",
+        commands=[
+            dedent("""\
+            systemctl start docker || true
+            if docker info > /dev/null 2>&1; then
+                docker ps -a --format '{{.Names}}' | grep -vx registry \\
+                    | xargs -r docker rm -f
+                docker network prune -f
+                docker image prune -f
+            else
+                echo "Docker is not working, resetting it"
+                systemctl stop docker.service docker.socket || true
+                rm -fr /var/lib/docker
+            fi
+            """)
+        ],
+        _shell_executable="/bin/bash",
+    )
+
+
 def remove_mk8s() -> None:
     server.shell(
         name="Remove .karmada and .kube configurations",
@@ -121,6 +168,18 @@ def remove_mk8s() -> None:
     fact = host.get_fact(File, "/snap/bin/microk8s")
     if not fact:
         return
+    if host.data.get("incremental"):
+        # Keep MicroK8s and its images, only remove the Karmada control plane.
+        server.shell(
+            name="Remove Karmada from MicroK8s",
+            commands=[
+                "karmadactl deinit --force "
+                "--kubeconfig /var/snap/microk8s/current/credentials/client.config "
+                "|| true",
+                "rm -fr /etc/karmada",
+            ],
+        )
+        return
     server.shell(
         name="Stop and remove any remaining microk8s",
         commands="snap remove --purge microk8s || true",
@@ -128,6 +187,11 @@ def remove_mk8s() -> None:
 
 
 def update_server() -> None:
+    if host.data.get("offline_bundle"):
+        return
+    if host.data.get("incremental"):
+        apt.update(name="Update apt cache if stale", cache_time=APT_CACHE_TIME)
+        return
     apt.update(name="Update apt cache")
     apt.upgrade(name="Upgrade system packages")
 
@@ -165,14 +229,17 @@ def configure_server_limits() -> None:
 # Go
 #
 def install_go() -> None:
-    apt.ppa(
-        name="Add the Go ppa",
-        src="ppa:longsleep/golang-backports",
-    )
+    offline = host.data.get("offline_bundle")
+    if not offline:
+        apt.ppa(
+            name="Add the Go ppa",
+            src="ppa:longsleep/golang-backports",
+        )
     apt.packages(
         name="Install Go packages",
         packages=["golang-go"],
-        update=True,
+        update=not offline,
+        cache_time=APT_CACHE_TIME if host.data.get("incremental") else None,
     )
 
 
@@ -199,25 +266,28 @@ def install_uv() -> None:
 # Docker
 #
 def install_docker() -> None:
-    apt.key(
-        name="Add the Docker apt gpg key",
-        src="https://download.docker.com/linux/ubuntu/gpg",
-    )
-
-    lsb_info = host.get_fact(LsbRelease)
-    distro = lsb_info["id"].lower()
-    code_name = lsb_info["codename"]
-
-    apt.repo(
-        name="Add Docker repo",
-        src=f"deb https://download.docker.com/linux/{distro} {code_name} stable",
-    )
+    offline = host.data.get("offline_bundle")
+    if not offline:
+        apt.key(
+            name="Add the Docker apt gpg key",
+            src="https://download.docker.com/linux/ubuntu/gpg",
+        )
+
+        lsb_info = host.get_fact(LsbRelease)
+        distro = lsb_info["id"].lower()
+        code_name = lsb_info["codename"]
+
+        apt.repo(
+            name="Add Docker repo",
+            src=f"deb https://download.docker.com/linux/{distro} {code_name} stable",
+        )
 
     packages = DOCKER_APT_PACKAGES
     apt.packages(
         name=f"Install packages {packages}",
         packages=packages,
-        update=True,
+        update=not offline,
+        cache_time=APT_CACHE_TIME if host.data.get("incremental") else None,
     )
 
     user = host.get_fact(User)
@@ -228,6 +298,17 @@ def install_docker() -> None:
     )
 
 
+def load_offline_images() -> None:
+    """Reload the bundle images, since Docker was reset above."""
+    if not host.data.get("offline_bundle"):
+        return
+    target = host.data.get("bundle_target", "mk8s")
+    server.shell(
+        name="Load container images from the offline bundle",
+        commands=[f"python3 {OFFLINE_INSTALLER} --images-only --target {target}"],
+    )
+
+
 def make_hdarctl():
     HDACTL = "/usr/bin/hdarctl"
     REPO = f"{GITS}/hdar"
@@ -237,30 +318,19 @@ def make_hdarctl():
         path=GITS,
     )
 
-    server.shell(
-        name="Clone/pull HDAR repository if needed",
-        commands=[
-            f"[ -d {REPO} ] || git clone {HDAR_URL} {REPO}",
-            f"cd {REPO} && git pull",
-        ],
-    )
+    if not host.data.get("offline_bundle"):
+        server.shell(
+            name="Clone/pull HDAR repository if needed",
+            commands=[
+                f"[ -d {REPO} ] || git clone {HDAR_URL} {REPO}",
+                f"cd {REPO} && git pull",
+            ],
+        )
 
-    workdir = f"{REPO}/components/hdar-ctl"
     server.shell(
-        name="Build HDAR if needed",
-        # commands=f"""cd {workdir} && [ -x {HDACTL} -a $({GIT_LAST}) -gt {LAST_KNOWN} ] && {{
-        #         CGO_ENABLED=0 go build -a -installsuffix cgo -o hdarctl .
-        #         f"{workdir}/hdarctl -h",
-        #         f"cp {workdir}/hdarctl {HDACTL}",
-        #     }} || true
-        #     """,
-        commands=f"""[ ! -x {HDACTL} ] && {{
-                cd {workdir}
-                CGO_ENABLED=0 go build -a -installsuffix cgo -o hdarctl .
-                ./hdarctl -h
-                cp hdarctl {HDACTL}
-            }} || true
-            """,
+        name="Build hdarctl if its sources changed",
+        commands=[go_build("hdarctl", f"{REPO}/components/hdar-ctl", ".", HDACTL)],
+        _shell_executable="/bin/bash",
     )
 
 
@@ -275,24 +345,35 @@ def start_docker_registry() -> None:
     ips = host.get_fact(Ipv4Addrs)
     eth0 = ips["eth0"][0]
     config = DOCKER_CONF.replace("___ip___", eth0)
-    files.put(
+    daemon_json = files.put(
         name="Put file /etc/docker/daemon.json",
         src=io.StringIO(config),
         dest="/etc/docker/daemon.json",
     )
 
-    systemd.service(
-        name="Restart docker daemon",
-        service="docker",
-        restarted=True,
-    )
+    if host.data.get("incremental"):
+        systemd.service(
+            name="Restart docker daemon if its configuration changed",
+            service="docker",
+            running=True,
+            restarted=True,
+            _if=daemon_json.did_change,
+        )
+    else:
+        systemd.service(
+            name="Restart docker daemon",
+            service="docker",
+            restarted=True,
+        )
 
     server.shell(
         name="Deploy docker registry",
         commands=[
             (
+                "docker start registry 2> /dev/null || "
                 f"docker run -d -p {REGISTRY_PORT}:5000 "
                 "--restart=always "
+                "-e REGISTRY_STORAGE_DELETE_ENABLED=true "
                 "--name registry registry:latest || true"
             )
         ],
@@ -327,7 +408,7 @@ def configure_containerd() -> None:
         "  skip_verify = true\n"
     )
 
-    files.block(
+    config_block = files.block(
         name=f"Configure {CONF}",
         path=CONF,
         content=(
@@ -347,20 +428,27 @@ def configure_containerd() -> None:
         name=f"Create {CERTD}/{HOST5000} directory",
         path=f"{CERTD}/{HOST5000}",
     )
-    files.put(
+    hosts_io = files.put(
         name=f"Put file {HOSTS_IO}",
         src=io.StringIO(HOSTS_IO_TOML),
         dest=HOSTS_IO,
     )
-    files.put(
+    hosts_5000 = files.put(
         name=f"Put file {HOSTS_5000}",
         src=io.StringIO(HOSTS_5000_TOML),
         dest=HOSTS_5000,
     )
-    server.shell(
-        name="Restart containerd",
-        commands=["systemctl restart containerd"],
-    )
+    if host.data.get("incremental"):
+        server.shell(
+            name="Restart containerd if its configuration changed",
+            commands=["systemctl restart containerd"],
+            _if=any_changed(config_block, hosts_io, hosts_5000),
+        )
+    else:
+        server.shell(
+            name="Restart containerd",
+            commands=["systemctl restart containerd"],
+        )
 
 
 main()
@@ -1,18 +1,39 @@
+from pyinfra import host
 from pyinfra.operations import server
 
+from constants import OFFLINE_BUNDLE_DIR, OFFLINE_INSTALLER
+
 def main():
-    server.shell(
-        name="Install MicroK8s",
-        commands=[
-            "snap install microk8s --classic --channel=1.29"
-        ]
-    )
+    if host.data.get("offline_bundle"):
+        snap_dir = f"{OFFLINE_BUNDLE_DIR}/snaps/microk8s-1.29"
+        server.shell(
+            name="Install MicroK8s from the offline bundle",
+            commands=[
+                f"snap ack {snap_dir}/*.assert",
+                f"snap install {snap_dir}/*.snap --classic",
+            ]
+        )
+    else:
+        server.shell(
+            name="Install MicroK8s",
+            commands=[
+                "snap install microk8s --classic --channel=1.29"
+            ]
+        )
     server.shell(
         name="Wait for MicroK8s to be ready",
         commands=[
             "microk8s status --wait-ready"
         ]
     )
+    if host.data.get("offline_bundle"):
+        target = host.data.get("bundle_target", "mk8s")
+        server.shell(
+            name="Import container images from the offline bundle",
+            commands=[
+                f"python3 {OFFLINE_INSTALLER} --images-only --target {target}"
+            ]
+        )
     server.shell(
         name="Enable MicroK8s addons",
         commands=[
@@ -5,3 +5,13 @@ HDAR_URL = (
 )
 SMO_URL = "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/smo.git"
 KARMADA_RELEASE_BRANCH = "release-1.14"
+
+# Offline bundle, see offline-bundle/README.md.
+OFFLINE_BUNDLE_DIR = "/opt/nephele-bundle"
+OFFLINE_INSTALLER = "/root/nephele-bundle/install-bundle.py"
+
+# Go build caches, kept across runs and resets (see gobuild.py). These are the
+# Go defaults for root, where the offline bundle also restores its modules.
+GOCACHE = "/root/.cache/go-build"
+GOMODCACHE = "/root/go/pkg/mod"
+BUILD_FINGERPRINT_DIR = "/root/.cache/nephele/builds"
@@ -0,0 +1 @@
+../../kind/_common/gobuild.py
\ No newline at end of file
@@ -8,7 +8,13 @@ _hostname = os.getenv("SERVER_NAME", _default_hostname)
 
 __all__ = ["hosts"]
 
+# Set NEPHELE_OFFLINE=1 for a host prepared with the offline bundle.
+_offline_bundle = os.getenv("NEPHELE_OFFLINE", "") == "1"
+# Set NEPHELE_INCREMENTAL=1 to re-run on a provisioned host without wiping
+# Docker (see 0-setup-server.py).
+_incremental = os.getenv("NEPHELE_INCREMENTAL", "") == "1"
+
 hosts = [
     # List of hosts in the inventory.
-    _hostname,
+    (_hostname, {"offline_bundle": _offline_bundle, "incremental": _incremental}),
 ]
@@ -31,6 +31,7 @@ from textwrap import dedent
 from pyinfra.operations import python, server
 
 from common import log_callback
+from readiness import kubectl_wait, wait_for_http
 
 # CENTRAL_PROMETHEUS_IP_AND_PORT = "127.0.0.1:30093"
 
@@ -305,20 +306,10 @@ def check_prometheus_member(mid: int) -> None:
                 jsonpath='{.items[0].status.addresses[?(@.type=="InternalIP")].address}')
 
                 url="http://${member_node_ip}:30090"
-
-                max_try=30
-                interval=2
-                for ((i=1; i<=max_try; i++)); do
-                  echo "try ${url} (attempt $i)..."
-                  if curl -s ${url} > /dev/null; then
-                    break
-                  else
-                    sleep $interval
-                  fi
-                done
-                curl -sS ${url} 2>&1 | head -n5
             """
             )
+            + wait_for_http(f"member{mid} Prometheus NodePort", "${url}", timeout=60)
+            + "curl -sS ${url} 2>&1 | head -n5\n"
         ],
         _shell_executable="/bin/bash",
         _get_pty=True,
@@ -335,14 +326,18 @@ def check_prometheus_member(mid: int) -> None:
             dedent(f"""\
                 export KUBECONFIG="/root/.kube/karmada-apiserver.config"
                 kubectl config use-context member{mid}
-
-                sleep 20
-
+            """)
+            + kubectl_wait(
+                f"member{mid} Prometheus server",
+                f"deployment/prometheus-member{mid}-server",
+                "condition=Available",
+                namespace="monitoring",
+            )
+            + dedent(f"""\
                 kubectl -n monitoring run -i --tty --rm debug \
                 --image=busybox --restart=Never \
-                -- sh -c 'i=0; while [ $i -lt 10 ]; do \
-                wget -qO- http://prometheus-member{mid}-server:80 2>/dev/null \
-                && break; i=$((i+1)); sleep 2; done | head -n10'
+                -- wget -qO- -T 10 http://prometheus-member{mid}-server:80 \
+                | head -n10
             """)
         ],
         _shell_executable="/bin/bash",
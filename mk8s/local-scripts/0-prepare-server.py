@@ -12,7 +12,6 @@
 
 import urllib.request
 import json
-import time
 import sys
 
 from common import (
@@ -23,6 +22,7 @@ from common import (
     colors,
 )
 from config import KARMADA_VERSION, LXD_BRIDGE_NAME
+from readiness import wait_until, wait_for_command, wait_or_exit, print_wait_summary
 
 
 def main():
@@ -34,7 +34,9 @@ def main():
     install_kubectl()
     install_karmada_tools()
     run_command(["snap", "install", "--classic", "helm"])
-    if step_6_verify_and_repair_network_setup():
+    network_ok = step_6_verify_and_repair_network_setup()
+    print_wait_summary()
+    if network_ok:
         print_color(
             colors.GREEN,
             "\n\n✅ --- Prerequisite and Network setup is complete and verified! --- ✅",
@@ -49,15 +51,10 @@ def main():
 
 def wait_for_lxd_daemon():
     """Waits for the LXD daemon to be ready by polling it."""
-    print("--> Waiting for LXD daemon to become responsive...")
-    for i in range(12):  # Wait up to 2 minutes
-        result = run_command(["lxc", "list"], check=False)
-        if result.returncode == 0:
-            print_color(colors.GREEN, "LXD daemon is ready.")
-            return
-        time.sleep(10)
-    print_color(colors.RED, "FATAL: Timed out waiting for LXD daemon.")
-    sys.exit(1)
+    wait_or_exit(
+        wait_for_command("LXD daemon", ["lxc", "list"], timeout=120),
+        "Timed out waiting for LXD daemon.",
+    )
 
 
 def install_utilities():
@@ -101,7 +98,7 @@ def install_lxd_and_configure_network():
 
     print("Restarting LXD daemon to apply configuration...")
     run_command(["systemctl", "restart", "snap.lxd.daemon.service"])
-    time.sleep(10)
+    wait_for_lxd_daemon()
 
 
 def install_docker():
@@ -148,11 +145,19 @@ def install_karmada_tools():
             run_command(command, command_input=install_script_content, env=install_env)
 
 
+def bridge_is_up():
+    """Checks whether the LXD bridge interface is administratively up."""
+    result = run_command(
+        ["ip", "-o", "link", "show", LXD_BRIDGE_NAME], check=False, capture_output=True
+    )
+    return result.returncode == 0 and "UP" in result.stdout.split(">")[0]
+
+
 def step_6_verify_and_repair_network_setup():
     print(f"\n--- 6. Verifying and Repairing Network Setup for '{LXD_BRIDGE_NAME}' ---")
     print(f"--> Forcibly bringing interface '{LXD_BRIDGE_NAME}' UP...")
     run_command(["ip", "link", "set", LXD_BRIDGE_NAME, "up"])
-    time.sleep(2)
+    wait_until(f"interface '{LXD_BRIDGE_NAME}' to come up", bridge_is_up, timeout=30)
     print(f"--> Checking and ensuring required firewall rules exist...")
     rules_to_check = {
         "FORWARD_IN": [
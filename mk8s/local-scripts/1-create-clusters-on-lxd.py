@@ -14,7 +14,6 @@
 import json
 import os
 import sys
-import time
 from pwd import getpwnam
 
 # Import shared configuration and helpers
@@ -26,6 +25,7 @@ from config import (
     CONTAINER_API_PORT,
     CONFIG_FILES_DIR,
 )
+from readiness import wait_for_command, print_wait_summary
 
 LXD_PROFILE_CONFIG = """
 config:
@@ -162,23 +162,19 @@ def setup_port_forward_and_kubeconfig(member_name):
 def health_check_cluster(member_name, kubeconfig_path):
     """Performs a health check to ensure the cluster is accessible."""
     print(f"--> Health checking connection to {member_name} via port forward...")
-    for i in range(12):  # Try for 2 minutes
-        check_cmd = [
-            "kubectl",
-            "--kubeconfig",
-            kubeconfig_path,
-            "get",
-            "nodes",
-            "--insecure-skip-tls-verify",
-        ]
-        result = run_command(check_cmd, check=False)
-        if result.returncode == 0:
-            print_color(colors.GREEN, f"✅ Health check PASSED for {member_name}.")
-            return True
-        print_color(
-            colors.YELLOW, f"Health check attempt {i + 1}/12 failed. Retrying in 10s..."
-        )
-        time.sleep(10)
+    check_cmd = [
+        "kubectl",
+        "--kubeconfig",
+        kubeconfig_path,
+        "get",
+        "nodes",
+        "--insecure-skip-tls-verify",
+    ]
+    if wait_for_command(
+        f"{member_name} API server via port forward", check_cmd, timeout=120
+    ):
+        print_color(colors.GREEN, f"✅ Health check PASSED for {member_name}.")
+        return True
 
     print_color(
         colors.RED,
@@ -205,6 +201,7 @@ def main():
             colors.GREEN, f">>> Successfully processed and verified cluster: {member}."
         )
 
+    print_wait_summary()
     print_color(colors.GREEN, "\n--- All member clusters are ready! ---")
 
 
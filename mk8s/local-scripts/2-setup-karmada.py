@@ -13,9 +13,15 @@
 import json
 import os
 import sys
-import time
 
 from common import run_command, check_root_privileges, print_color, colors
+from readiness import (
+    wait_until,
+    kubectl_wait,
+    wait_for_http,
+    wait_or_exit,
+    print_wait_summary,
+)
 from config import (
     MEMBER_CLUSTERS,
     KARMADA_VERSION,
@@ -33,11 +39,10 @@ def main():
     check_root_privileges("4-setup-karmada-on-mk8s.py")
     run_preflight_checks()
     step_1_prepare_host_cluster()
-    # Added because the registry can take a while to become available (seemingly)
-    time.sleep(10)
     step_2_push_images_to_local_registry()
     step_3_deploy_and_wait_for_karmada_control_plane()
     step_4_join_member_clusters()
+    print_wait_summary()
 
     print_color(
         colors.GREEN, "\n\n✅ --- Karmada setup on MicroK8s is complete! --- ✅"
@@ -68,41 +73,17 @@ def run_preflight_checks():
 
 
 def wait_for_registry():
-    print_color(
-        colors.YELLOW,
-        "\n--> Waiting for the local container registry to become available...",
+    """Waits for the registry deployment, then for its HTTP API to answer."""
+    ready = kubectl_wait(
+        "local container registry deployment",
+        "deployment/registry",
+        "condition=Available",
+        namespace="container-registry",
+        kubectl=("microk8s", "kubectl"),
+    ) and wait_for_http(
+        "local container registry API", f"http://{HOST_REGISTRY}/v2/", timeout=60
     )
-    max_wait_seconds = 180
-    start_time = time.time()
-    while time.time() - start_time < max_wait_seconds:
-        cmd = [
-            "microk8s",
-            "kubectl",
-            "get",
-            "deployment",
-            "registry",
-            "-n",
-            "container-registry",
-            "-o",
-            "json",
-        ]
-        result = run_command(cmd, check=False, capture_output=True)
-        if result.returncode == 0:
-            try:
-                deployment = json.loads(result.stdout)
-                if deployment.get("status", {}).get("availableReplicas", 0) >= 1:
-                    print_color(colors.GREEN, "✅ Local container registry is ready.")
-                    time.sleep(5)
-                    return
-            except (json.JSONDecodeError, KeyError):
-                pass
-        print("Registry not ready yet, waiting 15 seconds...")
-        time.sleep(15)
-    print_color(
-        colors.RED,
-        "FATAL: Timed out waiting for the local registry to become available.",
-    )
-    sys.exit(1)
+    wait_or_exit(ready, "Timed out waiting for the local registry to become available.")
 
 
 def step_1_prepare_host_cluster():
@@ -154,28 +135,19 @@ def step_3_deploy_and_wait_for_karmada_control_plane():
     run_command(init_command)
     print("Karmada control plane initialization successful.")
 
-    print("\nWaiting for the Karmada control plane API to become fully available...")
-    max_wait_seconds = 180
-    start_time = time.time()
-    api_ready = False
-    while time.time() - start_time < max_wait_seconds:
-        check_api_cmd = ["kubectl", "api-resources", "--api-group=cluster.karmada.io"]
+    def clusters_api_available():
         result = run_command(
-            check_api_cmd,
+            ["kubectl", "api-resources", "--api-group=cluster.karmada.io"],
             check=False,
             env={"KUBECONFIG": KARMADA_KUBECONFIG},
             capture_output=True,
         )
-        if result.returncode == 0 and "clusters" in result.stdout:
-            print_color(colors.GREEN, "Karmada 'clusters' API is now available!")
-            api_ready = True
-            break
-        time.sleep(10)
-    if not api_ready:
-        print_color(
-            colors.RED, "FATAL: Timed out waiting for Karmada APIs to become available."
-        )
-        sys.exit(1)
+        return result.returncode == 0 and "clusters" in result.stdout
+
+    wait_or_exit(
+        wait_until("Karmada 'clusters' API", clusters_api_available),
+        "Timed out waiting for Karmada APIs to become available.",
+    )
 
 
 def step_4_join_member_clusters():
@@ -254,26 +226,15 @@ def wait_for_all_clusters_ready(timeout_seconds=60):
     Waits for all member clusters to report a Ready status.
     Exits with an error if the timeout is reached.
     """
-    print_color(
-        colors.YELLOW,
-        f"\n--> Waiting up to {timeout_seconds} seconds for all clusters to become Ready...",
+    ready = kubectl_wait(
+        f"member clusters {', '.join(MEMBER_CLUSTERS)} to be Ready",
+        [f"clusters.cluster.karmada.io/{member}" for member in MEMBER_CLUSTERS],
+        "condition=Ready",
+        kubeconfig=KARMADA_KUBECONFIG,
+        timeout=timeout_seconds,
     )
-    start_time = time.time()
-    while time.time() - start_time < timeout_seconds:
-        ready_clusters = [
-            member
-            for member in MEMBER_CLUSTERS
-            if is_cluster_registered_and_ready(member)
-        ]
-
-        if len(ready_clusters) == len(MEMBER_CLUSTERS):
-            print_color(colors.GREEN, "\n✅ All member clusters are now Ready.")
-            return
-
-        print(
-            f"Waiting... ({len(ready_clusters)}/{len(MEMBER_CLUSTERS)} clusters ready). Retrying in 10 seconds."
-        )
-        time.sleep(10)
+    if ready:
+        return
 
     print_color(
         colors.RED, "\nFATAL: Timed out waiting for all clusters to become Ready."
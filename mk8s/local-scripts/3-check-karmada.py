@@ -14,9 +14,9 @@ import json
 import os
 import sys
 import tempfile
-import time
 
 from common import run_command, check_root_privileges, print_color, colors
+from readiness import kubectl_wait, print_wait_summary
 from config import (
     MEMBER_CLUSTERS,
     KARMADA_NAMESPACE,
@@ -186,8 +186,14 @@ spec:
         print("--> Deploying test Nginx application and policy...")
         run_command(["kubectl", "apply", "-f", dep_filename], env=karmada_env)
         run_command(["kubectl", "apply", "-f", pol_filename], env=karmada_env)
-        print("--> Waiting up to 90 seconds for resources to propagate...")
-        time.sleep(90)
+        for member in MEMBER_CLUSTERS_TO_DEPLOY:
+            kubectl_wait(
+                f"test deployment to propagate to '{member}'",
+                "deployment/karmada-test-nginx",
+                "jsonpath={.status.readyReplicas}=2",
+                kubeconfig=os.path.join(CONFIG_FILES_DIR, f"{member}.config"),
+                timeout=90,
+            )
         overall_success = True
 
         for member in MEMBER_CLUSTERS_TO_DEPLOY:
@@ -282,6 +288,7 @@ def main():
             colors.RED, "\nSkipping Level 3 Test due to failures in preliminary checks."
         )
 
+    print_wait_summary()
     print("\n\n" + "=" * 20 + " FINAL SUMMARY " + "=" * 20)
     if all(results.values()):
         print_color(
@@ -11,7 +11,6 @@ Here's what this script does:
 
 import os
 import sys
-import time
 import json
 import tempfile
 import http.client
@@ -19,6 +18,7 @@ import http.client
 # Import shared configuration and helpers
 from common import run_command, check_root_privileges, print_color, colors
 from config import MEMBER_CLUSTERS, KARMADA_KUBECONFIG, CONFIG_FILES_DIR
+from readiness import wait_until, print_wait_summary
 
 # --- Configuration ---
 APP_HOST_PORT_MAPPING = {
@@ -130,11 +130,8 @@ def verify_pod_readiness():
     print_color(
         colors.YELLOW, "\n--- 2. Verifying application propagation and pod status ---"
     )
-    print(
-        "--> Waiting up to 120 seconds for Nginx pods to be running on all member clusters..."
-    )
 
-    for i in range(12):
+    def count_ready_clusters():
         pods_ready_count = 0
         for member in MEMBER_CLUSTERS:
             kubeconfig_path = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
@@ -157,18 +154,19 @@ def verify_pod_readiness():
                 ]
                 if len(running_pods) == 2:
                     pods_ready_count += 1
-
-        if pods_ready_count == len(MEMBER_CLUSTERS):
-            print_color(
-                colors.GREEN,
-                "✅ SUCCESS: All Nginx pods are running on all member clusters.",
-            )
-            return True
-
-        print(
-            f"Pods not ready yet (Ready clusters: {pods_ready_count}/{len(MEMBER_CLUSTERS)}). Retrying in 10s..."
+        print(f"Ready clusters: {pods_ready_count}/{len(MEMBER_CLUSTERS)}")
+        return pods_ready_count == len(MEMBER_CLUSTERS)
+
+    if wait_until(
+        "Nginx pods to be running on all member clusters",
+        count_ready_clusters,
+        timeout=120,
+    ):
+        print_color(
+            colors.GREEN,
+            "✅ SUCCESS: All Nginx pods are running on all member clusters.",
         )
-        time.sleep(10)
+        return True
 
     print_color(
         colors.RED, "❌ FAILED: Timed out waiting for all Nginx pods to become ready."
@@ -295,6 +293,7 @@ def main():
 
         if not verify_http_access():
             sys.exit(1)
+        print_wait_summary()
 
         print_color(
             colors.GREEN,
@@ -12,7 +12,6 @@ Here's what this script does:
 
 import os
 import sys
-import time
 import json
 import tempfile
 import http.client
@@ -20,6 +19,7 @@ import http.client
 # Import shared configuration and helpers
 from common import run_command, check_root_privileges, print_color, colors
 from config import MEMBER_CLUSTERS, KARMADA_KUBECONFIG, CONFIG_FILES_DIR
+from readiness import wait_until, wait_for_command, wait_for_http, print_wait_summary
 
 # --- Configuration ---
 # Use a new port range to avoid conflicts with other demos
@@ -136,11 +136,8 @@ def verify_pod_readiness():
     print_color(
         colors.YELLOW, "\n--- 2. Verifying application propagation and pod status ---"
     )
-    print(
-        "--> Waiting up to 120 seconds for Flask pods to be running on all member clusters..."
-    )
 
-    for i in range(12):
+    def count_ready_clusters():
         pods_ready_count = 0
         for member in MEMBER_CLUSTERS:
             kubeconfig_path = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
@@ -164,18 +161,19 @@ def verify_pod_readiness():
                 # Expecting 1 replica per cluster as defined in the deployment YAML
                 if len(running_pods) == 1:
                     pods_ready_count += 1
-
-        if pods_ready_count == len(MEMBER_CLUSTERS):
-            print_color(
-                colors.GREEN,
-                "✅ SUCCESS: All Flask pods are running on all member clusters.",
-            )
-            return True
-
-        print(
-            f"Pods not ready yet (Ready clusters: {pods_ready_count}/{len(MEMBER_CLUSTERS)}). Retrying in 10s..."
+        print(f"Ready clusters: {pods_ready_count}/{len(MEMBER_CLUSTERS)}")
+        return pods_ready_count == len(MEMBER_CLUSTERS)
+
+    if wait_until(
+        "Flask pods to be running on all member clusters",
+        count_ready_clusters,
+        timeout=120,
+    ):
+        print_color(
+            colors.GREEN,
+            "✅ SUCCESS: All Flask pods are running on all member clusters.",
         )
-        time.sleep(10)
+        return True
 
     print_color(
         colors.RED, "❌ FAILED: Timed out waiting for all Flask pods to become ready."
@@ -201,14 +199,11 @@ def expose_services_and_get_nodeport():
         "-o",
         "json",
     ]
-    print("--> Waiting for service to be created to get NodePort...")
     # It can take a moment for the service to be propagated and created
-    for _ in range(6):
-        result = run_command(cmd, capture_output=True, check=False)
-        if result.returncode == 0:
-            break
-        time.sleep(10)
-    else:
+    result = wait_for_command(
+        f"flask-demo-service on {member_to_check}", cmd, timeout=60
+    )
+    if not result:
         print_color(colors.RED, "❌ FAILED: Could not find flask-demo-service.")
         return None
 
@@ -247,8 +242,10 @@ def verify_http_access():
     )
     all_accessible = True
 
-    # Give the proxy a moment to stabilize
-    time.sleep(5)
+    for member, host_port in APP_HOST_PORT_MAPPING.items():
+        wait_for_http(
+            f"proxy on {member}", f"http://127.0.0.1:{host_port}/", timeout=30
+        )
 
     for member, host_port in APP_HOST_PORT_MAPPING.items():
         print(
@@ -322,6 +319,7 @@ def main():
 
         if not verify_http_access():
             sys.exit(1)
+        print_wait_summary()
 
         print_color(
             colors.GREEN,
@@ -15,7 +15,6 @@ Here's what this script does:
 
 import os
 import sys
-import time
 import json
 import tempfile
 import http.client
@@ -27,6 +26,7 @@ from config import (
     KARMADA_KUBECONFIG,
     CONFIG_FILES_DIR,
 )
+from readiness import wait_until, wait_for_command, wait_for_http, print_wait_summary
 
 # --- Configuration ---
 APP_HOST_PORT_MAPPING = {
@@ -170,8 +170,8 @@ spec:
 def verify_pod_readiness():
     """Waits for and verifies that all pods are running in all member clusters."""
     print_color(colors.YELLOW, "\n--- 4. Verifying pod readiness ---")
-    print("--> Waiting up to 120 seconds for pods to be running...")
-    for i in range(12):
+
+    def count_ready_clusters():
         ready_count = 0
         for member in MEMBER_CLUSTERS:
             kubeconfig = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
@@ -182,11 +182,12 @@ def verify_pod_readiness():
                 running = [p for p in pods if p.get("status", {}).get("phase") == "Running"]
                 if len(running) == 1:
                     ready_count += 1
-        if ready_count == len(MEMBER_CLUSTERS):
-            print_color(colors.GREEN, "✅ SUCCESS: All pods are running.")
-            return True
-        print(f"Pods not ready yet ({ready_count}/{len(MEMBER_CLUSTERS)}). Retrying in 10s...")
-        time.sleep(10)
+        print(f"Ready clusters: {ready_count}/{len(MEMBER_CLUSTERS)}")
+        return ready_count == len(MEMBER_CLUSTERS)
+
+    if wait_until("pods to be running on all members", count_ready_clusters, 120):
+        print_color(colors.GREEN, "✅ SUCCESS: All pods are running.")
+        return True
     print_color(colors.RED, "❌ FAILED: Timed out waiting for pods to become ready.")
     return False
 
@@ -196,12 +197,10 @@ def expose_services_and_get_nodeport():
     print_color(colors.YELLOW, "\n--- 5. Exposing application via LXD Port Forwarding ---")
     kubeconfig = os.path.join(CONFIG_FILES_DIR, f"{MEMBER_CLUSTERS[0]}.config")
     cmd = ["kubectl", "--kubeconfig", kubeconfig, "get", "service", f"{APP_NAME}-service", "-o", "json"]
-    for _ in range(6):
-        result = run_command(cmd, capture_output=True, check=False)
-        if result.returncode == 0:
-            break
-        time.sleep(10)
-    else:
+    result = wait_for_command(
+        f"service {APP_NAME}-service on {MEMBER_CLUSTERS[0]}", cmd, timeout=60
+    )
+    if not result:
         print_color(colors.RED, "❌ FAILED: Could not find the service.")
         return None
     node_port = json.loads(result.stdout)["spec"]["ports"][0]["nodePort"]
@@ -216,7 +215,10 @@ def verify_http_access():
     """Verifies that each Nginx endpoint is accessible and returns HTTP 200."""
     print_color(colors.YELLOW, "\n--- 6. Verifying HTTP access to all instances ---")
     all_ok = True
-    time.sleep(5)
+    for member, host_port in APP_HOST_PORT_MAPPING.items():
+        wait_for_http(
+            f"proxy on {member}", f"http://127.0.0.1:{host_port}/", timeout=30
+        )
     for member, host_port in APP_HOST_PORT_MAPPING.items():
         print(f"--> Checking connection to {member} (http://127.0.0.1:{host_port})...")
         try:
@@ -277,6 +279,7 @@ def main():
         if not verify_pod_readiness(): sys.exit(1)
         if not expose_services_and_get_nodeport(): sys.exit(1)
         if not verify_http_access(): sys.exit(1)
+        print_wait_summary()
 
         print_color(colors.GREEN, "\n\n✅ --- Simple Custom Flask Demo Completed Successfully! --- ✅")
         all_tests_passed = True
@@ -19,7 +19,6 @@ Here's what it does:
 
 import os
 import sys
-import time
 import json
 import tempfile
 import http.client
@@ -31,6 +30,7 @@ from config import (
     HOST_KUBECONFIG,
     CONFIG_FILES_DIR,
 )
+from readiness import wait_until, wait_for_http, print_wait_summary
 
 # --- Configuration ---
 PROMETHEUS_HELM_REPO_URL = "https://prometheus-community.github.io/helm-charts"
@@ -128,28 +128,21 @@ def verify_installations():
         ])
 
     # Now, wait for pods to be ready
-    print("--> Waiting up to 180 seconds for all Prometheus pods to become ready...")
-    for i in range(18): # 18 * 10s = 3 minutes
-        all_ready = True
+    def all_pods_running():
         for member in MEMBER_CLUSTERS:
             member_kubeconfig = os.path.join(CONFIG_FILES_DIR, f"{member}.config")
             cmd = ["kubectl", "--kubeconfig", member_kubeconfig, "get", "pods", "-n", NAMESPACE, "-l", "app=prometheus,component=server", "-o", "json"]
             result = run_command(cmd, check=False, capture_output=True)
             if result.returncode != 0:
-                all_ready = False
-                break
+                return False
 
             pods = json.loads(result.stdout).get("items", [])
             if not pods or not any(p.get("status", {}).get("phase") == "Running" for p in pods):
-                all_ready = False
-                break
+                return False
+        return True
 
-        if all_ready:
-            print_color(colors.GREEN, "✅ All Prometheus server pods are running.")
-            break
-
-        print(f"Not all pods are ready yet. Retrying in 10s...")
-        time.sleep(10)
+    if wait_until("all Prometheus server pods to be running", all_pods_running):
+        print_color(colors.GREEN, "✅ All Prometheus server pods are running.")
     else:
         print_color(colors.RED, "❌ FAILED: Timed out waiting for pods.")
         return False
@@ -157,7 +150,8 @@ def verify_installations():
     # Finally, verify HTTP access
     print("\n--> Verifying HTTP access to each Prometheus instance...")
     all_accessible = True
-    time.sleep(5) # Give proxies a moment
+    for member, ports in PROMETHEUS_PORTS.items():
+        wait_for_http(f"proxy on {member}", f"http://localhost:{ports['host_port']}/graph", timeout=30)
     for member, ports in PROMETHEUS_PORTS.items():
         print(f"--> Checking connection to {member} (http://localhost:{ports['host_port']})...")
         try:
@@ -213,6 +207,7 @@ def main():
 
         if not verify_installations():
             sys.exit(1)
+        print_wait_summary()
 
         print_color(colors.GREEN, "\n\n✅ --- Prometheus installed and verified successfully on all member clusters! --- ✅")
         print("\nYou can access the UIs on the following ports on your host:")
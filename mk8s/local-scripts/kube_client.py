@@ -0,0 +1 @@
+../../mk8s-local/local-scripts/kube_client.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../mk8s-local/local-scripts/readiness.py
\ No newline at end of file
@@ -2,11 +2,14 @@
 
 import os
 import subprocess
-import time
+import sys
 
 from hcloud import Client
 from hcloud.images import Image
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "local-scripts"))
+from readiness import wait_for_command, wait_or_exit  # noqa: E402
+
 HETZNER_TOKEN = os.environ["HETZNER_TOKEN"]
 IMAGE = Image(name="ubuntu-24.04")
 SERVER_NAME = "nephele-sf-mk8s"
@@ -20,18 +23,24 @@ def main():
     subprocess.run(["ssh-keygen", "-R", SERVER_NAME], check=True)
     # fix_known_hosts(SERVER_NAME)
 
-    time.sleep(30)  # Wait for the server to be fully rebuilt
-
-    subprocess.run(
-        # fmt: off
-        [
-            "ssh",
-            "-o", "StrictHostKeyChecking=accept-new",
-            f"root@{SERVER_NAME}",
-            "sleep 1",
-        ],
-        # fmt: on
-        check=True,
+    # Wait for the rebuilt server to accept SSH connections (and record its key).
+    wait_or_exit(
+        wait_for_command(
+            f"SSH on {SERVER_NAME}",
+            [
+                "ssh",
+                "-o",
+                "StrictHostKeyChecking=accept-new",
+                "-o",
+                "ConnectTimeout=5",
+                "-o",
+                "BatchMode=yes",
+                f"root@{SERVER_NAME}",
+                "true",
+            ],
+            timeout=300,
+        ),
+        f"Timed out waiting for SSH on {SERVER_NAME}.",
     )
 
     print("Syncing local scripts to server...")
@@ -40,7 +49,7 @@ def main():
         [
             "rsync",
             "-e", "ssh",
-            "-avz",
+            "-avzL",
             "./local-scripts/",
             f"root@{SERVER_NAME}:/root/local-scripts/",
         ],
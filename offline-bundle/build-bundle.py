@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+
+"""
+Builds the offline testbed bundle.
+
+Here's what this script does:
+
+1. **Checks for root privileges and required tools**: apt, snap, docker, git, go, helm (and lxc for mk8s-local, unsquashfs for the MicroK8s targets).
+2. **Downloads apt packages**: Resolves the full dependency closure of the packages in contents.py (including the Go PPA and Docker repositories) and builds a local apt repository.
+3. **Downloads snaps**: Fetches each snap with its assertion, so it can be installed offline.
+4. **Downloads single files**: kubectl, kind, Karmada CLIs, uv, install scripts and the metrics-server manifest.
+5. **Bundles git repositories**: Clones the Karmada, HDAR and SMO repositories into `git bundle` files, and pre-downloads their Go modules.
+6. **Pulls Helm charts**: Saves the chart archives and records their resolved versions.
+7. **Saves container images**: Pulls every image (including the ones referenced by the charts, by Karmada's kind tooling and by the MicroK8s add-ons of the bundled snaps) and saves each one to a tarball.
+8. **Exports the LXD base image** used for mk8s-local member containers.
+9. **Writes the manifest and archive**: Records every file with its SHA-256 in manifest.json and packs everything into `nephele-bundle-<version>.tar`, next to a `.sha256` file.
+
+The bundle must be built on the same Ubuntu release as the hosts it is meant for.
+
+Usage:
+    sudo ./build-bundle.py
+    sudo ./build-bundle.py --targets mk8s-local --output /srv/bundles
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import tarfile
+import tempfile
+import urllib.request
+from datetime import datetime, timezone
+
+from common import (
+    run_command,
+    print_color,
+    colors,
+    sha256_file,
+    check_root_privileges,
+    image_file_name,
+)
+import contents
+
+IMAGE_REFERENCE_PATTERNS = [
+    # "image: quay.io/prometheus/prometheus:v3.0.0" in rendered manifests
+    re.compile(r"""^\s*-?\s*image:\s*["']?([^"'\s]+:[^"'\s]+)""", re.MULTILINE),
+    # "--prometheus-config-reloader=quay.io/...:v0.78.2" in container args
+    re.compile(r"=((?:[a-z0-9.-]+\.[a-z]{2,}|docker\.io)/[^\s\"',]+:[^\s\"',]+)"),
+]
+# Base images pinned by tag in Karmada's Dockerfiles (skipping build args).
+DOCKERFILE_FROM_PATTERN = re.compile(r"^FROM\s+([^\s$]+:[^\s$]+)", re.MULTILINE)
+KIND_NODE_PATTERN = re.compile(r"kindest/node:v[0-9.]+")
+# The pause image set in MicroK8s' containerd template.
+SANDBOX_IMAGE_PATTERN = re.compile(r'sandbox_image\s*=\s*"([^"]+)"')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds the offline testbed bundle.")
+    parser.add_argument(
+        "--targets",
+        nargs="+",
+        choices=sorted(contents.TARGETS),
+        default=sorted(contents.TARGETS),
+        help="Deployment targets to include. Default: all of them.",
+    )
+    parser.add_argument(
+        "--output", default=".", help="Directory for the archive. Default: '.'."
+    )
+    args = parser.parse_args()
+
+    check_root_privileges("build-bundle.py")
+    targets = {name: contents.TARGETS[name] for name in args.targets}
+    check_tools(targets)
+
+    with tempfile.TemporaryDirectory(prefix="nephele-bundle-") as workdir:
+        staging = os.path.join(workdir, "bundle")
+        os.makedirs(staging)
+        components = {
+            "apt": collect_apt_packages(staging, targets),
+            "snaps": collect_snaps(staging, targets),
+            "downloads": collect_downloads(staging, targets),
+        }
+        components["git"] = collect_git_repos(staging, workdir)
+        if any(target["go_modules"] for target in targets.values()):
+            components["go_modules"] = collect_go_modules(staging, workdir)
+        charts = collect_helm_charts(staging)
+        components["charts"] = charts
+        components["images"] = collect_images(
+            staging, targets, charts, components["snaps"], workdir
+        )
+        if any(target["lxd_image"] for target in targets.values()):
+            components["lxd_image"] = collect_lxd_image(staging)
+
+        manifest = write_manifest(staging, targets, components)
+        archive = write_archive(staging, args.output)
+
+    print_color(colors.GREEN, f"\n✅ Bundle {manifest['version']} written to {archive}")
+
+
+def check_tools(targets):
+    """Fails early if a tool needed to build the bundle is missing."""
+    required = ["apt-get", "apt-cache", "dpkg-scanpackages", "snap", "docker", "git"]
+    required += ["helm", "add-apt-repository"]
+    if any(target["go_modules"] for target in targets.values()):
+        required.append("go")
+    if any(target["lxd_image"] for target in targets.values()):
+        required.append("lxc")
+    if "microk8s-addons" in wanted_image_groups(targets):
+        required.append("unsquashfs")
+    missing = [tool for tool in required if shutil.which(tool) is None]
+    if missing:
+        print_color(colors.RED, f"FATAL: Missing tools: {', '.join(missing)}")
+        print("Hint: 'apt-get install dpkg-dev software-properties-common")
+        print("squashfs-tools' provides dpkg-scanpackages, add-apt-repository and")
+        print("unsquashfs.")
+        raise SystemExit(1)
+
+
+def lsb_codename():
+    return run_command(["lsb_release", "-cs"], capture_output=True).stdout.strip()
+
+
+def collect_apt_packages(staging, targets):
+    """Downloads the dependency closure of all apt packages into a local repo."""
+    print_color(colors.YELLOW, "\n--- Collecting apt packages ---")
+    for ppa in contents.APT_PPAS:
+        run_command(["add-apt-repository", "-y", ppa])
+    os.makedirs("/etc/apt/keyrings", exist_ok=True)
+    key_path = "/etc/apt/keyrings/docker.asc"
+    download(contents.DOCKER_APT_KEY_URL, key_path)
+    distro = run_command(["lsb_release", "-is"], capture_output=True).stdout
+    repo_line = contents.DOCKER_APT_REPO.format(
+        distro=distro.strip().lower(), codename=lsb_codename()
+    ).replace("deb ", f"deb [signed-by={key_path}] ", 1)
+    with open("/etc/apt/sources.list.d/docker.list", "w") as f:
+        f.write(repo_line + "\n")
+    run_command(["apt-get", "update"])
+
+    packages = sorted({pkg for target in targets.values() for pkg in target["apt"]})
+    result = run_command(
+        [
+            "apt-cache",
+            "depends",
+            "--recurse",
+            "--no-recommends",
+            "--no-suggests",
+            "--no-conflicts",
+            "--no-breaks",
+            "--no-replaces",
+            "--no-enhances",
+            *packages,
+        ],
+        capture_output=True,
+    )
+    closure = sorted(
+        {
+            line.strip()
+            for line in result.stdout.splitlines()
+            if line and not line.startswith(" ") and not line.startswith("<")
+        }
+    )
+
+    apt_dir = os.path.join(staging, "apt")
+    os.makedirs(apt_dir)
+    run_command(["apt-get", "download", *closure], cwd=apt_dir)
+    with open(os.path.join(apt_dir, "Packages"), "w") as f:
+        subprocess.run(
+            ["dpkg-scanpackages", "--multiversion", ".", "/dev/null"],
+            cwd=apt_dir,
+            stdout=f,
+            check=True,
+        )
+    return {"packages": packages, "files": len(os.listdir(apt_dir)) - 1}
+
+
+def collect_snaps(staging, targets):
+    """Downloads every snap needed by the targets, with its assertion."""
+    print_color(colors.YELLOW, "\n--- Collecting snaps ---")
+    snap_ids = sorted(
+        {
+            snap_id
+            for target in targets.values()
+            for snap_id in target["snaps"] + target["kept_snaps"]
+        }
+    )
+    collected = {}
+    for snap_id in snap_ids:
+        name, channel, classic = contents.SNAPS[snap_id]
+        snap_dir = os.path.join(staging, "snaps", snap_id)
+        os.makedirs(snap_dir)
+        run_command(["snap", "download", name, f"--channel={channel}"], cwd=snap_dir)
+        files = sorted(os.listdir(snap_dir))
+        collected[snap_id] = {
+            "name": name,
+            "channel": channel,
+            "classic": classic,
+            "snap": next(f for f in files if f.endswith(".snap")),
+            "assert": next(f for f in files if f.endswith(".assert")),
+        }
+    return collected
+
+
+def download(url, path):
+    """Downloads a URL to a file."""
+    print_color(colors.BLUE, f"--> Downloading: {url}")
+    with urllib.request.urlopen(url, timeout=300) as response, open(path, "wb") as f:
+        shutil.copyfileobj(response, f, length=1024 * 1024)
+
+
+def collect_downloads(staging, targets):
+    """Downloads single files: binaries, install scripts and manifests."""
+    print_color(colors.YELLOW, "\n--- Collecting binaries, scripts and manifests ---")
+    wanted = {item for target in targets.values() for item in target["downloads"]}
+    # Scripts and manifests are small and always shipped.
+    wanted |= {
+        item
+        for item, (_, _, kind) in contents.DOWNLOADS.items()
+        if kind in ("script", "manifest")
+    }
+    downloads_dir = os.path.join(staging, "downloads")
+    os.makedirs(downloads_dir)
+    collected = {}
+    for item in sorted(wanted):
+        url, file_name, kind = contents.DOWNLOADS[item]
+        download(url, os.path.join(downloads_dir, file_name))
+        collected[item] = {"file": file_name, "kind": kind, "url": url}
+    return collected
+
+
+def collect_git_repos(staging, workdir):
+    """Clones each repository and stores it as a single `git bundle` file."""
+    print_color(colors.YELLOW, "\n--- Collecting git repositories ---")
+    git_dir = os.path.join(staging, "git")
+    os.makedirs(git_dir)
+    collected = {}
+    for name, (url, branch) in contents.GIT_REPOS.items():
+        checkout = os.path.join(workdir, "gits", name)
+        command = ["git", "clone", url, checkout]
+        if branch:
+            command[2:2] = ["--branch", branch]
+        run_command(command)
+        commit = run_command(
+            ["git", "rev-parse", "HEAD"], cwd=checkout, capture_output=True
+        ).stdout.strip()
+        bundle_file = f"{name}.bundle"
+        run_command(
+            ["git", "bundle", "create", os.path.join(git_dir, bundle_file), "--all"],
+            cwd=checkout,
+        )
+        collected[name] = {
+            "file": bundle_file,
+            "url": url,
+            "branch": branch,
+            "commit": commit,
+        }
+    return collected
+
+
+def collect_go_modules(staging, workdir):
+    """Pre-downloads Go modules for the bundled checkouts into one GOMODCACHE."""
+    print_color(colors.YELLOW, "\n--- Collecting Go modules ---")
+    modcache = os.path.join(workdir, "gomodcache")
+    go_env = {
+        "GOMODCACHE": modcache,
+        "GOFLAGS": "-modcacherw",
+        "GOBIN": os.path.join(workdir, "gobin"),
+    }
+    for module_dir in contents.GO_MODULE_DIRS:
+        run_command(
+            ["go", "mod", "download"],
+            cwd=os.path.join(workdir, "gits", module_dir),
+            env=go_env,
+        )
+    for install_target in contents.GO_INSTALL_TARGETS:
+        run_command(["go", "install", install_target], env=go_env)
+
+    archive = os.path.join(staging, "go", "gomodcache.tar")
+    os.makedirs(os.path.dirname(archive))
+    with tarfile.open(archive, "w") as tar:
+        tar.add(modcache, arcname="mod")
+    return {"file": "gomodcache.tar", "install_targets": contents.GO_INSTALL_TARGETS}
+
+
+def collect_helm_charts(staging):
+    """Pulls each chart archive and records the version that was resolved."""
+    print_color(colors.YELLOW, "\n--- Collecting Helm charts ---")
+    charts_dir = os.path.join(staging, "charts")
+    os.makedirs(charts_dir)
+    repos = {(name, url) for name, url, _, _ in contents.HELM_CHARTS.values()}
+    for repo_name, repo_url in sorted(repos):
+        run_command(["helm", "repo", "add", repo_name, repo_url, "--force-update"])
+    run_command(["helm", "repo", "update"])
+
+    collected = {}
+    for chart_id, (repo_name, _, chart, version) in contents.HELM_CHARTS.items():
+        before = set(os.listdir(charts_dir))
+        command = ["helm", "pull", f"{repo_name}/{chart}", "-d", charts_dir]
+        if version:
+            command += ["--version", version]
+        run_command(command)
+        (file_name,) = set(os.listdir(charts_dir)) - before
+        collected[chart_id] = {
+            "file": file_name,
+            "chart": f"{repo_name}/{chart}",
+            "version": file_name[len(chart) + 1 : -len(".tgz")],
+        }
+    return collected
+
+
+def images_in_text(text):
+    """Finds image references in rendered manifests or Dockerfiles."""
+    found = set()
+    for pattern in IMAGE_REFERENCE_PATTERNS:
+        found.update(pattern.findall(text))
+    return found
+
+
+def microk8s_addon_images(staging, snaps, workdir):
+    """
+    Finds the images that MicroK8s pulls for its CNI, its sandbox and the
+    MICROK8S_ADDONS, by reading the manifests shipped in each bundled snap.
+    """
+    found = set()
+    for snap_id, snap in sorted(snaps.items()):
+        if snap["name"] != "microk8s":
+            continue
+        root = os.path.join(workdir, "snaps", snap_id)
+        snap_path = os.path.join(staging, "snaps", snap_id, snap["snap"])
+        run_command(["unsquashfs", "-no-progress", "-d", root, snap_path])
+        sources = [os.path.join(root, "default-args")]
+        for dir_path, dir_names, _ in os.walk(root):
+            if os.path.basename(dir_path) == "addons":
+                sources += [
+                    os.path.join(dir_path, addon)
+                    for addon in contents.MICROK8S_ADDONS
+                    if addon in dir_names
+                ]
+        missing = [
+            addon
+            for addon in contents.MICROK8S_ADDONS
+            if not any(os.path.basename(source) == addon for source in sources)
+        ]
+        if missing:
+            print_color(
+                colors.RED,
+                f"FATAL: Add-ons {', '.join(missing)} not found in snap {snap_id}.",
+            )
+            raise SystemExit(1)
+
+        for source in sources:
+            for dir_path, _, file_names in os.walk(source):
+                for file_name in file_names:
+                    with open(os.path.join(dir_path, file_name), errors="ignore") as f:
+                        text = f.read()
+                    found |= images_in_text(text)
+                    found |= set(SANDBOX_IMAGE_PATTERN.findall(text))
+    # Skip references templated by the add-on scripts.
+    return {image for image in found if "$" not in image and "{" not in image}
+
+
+def discover_images(charts, snaps, wanted_groups, staging, workdir):
+    """
+    Returns {group: images} for the images found in charts, Karmada and the
+    MicroK8s snaps.
+    """
+    groups = {
+        "karmada": set(contents.KARMADA_IMAGES),
+        "k8s": set(contents.K8S_IMAGES),
+        "extra": set(contents.EXTRA_IMAGES),
+        "charts": set(),
+        "kind": set(),
+        "microk8s-addons": set(),
+    }
+    for chart in charts.values():
+        chart_path = os.path.join(staging, "charts", chart["file"])
+        rendered = run_command(
+            ["helm", "template", "bundle", chart_path], capture_output=True
+        ).stdout
+        groups["charts"] |= images_in_text(rendered)
+
+    karmada = os.path.join(workdir, "gits", "karmada")
+    for root, _, files in os.walk(karmada):
+        for file_name in files:
+            path = os.path.join(root, file_name)
+            if file_name.startswith("Dockerfile"):
+                with open(path, errors="ignore") as f:
+                    groups["kind"] |= set(DOCKERFILE_FROM_PATTERN.findall(f.read()))
+            elif file_name.endswith(".sh") and f"{os.sep}hack{os.sep}" in path:
+                with open(path, errors="ignore") as f:
+                    groups["kind"] |= set(KIND_NODE_PATTERN.findall(f.read()))
+    if "microk8s-addons" in wanted_groups:
+        groups["microk8s-addons"] = microk8s_addon_images(staging, snaps, workdir)
+    return groups
+
+
+def wanted_image_groups(targets):
+    """Returns the image groups loaded by at least one of the targets."""
+    return {
+        group
+        for target in targets.values()
+        for groups in target["images"].values()
+        for group in groups
+    }
+
+
+def collect_images(staging, targets, charts, snaps, workdir):
+    """Pulls and saves every container image used by the targets."""
+    print_color(colors.YELLOW, "\n--- Collecting container images ---")
+    wanted_groups = wanted_image_groups(targets)
+    groups = discover_images(charts, snaps, wanted_groups, staging, workdir)
+    images_dir = os.path.join(staging, "images")
+    os.makedirs(images_dir)
+    collected = {}
+    for group in sorted(wanted_groups):
+        for image in sorted(groups[group]):
+            if image in collected:
+                collected[image]["groups"].append(group)
+                continue
+            run_command(["docker", "pull", image])
+            file_name = image_file_name(image)
+            image_path = os.path.join(images_dir, file_name)
+            run_command(["docker", "save", "-o", image_path, image])
+            collected[image] = {"file": file_name, "groups": [group]}
+    return collected
+
+
+def collect_lxd_image(staging):
+    """Exports the LXD base image used by mk8s-local member containers."""
+    print_color(colors.YELLOW, "\n--- Collecting the LXD base image ---")
+    lxd_dir = os.path.join(staging, "lxd")
+    os.makedirs(lxd_dir)
+    run_command(
+        [
+            "lxc",
+            "image",
+            "copy",
+            contents.LXD_IMAGE,
+            "local:",
+            "--alias",
+            contents.LXD_IMAGE_ALIAS,
+        ],
+        check=False,
+    )
+    run_command(["lxc", "image", "export", contents.LXD_IMAGE_ALIAS, lxd_dir + "/"])
+    return {
+        "source": contents.LXD_IMAGE,
+        "alias": contents.LXD_IMAGE_ALIAS,
+        "files": sorted(os.listdir(lxd_dir)),
+    }
+
+
+def write_manifest(staging, targets, components):
+    """Writes manifest.json, with the checksum of every file in the bundle."""
+    print_color(colors.YELLOW, "\n--- Writing the bundle manifest ---")
+    files = {}
+    for root, _, names in os.walk(staging):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, staging)
+            files[relative] = {
+                "sha256": sha256_file(path),
+                "size": os.path.getsize(path),
+            }
+    manifest = {
+        "version": contents.BUNDLE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "ubuntu_codename": lsb_codename(),
+        "targets": targets,
+        "components": components,
+        "files": files,
+    }
+    with open(os.path.join(staging, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    total = sum(entry["size"] for entry in files.values())
+    print(f"{len(files)} files, {total / 2**30:.1f} GiB.")
+    return manifest
+
+
+def write_archive(staging, output_dir):
+    """Packs the staging directory into an uncompressed tar and its .sha256."""
+    os.makedirs(output_dir, exist_ok=True)
+    archive = os.path.join(output_dir, f"nephele-bundle-{contents.BUNDLE_VERSION}.tar")
+    print_color(colors.YELLOW, f"\n--- Writing {archive} ---")
+    # Images and packages are already compressed: a plain tar keeps install
+    # time bound by disk speed rather than by decompression.
+    with tarfile.open(archive, "w") as tar:
+        tar.add(staging, arcname=".")
+    with open(f"{archive}.sha256", "w") as f:
+        f.write(f"{sha256_file(archive)}  {os.path.basename(archive)}\n")
+    return archive
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import subprocess
+import sys
+
+
+# --- ANSI Color Codes for Better Output ---
+class colors:
+    GREEN = "\033[92m"
+    RED = "\033[91m"
+    YELLOW = "\033[93m"
+    BLUE = "\033[94m"
+    GRAY = "\033[90m"
+    ENDC = "\033[0m"
+
+
+def print_color(color, message):
+    """Prints a message in a given color."""
+    print(f"{color}{message}{colors.ENDC}")
+
+
+def run_command(
+    command, check=True, cwd=None, env=None, capture_output=False, stdin=None
+):
+    """Runs a command, printing it first, and exits on failure if `check`."""
+    print_color(colors.BLUE, f"--> Executing: {' '.join(command)}")
+    process_env = os.environ.copy()
+    if env:
+        process_env.update(env)
+    try:
+        return subprocess.run(
+            command,
+            check=check,
+            cwd=cwd,
+            env=process_env,
+            text=True,
+            capture_output=capture_output,
+            stdin=stdin,
+        )
+    except FileNotFoundError:
+        print_color(
+            colors.RED, f"FATAL: Command '{command[0]}' not found. Is it in your PATH?"
+        )
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        if capture_output and e.stderr:
+            print_color(colors.RED, f"Stderr:\n{e.stderr}")
+        print_color(
+            colors.RED, f"FATAL: Command failed with return code {e.returncode}."
+        )
+        sys.exit(1)
+
+
+def sha256_file(path):
+    """Returns the hex SHA-256 of a file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def check_root_privileges(script_name="This script"):
+    """Checks for root privileges and exits if not found."""
+    if os.geteuid() != 0:
+        print_color(colors.RED, f"FATAL: {script_name} must be run as the 'root' user.")
+        sys.exit(1)
+
+
+def image_file_name(image):
+    """Maps an image reference to a flat, file-system safe tarball name."""
+    return image.replace("/", "_").replace(":", "_").replace("@", "_") + ".tar"
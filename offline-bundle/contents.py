@@ -0,0 +1,234 @@
+"""
+Everything that goes into the offline testbed bundle.
+
+build-bundle.py collects these items on a connected host; install-bundle.py
+installs the subset needed by one deployment target (kind, mk8s or mk8s-local)
+without any network access.
+
+Bump BUNDLE_VERSION whenever one of the pinned versions below changes.
+"""
+
+BUNDLE_VERSION = "2025.2"
+BUNDLE_DIR = "/opt/nephele-bundle"
+GITS = "/root/gits"
+
+KARMADA_VERSION = "1.14.2"
+KARMADA_RELEASE_BRANCH = "release-1.14"
+KUBE_VERSION_TAG = "v1.31.3"
+KIND_VERSION = "v0.29.0"
+UV_VERSION = "0.7.13"
+METRICS_SERVER_VERSION = "v0.7.2"
+
+# --- apt ---
+# Extra repositories the builder needs to resolve the packages below.
+APT_PPAS = ["ppa:longsleep/golang-backports"]
+DOCKER_APT_KEY_URL = "https://download.docker.com/linux/ubuntu/gpg"
+DOCKER_APT_REPO = "deb https://download.docker.com/linux/{distro} {codename} stable"
+
+BASE_APT_PACKAGES = [
+    "ca-certificates",
+    "lsb-release",
+    "curl",
+    "wget",
+    "tar",
+    "gnupg",
+    "vim",
+    "build-essential",
+    "python3-requests",
+    "git",
+    "tree",
+    "iotop",
+    "jq",
+    "snapd",
+]
+DOCKER_CE_APT_PACKAGES = [
+    "docker-ce",
+    "docker-ce-cli",
+    "containerd.io",
+    "docker-buildx-plugin",
+    "docker-compose-plugin",
+]
+GO_APT_PACKAGES = ["golang-go"]
+MK8S_LOCAL_APT_PACKAGES = ["make", "fish", "docker.io", "docker-buildx"]
+
+# --- snaps: id -> (snap name, channel, classic) ---
+SNAPS = {
+    "lxd": ("lxd", "latest/stable", False),
+    "helm": ("helm", "latest/stable", True),
+    "kubeadm": ("kubeadm", "latest/stable", True),
+    "kubectl": ("kubectl", "latest/stable", True),
+    "microk8s": ("microk8s", "latest/stable", True),
+    "microk8s-1.29": ("microk8s", "1.29/stable", True),
+    "microk8s-1.31": ("microk8s", "1.31/stable", True),
+}
+
+# --- Single files: id -> (url, file name in the bundle, kind) ---
+# kind is "binary" (installed to /usr/local/bin), "tgz-binary" (extracted
+# there), "script" or "manifest" (kept in the bundle for reference / apply).
+DOWNLOADS = {
+    "kubectl": (
+        f"https://dl.k8s.io/release/{KUBE_VERSION_TAG}/bin/linux/amd64/kubectl",
+        "kubectl",
+        "binary",
+    ),
+    "kind": (
+        f"https://kind.sigs.k8s.io/dl/{KIND_VERSION}/kind-linux-amd64",
+        "kind",
+        "binary",
+    ),
+    "karmadactl": (
+        "https://github.com/karmada-io/karmada/releases/download/"
+        f"v{KARMADA_VERSION}/karmadactl-linux-amd64.tgz",
+        "karmadactl-linux-amd64.tgz",
+        "tgz-binary",
+    ),
+    "kubectl-karmada": (
+        "https://github.com/karmada-io/karmada/releases/download/"
+        f"v{KARMADA_VERSION}/kubectl-karmada-linux-amd64.tgz",
+        "kubectl-karmada-linux-amd64.tgz",
+        "tgz-binary",
+    ),
+    "uv": (
+        f"https://github.com/astral-sh/uv/releases/download/{UV_VERSION}/"
+        "uv-x86_64-unknown-linux-gnu.tar.gz",
+        "uv-x86_64-unknown-linux-gnu.tar.gz",
+        "tgz-binary",
+    ),
+    "uv-install-script": (
+        f"https://astral.sh/uv/{UV_VERSION}/install.sh",
+        "uv-install.sh",
+        "script",
+    ),
+    "karmada-install-cli": (
+        "https://raw.githubusercontent.com/karmada-io/karmada/"
+        f"v{KARMADA_VERSION}/hack/install-cli.sh",
+        "karmada-install-cli.sh",
+        "script",
+    ),
+    "metrics-server": (
+        "https://github.com/kubernetes-sigs/metrics-server/releases/download/"
+        f"{METRICS_SERVER_VERSION}/components.yaml",
+        "metrics-server-components.yaml",
+        "manifest",
+    ),
+}
+
+# --- Git repositories: directory name under GITS -> (url, branch or None) ---
+GIT_REPOS = {
+    "karmada": ("https://github.com/karmada-io/karmada.git", KARMADA_RELEASE_BRANCH),
+    "hdar": (
+        "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/nephele-hdar.git",
+        None,
+    ),
+    "smo": (
+        "https://gitlab.eclipse.org/eclipse-research-labs/nephele-project/smo.git",
+        "main",
+    ),
+}
+# Go modules needed to build from these checkouts (relative to GITS), plus
+# `go install` targets. They are pre-downloaded into a shared GOMODCACHE.
+GO_MODULE_DIRS = ["karmada", "hdar/components/hdar-ctl"]
+GO_INSTALL_TARGETS = [f"sigs.k8s.io/kind@{KIND_VERSION}"]
+
+# --- Helm charts: id -> (repo name, repo url, chart, version or None) ---
+# A None version means "latest at build time"; the resolved version is
+# recorded in the bundle manifest. The Prometheus charts are pinned to the
+# versions the install scripts look up in their chart cache.
+HELM_CHARTS = {
+    "prometheus": (
+        "prometheus-community",
+        "https://prometheus-community.github.io/helm-charts",
+        "prometheus",
+        "25.27.0",
+    ),
+    "kube-prometheus-stack": (
+        "prometheus-community",
+        "https://prometheus-community.github.io/helm-charts",
+        "kube-prometheus-stack",
+        "65.1.1",
+    ),
+}
+
+# --- Container images ---
+# Images referenced by the rendered Helm charts, by FROM lines of the Karmada
+# Dockerfiles and by kindest/node references in Karmada's hack/ scripts are
+# added automatically at build time.
+KARMADA_IMAGES = [
+    f"docker.io/karmada/{name}:v{KARMADA_VERSION}"
+    for name in (
+        "karmada-aggregated-apiserver",
+        "karmada-controller-manager",
+        "karmada-scheduler",
+        "karmada-webhook",
+        "karmada-agent",
+    )
+]
+K8S_IMAGES = [
+    "registry.k8s.io/etcd:3.5.12-0",
+    f"registry.k8s.io/kube-apiserver:{KUBE_VERSION_TAG}",
+    f"registry.k8s.io/kube-controller-manager:{KUBE_VERSION_TAG}",
+]
+EXTRA_IMAGES = [
+    "docker.io/library/registry:latest",
+    "docker.io/library/registry:2",
+    # The BuildKit daemon of the buildx builders (imagebuild.py, image_build.py).
+    "docker.io/moby/buildkit:buildx-stable-1",
+    "docker.io/library/busybox:latest",
+    "docker.io/library/nginx:latest",
+    "docker.io/library/nginx:1.21.6",
+    # Used by the bundled metrics-server manifest (demo-nginx).
+    f"registry.k8s.io/metrics-server/metrics-server:{METRICS_SERVER_VERSION}",
+]
+# The images pulled by `microk8s enable` for these add-ons, and by MicroK8s
+# itself (Calico CNI, pause sandbox), are read from the bundled MicroK8s snaps
+# into the "microk8s-addons" group.
+MICROK8S_ADDONS = ["dns", "hostpath-storage", "registry"]
+
+# --- LXD base image for mk8s-local member containers ---
+LXD_IMAGE = "ubuntu:22.04"
+LXD_IMAGE_ALIAS = "nephele/ubuntu-22.04"
+
+# --- What each deployment target installs from the bundle ---
+# "snaps" are installed on the host by install-bundle.py; "kept_snaps" are only
+# unpacked into the bundle directory, to be installed later by the setup
+# recipes (mk8s) or pushed into LXD member containers (mk8s-local). "images"
+# maps each container runtime (Docker or the MicroK8s containerd) to the image
+# groups collected by the builder that are loaded into it.
+TARGETS = {
+    "kind": {
+        "apt": BASE_APT_PACKAGES + DOCKER_CE_APT_PACKAGES + GO_APT_PACKAGES,
+        "snaps": ["lxd", "helm", "kubeadm"],
+        "kept_snaps": [],
+        "downloads": ["kubectl", "kind", "karmadactl", "kubectl-karmada", "uv"],
+        "go_modules": True,
+        "images": {"docker": ["karmada", "k8s", "charts", "extra", "kind"]},
+        "lxd_image": False,
+    },
+    "mk8s": {
+        "apt": BASE_APT_PACKAGES + DOCKER_CE_APT_PACKAGES + GO_APT_PACKAGES,
+        "snaps": [],
+        "kept_snaps": ["microk8s-1.29"],
+        "downloads": ["karmadactl", "kubectl-karmada", "uv"],
+        "go_modules": True,
+        # The host Docker only runs the registry; the clusters use MicroK8s.
+        "images": {
+            "docker": ["extra"],
+            "microk8s": ["karmada", "k8s", "charts", "extra", "microk8s-addons"],
+        },
+        "lxd_image": False,
+    },
+    "mk8s-local": {
+        "apt": MK8S_LOCAL_APT_PACKAGES,
+        "snaps": ["microk8s", "lxd", "kubectl", "helm"],
+        "kept_snaps": ["microk8s-1.31"],
+        "downloads": ["karmadactl", "kubectl-karmada"],
+        "go_modules": False,
+        # The MicroK8s add-on images go to the host MicroK8s here, and are
+        # imported into the member containers by golden_image.py.
+        "images": {
+            "docker": ["karmada", "k8s", "charts", "extra"],
+            "microk8s": ["microk8s-addons"],
+        },
+        "lxd_image": True,
+    },
+}
@@ -0,0 +1,77 @@
+"""
+Recipe to copy the offline testbed bundle to a server and install it there.
+
+The archive is taken from NEPHELE_BUNDLE and the deployment target from the
+'bundle_target' host data (default: kind):
+
+NEPHELE_BUNDLE=nephele-bundle-2025.2.tar \
+    pyinfra -y --user root ${SERVER_NAME} deploy-bundle.py --data bundle_target=mk8s
+
+Warning: connection as user root.
+"""
+
+import os
+
+from pyinfra import host, logger
+from pyinfra.operations import files, python, server
+
+from contents import BUNDLE_DIR
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE = os.getenv("NEPHELE_BUNDLE", "nephele-bundle.tar")
+REMOTE_DIR = "/root/nephele-bundle"
+
+
+def log_callback(result):
+    logger.info("-" * 60)
+    if result.stdout:
+        logger.info(result.stdout)
+    if result.stderr:
+        logger.info("stderr:")
+        logger.info(result.stderr)
+    logger.info("-" * 60)
+
+
+def main() -> None:
+    target = host.data.get("bundle_target", "kind")
+    archive_name = os.path.basename(ARCHIVE)
+
+    files.directory(
+        name=f"Create {REMOTE_DIR} directory",
+        path=REMOTE_DIR,
+    )
+    for local_file in ("common.py", "contents.py", "install-bundle.py"):
+        files.put(
+            name=f"Put file {local_file}",
+            src=os.path.join(HERE, local_file),
+            dest=f"{REMOTE_DIR}/{local_file}",
+            mode="755",
+        )
+    # files.put compares checksums, so an unchanged archive is not re-sent.
+    files.put(
+        name=f"Put bundle {archive_name}",
+        src=ARCHIVE,
+        dest=f"{REMOTE_DIR}/{archive_name}",
+    )
+    if os.path.exists(f"{ARCHIVE}.sha256"):
+        files.put(
+            name=f"Put file {archive_name}.sha256",
+            src=f"{ARCHIVE}.sha256",
+            dest=f"{REMOTE_DIR}/{archive_name}.sha256",
+        )
+
+    result = server.shell(
+        name=f"Install bundle for target {target}",
+        commands=[
+            f"cd {REMOTE_DIR} && python3 install-bundle.py {archive_name} "
+            f"--target {target} --bundle-dir {BUNDLE_DIR}"
+        ],
+    )
+    python.call(
+        name="Show bundle installation log",
+        function=log_callback,
+        result=result,
+    )
+
+
+main()
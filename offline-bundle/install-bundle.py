@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+
+"""
+Installs the offline testbed bundle on a host without network access.
+
+Here's what this script does:
+
+1. **Verifies the archive**: Checks the `.sha256` of the archive (if present), extracts it to the bundle directory and checks every file against manifest.json.
+2. **Installs apt packages**: Registers the bundle as a local apt repository and installs the packages of the target from it.
+3. **Installs snaps**: Acknowledges the bundled assertions and installs the snaps (member snaps are left in the bundle directory for the LXD containers).
+4. **Installs binaries**: kubectl, kind, the Karmada CLIs and uv, into /usr/local/bin.
+5. **Restores git repositories and Go modules**: Clones the bundled repositories into /root/gits, fills the Go module cache and makes Go work offline.
+6. **Loads container images**: Into Docker, and into the MicroK8s containerd for the 'mk8s' target and for the MicroK8s add-ons of 'mk8s-local'.
+7. **Imports the LXD base image** (mk8s-local only).
+
+After this, the regular setup scripts of the target can run with the 'offline_bundle' host data set (see README.md).
+As those scripts reset Docker and MicroK8s, they call this script again with `--images-only` once the runtimes are back.
+
+Usage:
+    sudo ./install-bundle.py nephele-bundle-2025.2.tar --target kind
+    sudo ./install-bundle.py --images-only --target kind
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import tarfile
+
+from common import (
+    run_command,
+    print_color,
+    colors,
+    sha256_file,
+    check_root_privileges,
+)
+import contents
+
+APT_LIST = "/etc/apt/sources.list.d/nephele-bundle.list"
+INSTALL_BIN_DIR = "/usr/local/bin"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Installs the offline testbed bundle on this host."
+    )
+    parser.add_argument(
+        "archive", nargs="?", help="Path to nephele-bundle-<version>.tar."
+    )
+    parser.add_argument(
+        "--target",
+        required=True,
+        choices=sorted(contents.TARGETS),
+        help="Deployment target to install.",
+    )
+    parser.add_argument(
+        "--bundle-dir",
+        default=contents.BUNDLE_DIR,
+        help=f"Where to extract the bundle. Default: {contents.BUNDLE_DIR}.",
+    )
+    parser.add_argument(
+        "--images-only",
+        action="store_true",
+        help="Only (re)load the container images of an already extracted bundle.",
+    )
+    args = parser.parse_args()
+    if not args.archive and not args.images_only:
+        parser.error("the archive is required, unless --images-only is given")
+
+    check_root_privileges("install-bundle.py")
+    if args.images_only:
+        with open(os.path.join(args.bundle_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+    else:
+        manifest = extract_bundle(args.archive, args.bundle_dir)
+    if args.target not in manifest["targets"]:
+        print_color(
+            colors.RED,
+            f"FATAL: Bundle {manifest['version']} was not built for '{args.target}'.",
+        )
+        raise SystemExit(1)
+
+    target = manifest["targets"][args.target]
+    components = manifest["components"]
+    if args.images_only:
+        load_images(args.bundle_dir, target, components["images"])
+        return
+
+    install_apt_packages(args.bundle_dir, target)
+    install_snaps(args.bundle_dir, target, components["snaps"])
+    install_downloads(args.bundle_dir, target, components["downloads"])
+    restore_git_repos(args.bundle_dir, components["git"])
+    if target["go_modules"]:
+        restore_go_modules(args.bundle_dir)
+    load_images(args.bundle_dir, target, components["images"])
+    if target["lxd_image"]:
+        import_lxd_image(args.bundle_dir, components["lxd_image"])
+
+    print_color(
+        colors.GREEN,
+        f"\n✅ Bundle {manifest['version']} installed for target '{args.target}'.",
+    )
+
+
+def extract_bundle(archive, bundle_dir):
+    """Verifies and extracts the archive, then checks every extracted file."""
+    print_color(colors.YELLOW, "\n--- Verifying and extracting the bundle ---")
+    checksum_file = f"{archive}.sha256"
+    if os.path.exists(checksum_file):
+        with open(checksum_file) as f:
+            expected = f.read().split()[0]
+        if sha256_file(archive) != expected:
+            print_color(colors.RED, f"FATAL: {archive} does not match {checksum_file}.")
+            raise SystemExit(1)
+        print("Archive checksum OK.")
+    else:
+        print_color(colors.YELLOW, f"No {checksum_file} found, skipping this check.")
+
+    if os.path.isdir(bundle_dir):
+        print(f"Removing previous bundle in {bundle_dir}...")
+        shutil.rmtree(bundle_dir)
+    os.makedirs(bundle_dir)
+    with tarfile.open(archive) as tar:
+        tar.extractall(bundle_dir, filter="data")
+
+    with open(os.path.join(bundle_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    corrupted = [
+        relative
+        for relative, entry in manifest["files"].items()
+        if sha256_file(os.path.join(bundle_dir, relative)) != entry["sha256"]
+    ]
+    if corrupted:
+        print_color(colors.RED, f"FATAL: Corrupted files: {', '.join(corrupted)}")
+        raise SystemExit(1)
+    print(f"Bundle {manifest['version']}: {len(manifest['files'])} files OK.")
+
+    codename = run_command(["lsb_release", "-cs"], capture_output=True).stdout.strip()
+    if codename != manifest["ubuntu_codename"]:
+        print_color(
+            colors.YELLOW,
+            f"WARNING: Bundle was built on '{manifest['ubuntu_codename']}', "
+            f"this host runs '{codename}'. apt packages may not install.",
+        )
+    return manifest
+
+
+def install_apt_packages(bundle_dir, target):
+    """Installs the apt packages of the target from the bundled repository."""
+    print_color(colors.YELLOW, "\n--- Installing apt packages ---")
+    with open(APT_LIST, "w") as f:
+        f.write(f"deb [trusted=yes] file:{bundle_dir}/apt ./\n")
+    # Only refresh the bundle repository: the others are unreachable.
+    run_command(
+        [
+            "apt-get",
+            "update",
+            "-o",
+            f"Dir::Etc::sourcelist={APT_LIST}",
+            "-o",
+            "Dir::Etc::sourceparts=-",
+            "-o",
+            "APT::Get::List-Cleanup=0",
+        ]
+    )
+    run_command(
+        ["apt-get", "install", "-y", "--no-install-recommends", *target["apt"]],
+        env={"DEBIAN_FRONTEND": "noninteractive"},
+    )
+
+
+def install_snaps(bundle_dir, target, snaps):
+    """Installs the host snaps of the target from their bundled files."""
+    print_color(colors.YELLOW, "\n--- Installing snaps ---")
+    installed = run_command(["snap", "list"], capture_output=True).stdout.split()
+    for snap_id in target["snaps"]:
+        snap = snaps[snap_id]
+        if snap["name"] in installed:
+            print(f"Snap '{snap['name']}' is already installed. Skipping.")
+            continue
+        snap_dir = os.path.join(bundle_dir, "snaps", snap_id)
+        run_command(["snap", "ack", os.path.join(snap_dir, snap["assert"])])
+        command = ["snap", "install", os.path.join(snap_dir, snap["snap"])]
+        if snap["classic"]:
+            command.append("--classic")
+        run_command(command)
+    for snap_id in target["kept_snaps"]:
+        print(f"Snap '{snap_id}' kept in {bundle_dir}/snaps/{snap_id}.")
+
+
+def install_downloads(bundle_dir, target, downloads):
+    """Installs the bundled binaries into INSTALL_BIN_DIR."""
+    print_color(colors.YELLOW, "\n--- Installing binaries ---")
+    for item in target["downloads"]:
+        entry = downloads[item]
+        path = os.path.join(bundle_dir, "downloads", entry["file"])
+        if entry["kind"] == "binary":
+            dest = os.path.join(INSTALL_BIN_DIR, item)
+            shutil.copy(path, dest)
+            os.chmod(dest, 0o755)
+            print(f"Installed {dest}")
+        elif entry["kind"] == "tgz-binary":
+            install_binaries_from_tarball(path)
+    # The setup recipes expect uv in /usr/bin, as the uv installer puts it.
+    uv = os.path.join(INSTALL_BIN_DIR, "uv")
+    if os.path.exists(uv):
+        shutil.copy(uv, "/usr/bin/uv")
+
+
+def install_binaries_from_tarball(path):
+    """Installs every executable file of a tarball into INSTALL_BIN_DIR."""
+    with tarfile.open(path) as tar:
+        for member in tar.getmembers():
+            if not member.isfile() or not member.mode & 0o111:
+                continue
+            dest = os.path.join(INSTALL_BIN_DIR, os.path.basename(member.name))
+            with tar.extractfile(member) as src, open(dest, "wb") as f:
+                shutil.copyfileobj(src, f)
+            os.chmod(dest, 0o755)
+            print(f"Installed {dest}")
+
+
+def restore_git_repos(bundle_dir, repos):
+    """Restores the bundled repositories into GITS, keeping their upstream URL."""
+    print_color(colors.YELLOW, "\n--- Restoring git repositories ---")
+    os.makedirs(contents.GITS, exist_ok=True)
+    for name, repo in repos.items():
+        bundle_file = os.path.join(bundle_dir, "git", repo["file"])
+        checkout = os.path.join(contents.GITS, name)
+        if os.path.isdir(checkout):
+            run_command(
+                ["git", "fetch", bundle_file, "+refs/heads/*:refs/remotes/origin/*"],
+                cwd=checkout,
+            )
+        else:
+            run_command(["git", "clone", bundle_file, checkout])
+            run_command(
+                ["git", "remote", "set-url", "origin", repo["url"]], cwd=checkout
+            )
+        run_command(["git", "checkout", "--force", repo["commit"]], cwd=checkout)
+        if repo["branch"]:
+            run_command(
+                ["git", "checkout", "-B", repo["branch"], repo["commit"]], cwd=checkout
+            )
+
+
+def restore_go_modules(bundle_dir):
+    """Fills the Go module cache and turns off module downloads."""
+    print_color(colors.YELLOW, "\n--- Restoring Go modules ---")
+    gopath = "/root/go/pkg"
+    os.makedirs(gopath, exist_ok=True)
+    with tarfile.open(os.path.join(bundle_dir, "go", "gomodcache.tar")) as tar:
+        tar.extractall(gopath, filter="data")
+    run_command(["go", "env", "-w", "GOPROXY=off", "GOSUMDB=off", "GOFLAGS=-mod=mod"])
+
+
+def load_images(bundle_dir, target, images):
+    """Loads the container images of the target into each available runtime."""
+    print_color(colors.YELLOW, "\n--- Loading container images ---")
+    for runtime, groups in target["images"].items():
+        if shutil.which(runtime) is None:
+            print(f"'{runtime}' is not installed yet: skipping its images.")
+            continue
+        if runtime == "microk8s":
+            # A freshly installed snap needs its containerd up to import.
+            run_command(["microk8s", "status", "--wait-ready"])
+        for image, entry in sorted(images.items()):
+            if not set(groups).intersection(entry["groups"]):
+                continue
+            path = os.path.join(bundle_dir, "images", entry["file"])
+            if runtime == "microk8s":
+                run_command(["microk8s", "ctr", "image", "import", path])
+            else:
+                run_command(["docker", "load", "-i", path])
+
+
+def import_lxd_image(bundle_dir, lxd_image):
+    """Imports the LXD base image under its bundle alias."""
+    print_color(colors.YELLOW, "\n--- Importing the LXD base image ---")
+    alias = lxd_image["alias"]
+    result = run_command(
+        ["lxc", "image", "info", alias], check=False, capture_output=True
+    )
+    if result.returncode == 0:
+        print(f"LXD image '{alias}' already exists. Skipping.")
+        return
+    # A split image is exported as metadata tarball + rootfs; metadata goes first.
+    files = sorted(
+        glob.glob(os.path.join(bundle_dir, "lxd", "*")),
+        key=lambda path: (".tar" not in path, path),
+    )
+    run_command(["lxc", "image", "import", *files, "--alias", alias])
+
+
+if __name__ == "__main__":
+    main()
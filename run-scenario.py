@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+
+"""
+Runs a deployment scenario as a dependency graph instead of a fixed sequence.
+
+The Makefiles run the deploy files and scripts of a scenario one after the
+other, although many of them do not depend on each other (e.g. building the
+SMO does not need the clusters). Here, each step of a scenario (see
+scenarios.py) declares its inputs and outputs, and starts as soon as the steps
+producing its inputs are done, so independent steps run concurrently, on one
+host or across hosts.
+
+Here's what this script does:
+
+1. **Checks the scenario**: every input is produced by exactly one step, and there are no cycles.
+2. **Runs the steps**: as soon as their inputs are ready (and their locks free), up to `--jobs` at a time. The output of each step goes to its own log file; a failure stops the scheduling of new steps.
+3. **Prints the timeline and the critical path**: the chain of steps that determined the total duration, i.e. the steps worth optimizing.
+
+    ./run-scenario.py kind-demo0
+    ./run-scenario.py kind-demo2 --host main=nephele-1
+    ./run-scenario.py mk8s-local --dry-run
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from scenarios import SCENARIOS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HOST = os.getenv("SERVER_NAME", "nephele")
+
+
+# --- ANSI Color Codes for Better Output ---
+class colors:
+    GREEN = "\033[92m"
+    RED = "\033[91m"
+    YELLOW = "\033[93m"
+    BLUE = "\033[94m"
+    GRAY = "\033[90m"
+    ENDC = "\033[0m"
+
+
+def print_color(color, message):
+    """Prints a message in a given color."""
+    print(f"{color}{message}{colors.ENDC}", flush=True)
+
+
+def dependencies(steps):
+    """
+    Returns {step: set of the steps producing its inputs}.
+    Exits if an input has no producer or several ones.
+    """
+    producers = {}
+    for name, step in steps.items():
+        for output in step["outputs"]:
+            if output in producers:
+                print_color(
+                    colors.RED,
+                    f"FATAL: '{output}' is produced by both "
+                    f"'{producers[output]}' and '{name}'.",
+                )
+                sys.exit(1)
+            producers[output] = name
+
+    needs = {}
+    for name, step in steps.items():
+        missing = [input for input in step["inputs"] if input not in producers]
+        if missing:
+            print_color(colors.RED, f"FATAL: No step produces {missing} for '{name}'.")
+            sys.exit(1)
+        needs[name] = {producers[input] for input in step["inputs"]}
+    return needs
+
+
+def topological_levels(needs):
+    """Groups the steps by depth in the graph. Exits on a cycle."""
+    levels, done = [], set()
+    while len(done) < len(needs):
+        level = sorted(
+            name for name in needs if name not in done and needs[name] <= done
+        )
+        if not level:
+            cycle = sorted(set(needs) - done)
+            print_color(colors.RED, f"FATAL: Dependency cycle between {cycle}.")
+            sys.exit(1)
+        levels.append(level)
+        done.update(level)
+    return levels
+
+
+def step_command(step, hosts):
+    """Returns (argv, cwd, env) to run a step on the host of its role."""
+    host = hosts.get(step["role"], DEFAULT_HOST)
+    if step["via"] == "ssh":
+        remote = f"cd {step['cwd']} && {' '.join(step['command'])}"
+        return ["ssh", f"root@{host}", remote], HERE, {}
+    return step["command"], os.path.join(HERE, step["cwd"]), {"SERVER_NAME": host}
+
+
+def run_step(name, step, hosts, log_dir):
+    """Runs a step, with its output in its log file. Returns its exit code."""
+    command, cwd, env = step_command(step, hosts)
+    with open(os.path.join(log_dir, f"{name}.log"), "w") as log:
+        log.write(f"$ {' '.join(command)}\n")
+        log.flush()
+        return subprocess.run(
+            command,
+            cwd=cwd,
+            env={**os.environ, **env},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+        ).returncode
+
+
+def show_log_tail(log_dir, name, lines=20):
+    with open(os.path.join(log_dir, f"{name}.log")) as log:
+        tail = log.readlines()[-lines:]
+    for line in tail:
+        print(f"  {colors.GRAY}[{name}]{colors.ENDC} {line}", end="")
+
+
+def run_scenario(steps, needs, hosts, jobs, log_dir):
+    """
+    Runs the steps as their dependencies complete.
+    Returns ({step: (start, end)}, failed steps).
+    """
+    pending = dict(needs)
+    running, timings, failed = {}, {}, []
+    done, held_locks = set(), set()
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            if not failed:
+                for name in sorted(pending):
+                    if len(running) >= jobs:
+                        break
+                    locks = set(steps[name]["locks"])
+                    if pending[name] <= done and not locks & held_locks:
+                        del pending[name]
+                        held_locks |= locks
+                        timings[name] = (time.monotonic() - started, None)
+                        print_color(colors.BLUE, f"--> Starting {name}")
+                        future = pool.submit(
+                            run_step, name, steps[name], hosts, log_dir
+                        )
+                        running[future] = name
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                held_locks -= set(steps[name]["locks"])
+                start = timings[name][0]
+                end = time.monotonic() - started
+                timings[name] = (start, end)
+                if future.result() == 0:
+                    done.add(name)
+                    print_color(colors.GREEN, f"✅ {name} ({end - start:.0f}s)")
+                else:
+                    failed.append(name)
+                    print_color(colors.RED, f"❌ {name} failed ({end - start:.0f}s)")
+                    show_log_tail(log_dir, name)
+    return timings, failed
+
+
+def critical_path(needs, timings):
+    """
+    Returns the chain of steps that determined the total duration: from the
+    step that finished last, back through the dependency that finished last.
+    """
+    finished = {name: timing for name, timing in timings.items() if timing[1]}
+    if not finished:
+        return []
+    path = [max(finished, key=lambda name: finished[name][1])]
+    while True:
+        gating = [dep for dep in needs[path[-1]] if dep in finished]
+        if not gating:
+            break
+        path.append(max(gating, key=lambda name: finished[name][1]))
+    return path[::-1]
+
+
+def print_report(needs, timings):
+    print_color(colors.YELLOW, "\n--- Timeline (seconds since start) ---")
+    for name, (start, end) in sorted(timings.items(), key=lambda item: item[1][0]):
+        print(f"  {name:<20} {start:7.0f} → {end:7.0f}  ({end - start:5.0f}s)")
+
+    total = max(end for _, end in timings.values())
+    serial = sum(end - start for start, end in timings.values())
+    print_color(colors.YELLOW, "\n--- Critical path ---")
+    for name in critical_path(needs, timings):
+        start, end = timings[name]
+        print(f"  {name:<20} {end - start:7.0f}s")
+    print(f"\n  Total: {total:.0f}s (the steps one after the other: {serial:.0f}s)")
+
+
+def parse_hosts(values):
+    hosts = {}
+    for value in values:
+        role, separator, host = value.partition("=")
+        if not separator:
+            print_color(colors.RED, f"FATAL: --host expects ROLE=HOST, not '{value}'.")
+            sys.exit(1)
+        hosts[role] = host
+    return hosts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a deployment scenario, with independent steps in parallel."
+    )
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument(
+        "--host",
+        action="append",
+        default=[],
+        metavar="ROLE=HOST",
+        help=f"Host of the steps of a role (default for all roles: {DEFAULT_HOST}).",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=4, help="Maximum number of concurrent steps."
+    )
+    parser.add_argument(
+        "--log-dir", help="Directory of the step logs (default: a temporary one)."
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only show the steps, by level."
+    )
+    args = parser.parse_args()
+
+    steps = SCENARIOS[args.scenario]
+    needs = dependencies(steps)
+    levels = topological_levels(needs)
+    hosts = parse_hosts(args.host)
+
+    print_color(colors.YELLOW, f"--- Scenario {args.scenario} ---")
+    for depth, level in enumerate(levels):
+        for name in level:
+            after = ", ".join(sorted(needs[name])) or "-"
+            host = hosts.get(steps[name]["role"], DEFAULT_HOST)
+            print(f"  {depth}. {name:<20} on {host:<15} after: {after}")
+    if args.dry_run:
+        return
+
+    log_dir = args.log_dir or tempfile.mkdtemp(prefix=f"scenario-{args.scenario}-")
+    os.makedirs(log_dir, exist_ok=True)
+    print(f"Step logs: {log_dir}\n")
+
+    timings, failed = run_scenario(steps, needs, hosts, max(args.jobs, 1), log_dir)
+    print_report(needs, timings)
+    if failed:
+        not_run = sorted(set(steps) - set(timings))
+        print_color(colors.RED, f"\nFATAL: {', '.join(failed)} failed.")
+        if not_run:
+            print(f"  Not run: {', '.join(not_run)}")
+        sys.exit(1)
+    print_color(colors.GREEN, f"\n✅ --- Scenario {args.scenario} completed! --- ✅")
+
+
+if __name__ == "__main__":
+    main()
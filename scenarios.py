@@ -0,0 +1,137 @@
+"""
+Scenarios for run-scenario.py.
+
+A scenario is a set of named steps. Each step runs one kind deploy file (with
+pyinfra, from the kind/ directory) or one mk8s-local script (over ssh, in
+/root/local-scripts, see `make push-local-scripts`), and declares:
+
+- inputs: what it needs (e.g. "clusters"),
+- outputs: what it sets up, for the steps that need it,
+- role: the host it runs on, "main" unless stated otherwise (see --host),
+- locks: steps sharing a lock never run at the same time.
+
+A step starts as soon as every step producing one of its inputs is done.
+"""
+
+
+def kind(deploy, inputs=(), outputs=(), role="main", locks=()):
+    """A kind deploy file, run with pyinfra on the host of `role`."""
+    return {
+        "via": "pyinfra",
+        "cwd": "kind",
+        "command": ["pyinfra", "-y", "--user", "root", "_common/inventory.py", deploy],
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "role": role,
+        "locks": list(locks),
+    }
+
+
+def mk8s_local(script, inputs=(), outputs=(), role="main", locks=()):
+    """A script of mk8s-local/local-scripts, run over ssh on the host of `role`."""
+    return {
+        "via": "ssh",
+        "cwd": "/root/local-scripts",
+        "command": [f"./{script}"],
+        "inputs": list(inputs),
+        "outputs": list(outputs),
+        "role": role,
+        "locks": list(locks),
+    }
+
+
+# Steps shared by the kind demos: the testbed, Prometheus and the SMO. The SMO
+# is built while the clusters come up, and both Prometheus installs run at the
+# same time.
+KIND_TESTBED = {
+    "setup-server": kind("_common/0-setup-server.py", outputs=["server"]),
+    "kind-tools": kind("_common/2-install-kind-kubectl.py", ["server"], ["kind"]),
+    "karmada": kind("_common/4-install-kubectl-karmada.py", ["kind"], ["clusters"]),
+    "kubeconfig": kind("_common/8-merge-kube-configs.py", ["clusters"], ["kubeconfig"]),
+    "prometheus": kind(
+        "_common/5-install-prometheus.py", ["kubeconfig"], ["prometheus"]
+    ),
+    "prometheus-members": kind(
+        "_common/6-install-prometheus-members.py",
+        ["kubeconfig"],
+        ["prometheus-members"],
+    ),
+    "smo-build": kind("_common/10-build-nephele-smo.py", ["server"], ["smo-source"]),
+    "smo": kind(
+        "_common/10-install-nephele-smo.py",
+        ["smo-source", "prometheus", "prometheus-members"],
+        ["smo"],
+    ),
+}
+
+SCENARIOS = {
+    # The base testbed of testbed.py, shared by the kind-scripts-demo-* demos.
+    "kind-base": KIND_TESTBED,
+    "kind-demo0": {
+        **KIND_TESTBED,
+        "h3ni-demos": kind(
+            "demo0-hello-world/11-pull-h3ni-demo.py", ["server"], ["h3ni-demos"]
+        ),
+        "demo": kind(
+            "demo0-hello-world/12-deploy-demo-hello-world.py",
+            ["smo", "h3ni-demos"],
+            ["demo"],
+        ),
+    },
+    "kind-demo1": {
+        **KIND_TESTBED,
+        "demo": kind("demo1-nginx/13-deploy-nginx.py", ["smo"], ["demo"]),
+    },
+    "kind-demo2": {
+        **KIND_TESTBED,
+        "bxl-build": kind(
+            "demo2-bxl/11-build-bxl-demo.py", ["smo-source"], ["bxl-artifacts"]
+        ),
+        "demo": kind(
+            "demo2-bxl/12-install-bxl-demo.py", ["smo", "bxl-artifacts"], ["demo"]
+        ),
+    },
+    # The demos all add LXD proxy devices to the member containers, and
+    # concurrent changes to the configuration of a container conflict.
+    "mk8s-local": {
+        "prepare": mk8s_local("0-prepare-server.py", outputs=["host"]),
+        "clusters": mk8s_local("1-create-clusters-on-lxd.py", ["host"], ["members"]),
+        "karmada": mk8s_local("2-setup-karmada.py", ["members"], ["karmada"]),
+        "check": mk8s_local("3-check-karmada.py", ["karmada"], ["checked"]),
+        "nginx": mk8s_local(
+            "4-nginx-demo.py", ["karmada"], ["nginx-demo"], locks=["lxd-devices"]
+        ),
+        "flask-1": mk8s_local(
+            "5-flask-demo-1.py", ["karmada"], ["flask-demo-1"], locks=["lxd-devices"]
+        ),
+        "flask-2": mk8s_local(
+            "5-flask-demo-2.py", ["karmada"], ["flask-demo-2"], locks=["lxd-devices"]
+        ),
+        "prometheus": mk8s_local(
+            "6-install-prometheus.py",
+            ["members"],
+            ["prometheus"],
+            locks=["lxd-devices"],
+        ),
+        "verify": mk8s_local(
+            "8-verify-full-system.py",
+            ["checked", "nginx-demo", "flask-demo-1", "flask-demo-2", "prometheus"],
+            ["verified"],
+        ),
+    },
+}
+
+# The demo-specific deploy files of the kind-scripts-demo-* directories, run by
+# testbed.py (from their directory, with their own inventory.py) against the
+# base testbed. The rest of their Makefile targets is the base testbed.
+# kind-scripts-demo-3-autoscaling has no deploy file for its demo (its
+# Makefile refers to a missing 12-deploy-demo-autoscaling), so it only pulls
+# the demo sources.
+KIND_DEMOS = {
+    "0-hello-world": ["11-pull-h3ni-demo.py", "12-deploy-demo-hello-world.py"],
+    "2-gpu-offloading": ["11-pull-h3ni-demo.py", "14-deploy-demo-2.py"],
+    "3-autoscaling": ["11-pull-h3ni-demo.py"],
+    "4-resilience": ["11-pull-h3ni-demo.py", "12-deploy-demo-resilience.py"],
+    "bxl": ["12-install-bxl-demo.py"],
+    "nginx": ["13-deploy-nginx.py"],
+}
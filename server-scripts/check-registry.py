@@ -1,14 +1,433 @@
 #!/usr/bin/env python3
 
 """
-This script checks if specific repositories (from the BXL-demo) are present in the Docker registry catalog.
+Checks and maintains the local Docker registries: the `registry` container on
+:5000 (kind testbeds) and the MicroK8s registry add-on on :32000.
+
+Here's what this script does:
+
+1. **check [REPO...]**: Checks that repositories (by default, the ones of the BXL demo) are present in the registry catalog.
+2. **inventory**: Walks the catalog and the tags of every repository (paginated, the repositories concurrently) and prints the digest and size of every tag, the size of each repository and the space the unique blobs take.
+3. **prune --keep N**: Applies a retention policy: keeps the N most recent tags of each repository (by image creation date, then by tag) and deletes the manifests of the others, unless a kept tag shares them. With `--dry-run`, only prints what it would delete.
+4. **gc**: Runs the registry's garbage collection in the running registry (online: the registry is not stopped), restarts the registry, then reports how many bytes it reclaimed. `prune --gc` does both.
+
+Deleting manifests needs a registry with deletes enabled
+(REGISTRY_STORAGE_DELETE_ENABLED, as start_docker_registry() and the MicroK8s
+add-on configure it). Nothing should be pushed while the garbage collection
+runs: blobs uploaded but not yet referenced by a manifest could be removed.
+
+The registry must be restarted after a garbage collection: its default
+configuration caches blob descriptors in memory, so it would keep reporting
+the deleted blobs as present, and the next push would skip them ("Layer
+already exists") and leave manifests pointing at missing blobs.
+
+`registry garbage-collect --delete-untagged` is not used: registry 2.8 (the
+image of the MicroK8s add-on) deletes the per-platform manifests that only an
+image index refers to, which breaks the images pushed by buildx. Instead,
+`prune` deletes the per-platform manifests of the indexes it deletes, unless a
+kept tag refers to them.
+
+Usage:
+    ./check-registry.py inventory
+    ./check-registry.py --registry 32000 inventory --json
+    ./check-registry.py prune --keep 3 --dry-run
+    ./check-registry.py prune --keep 3 --gc
 """
 
+import argparse
+import json
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 
+# name -> (API URL, command prefix to run a command in the registry, commands
+# restarting it).
+REGISTRIES = {
+    "5000": (
+        "http://localhost:5000",
+        ["docker", "exec", "registry"],
+        [["docker", "restart", "registry"]],
+    ),
+    "32000": (
+        "http://localhost:32000",
+        ["microk8s", "kubectl", "-n", "container-registry", "exec", "deploy/registry"]
+        + ["--"],
+        [
+            ["microk8s", "kubectl", "-n", "container-registry"]
+            + ["rollout", "restart", "deploy/registry"],
+            ["microk8s", "kubectl", "-n", "container-registry"]
+            + ["rollout", "status", "deploy/registry", "--timeout=120s"],
+        ],
+    ),
+}
+BXL_REPOSITORIES = ["custom-vo", "image-detection", "noise-reduction"]
+PAGE_SIZE = 100
+REQUEST_TIMEOUT = 30
+RESTART_TIMEOUT = 120
+STORAGE_DIR = "/var/lib/registry"
+# The configuration file of registry v3 images, then of v2 ones.
+CONFIG_FILES = ["/etc/distribution/config.yml", "/etc/docker/registry/config.yml"]
+MANIFEST_MEDIA_TYPES = ", ".join(
+    [
+        "application/vnd.oci.image.index.v1+json",
+        "application/vnd.docker.distribution.manifest.list.v2+json",
+        "application/vnd.oci.image.manifest.v1+json",
+        "application/vnd.docker.distribution.manifest.v2+json",
+    ]
+)
+INDEX_MEDIA_TYPES = {
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+}
+
+_sessions = threading.local()
+
+
+def session():
+    """One HTTP session (connection pool) per thread."""
+    if not hasattr(_sessions, "session"):
+        _sessions.session = requests.Session()
+    return _sessions.session
+
+
+def get(url, **kwargs):
+    response = session().get(url, timeout=REQUEST_TIMEOUT, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def paginated(url, key):
+    """Yields the items of a paginated list (the catalog, or tags)."""
+    while url:
+        response = get(url, params={"n": PAGE_SIZE} if "?" not in url else None)
+        yield from response.json().get(key) or []
+        # Link: </v2/_catalog?last=x&n=100>; rel="next"
+        match = re.search(r'<([^>]+)>;\s*rel="next"', response.headers.get("Link", ""))
+        url = requests.compat.urljoin(url, match.group(1)) if match else None
+
+
+def list_repositories(base_url):
+    return list(paginated(f"{base_url}/v2/_catalog", "repositories"))
+
+
+def list_tags(base_url, repository):
+    return list(paginated(f"{base_url}/v2/{repository}/tags/list", "tags"))
+
+
+def get_manifest(base_url, repository, reference):
+    """Returns (digest, manifest) for a tag or digest."""
+    response = get(
+        f"{base_url}/v2/{repository}/manifests/{reference}",
+        headers={"Accept": MANIFEST_MEDIA_TYPES},
+    )
+    return response.headers.get("Docker-Content-Digest"), response.json()
+
+
+def manifest_blobs(base_url, repository, manifest):
+    """Returns {digest: size} of the blobs of a manifest (or of an index)."""
+    if manifest.get("mediaType") in INDEX_MEDIA_TYPES or "manifests" in manifest:
+        blobs = {}
+        for child in manifest.get("manifests", []):
+            _, child_manifest = get_manifest(base_url, repository, child["digest"])
+            blobs.update(manifest_blobs(base_url, repository, child_manifest))
+        return blobs
+    descriptors = [manifest.get("config") or {}] + manifest.get("layers", [])
+    return {d["digest"]: d.get("size", 0) for d in descriptors if "digest" in d}
+
+
+def created_at(base_url, repository, manifest):
+    """The creation date of an image (from its config), or "" if unknown."""
+    config = manifest.get("config") or {}
+    if not config.get("mediaType", "").endswith(("config.v1+json", "image.config")):
+        return ""
+    try:
+        return (
+            get(f"{base_url}/v2/{repository}/blobs/{config['digest']}")
+            .json()
+            .get("created", "")
+        )
+    except (requests.RequestException, ValueError):
+        return ""
+
+
+def inspect_repository(base_url, repository):
+    """
+    Returns the tags of a repository: [{tag, digest, size, created, blobs,
+    children}], children being the manifests of an index.
+    """
+    tags = []
+    for tag in list_tags(base_url, repository):
+        digest, manifest = get_manifest(base_url, repository, tag)
+        blobs = manifest_blobs(base_url, repository, manifest)
+        tags.append(
+            {
+                "tag": tag,
+                "digest": digest,
+                "size": sum(blobs.values()),
+                "created": created_at(base_url, repository, manifest),
+                "blobs": blobs,
+                "children": [c["digest"] for c in manifest.get("manifests", [])],
+            }
+        )
+    return tags
+
+
+def walk_registry(base_url, jobs):
+    """Returns {repository: tags}, inspecting `jobs` repositories at a time."""
+    repositories = list_repositories(base_url)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(lambda r: inspect_repository(base_url, r), repositories)
+        return dict(zip(repositories, results))
+
+
+def human_size(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+
+def version_key(tag):
+    """Sorts tags like versions: 0.10.0 after 0.9.0."""
+    return [
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in re.split(r"[.\-_+]", tag)
+    ]
+
+
+def newest_first(tags):
+    return sorted(
+        tags, key=lambda t: (t["created"], version_key(t["tag"])), reverse=True
+    )
+
+
+#
+# Commands
+#
+def cmd_check(base_url, args):
+    """Checks that repositories are present in the catalog."""
+    catalog = set(list_repositories(base_url))
+    repositories = args.repositories or BXL_REPOSITORIES
+    missing = [repo for repo in repositories if repo not in catalog]
+    if missing:
+        print(f"Repositories not found in catalog: {', '.join(missing)}")
+        return False
+    print("All repositories are in the catalog.")
+    return True
+
+
+def cmd_inventory(base_url, args):
+    inventory = walk_registry(base_url, args.jobs)
+    if args.json:
+        print(json.dumps(inventory, indent=2))
+        return True
+
+    unique_blobs = {}
+    for repository, tags in sorted(inventory.items()):
+        repository_blobs = {}
+        for tag in tags:
+            repository_blobs.update(tag["blobs"])
+        unique_blobs.update(repository_blobs)
+        print(
+            f"{repository}  ({len(tags)} tags, "
+            f"{human_size(sum(repository_blobs.values()))})"
+        )
+        for tag in newest_first(tags):
+            print(
+                f"    {tag['tag']:<30} {(tag['digest'] or '?')[:19]}  "
+                f"{human_size(tag['size']):>10}  {tag['created'][:19]}"
+            )
+    print(
+        f"\n{len(inventory)} repositories, "
+        f"{sum(len(tags) for tags in inventory.values())} tags, "
+        f"{len(unique_blobs)} unique blobs ({human_size(sum(unique_blobs.values()))})"
+    )
+    return True
+
+
+def delete_manifest(base_url, repository, digest):
+    response = session().delete(
+        f"{base_url}/v2/{repository}/manifests/{digest}", timeout=REQUEST_TIMEOUT
+    )
+    if response.status_code == 405:
+        print("FATAL: the registry does not allow deletes.")
+        print("Set REGISTRY_STORAGE_DELETE_ENABLED=true in its environment.")
+        return False
+    return response.status_code in (202, 404)
+
+
+def cmd_prune(base_url, args, exec_prefix, restart):
+    """
+    Keeps the `--keep` most recent tags of each repository. The manifests of
+    the indexes deleted are deleted too, unless a kept tag refers to them.
+    """
+    inventory = walk_registry(base_url, args.jobs)
+    deletions = []  # (repository, digest, tags)
+    for repository, tags in sorted(inventory.items()):
+        if args.repository and not re.fullmatch(args.repository, repository):
+            continue
+        ordered = newest_first(tags)
+        kept = set()
+        for tag in ordered[: args.keep]:
+            kept |= {tag["digest"], *tag["children"]}
+        expired = {}
+        for tag in ordered[args.keep :]:
+            if tag["digest"] not in kept:
+                expired.setdefault(tag["digest"], []).append(tag["tag"])
+                for child in tag["children"]:
+                    if child not in kept:
+                        expired.setdefault(child, [f"{tag['tag']} (platform)"])
+        deletions += [(repository, d, t) for d, t in expired.items()]
+
+    for repository, digest, tags in deletions:
+        action = "Would delete" if args.dry_run else "Deleting"
+        print(f"{action} {repository}:{','.join(tags)} ({digest[:19]})")
+    if args.dry_run or not deletions:
+        print(f"{len(deletions)} manifests to delete.")
+        return True
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(
+            pool.map(lambda d: delete_manifest(base_url, d[0], d[1]), deletions)
+        )
+    print(f"Deleted {sum(results)} of {len(deletions)} manifests.")
+    if not all(results):
+        return False
+    return cmd_gc(base_url, args, exec_prefix, restart) if args.gc else True
+
+
+def storage_bytes(exec_prefix):
+    """The disk usage of the registry storage, or None."""
+    result = subprocess.run(
+        exec_prefix + ["du", "-sk", STORAGE_DIR], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr.strip())
+        return None
+    return int(result.stdout.split()[0]) * 1024
+
+
+def restart_registry(base_url, restart):
+    """
+    Restarts the registry (dropping its in-memory blob descriptor cache), and
+    waits until its API answers again.
+    """
+    print(f"--> Restarting {base_url}...")
+    for command in restart:
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(result.stdout + result.stderr)
+            return False
+    deadline = time.monotonic() + RESTART_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            if session().get(f"{base_url}/v2/", timeout=5).ok:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    print(f"FATAL: {base_url} did not answer after its restart.")
+    return False
+
+
+def cmd_gc(base_url, args, exec_prefix, restart):
+    """
+    Garbage-collects the registry storage, restarts the registry, and reports
+    the bytes reclaimed.
+    """
+    if exec_prefix is None:
+        print("FATAL: use --registry 5000 or 32000 to garbage-collect.")
+        return False
+    before = storage_bytes(exec_prefix)
+    configs = " ".join(CONFIG_FILES)
+    command = f"registry garbage-collect $(ls {configs} 2> /dev/null | head -1)"
+    print(f"--> Garbage-collecting {base_url}...")
+    result = subprocess.run(
+        exec_prefix + ["sh", "-c", command], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stdout + result.stderr)
+        return False
+    if not restart_registry(base_url, restart):
+        return False
+    blobs = len(re.findall(r"(?m)^blob eligible for deletion", result.stdout))
+    after = storage_bytes(exec_prefix)
+    if before is None or after is None:
+        print(f"Garbage collection done ({blobs} blobs deleted).")
+        return True
+    print(
+        f"Garbage collection done: {blobs} blobs deleted, "
+        f"{human_size(before - after)} reclaimed "
+        f"({human_size(before)} -> {human_size(after)})."
+    )
+    return True
+
 
 def my_callback():
-    res = requests.get("http://localhost:5000/v2/_catalog")
-    json = res.json()
-    for repo in ["custom-vo", "image-detection", "noise-reduction"]:
-        assert repo in json["repositories"], f"Repository {repo} not found in catalog"
+    """The former check of this script, kept for the recipes that call it."""
+    assert cmd_check(REGISTRIES["5000"][0], argparse.Namespace(repositories=[])), (
+        "Some BXL repositories are missing"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check and maintain the local Docker registries."
+    )
+    parser.add_argument(
+        "--registry",
+        default="5000",
+        help="5000 (the registry container), 32000 (the MicroK8s registry) "
+        "or the URL of another registry (no garbage collection). Default: 5000.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=8,
+        help="Repositories inspected (or manifests deleted) concurrently. Default: 8.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    check = commands.add_parser("check", help="Check that repositories exist.")
+    check.add_argument("repositories", nargs="*", metavar="REPO")
+    inventory = commands.add_parser("inventory", help="List tags, digests and sizes.")
+    inventory.add_argument("--json", action="store_true", help="Print JSON.")
+    prune = commands.add_parser("prune", help="Keep the last N tags per repository.")
+    prune.add_argument("--keep", type=int, required=True, metavar="N")
+    prune.add_argument(
+        "--repository", metavar="REGEX", help="Only prune the matching repositories."
+    )
+    prune.add_argument("--dry-run", action="store_true")
+    prune.add_argument(
+        "--gc", action="store_true", help="Garbage-collect after the deletions."
+    )
+    commands.add_parser("gc", help="Garbage-collect and report the space reclaimed.")
+    args = parser.parse_args()
+    if args.command == "prune" and args.keep < 1:
+        parser.error("--keep must be at least 1.")
+
+    base_url, exec_prefix, restart = REGISTRIES.get(
+        args.registry, (args.registry, None, None)
+    )
+    base_url = base_url.rstrip("/")
+    try:
+        if args.command == "check":
+            succeeded = cmd_check(base_url, args)
+        elif args.command == "inventory":
+            succeeded = cmd_inventory(base_url, args)
+        elif args.command == "prune":
+            succeeded = cmd_prune(base_url, args, exec_prefix, restart)
+        else:
+            succeeded = cmd_gc(base_url, args, exec_prefix, restart)
+    except requests.RequestException as e:
+        print(f"FATAL: registry {base_url} error: {e}")
+        succeeded = False
+    sys.exit(0 if succeeded else 1)
+
+
+if __name__ == "__main__":
+    main()
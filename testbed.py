@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+
+"""
+Runs the kind-scripts-demo-* demos against a shared, reusable base testbed.
+
+Each kind-scripts-demo-* Makefile builds the whole testbed (server setup,
+kind clusters, Karmada, Prometheus, SMO) before its own demo, so running all
+the demos one after the other rebuilds the same testbed again and again. Here,
+the testbed (the "kind-base" scenario of scenarios.py, i.e. kind/_common) is
+built once, and each demo only runs its own deploy files (KIND_DEMOS in
+scenarios.py) against it. Like the testbed of the demo directories, the base
+patches the SMO with their fix/kind.patch (DEMOS_SMO_PATCH), and its clusters
+pull from the local registry at the host's address (see
+4-install-kubectl-karmada.py).
+
+Here's what this script does:
+
+1. **Ensures the base testbed**: the base is fingerprinted with a hash of the deploy files it is built from (kind/_common and kind/fix, and the SMO patch of the demos). The fingerprint is stored on the server after a successful build, and the base is rebuilt (with run-scenario.py) only if the fingerprints differ, if the clusters or the SMO are not healthy, or with `--force`.
+2. **Resets the demos**: before each demo, the SMO graphs and the demo namespaces are removed (kind/_common/reset-demos.py), which takes seconds instead of a rebuild.
+3. **Runs the demos**: one after the other (they share the SMO and the clusters), and prints a timing table. A failed demo does not stop the next ones.
+
+    ./testbed.py base
+    ./testbed.py demo 0-hello-world nginx
+    ./testbed.py matrix
+    ./testbed.py reset
+"""
+
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from scenarios import KIND_DEMOS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+KIND_DIR = os.path.join(HERE, "kind")
+DEFAULT_HOST = os.getenv("SERVER_NAME", "nephele")
+
+# The demo directories share the same SMO patch, with their values for the
+# brussels demo on kind.
+DEMOS_SMO_PATCH = os.path.join(HERE, "kind-scripts-demo-0-hello-world/fix/kind.patch")
+# What the base testbed is built from: a change here means a rebuild.
+BASE_SOURCES = ["kind/_common", "kind/fix", DEMOS_SMO_PATCH]
+RESET_DEPLOY = "kind/_common/reset-demos.py"
+FINGERPRINT_FILE = "/root/.cache/nephele/base-testbed.fingerprint"
+
+# Exits with 0 if the members are Ready in Karmada and the SMO answers.
+HEALTH_CHECK = """\
+export KUBECONFIG=/root/.kube/karmada-apiserver.config
+kubectl --context karmada-apiserver wait clusters --all \
+    --for=condition=Ready --timeout=10s > /dev/null || exit 1
+curl -sf -o /dev/null --max-time 5 http://127.0.0.1:8000/clusters/
+"""
+
+
+# --- ANSI Color Codes for Better Output ---
+class colors:
+    GREEN = "\033[92m"
+    RED = "\033[91m"
+    YELLOW = "\033[93m"
+    BLUE = "\033[94m"
+    GRAY = "\033[90m"
+    ENDC = "\033[0m"
+
+
+def print_color(color, message):
+    """Prints a message in a given color."""
+    print(f"{color}{message}{colors.ENDC}", flush=True)
+
+
+def source_files(source):
+    """Returns the files of a base source (a file or a directory), sorted."""
+    source = os.path.join(HERE, source)
+    if os.path.isfile(source):
+        return [source]
+    paths = []
+    for root, dirs, files in os.walk(source):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        paths += [os.path.join(root, name) for name in sorted(files)]
+    return paths
+
+
+def base_fingerprint():
+    """Returns the hash of the files the base testbed is built from."""
+    digest = hashlib.sha256()
+    for source in BASE_SOURCES:
+        for path in source_files(source):
+            relative = os.path.relpath(path, HERE)
+            if relative == RESET_DEPLOY or path.endswith(".pyc"):
+                continue
+            digest.update(relative.encode() + b"\0")
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+def ssh(host, command, command_input=None):
+    """Runs a shell command on the host. Returns the CompletedProcess."""
+    return subprocess.run(
+        ["ssh", f"root@{host}", command],
+        input=command_input,
+        capture_output=True,
+        text=True,
+    )
+
+
+def run_logged(command, cwd, host, log_path):
+    """Runs a command with its output in a log file. Returns its duration."""
+    start = time.monotonic()
+    with open(log_path, "w") as log:
+        log.write(f"$ {' '.join(command)}\n")
+        log.flush()
+        returncode = subprocess.run(
+            command,
+            cwd=cwd,
+            env={**os.environ, "SERVER_NAME": host},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+        ).returncode
+    duration = time.monotonic() - start
+    if returncode != 0:
+        with open(log_path) as log:
+            for line in log.readlines()[-20:]:
+                print(f"  {colors.GRAY}|{colors.ENDC} {line}", end="")
+        return None
+    return duration
+
+
+def ensure_base(host, force, log_dir):
+    """Builds the base testbed unless an identical, healthy one is there."""
+    fingerprint = base_fingerprint()
+    stored = ssh(host, f"cat {FINGERPRINT_FILE}").stdout.strip()
+    if not force and stored == fingerprint:
+        if ssh(host, "bash -s", HEALTH_CHECK).returncode == 0:
+            print_color(colors.GREEN, f"✅ Base testbed {fingerprint} is up to date.")
+            return True
+        print_color(colors.YELLOW, "--> The base testbed is not healthy.")
+    elif not force:
+        print_color(
+            colors.YELLOW,
+            f"--> Base testbed {stored or 'missing'}, expected {fingerprint}.",
+        )
+
+    print_color(colors.BLUE, f"--> Building base testbed {fingerprint} on {host}")
+    # A build that fails halfway must not be taken for a complete one.
+    ssh(host, f"rm -f {FINGERPRINT_FILE}")
+    command = [
+        os.path.join(HERE, "run-scenario.py"),
+        "kind-base",
+        "--host",
+        f"main={host}",
+        "--log-dir",
+        os.path.join(log_dir, "base"),
+    ]
+    env = {**os.environ, "NEPHELE_SMO_PATCH": DEMOS_SMO_PATCH}
+    if subprocess.run(command, cwd=HERE, env=env).returncode != 0:
+        print_color(colors.RED, "❌ The base testbed could not be built.")
+        return False
+    directory = os.path.dirname(FINGERPRINT_FILE)
+    ssh(host, f"mkdir -p {directory} && echo {fingerprint} > {FINGERPRINT_FILE}")
+    return True
+
+
+def reset_demos(host, log_dir, label="reset"):
+    """Removes the SMO graphs and namespaces of the demos. Returns its duration."""
+    command = ["pyinfra", "-y", "--user", "root", "_common/inventory.py"]
+    return run_logged(
+        [*command, os.path.relpath(RESET_DEPLOY, "kind")],
+        KIND_DIR,
+        host,
+        os.path.join(log_dir, f"{label}.log"),
+    )
+
+
+def deploy_demo(name, host, log_dir):
+    """Runs the demo's own deploy files. Returns its duration."""
+    command = ["pyinfra", "-y", "--user", "root", "inventory.py", *KIND_DEMOS[name]]
+    return run_logged(
+        command,
+        os.path.join(HERE, f"kind-scripts-demo-{name}"),
+        host,
+        os.path.join(log_dir, f"{name}.log"),
+    )
+
+
+def run_demos(names, host, log_dir):
+    """
+    Runs the demos one after the other, each after a reset.
+    Returns {demo: (reset duration, deploy duration)}, None for a failure.
+    """
+    results = {}
+    for name in names:
+        print_color(colors.BLUE, f"--> Resetting the demos before {name}")
+        reset = reset_demos(host, log_dir, f"reset-{name}")
+        deploy = None
+        if reset is not None:
+            print_color(colors.BLUE, f"--> Deploying {name}")
+            deploy = deploy_demo(name, host, log_dir)
+        if deploy is None:
+            print_color(colors.RED, f"❌ {name} failed")
+        else:
+            print_color(colors.GREEN, f"✅ {name} ({reset + deploy:.0f}s)")
+        results[name] = (reset, deploy)
+    return results
+
+
+def print_report(results, base_duration):
+    print_color(colors.YELLOW, "\n--- Demos (seconds) ---")
+    print(f"  {'DEMO':<20} {'RESET':>7} {'DEPLOY':>7}  STATUS")
+    for name, (reset, deploy) in results.items():
+        status = "ok" if deploy is not None else "FAILED"
+        reset = f"{reset:.0f}" if reset is not None else "-"
+        deploy = f"{deploy:.0f}" if deploy is not None else "-"
+        print(f"  {name:<20} {reset:>7} {deploy:>7}  {status}")
+    print(f"\n  Base testbed: {base_duration:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the kind demos against a shared base testbed."
+    )
+    parser.add_argument(
+        "command",
+        choices=["base", "reset", "demo", "matrix"],
+        help="base: ensure the base testbed; reset: reset the demos; "
+        "demo: run the given demos; matrix: run all the demos.",
+    )
+    parser.add_argument("demos", nargs="*", metavar="DEMO", help=", ".join(KIND_DEMOS))
+    parser.add_argument(
+        "--host", default=DEFAULT_HOST, help=f"Test server (default: {DEFAULT_HOST})."
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Rebuild the base testbed in any case."
+    )
+    parser.add_argument("--log-dir", help="Directory of the logs (default: temporary).")
+    args = parser.parse_args()
+
+    names = list(KIND_DEMOS) if args.command == "matrix" else args.demos
+    unknown = [name for name in names if name not in KIND_DEMOS]
+    if unknown:
+        print_color(colors.RED, f"FATAL: Unknown demos: {', '.join(unknown)}.")
+        sys.exit(1)
+    if args.command == "demo" and not names:
+        print_color(colors.RED, "FATAL: No demo given.")
+        sys.exit(1)
+
+    log_dir = args.log_dir or tempfile.mkdtemp(prefix="testbed-")
+    os.makedirs(log_dir, exist_ok=True)
+    print(f"Logs: {log_dir}\n")
+
+    if args.command == "reset":
+        sys.exit(0 if reset_demos(args.host, log_dir) is not None else 1)
+
+    start = time.monotonic()
+    if not ensure_base(args.host, args.force, log_dir):
+        sys.exit(1)
+    base_duration = time.monotonic() - start
+    if args.command == "base":
+        return
+
+    results = run_demos(names, args.host, log_dir)
+    print_report(results, base_duration)
+    failed = [name for name, (_, deploy) in results.items() if deploy is None]
+    if failed:
+        print_color(colors.RED, f"\nFATAL: {', '.join(failed)} failed.")
+        sys.exit(1)
+    print_color(colors.GREEN, f"\n✅ --- {len(results)} demo(s) completed! --- ✅")
+
+
+if __name__ == "__main__":
+    main()